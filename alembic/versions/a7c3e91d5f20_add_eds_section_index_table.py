@@ -0,0 +1,33 @@
+"""add_eds_section_index_table
+
+Revision ID: a7c3e91d5f20
+Revises: 31e8e8e7c8d7
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e91d5f20'
+down_revision = '31e8e8e7c8d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tokenized EDS sections (section -> ordered key/value list with source offsets),
+    # computed once at import and reused by PQA reconstruction and diffing
+    op.create_table(
+        'eds_section_index',
+        sa.Column('eds_file_id', sa.Integer(), nullable=False),
+        sa.Column('format_version', sa.Integer(), nullable=False),
+        sa.Column('index_data', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('eds_file_id'),
+        sa.ForeignKeyConstraint(['eds_file_id'], ['eds_files.id'], ondelete='CASCADE')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('eds_section_index')
@@ -0,0 +1,34 @@
+"""add_device_versions_table
+
+Revision ID: a7d3e5b91c20
+Revises: f3a9c2d7e641
+Create Date: 2026-10-19 18:40:12.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5b91c20'
+down_revision = 'f3a9c2d7e641'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One version stamp per IODD device, bumped whenever the device is saved.
+    # Used for ETag/Last-Modified on device-scoped responses
+    # (src/utils/device_versions.py, src/utils/conditional_requests.py).
+    op.create_table(
+        'device_versions',
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('device_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('device_versions')
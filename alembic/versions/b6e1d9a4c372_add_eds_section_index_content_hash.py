@@ -0,0 +1,46 @@
+"""add_eds_section_index_content_hash
+
+Revision ID: b6e1d9a4c372
+Revises: d2b7e4f61a93
+Create Date: 2026-10-19 23:18:52.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.parsers.eds_section_index import INDEX_FORMAT_VERSION, EDSSectionIndex, content_hash
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d9a4c372'
+down_revision = 'd2b7e4f61a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the content an index was built from, so readers can check
+    # freshness without loading eds_content
+    with op.batch_alter_table('eds_section_index') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(64), nullable=True))
+
+    # Index every EDS file once here; the read path no longer backfills
+    conn = op.get_bind()
+    file_ids = [row[0] for row in conn.execute(
+        sa.text("SELECT id FROM eds_files WHERE eds_content IS NOT NULL AND eds_content != ''")
+    )]
+    for eds_file_id in file_ids:
+        content = conn.execute(
+            sa.text("SELECT eds_content FROM eds_files WHERE id = :id"), {"id": eds_file_id}
+        ).scalar()
+        conn.execute(
+            sa.text("INSERT OR REPLACE INTO eds_section_index (eds_file_id, format_version, content_hash, index_data) "
+                    "VALUES (:id, :version, :hash, :data)"),
+            {"id": eds_file_id, "version": INDEX_FORMAT_VERSION, "hash": content_hash(content),
+             "data": EDSSectionIndex.tokenize(content).to_bytes()}
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('eds_section_index') as batch_op:
+        batch_op.drop_column('content_hash')
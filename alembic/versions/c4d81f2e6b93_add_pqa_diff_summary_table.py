@@ -0,0 +1,46 @@
+"""add_pqa_diff_summary_table
+
+Revision ID: c4d81f2e6b93
+Revises: a7c3e91d5f20
+Create Date: 2026-10-19 11:03:27.540918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d81f2e6b93'
+down_revision = 'a7c3e91d5f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Aggregated diff counts for older analyses whose pqa_diff_details rows
+    # were compacted by the PQA retention policy
+    op.create_table(
+        'pqa_diff_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('metric_id', sa.Integer(), nullable=False),
+        sa.Column('diff_type', sa.Text(), nullable=False),
+        sa.Column('severity', sa.Text(), nullable=False),
+        sa.Column('phase', sa.Text(), nullable=True),
+        sa.Column('diff_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['metric_id'], ['pqa_quality_metrics.id'], ondelete='CASCADE')
+    )
+    op.create_index('idx_pqa_diff_summary_metric', 'pqa_diff_summary', ['metric_id'])
+
+    # Retention walks each file's history newest first
+    op.create_index(
+        'idx_pqa_metrics_device_type_timestamp',
+        'pqa_quality_metrics',
+        ['device_id', 'file_type', 'analysis_timestamp']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_pqa_metrics_device_type_timestamp', table_name='pqa_quality_metrics')
+    op.drop_index('idx_pqa_diff_summary_metric', table_name='pqa_diff_summary')
+    op.drop_table('pqa_diff_summary')
@@ -0,0 +1,35 @@
+"""add_device_access_stats_table
+
+Revision ID: c5f1a8e2d934
+Revises: a7d3e5b91c20
+Create Date: 2026-10-19 21:05:37.228914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f1a8e2d934'
+down_revision = 'a7d3e5b91c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Requests per IODD device, used to pick the devices whose views are
+    # warmed at startup (src/utils/cache_warmer.py).
+    op.create_table(
+        'device_access_stats',
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_accessed', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('device_id')
+    )
+    op.create_index('idx_device_access_stats_count', 'device_access_stats', ['request_count'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_device_access_stats_count', table_name='device_access_stats')
+    op.drop_table('device_access_stats')
@@ -0,0 +1,62 @@
+"""add_table_row_counts
+
+Revision ID: d2b7e4f61a93
+Revises: c5f1a8e2d934
+Create Date: 2026-10-19 22:41:09.516203
+
+"""
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7e4f61a93'
+down_revision = 'c5f1a8e2d934'
+branch_labels = None
+depends_on = None
+
+# Keep in sync with COUNTED_TABLES in src/utils/table_counters.py
+COUNTED_TABLES = (
+    'devices', 'parameters', 'iodd_text', 'iodd_assets', 'generated_adapters',
+    'eds_files', 'eds_parameters', 'eds_packages', 'tickets',
+)
+
+
+def upgrade() -> None:
+    # Row counts of the large tables, kept current by triggers so the
+    # statistics endpoints do not run COUNT(*) per request.
+    op.create_table(
+        'table_row_counts',
+        sa.Column('table_name', sa.Text(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('reconciled_at', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+
+    conn = op.get_bind()
+    existing = set(sa.inspect(conn).get_table_names())
+    for table in COUNTED_TABLES:
+        if table not in existing:
+            continue
+        for event, delta in (('INSERT', '+ 1'), ('DELETE', '- 1')):
+            conn.execute(sa.text(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_row_counts SET row_count = row_count {delta} WHERE table_name = '{table}';
+                END
+            """))
+        conn.execute(
+            sa.text(f"INSERT INTO table_row_counts (table_name, row_count, reconciled_at) "
+                    f"SELECT :name, COUNT(*), :now FROM {table}"),
+            {"name": table, "now": time.time()}
+        )
+
+
+def downgrade() -> None:
+    for table in COUNTED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_count_insert")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_count_delete")
+    op.drop_table('table_row_counts')
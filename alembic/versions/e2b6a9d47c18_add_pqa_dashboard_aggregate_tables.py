@@ -0,0 +1,108 @@
+"""add_pqa_dashboard_aggregate_tables
+
+Revision ID: e2b6a9d47c18
+Revises: c4d81f2e6b93
+Create Date: 2026-10-19 13:41:06.227391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6a9d47c18'
+down_revision = 'c4d81f2e6b93'
+branch_labels = None
+depends_on = None
+
+PHASES = range(1, 6)
+
+
+def upgrade() -> None:
+    # Materialized PQA dashboard aggregates, one row set per scope ('ALL', 'IODD', 'EDS').
+    # Maintained incrementally by src/utils/pqa_dashboard.py and built on first use.
+    op.create_table(
+        'pqa_dashboard_totals',
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('total_analyses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('passed_analyses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('critical_failures', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('score_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('bucket_perfect', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bucket_near_perfect', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bucket_excellent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bucket_good', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bucket_acceptable', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('bucket_below_threshold', sa.Integer(), nullable=False, server_default='0'),
+        *[sa.Column(f'phase{n}_sum', sa.Float(), nullable=False, server_default='0') for n in PHASES],
+        *[sa.Column(f'phase{n}_count', sa.Integer(), nullable=False, server_default='0') for n in PHASES],
+        *[sa.Column(f'phase{n}_perfect', sa.Integer(), nullable=False, server_default='0') for n in PHASES],
+        sa.Column('diff_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('devices_analyzed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('diff_devices', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+    op.create_table(
+        'pqa_dashboard_devices',
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('analysis_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('diff_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('scope', 'device_id')
+    )
+
+    op.create_table(
+        'pqa_dashboard_diff_counts',
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('diff_type', sa.Text(), nullable=False),
+        sa.Column('severity', sa.Text(), nullable=False),
+        sa.Column('diff_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('scope', 'diff_type', 'severity')
+    )
+
+    op.create_table(
+        'pqa_dashboard_daily',
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('day', sa.Text(), nullable=False),
+        sa.Column('analysis_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('min_score', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('scope', 'day')
+    )
+
+    op.create_table(
+        'pqa_dashboard_xpath_patterns',
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('xpath', sa.Text(), nullable=False),
+        sa.Column('diff_type', sa.Text(), nullable=False),
+        sa.Column('severity', sa.Text(), nullable=False),
+        sa.Column('occurrences', sa.Integer(), nullable=False),
+        sa.Column('device_ids', sa.Text(), nullable=True),
+        sa.Column('example_expected', sa.Text(), nullable=True),
+        sa.Column('example_actual', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('scope', 'xpath', 'diff_type', 'severity')
+    )
+    op.create_index('idx_pqa_dashboard_diff_counts_count', 'pqa_dashboard_diff_counts',
+                    ['scope', sa.text('diff_count DESC')])
+    op.create_index('idx_pqa_dashboard_patterns_occurrences', 'pqa_dashboard_xpath_patterns',
+                    ['scope', sa.text('occurrences DESC')])
+    op.create_index('idx_pqa_dashboard_patterns_severity', 'pqa_dashboard_xpath_patterns',
+                    ['scope', 'severity', sa.text('occurrences DESC')])
+
+    # Per-pattern refresh looks diffs up by pattern
+    op.create_index('idx_pqa_diff_pattern', 'pqa_diff_details', ['xpath', 'diff_type', 'severity'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_pqa_diff_pattern', table_name='pqa_diff_details')
+    op.drop_index('idx_pqa_dashboard_patterns_severity', table_name='pqa_dashboard_xpath_patterns')
+    op.drop_index('idx_pqa_dashboard_patterns_occurrences', table_name='pqa_dashboard_xpath_patterns')
+    op.drop_index('idx_pqa_dashboard_diff_counts_count', table_name='pqa_dashboard_diff_counts')
+    op.drop_table('pqa_dashboard_xpath_patterns')
+    op.drop_table('pqa_dashboard_daily')
+    op.drop_table('pqa_dashboard_diff_counts')
+    op.drop_table('pqa_dashboard_devices')
+    op.drop_table('pqa_dashboard_totals')
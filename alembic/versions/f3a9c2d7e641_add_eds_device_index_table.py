@@ -0,0 +1,61 @@
+"""add_eds_device_index_table
+
+Revision ID: f3a9c2d7e641
+Revises: e2b6a9d47c18
+Create Date: 2026-10-19 15:12:44.918203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c2d7e641'
+down_revision = 'e2b6a9d47c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per EDS variant (vendor_code, product_code, revision, assembly count)
+    # describing its newest file. Maintained by src/utils/eds_device_index.py on
+    # import and delete and built on first use.
+    op.create_table(
+        'eds_device_index',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('vendor_code', sa.Integer(), nullable=True),
+        sa.Column('product_code', sa.Integer(), nullable=True),
+        sa.Column('major_revision', sa.Integer(), nullable=True),
+        sa.Column('minor_revision', sa.Integer(), nullable=True),
+        sa.Column('assembly_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('eds_file_id', sa.Integer(), nullable=False),
+        sa.Column('file_count', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('revision_count', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('is_latest_revision', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('has_opcua', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('has_mqtt', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('has_json', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('vendor_name', sa.Text(), nullable=True),
+        sa.Column('product_type', sa.Integer(), nullable=True),
+        sa.Column('product_type_str', sa.Text(), nullable=True),
+        sa.Column('product_name', sa.Text(), nullable=True),
+        sa.Column('catalog_number', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('import_date', sa.DateTime(), nullable=True),
+        sa.Column('home_url', sa.Text(), nullable=True),
+        sa.Column('diagnostic_info_count', sa.Integer(), nullable=True),
+        sa.Column('diagnostic_warn_count', sa.Integer(), nullable=True),
+        sa.Column('diagnostic_error_count', sa.Integer(), nullable=True),
+        sa.Column('diagnostic_fatal_count', sa.Integer(), nullable=True),
+        sa.Column('has_parsing_issues', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_eds_device_index_device', 'eds_device_index', ['vendor_code', 'product_code'])
+    op.create_index('idx_eds_device_index_latest', 'eds_device_index',
+                    ['is_latest_revision', 'vendor_name', 'product_name'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_eds_device_index_latest', table_name='eds_device_index')
+    op.drop_index('idx_eds_device_index_device', table_name='eds_device_index')
+    op.drop_table('eds_device_index')
@@ -0,0 +1,138 @@
+"""
+Benchmark Cache Operations
+
+Reports operations per second for the Redis cache tier: tagged writes, tag
+invalidation and pattern deletes through ``src.cache_manager`` (one Lua
+script call per write or invalidation, SCAN + UNLINK for patterns), next to
+the previous approach of one round trip per command, ``KEYS`` and ``DEL``.
+
+The in-process tier is disabled so every operation reaches Redis. Without a
+reachable server the benchmark runs against fakeredis when it is installed;
+those numbers only show command counts, not network latency.
+
+Usage:
+    python scripts/benchmark_cache.py [--redis-url redis://localhost:6379/15] [--ops 2000] [--tags 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import cache_manager  # noqa: E402
+from src.cache_manager import CacheManager, LocalCache  # noqa: E402
+
+VALUE = {"id": 1, "product_name": "Sensor", "parameters": [{"index": i, "name": f"Param {i}"} for i in range(20)]}
+
+
+def connect(redis_url: str) -> CacheManager:
+    """Tiered cache with the local tier disabled, falling back to fakeredis"""
+    manager = CacheManager(redis_url, local=LocalCache(0, 0, 0))
+    if manager.redis_available():
+        return manager
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit(f"Redis is not reachable at {redis_url} and fakeredis is not installed")
+    print("Redis not reachable, using fakeredis (no network round trips)\n")
+    server = fakeredis.FakeServer()
+    cache_manager.redis.from_url = lambda url, **kwargs: fakeredis.FakeRedis(server=server)
+    return CacheManager(redis_url, local=LocalCache(0, 0, 0))
+
+
+def legacy_set(client, key: str, value, ttl: int, tags):
+    client.set(key, json.dumps(value), ex=ttl)
+    for tag in tags:
+        client.sadd(f"cache:tag:{tag}", key)
+        client.expire(f"cache:tag:{tag}", ttl + 60)
+
+
+def legacy_invalidate(client, tag: str):
+    keys = client.smembers(f"cache:tag:{tag}")
+    if keys:
+        client.delete(*keys)
+    client.delete(f"cache:tag:{tag}")
+
+
+def legacy_delete_pattern(client, pattern: str) -> int:
+    keys = client.keys(pattern)
+    return client.delete(*keys) if keys else 0
+
+
+def rate(count: int, run) -> float:
+    """Operations per second of run()"""
+    start = time.perf_counter()
+    run()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cache operations per second')
+    parser.add_argument('--redis-url', default='redis://localhost:6379/15', help='Redis database to use (keys under cache:bench are removed)')
+    parser.add_argument('--ops', type=int, default=2000, help='Operations per measurement')
+    parser.add_argument('--tags', type=int, default=3, help='Tags per cached entry')
+    args = parser.parse_args()
+
+    manager = connect(args.redis_url)
+    client = manager.client
+    ops = args.ops
+
+    def tags_for(i):
+        return [f"bench:{i % 50}"] + [f"bench:extra{t}" for t in range(args.tags - 1)]
+
+    results = []
+
+    def set_legacy():
+        for i in range(ops):
+            legacy_set(client, f"cache:bench:item:{i}", VALUE, 300, tags_for(i))
+
+    def set_pipelined():
+        for i in range(ops):
+            manager.set("bench", f"item:{i}", VALUE, 300, tags_for(i))
+
+    def invalidate_legacy():
+        for i in range(50):
+            legacy_invalidate(client, f"bench:{i}")
+
+    def invalidate_pipelined():
+        for i in range(0, 50, 10):
+            manager.invalidate_by_tags([f"bench:{j}" for j in range(i, i + 10)])
+
+    def pattern_legacy():
+        legacy_delete_pattern(client, "cache:bench:item:*")
+
+    def pattern_scan():
+        manager.delete_pattern("bench", "item:*")
+
+    def reset():
+        manager.invalidate_namespace("bench")
+        client.unlink(*[f"cache:tag:bench:{i}" for i in range(50)])
+
+    def measure(run, populate: bool) -> float:
+        if populate:
+            set_pipelined()
+        result = rate(ops, run)
+        reset()
+        return result
+
+    for name, legacy, current, populate in [
+        ("set with tags", set_legacy, set_pipelined, False),
+        ("tag invalidation", invalidate_legacy, invalidate_pipelined, True),
+        ("pattern delete", pattern_legacy, pattern_scan, True),
+    ]:
+        results.append((name, measure(legacy, populate), measure(current, populate)))
+
+    # Entries removed per second for invalidations, writes per second for sets
+    print(f"{'operation':<18s}{'legacy ops/s':>14s}{'current ops/s':>15s}{'speedup':>9s}")
+    for name, legacy_rate, current_rate in results:
+        print(f"{name:<18s}{legacy_rate:14,.0f}{current_rate:15,.0f}{current_rate / legacy_rate:8.1f}x")
+
+    client.unlink(*[f"cache:tag:bench:extra{t}" for t in range(max(args.tags - 1, 1))])
+    manager.close()
+
+
+if __name__ == '__main__':
+    main()
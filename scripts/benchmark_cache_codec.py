@@ -0,0 +1,131 @@
+"""
+Benchmark Cache Value Codecs
+
+Encodes device payloads as returned by ``StorageManager.get_device`` (device
+row plus every parameter row, with JSON-encoded ``enumeration_values``) with
+each installed serializer/compressor pair and reports the stored size and
+encode/decode throughput, next to the plain ``json.dumps`` text the cache
+stored before.
+
+Payloads are read from --db when it contains devices (the largest ones by
+parameter count); otherwise synthetic devices with --params parameters are
+generated.
+
+Usage:
+    python scripts/benchmark_cache_codec.py [--db greenstack.db] [--devices 5] [--params 400]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache_codec import COMPRESSORS, SERIALIZERS, CacheCodec  # noqa: E402
+from src.database import get_db_path  # noqa: E402
+from src.storage import StorageManager  # noqa: E402
+
+
+def load_devices(db_path: str, count: int):
+    """Largest stored devices, or [] if the database has none"""
+    if not os.path.exists(db_path):
+        return []
+    try:
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute(
+            "SELECT device_id, COUNT(*) AS n FROM parameters GROUP BY device_id ORDER BY n DESC LIMIT ?", (count,)
+        ).fetchall()
+        conn.close()
+    except sqlite3.Error:
+        return []
+    storage = StorageManager(db_path)
+    return [storage.get_device(device_id) for device_id, _ in rows]
+
+
+def synthetic_device(device_id: int, params: int):
+    """Payload shaped like StorageManager.get_device for a device with params parameters"""
+    device = {
+        "id": device_id, "vendor_id": 26, "device_id": 1000 + device_id, "product_name": f"O5D{device_id:03d}",
+        "manufacturer": "ifm electronic gmbh", "iodd_version": "1.1", "import_date": "2025-11-29 10:12:31",
+        "checksum": "13de9ab7fe211ff4d3156cdee43af1257ea81468e2d4d9732d5b4d1431e91162",
+        "vendor_logo_filename": "ifm-logo.png", "device_name_text_id": "TI_ProductName0",
+        "vendor_text_text_id": "TI_VendorText", "vendor_url_text_id": "TI_VendorUrl",
+        "device_family_text_id": "TI_DeviceFamily", "has_error_type_collection": 1,
+        "device_id_str": str(1000 + device_id), "additional_device_ids": None, "has_event_collection": 1,
+    }
+    parameters = []
+    for index in range(params):
+        enum = {str(value): f"Option {value} for parameter {index}" for value in range(index % 12)}
+        parameters.append({
+            "id": device_id * 10_000 + index, "device_id": device_id, "param_index": index,
+            "name": f"Parameter {index}", "data_type": ("UIntegerT", "StringT", "BooleanT", "RecordT")[index % 4],
+            "access_rights": "rw", "default_value": "0", "min_value": "0", "max_value": "65535", "unit": "mm",
+            "description": f"Configures setting {index} of the measuring channel",
+            "enumeration_values": json.dumps(enum) if enum else None, "bit_length": 16, "is_array": 0,
+            "array_count": None, "array_element_type": None, "string_encoding": None, "string_fixed_length": None,
+            "subindex_access_supported": 1, "unit_code": 1013, "value_range_name": None,
+            "single_values": json.dumps([{"value": k, "name": v} for k, v in enum.items()]) if enum else None,
+            "variable_id": f"V_Param{index}", "array_element_bit_length": None, "array_element_fixed_length": None,
+            "name_text_id": f"TN_V_Param{index}", "description_text_id": f"TD_V_Param{index}",
+            "datatype_ref": None, "value_range_xsi_type": None, "value_range_name_text_id": None, "dynamic": 0,
+            "excluded_from_data_storage": 0, "modifies_other_variables": 0, "xml_order": index,
+            "array_element_min_value": None, "array_element_max_value": None,
+            "array_element_value_range_xsi_type": None, "array_element_value_range_name_text_id": None,
+            "array_element_value_range_lower": None, "array_element_value_range_upper": None,
+            "datatype_name_text_id": None, "is_std_direct_parameter_ref": 0,
+        })
+    device["parameters"] = parameters
+    return device
+
+
+def throughput(run, payloads, repeat: int) -> float:
+    """MiB/s of uncompressed JSON processed by run(payload)"""
+    size = sum(len(json.dumps(payload)) for payload in payloads) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            run(payload)
+    return size / 2 ** 20 / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cache value codecs on device payloads')
+    parser.add_argument('--db', default=get_db_path(), help='Database to read device payloads from')
+    parser.add_argument('--devices', type=int, default=5, help='Number of devices')
+    parser.add_argument('--params', type=int, default=400, help='Parameters per synthetic device')
+    parser.add_argument('--repeat', type=int, default=20, help='Encode/decode rounds')
+    args = parser.parse_args()
+
+    payloads = load_devices(args.db, args.devices)
+    if payloads:
+        print(f"{len(payloads)} devices from {args.db}")
+    else:
+        payloads = [synthetic_device(device_id, args.params) for device_id in range(1, args.devices + 1)]
+        print(f"{len(payloads)} synthetic devices with {args.params} parameters (no devices in {args.db})")
+
+    texts = {id(payload): json.dumps(payload) for payload in payloads}
+    baseline = sum(len(text.encode()) for text in texts.values())
+    print(f"{'codec':<18s}{'stored KiB':>11s}{'ratio':>8s}{'encode MiB/s':>14s}{'decode MiB/s':>14s}")
+    print(f"{'json text (old)':<18s}{baseline / 1024:11.1f}{1:7.1f}x"
+          f"{throughput(json.dumps, payloads, args.repeat):14.1f}"
+          f"{throughput(lambda payload: json.loads(texts[id(payload)]), payloads, args.repeat):14.1f}")
+
+    for serializer in SERIALIZERS:
+        for compressor in COMPRESSORS:
+            codec = CacheCodec(serializer, compressor)
+            encoded = {id(payload): codec.encode(payload) for payload in payloads}
+            stored = sum(len(data) for data in encoded.values())
+            encode_rate = throughput(codec.encode, payloads, args.repeat)
+            decode_rate = throughput(lambda payload: codec.decode(encoded[id(payload)]), payloads, args.repeat)
+            print(f"{serializer + '+' + compressor:<18s}{stored / 1024:11.1f}{baseline / stored:7.1f}x"
+                  f"{encode_rate:14.1f}{decode_rate:14.1f}")
+
+    default = CacheCodec()
+    print(f"\nDefault codec here: {default.serializer.name} + {default.compressor.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Warm vs Cold Latency of Device Views
+
+Requests every warmed device view (config schema, menus, process data, PQA
+metrics) through the API twice per round: cold, right after dropping the
+cached views, and warm, after ``CacheWarmer.warm_devices`` precomputed them.
+Reports the median latency per view and the time warming took.
+
+Uses the API's database (greenstack.db in the current directory) and the
+most requested devices, or the first devices when there are no request
+counts yet. Responses are requested without compression so the encoded
+response cache does not answer them.
+
+Usage:
+    python scripts/benchmark_cache_warming.py [--devices 10] [--repeat 5]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api import app, manager  # noqa: E402
+from src.utils.cache_warmer import CacheWarmer, invalidate_all_device_views, registered_views  # noqa: E402
+
+VIEW_PATHS = {
+    "config-schema": "/api/iodd/{device_id}/config-schema",
+    "menus": "/api/iodd/{device_id}/menus",
+    "processdata": "/api/iodd/{device_id}/processdata",
+    "pqa-metrics": "/api/pqa/metrics/{device_id}",
+}
+
+
+def pick_devices(warmer: CacheWarmer, count: int):
+    devices = warmer.access.top_devices(count)
+    if len(devices) < count:
+        conn = sqlite3.connect(warmer.db_path)
+        rows = conn.execute("SELECT id FROM devices ORDER BY id LIMIT ?", (count,)).fetchall()
+        conn.close()
+        devices += [row[0] for row in rows if row[0] not in devices][:count - len(devices)]
+    return devices
+
+
+def request_views(client: TestClient, devices, timings):
+    for name in timings:
+        for device_id in devices:
+            started = time.perf_counter()
+            client.get(VIEW_PATHS[name].format(device_id=device_id), headers={"Accept-Encoding": "identity"})
+            timings[name].append((time.perf_counter() - started) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cold and warmed device view latency')
+    parser.add_argument('--devices', type=int, default=10, help='Number of devices')
+    parser.add_argument('--repeat', type=int, default=5, help='Cold/warm rounds')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    warmer = CacheWarmer(manager.storage.db_path)
+    devices = pick_devices(warmer, args.devices)
+    if not devices:
+        sys.exit(f"No devices in {manager.storage.db_path}, import some IODD files first")
+
+    views = [name for name in registered_views() if name in VIEW_PATHS]
+    cold = {name: [] for name in views}
+    warm = {name: [] for name in views}
+    warm_seconds = []
+    client = TestClient(app)
+    for _ in range(args.repeat):
+        invalidate_all_device_views()
+        request_views(client, devices, cold)
+        invalidate_all_device_views()
+        warm_seconds.append(warmer.warm_devices(devices, "benchmark").seconds)
+        request_views(client, devices, warm)
+    warmer.close()
+
+    print(f"{len(devices)} devices, {args.repeat} rounds, warming took {statistics.median(warm_seconds) * 1000:.1f} ms per round")
+    print(f"{'view':<16s}{'cold ms':>10s}{'warm ms':>10s}{'speedup':>9s}")
+    for name in views:
+        cold_ms, warm_ms = statistics.median(cold[name]), statistics.median(warm[name])
+        print(f"{name:<16s}{cold_ms:10.2f}{warm_ms:10.2f}{cold_ms / warm_ms:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
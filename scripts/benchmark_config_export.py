@@ -0,0 +1,111 @@
+"""
+Benchmark Config Export Memory
+
+Builds a database with synthetic IODD devices and reports the traced peak
+memory of the streamed batch JSON export for growing device counts. The
+previous approach, which built the whole document and serialized it in one
+go, is reported alongside for reference.
+
+Usage:
+    python scripts/benchmark_config_export.py [--params 200] [--counts 100,1000]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.routes import config_export_routes  # noqa: E402
+
+
+def build_database(path: str, devices: int, params: int):
+    """Minimal devices/parameters tables with devices x params rows"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY, vendor_id INTEGER, device_id INTEGER,
+                              product_name TEXT, manufacturer TEXT, iodd_version TEXT);
+        CREATE TABLE parameters (id INTEGER PRIMARY KEY, device_id INTEGER, param_index INTEGER, name TEXT,
+                                 data_type TEXT, default_value TEXT, min_value TEXT, max_value TEXT, unit TEXT);
+        CREATE INDEX idx_parameters_device ON parameters (device_id);
+    """)
+    for device_id in range(1, devices + 1):
+        conn.execute("INSERT INTO devices VALUES (?, 26, ?, ?, 'Vendor', '1.1')",
+                     (device_id, device_id, f"Sensor {device_id}"))
+        conn.executemany(
+            "INSERT INTO parameters (device_id, param_index, name, data_type, default_value, min_value, max_value, unit)"
+            " VALUES (?, ?, ?, 'UIntegerT', '0', '0', '255', 'mm')",
+            [(device_id, index, f"Parameter {index}") for index in range(params)]
+        )
+    conn.commit()
+    conn.close()
+
+
+async def streamed(device_ids: str) -> int:
+    """Bytes produced by the streaming batch export"""
+    response = await config_export_routes.export_batch_configs_json(device_type="IODD", device_ids=device_ids)
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def materialized(db_path: str, ids) -> int:
+    """Bytes of the same export built as one document"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    devices = []
+    for device_id in ids:
+        device = dict(conn.execute("SELECT * FROM devices WHERE id = ?", (device_id,)).fetchone())
+        parameters = [dict(row) for row in conn.execute(
+            "SELECT param_index, name, data_type, default_value, min_value, max_value, unit"
+            " FROM parameters WHERE device_id = ? ORDER BY param_index", (device_id,)
+        ).fetchall()]
+        devices.append({"device": device, "parameters": parameters, "type": "IODD"})
+    conn.close()
+    return len(json.dumps({"devices": devices, "total_count": len(devices)}, indent=2))
+
+
+def measure(run):
+    """(peak MiB, seconds, result) of run()"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streamed config export memory')
+    parser.add_argument('--params', type=int, default=200, help='Parameters per device')
+    parser.add_argument('--counts', default='100,1000', help='Comma-separated device counts')
+    args = parser.parse_args()
+    counts = [int(count) for count in args.counts.split(',')]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'export.db')
+        build_database(db_path, max(counts), args.params)
+        config_export_routes.DB_PATH = db_path
+
+        print(f"{'devices':>8s}{'size':>12s}{'streamed peak':>16s}{'in-memory peak':>17s}")
+        for count in counts:
+            ids = list(range(1, count + 1))
+            device_ids = ','.join(map(str, ids))
+            stream_peak, stream_time, size = measure(lambda: asyncio.run(streamed(device_ids)))
+            memory_peak, memory_time, _ = measure(lambda: materialized(db_path, ids))
+            print(f"{count:8d}{size / 2 ** 20:9.1f} MiB{stream_peak:10.1f} MiB{memory_peak:11.1f} MiB"
+                  f"   ({stream_time:.2f}s vs {memory_time:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
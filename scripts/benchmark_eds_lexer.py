@@ -0,0 +1,229 @@
+"""
+Benchmark EDS Parsing
+
+Generates a large modular-device EDS file (thousands of ParamN/EnumN entries,
+modules, groups, assemblies and connections) and reports how long the
+single-pass lexer, each EDSParser getter, all getters on a fresh parser and
+parse_eds_file take. The same timings are taken for the parser as it was
+before the lexer (the parent of the commit that added
+src/parsers/eds_lexer.py, or --baseline) by running this script against a
+``git archive`` of that revision, and both are printed side by side.
+
+Usage:
+    python scripts/benchmark_eds_lexer.py [--params 5000] [--modules 64] [--repeat 5]
+    python scripts/benchmark_eds_lexer.py --file path/to/device.eds
+    python scripts/benchmark_eds_lexer.py --baseline <git revision> | --no-baseline
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Dict, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The baseline run imports src from an extracted revision instead of this tree
+sys.path.insert(0, os.environ.get('EDS_BENCH_ROOT', REPO_ROOT))
+
+from src.parsers.eds_parser import EDSParser, parse_eds_file
+
+GETTERS = [
+    'get_file_info', 'get_device_info', 'get_device_classification', 'get_parameters',
+    'get_enums', 'get_assemblies', 'get_connections', 'get_ports', 'get_modules',
+    'get_groups', 'get_capacity',
+]
+
+
+def build_synthetic_eds(param_count: int, module_count: int) -> str:
+    """Build a modular-device EDS with the given number of parameters and modules"""
+    out = [
+        '$ Synthetic modular device EDS',
+        '[File]',
+        '        DescText = "Synthetic Bus Coupler";',
+        '        CreateDate = 01-15-2024;',
+        '        CreateTime = 10:30:00;',
+        '        Revision = 1.2;',
+        '',
+        '[Device]',
+        '        VendCode = 42;',
+        '        VendName = "ACME";',
+        '        ProdType = 12;',
+        '        ProdTypeStr = "Communications Adapter";',
+        '        ProdCode = 100;',
+        '        MajRev = 1;',
+        '        MinRev = 2;',
+        '        ProdName = "Coupler 100";',
+        '        Catalog = "C-100";',
+        '',
+        '[Params]',
+        f'        Num_Params = {param_count};',
+    ]
+    for i in range(1, param_count + 1):
+        out += [
+            f'        Param{i} =',
+            '                0,                      $ reserved',
+            '                6,"20 01 24 01 30 03",  $ Link Path Size, Link Path',
+            '                0x0010,                 $ Descriptor',
+            '                0xC7,                   $ Data Type',
+            '                2,                      $ Data Size',
+            f'                "Parameter {i}",        $ name',
+            '                "ms",                   $ units',
+            f'                "Help for parameter {i}",',
+            '                0,1000,10,              $ min, max, default',
+            '                1,1,1,0,                $ scaling',
+            '                ,,,,                    $ links',
+            '                0;                      $ decimal places',
+        ]
+        if i % 2 == 0:
+            out.append(f'        Enum{i} =')
+            out += [f'                {v},"Option {v}{" (default)" if v == 0 else ""}",' for v in range(7)]
+            out.append('                7,"Option 7";')
+    out += ['', '[Assembly]', '        Object_Name = "Assembly Object";']
+    for i in range(module_count):
+        out.append(f'        Assem{100 + i} = "Module {i} Input", 0x{100 + i:X}, , 0x0020, , "20 04 24 {i:02X} 30 03";')
+    out.append('        AssemExa134 = 34, 32, "IO-Link Process Data from IO Device";')
+    out += ['', '[Connection Manager]']
+    for i in range(1, module_count + 1):
+        out += [
+            f'        Connection{i} =',
+            '                0x04010002,             $ trigger & transport',
+            '                0x44640405,             $ connection parameters',
+            '                ,0,,                    $ O->T RPI, size, format',
+            '                ,0,,                    $ T->O RPI, size, format',
+            '                ,,                      $ config part 1',
+            '                ,,                      $ config part 2',
+            f'                "Exclusive Owner {i}",  $ connection name',
+            '                "",                     $ help string',
+            '                "20 04 24 01 2C 96 2C 64";  $ path',
+        ]
+    out += ['', '[Port]', '        Port1 = TCP, "EtherNet/IP", "20 F5 24 01", 1;', '', '[Module]']
+    for i in range(1, module_count + 1):
+        out.append(f'        Module{i} = "IO Module {i}", 7, "IO-{i:03d}", 1, 2, 4, 8, 8, "Slot module", {i};')
+    out += ['', '[Groups]']
+    for g in range(1, max(param_count // 50, 1) + 1):
+        members = ','.join(str(p) for p in range((g - 1) * 50 + 1, min(g * 50, param_count) + 1))
+        out.append(f'        Group{g} = "Group {g}", {members.count(",") + 1}, {members};')
+    out += ['', '[Capacity]', '        MaxIOConnections = 4;', '        TSpec1 = TxRx, 32, 100;', '']
+    return '\n'.join(out)
+
+
+def best_of(func, repeat: int) -> float:
+    """Best wall time of func() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def time_parser(content: str, repeat: int) -> Dict[str, float]:
+    """Best wall time in milliseconds of every getter and of a full parse"""
+    timings = {'EDSParser()': best_of(lambda: EDSParser(content), repeat)}
+    for getter in GETTERS:
+        # A fresh parser per run, so lazily tokenized sections are paid for by
+        # the first getter that reads them
+        runs = []
+        for _ in range(repeat):
+            eds = EDSParser(content)
+            start = time.perf_counter()
+            getattr(eds, getter)()
+            runs.append(time.perf_counter() - start)
+        timings[getter] = min(runs) * 1000
+
+    def all_getters():
+        eds = EDSParser(content)
+        for getter in GETTERS:
+            getattr(eds, getter)()
+
+    timings['all getters'] = best_of(all_getters, repeat)
+    timings['parse_eds_file'] = best_of(lambda: parse_eds_file(content), repeat)
+    return timings
+
+
+def default_baseline() -> Optional[str]:
+    """Parent of the commit that added the EDS lexer"""
+    result = subprocess.run(
+        ['git', 'log', '--diff-filter=A', '--format=%H', '--', 'src/parsers/eds_lexer.py'],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    commits = result.stdout.split()
+    return f'{commits[-1]}^' if result.returncode == 0 and commits else None
+
+
+def time_baseline(revision: str, path: str, repeat: int) -> Dict[str, float]:
+    """Run time_parser on the src tree of a git revision in a subprocess"""
+    archive = subprocess.run(
+        ['git', 'archive', '--format=tar', revision, 'src'],
+        cwd=REPO_ROOT, capture_output=True, check=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as root:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(root)
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--file', path, '--repeat', str(repeat), '--json'],
+            env={**os.environ, 'EDS_BENCH_ROOT': root}, capture_output=True, text=True, check=True,
+        )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark EDS lexing and parsing')
+    parser.add_argument('--params', type=int, default=5000, help='ParamN entries in the synthetic file')
+    parser.add_argument('--modules', type=int, default=64, help='Modules/connections in the synthetic file')
+    parser.add_argument('--file', help='Benchmark an existing EDS file instead')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', help='Git revision to compare against (default: before the lexer)')
+    parser.add_argument('--no-baseline', action='store_true', help='Only time the current tree')
+    parser.add_argument('--json', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        label = args.file
+    else:
+        content = build_synthetic_eds(args.params, args.modules)
+        label = f'synthetic ({args.params} params, {args.modules} modules)'
+
+    if args.json:
+        print(json.dumps(time_parser(content, args.repeat)))
+        return
+
+    print(f"EDS: {label}, {len(content) / 1024:.0f} KiB, {content.count(chr(10)) + 1} lines")
+
+    baseline = None
+    revision = None if args.no_baseline else args.baseline or default_baseline()
+    if revision:
+        with tempfile.NamedTemporaryFile('w', suffix='.eds', encoding='utf-8', delete=False) as f:
+            f.write(content)
+        try:
+            baseline = time_baseline(revision, f.name, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"  baseline {revision} failed: {(e.stderr or b'').strip()[-200:]}")
+        finally:
+            os.unlink(f.name)
+    current = time_parser(content, args.repeat)
+
+    if baseline:
+        print(f"  baseline: {revision}")
+        print(f"  {'':26s}{'old ms':>10s}{'new ms':>10s}{'speedup':>9s}")
+        for name, elapsed in current.items():
+            old = baseline.get(name)
+            if old is None:
+                print(f"  {name + ':':26s}{'':>10s}{elapsed:10.1f}")
+            else:
+                print(f"  {name + ':':26s}{old:10.1f}{elapsed:10.1f}{old / max(elapsed, 1e-6):8.2f}x")
+    else:
+        for name, elapsed in current.items():
+            print(f"  {name + ':':26s}{elapsed:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark EDS Package Memory
+
+Builds an EDS package ZIP of synthetic device files and reports the memory
+held by EDSPackageParser.parse_package while an upload inserts the results:
+the traced peak during parsing and what the result still holds afterwards.
+The previous result shape, which stored ``eds_content`` and ``all_sections``
+for every file, is reported as a reference by materializing each result
+into a plain dict.
+
+Usage:
+    python scripts/benchmark_eds_package_memory.py [--files 40] [--params 1000] [--non-ascii]
+    python scripts/benchmark_eds_package_memory.py --package path/to/package.zip
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_eds_lexer import build_synthetic_eds  # noqa: E402
+from src.parsers.eds_package_parser import EDSPackageParser  # noqa: E402
+
+
+def build_package(path: str, file_count: int, param_count: int, non_ascii: bool):
+    """Write a package ZIP with file_count EDS files spread over version folders"""
+    content = build_synthetic_eds(param_count, 16)
+    if non_ascii:
+        content = content.replace('"ms"', '"°C"')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for i in range(file_count):
+            folder = f'EDS/01_ODVA_Certified/V1.{i // 10}'
+            zf.writestr(f'{folder}/device_{i}.eds', content.replace('ProdCode = 100;', f'ProdCode = {100 + i};'))
+
+
+def measure(package: str, eager: bool):
+    """(peak MiB, retained MiB, file count) for one parse_package run"""
+    gc.collect()
+    tracemalloc.start()
+    result = EDSPackageParser(package, workers=1).parse_package()
+    if eager:
+        for info in result['eds_files']:
+            info['parsed_data'] = dict(info['parsed_data'])
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20, retained / 2 ** 20, len(result['eds_files'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory held by EDS package parsing')
+    parser.add_argument('--files', type=int, default=40, help='EDS files in the synthetic package')
+    parser.add_argument('--params', type=int, default=1000, help='ParamN entries per synthetic file')
+    parser.add_argument('--non-ascii', action='store_true', help='Use a non-ASCII unit string ("°C")')
+    parser.add_argument('--package', help='Benchmark an existing package ZIP instead')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        package = args.package
+        if not package:
+            package = os.path.join(temp_dir, 'package.zip')
+            build_package(package, args.files, args.params, args.non_ascii)
+
+        lean = measure(package, eager=False)
+        eager = measure(package, eager=True)
+
+    print(f"Package: {args.package or 'synthetic'}, {lean[2]} EDS files")
+    print(f"  {'':28s}{'peak':>10s}{'retained':>12s}")
+    print(f"  {'parse result':28s}{lean[0]:8.1f} MiB{lean[1]:8.1f} MiB")
+    print(f"  {'eds_content + all_sections':28s}{eager[0]:8.1f} MiB{eager[1]:8.1f} MiB")
+    print(f"  retained reduction: {(1 - lean[1] / eager[1]) * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark EDS Storage
+
+Parses synthetic EDS files and stores them with save_eds_details into a
+fresh, fully migrated SQLite database, reporting rows/sec. The same savers
+are also run through a cursor that turns every executemany into one execute
+per row, which is how the upload routes used to insert EDS child rows.
+
+Usage:
+    python scripts/benchmark_eds_storage.py [--files 20] [--params 1000] [--modules 64]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3  # noqa: E402
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from benchmark_eds_lexer import build_synthetic_eds  # noqa: E402
+from src.parsers.eds_parser import parse_eds_file  # noqa: E402
+from src.storage.eds import save_eds_details  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RowByRowCursor:
+    """Cursor wrapper that runs executemany as one execute per row"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def executemany(self, query, rows):
+        for row in rows:
+            self._cursor.execute(query, row)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def migrated_database(path: str):
+    """Create a database at path with the current schema"""
+    os.environ['IODD_DATABASE_URL'] = f'sqlite:///{path}'
+    command.upgrade(Config(os.path.join(PROJECT_ROOT, 'alembic.ini')), 'head')
+
+
+def store(db_path: str, parsed_files, row_by_row: bool):
+    """(seconds, rows written) for storing every parsed file in one transaction"""
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        saver_cursor = RowByRowCursor(cursor) if row_by_row else cursor
+        rows = 0
+        start = time.perf_counter()
+        for parsed, diagnostics in parsed_files:
+            cursor.execute("INSERT INTO eds_files (vendor_code, product_name, file_checksum) VALUES (?, ?, ?)",
+                           (parsed['device']['vendor_code'], parsed['device']['product_name'], parsed['checksum']))
+            rows += 1 + sum(save_eds_details(saver_cursor, cursor.lastrowid, parsed, diagnostics).values())
+        conn.commit()
+        return time.perf_counter() - start, rows
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk EDS storage')
+    parser.add_argument('--files', type=int, default=20, help='EDS files to store')
+    parser.add_argument('--params', type=int, default=1000, help='ParamN entries per file')
+    parser.add_argument('--modules', type=int, default=64, help='Modules/connections per file')
+    args = parser.parse_args()
+
+    content = build_synthetic_eds(args.params, args.modules)
+    parsed_files = [parse_eds_file(content.replace('ProdCode = 100;', f'ProdCode = {100 + i};'))
+                    for i in range(args.files)]
+
+    print(f"{args.files} EDS files, {args.params} params and {args.modules} modules each")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, row_by_row in (('execute per row', True), ('executemany', False)):
+            db_path = os.path.join(temp_dir, f'{label.replace(" ", "_")}.db')
+            migrated_database(db_path)
+            elapsed, rows = store(db_path, parsed_files, row_by_row)
+            print(f"  {label + ':':18s}{elapsed * 1000:8.0f} ms  {rows:8d} rows  {rows / elapsed:10.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
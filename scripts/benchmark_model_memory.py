@@ -0,0 +1,153 @@
+"""
+Memory of Parsed Parameters: Slotted vs Dict-Backed Models
+
+Generates an IODD with the requested number of Variables (a mix of UIntegerT
+with single values, RecordT with record items, and StringT), parses it with
+IODDParser and measures the memory the resulting parameters hold
+(tracemalloc). The parse is repeated with dict-backed copies of the model
+dataclasses, i.e. without ``__slots__`` and without string interning, which
+is how the models were defined before.
+
+Usage:
+    python scripts/benchmark_model_memory.py [--parameters 1000]
+"""
+
+import argparse
+import dataclasses
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.parsing as parsing  # noqa: E402
+from src import models  # noqa: E402
+from src.parsing import IODDParser  # noqa: E402
+
+HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<IODevice xmlns="http://www.io-link.com/IODD/2010/10" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <DocumentInfo version="1.0" releaseDate="2024-01-01"/>
+  <ProfileBody>
+    <DeviceIdentity vendorId="42" deviceId="1234">
+      <VendorName>Bench</VendorName>
+      <DeviceName textId="TN_DeviceName"/>
+    </DeviceIdentity>
+    <DeviceFunction>
+      <VariableCollection>
+"""
+
+FOOTER = """      </VariableCollection>
+    </DeviceFunction>
+  </ProfileBody>
+  <ExternalTextCollection>
+    <PrimaryLanguage xml:lang="en">
+{texts}
+    </PrimaryLanguage>
+  </ExternalTextCollection>
+</IODevice>
+"""
+
+
+def variable_xml(i: int, texts: list) -> str:
+    texts += [f'      <Text id="TN_V{i}" value="Variable {i}"/>', f'      <Text id="TD_V{i}" value="Description of variable {i}"/>']
+    head = (f'        <Variable id="V_{i}" index="{64 + i}" accessRights="{("rw", "ro")[i % 2]}">\n'
+            f'          <Name textId="TN_V{i}"/>\n          <Description textId="TD_V{i}"/>\n')
+    kind = i % 3
+    if kind == 0:
+        values = "".join(
+            f'            <SingleValue value="{v}"><Name textId="TN_SV_{v}"/></SingleValue>\n' for v in range(4))
+        body = f'          <Datatype xsi:type="UIntegerT" bitLength="8">\n{values}          </Datatype>\n'
+    elif kind == 1:
+        items = "".join(
+            f'            <RecordItem subindex="{s}" bitOffset="{(2 - s) * 8}">\n'
+            f'              <SimpleDatatype xsi:type="UIntegerT" bitLength="8">\n'
+            f'                <ValueRange xsi:type="UIntegerValueRangeT" lowerValue="0" upperValue="100"/>\n'
+            f'              </SimpleDatatype>\n'
+            f'              <Name textId="TN_RI_{s}"/>\n'
+            f'            </RecordItem>\n'
+            for s in range(1, 4))
+        body = f'          <Datatype xsi:type="RecordT" bitLength="24" subindexAccessSupported="true">\n{items}          </Datatype>\n'
+    else:
+        body = '          <Datatype xsi:type="StringT" fixedLength="16" encoding="UTF-8"/>\n'
+    return head + body + '        </Variable>\n'
+
+
+def generate_iodd(count: int) -> str:
+    texts = [f'      <Text id="TN_SV_{v}" value="Value {v}"/>' for v in range(4)]
+    texts += [f'      <Text id="TN_RI_{s}" value="Item {s}"/>' for s in range(1, 4)]
+    texts.append('      <Text id="TN_DeviceName" value="Bench Device"/>')
+    variables = "".join(variable_xml(i, texts) for i in range(count))
+    return HEADER + variables + FOOTER.format(texts="\n".join(texts))
+
+
+def dict_backed(cls):
+    """Copy of a model dataclass without __slots__ and without string interning"""
+    specs = []
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            specs.append((f.name, f.type, dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            specs.append((f.name, f.type, dataclasses.field(default_factory=f.default_factory)))
+        else:
+            specs.append((f.name, f.type))
+    return dataclasses.make_dataclass(cls.__name__, specs)
+
+
+@contextmanager
+def dict_backed_models():
+    """Parse with dict-backed model copies"""
+    originals = {name: getattr(parsing, name) for name in models.__all__
+                 if dataclasses.is_dataclass(getattr(parsing, name, None))}
+    try:
+        for name, cls in originals.items():
+            setattr(parsing, name, dict_backed(cls))
+        yield
+    finally:
+        for name, cls in originals.items():
+            setattr(parsing, name, cls)
+
+
+def measure(xml: str):
+    """(bytes held by the parsed parameters, number of parameters)"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parameters = IODDParser(xml).parse().parameters
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, len(parameters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory of slotted and dict-backed models')
+    parser.add_argument('--parameters', type=int, default=1000, help='Variables in the generated IODD')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    xml = generate_iodd(args.parameters)
+    # Parser caches and first-use allocations are not part of either result
+    for _ in range(2):
+        measure(xml)
+        with dict_backed_models():
+            measure(xml)
+
+    with dict_backed_models():
+        dict_bytes, count = measure(xml)
+    slotted_bytes, slotted_count = measure(xml)
+    assert count == slotted_count
+
+    per_1000 = 1000 / count
+    print(f"{count} parameters (UIntegerT with single values, RecordT with record items, StringT)")
+    print(f"{'models':<26s}{'total KiB':>12s}{'KiB per 1,000':>16s}")
+    print(f"{'dict-backed':<26s}{dict_bytes / 1024:12.1f}{dict_bytes * per_1000 / 1024:16.1f}")
+    print(f"{'slotted + interned':<26s}{slotted_bytes / 1024:12.1f}{slotted_bytes * per_1000 / 1024:16.1f}")
+    print(f"saved: {(dict_bytes - slotted_bytes) * per_1000 / 1024:.1f} KiB per 1,000 parameters "
+          f"({(1 - slotted_bytes / dict_bytes) * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
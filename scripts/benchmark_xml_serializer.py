@@ -0,0 +1,117 @@
+"""
+Benchmark IODD XML Serialization
+
+Compares the streaming serializer used by the reconstruction engine against
+the previous ET.tostring -> minidom.parseString -> toprettyxml path, reporting
+wall time and peak traced memory for each.
+
+Usage:
+    python scripts/benchmark_xml_serializer.py [--variables 2000] [--repeat 5]
+    python scripts/benchmark_xml_serializer.py --db greenstack.db --device-id 42
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from xml.dom import minidom
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.xml_serializer import XSI_NAMESPACE, serialize_xml
+
+
+def build_synthetic_tree(variable_count: int) -> ET.Element:
+    """Build an IODD-shaped tree with the given number of Variable elements"""
+    root = ET.Element('IODevice')
+    root.set('xmlns', 'http://www.io-link.com/IODD/2010/10')
+    root.set(f'{{{XSI_NAMESPACE}}}schemaLocation', 'http://www.io-link.com/IODD/2010/10 IODD1.1.xsd')
+    body = ET.SubElement(root, 'ProfileBody')
+    dev_func = ET.SubElement(body, 'DeviceFunction')
+    variables = ET.SubElement(dev_func, 'VariableCollection')
+    for i in range(variable_count):
+        var = ET.SubElement(variables, 'Variable', id=f'V_Param{i}', index=str(i), accessRights='rw')
+        datatype = ET.SubElement(var, 'Datatype')
+        datatype.set(f'{{{XSI_NAMESPACE}}}type', 'UIntegerT')
+        datatype.set('bitLength', '16')
+        for v in range(3):
+            single = ET.SubElement(datatype, 'SingleValue', value=str(v))
+            ET.SubElement(single, 'Name', textId=f'TN_SV_{i}_{v}')
+        ET.SubElement(var, 'Name', textId=f'TN_V_Param{i}')
+    texts = ET.SubElement(root, 'ExternalTextCollection')
+    lang = ET.SubElement(texts, 'PrimaryLanguage', {'xml:lang': 'en'})
+    for i in range(variable_count):
+        ET.SubElement(lang, 'Text', id=f'TN_V_Param{i}', value=f'Parameter {i} & "value"')
+    return root
+
+
+def load_device_tree(db_path: str, device_id: int) -> ET.Element:
+    """Reconstruct a stored device and return it as an element tree"""
+    from src.utils.forensic_reconstruction_v2 import IODDReconstructor
+    xml_text = IODDReconstructor(db_path).reconstruct_iodd(device_id)
+    return ET.fromstring(xml_text)
+
+
+def minidom_prettify(elem: ET.Element) -> str:
+    """Previous reconstruction serialization path"""
+    rough_string = ET.tostring(elem, encoding='unicode')
+    return minidom.parseString(rough_string).toprettyxml(indent="  ")
+
+
+def measure(func, elem: ET.Element, repeat: int) -> dict:
+    """Return best wall time, peak memory and output size for func(elem)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(elem)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(elem)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'best_ms': min(timings) * 1000,
+        'mean_ms': sum(timings) / len(timings) * 1000,
+        'peak_kib': peak / 1024,
+        'output_bytes': len(output),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark IODD XML serialization')
+    parser.add_argument('--variables', type=int, default=2000,
+                        help='Variables in the synthetic tree (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (default: 5)')
+    parser.add_argument('--db', help='Database path to reconstruct a real device from')
+    parser.add_argument('--device-id', type=int, help='Device ID to reconstruct (requires --db)')
+    args = parser.parse_args()
+
+    if args.db and args.device_id is not None:
+        elem = load_device_tree(args.db, args.device_id)
+        source = f'device {args.device_id} from {args.db}'
+    else:
+        elem = build_synthetic_tree(args.variables)
+        source = f'synthetic tree with {args.variables} variables'
+
+    element_count = sum(1 for _ in elem.iter())
+    print(f"Benchmarking {source} ({element_count} elements, {args.repeat} runs)\n")
+    print(f"{'serializer':<12} {'best ms':>10} {'mean ms':>10} {'peak KiB':>12} {'bytes':>10}")
+
+    results = {}
+    for name, func in (('minidom', minidom_prettify), ('streaming', serialize_xml)):
+        results[name] = measure(func, elem, args.repeat)
+        r = results[name]
+        print(f"{name:<12} {r['best_ms']:>10.1f} {r['mean_ms']:>10.1f} "
+              f"{r['peak_kib']:>12.0f} {r['output_bytes']:>10}")
+
+    speedup = results['minidom']['best_ms'] / max(results['streaming']['best_ms'], 1e-9)
+    memory_ratio = results['minidom']['peak_kib'] / max(results['streaming']['peak_kib'], 1e-9)
+    print(f"\nStreaming serializer: {speedup:.1f}x faster, {memory_ratio:.1f}x less peak memory")
+
+
+if __name__ == '__main__':
+    main()
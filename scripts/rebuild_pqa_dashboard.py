@@ -0,0 +1,51 @@
+"""
+Rebuild PQA Dashboard Aggregates
+
+Recomputes the materialized tables behind the /api/pqa/dashboard endpoints
+from pqa_quality_metrics and pqa_diff_details, or checks them for drift.
+
+Usage:
+    python scripts/rebuild_pqa_dashboard.py [--db greenstack.db]
+    python scripts/rebuild_pqa_dashboard.py --check
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.pqa_dashboard import check_dashboard_aggregates, rebuild_dashboard_aggregates
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild or check PQA dashboard aggregates')
+    parser.add_argument('--db', default='greenstack.db', help='Database path (default: greenstack.db)')
+    parser.add_argument('--check', action='store_true',
+                        help='Only report mismatches; exit with status 1 if any are found')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.check:
+            problems = check_dashboard_aggregates(conn)
+            for problem in problems:
+                logger.warning(problem)
+            logger.info(f"{len(problems)} mismatch(es) found")
+            return 1 if problems else 0
+
+        counts = rebuild_dashboard_aggregates(conn)
+        for table, rows in counts.items():
+            logger.info(f"{table}: {rows} rows")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -37,14 +37,22 @@ if os.getenv("SENTRY_DSN"):
     logger.info("Sentry error tracking initialized")
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from limits.strategies import STRATEGIES
+from starlette.concurrency import run_in_threadpool
 
 from src import config
+from src.cache_manager import current_cache_manager
+from src.utils.cache_warmer import (
+    device_view, get_cache_warmer, init_cache_warmer, invalidate_all_device_views, record_device_access,
+    shutdown_cache_warmer, warm_imported_devices
+)
+from src.utils.conditional_requests import conditional_device_response, device_id_for_path, encoded_cache_stats
+from src.utils.text_table import get_device_text_table, text_table_cache_stats
 from src.config import validate_production_security
 
 # Configure logging for application loggers
@@ -56,8 +64,14 @@ if not logging.getLogger().handlers:
     )
 from src.models import DeviceProfile
 from src.greenstack import IODDManager
+from src.utils.cascade_delete import iodd_device_plan
+from src.utils.db_maintenance import init_maintenance_scheduler, shutdown_maintenance_scheduler
 from src.utils.pqa_orchestrator import UnifiedPQAOrchestrator, FileType
 from src.utils.pqa_scheduler import init_pqa_scheduler, shutdown_pqa_scheduler
+from src.utils.streaming_export import attachment_header, open_export_connection
+from src.utils.streaming_zip import ZipEntry, iter_blob, iter_zip
+from src.utils.system_stats import init_stats_refresher, shutdown_stats_refresher
+from src.utils.table_counters import read_row_counts
 
 # ============================================================================
 # API Models
@@ -407,6 +421,30 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize PQA scheduler: {e}", exc_info=True)
 
+    # Periodic incremental vacuum and ANALYZE (see src/utils/db_maintenance.py)
+    try:
+        init_maintenance_scheduler(manager.storage.db_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize database maintenance: {e}", exc_info=True)
+
+    # Precompute device views after imports and for the most requested devices
+    try:
+        init_cache_warmer(manager.storage.db_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize cache warmer: {e}", exc_info=True)
+
+    # Codebase statistics for the overview page, generated in the background when missing
+    try:
+        stats_routes.init_codebase_stats()
+    except Exception as e:
+        logger.error(f"Failed to initialize codebase statistics: {e}", exc_info=True)
+
+    # Background health check, admin activity snapshot and row counter reconciliation
+    try:
+        init_stats_refresher(manager.storage.db_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize statistics refresher: {e}", exc_info=True)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -420,6 +458,21 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Failed to stop PQA scheduler: {e}", exc_info=True)
 
+    try:
+        shutdown_maintenance_scheduler()
+    except Exception as e:
+        logger.error(f"Failed to stop database maintenance: {e}", exc_info=True)
+
+    try:
+        shutdown_cache_warmer()
+    except Exception as e:
+        logger.error(f"Failed to stop cache warmer: {e}", exc_info=True)
+
+    try:
+        shutdown_stats_refresher()
+    except Exception as e:
+        logger.error(f"Failed to stop statistics refresher: {e}", exc_info=True)
+
 
 # ============================================================================
 # Distributed Tracing (OpenTelemetry)
@@ -553,6 +606,18 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 backend_label = "Redis" if limiter_storage_uri != "memory://" else "in-memory"
 logger.info("Rate limiting initialized: %s using %s backend", DEFAULT_RATE_LIMIT, backend_label)
 
+# Conditional requests for device-scoped reads (innermost, so CORS and
+# request IDs also apply to 304s and responses served from the encoded cache)
+@app.middleware("http")
+async def device_conditional_requests(request: Request, call_next):
+    """ETag/Last-Modified, 304s and cached gzip bodies for /api/iodd/{id}/..."""
+    device_id = device_id_for_path(request.url.path)
+    if device_id is not None and request.method == "GET":
+        # Request counts pick the devices warmed at startup
+        record_device_access(device_id)
+    return await conditional_device_response(request, call_next, manager.storage.db_path)
+
+
 # Request ID tracking middleware
 @app.middleware("http")
 async def add_request_id(request, call_next):
@@ -912,6 +977,9 @@ async def upload_iodd(
                 background_tasks.add_task(queue_iodd_pqa_analysis, device_id)
                 logger.info(f"Queued PQA analysis for IODD device {device_id}")
 
+            # Background tasks run in order, so PQA metrics exist when warming starts
+            background_tasks.add_task(warm_imported_devices, result)
+
             return MultiUploadResponse(
                 devices=devices,
                 total_count=len(devices)
@@ -921,9 +989,10 @@ async def upload_iodd(
             device_id = result
             device = manager.storage.get_device(device_id)
 
-            # Queue PQA analysis
+            # Queue PQA analysis, then precompute the device's views
             background_tasks.add_task(queue_iodd_pqa_analysis, device_id)
             logger.info(f"Queued PQA analysis for IODD device {device_id}")
+            background_tasks.add_task(warm_imported_devices, [device_id])
 
             return UploadResponse(
                 device_id=device_id,
@@ -1096,6 +1165,7 @@ async def get_device_events(device_id: int):
 @app.get("/api/iodd/{device_id}/processdata",
          response_model=List[ProcessDataInfo],
          tags=["IODD Management"])
+@device_view("processdata")
 async def get_device_process_data(device_id: int):
     """Get all process data (inputs and outputs) for a specific device"""
     device = manager.storage.get_device(device_id)
@@ -1452,6 +1522,7 @@ async def get_device_ui_menus(device_id: int):
 
 @app.get("/api/iodd/{device_id}/config-schema",
          tags=["IODD Management"])
+@device_view("config-schema")
 async def get_device_config_schema(device_id: int):
     """Get enriched menu structure with parameter details for config page generation"""
     device = manager.storage.get_device(device_id)
@@ -1627,11 +1698,15 @@ async def reset_database():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_versions",
+        "device_access_stats",
         "devices",
     ])
 
     conn.commit()
     conn.close()
+    # Drops cached device data and version stamps
+    _invalidate_device_cache([])
 
     return {
         "message": f"Database reset successfully. Deleted {device_count} device(s) and all related data.",
@@ -1672,11 +1747,15 @@ async def reset_iodd_database():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_versions",
+        "device_access_stats",
         "devices",
     ])
 
     conn.commit()
     conn.close()
+    # Drops cached device data and version stamps
+    _invalidate_device_cache([])
 
     return {
         "message": f"IODD database reset successfully. Deleted {device_count} device(s) and all related data.",
@@ -1765,6 +1844,8 @@ async def delete_all_data():
         "iodd_files",
         "iodd_assets",
         "generated_adapters",
+        "device_versions",
+        "device_access_stats",
         "devices",
     ])
 
@@ -1788,6 +1869,10 @@ async def delete_all_data():
     conn.commit()
     conn.close()
 
+    cache = current_cache_manager()
+    if cache:
+        cache.clear_all()
+
     return {
         "message": f"All data deleted successfully. Deleted {iodd_device_count} IODD device(s) and {eds_count} EDS file(s).",
         "iodd_devices_deleted": iodd_device_count,
@@ -1800,6 +1885,14 @@ class BulkDeleteRequest(BaseModel):
     """Bulk delete request model"""
     device_ids: List[int]
 
+def _invalidate_device_cache(device_ids):
+    """Drop cached device entries after deleting devices directly in the database (all devices if empty)"""
+    invalidate = getattr(manager.storage, "invalidate_devices", None)
+    if invalidate:
+        invalidate(list(device_ids))
+    if not device_ids:
+        invalidate_all_device_views()
+
 @app.post("/api/iodd/bulk-delete",
           tags=["IODD Management"])
 async def bulk_delete_devices(request: BulkDeleteRequest):
@@ -1809,36 +1902,22 @@ async def bulk_delete_devices(request: BulkDeleteRequest):
 
     import sqlite3
     conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
-
-    deleted_count = 0
-    not_found = []
-
-    for device_id in request.device_ids:
-        # Check if device exists
-        cursor.execute("SELECT id FROM devices WHERE id = ?", (device_id,))
-        if not cursor.fetchone():
-            not_found.append(device_id)
-            continue
-
-        # Delete related records
-        cursor.execute("DELETE FROM process_data_record_items WHERE process_data_id IN (SELECT id FROM process_data WHERE device_id = ?)", (device_id,))
-        cursor.execute("DELETE FROM process_data WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM error_types WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM events WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM parameters WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM iodd_files WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM iodd_assets WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM generated_adapters WHERE device_id = ?", (device_id,))
-        cursor.execute("DELETE FROM devices WHERE id = ?", (device_id,))
-        deleted_count += 1
+    try:
+        plan = iodd_device_plan(conn.cursor())
+        existing = plan.existing_ids(conn.cursor(), request.device_ids)
+        not_found = [device_id for device_id in request.device_ids if device_id not in existing]
 
-    conn.commit()
-    conn.close()
+        # Deletes every child table of the devices in chunked, short transactions
+        rows_deleted = plan.delete(conn, existing)
+    finally:
+        conn.close()
+    _invalidate_device_cache(existing)
 
+    deleted_count = rows_deleted.get("devices", 0)
     response = {
         "deleted_count": deleted_count,
-        "message": f"Successfully deleted {deleted_count} device(s)"
+        "message": f"Successfully deleted {deleted_count} device(s)",
+        "rows_deleted": rows_deleted
     }
 
     if not_found:
@@ -1859,21 +1938,11 @@ async def delete_device(device_id: int):
     # Delete from database
     import sqlite3
     conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
-
-    # Delete related records (including assets)
-    cursor.execute("DELETE FROM process_data_record_items WHERE process_data_id IN (SELECT id FROM process_data WHERE device_id = ?)", (device_id,))
-    cursor.execute("DELETE FROM process_data WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM error_types WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM events WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM parameters WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM iodd_files WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM iodd_assets WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM generated_adapters WHERE device_id = ?", (device_id,))
-    cursor.execute("DELETE FROM devices WHERE id = ?", (device_id,))
-
-    conn.commit()
-    conn.close()
+    try:
+        iodd_device_plan(conn.cursor()).delete(conn, [device_id])
+    finally:
+        conn.close()
+    _invalidate_device_cache([device_id])
 
     return {"message": f"Device {device_id} deleted successfully"}
 
@@ -1889,9 +1958,7 @@ async def export_iodd(device_id: int, format: str = "zip"):
     Returns:
         ZIP file with all IODD files or just the XML file
     """
-    import io
     import sqlite3
-    import zipfile
 
     conn = sqlite3.connect(manager.storage.db_path)
     cursor = conn.cursor()
@@ -1905,9 +1972,9 @@ async def export_iodd(device_id: int, format: str = "zip"):
 
     product_name = device[0]
 
-    # Get all assets for this device
+    # Asset names and sizes only; contents are streamed from the BLOBs below
     cursor.execute(
-        "SELECT file_name, file_content, file_type FROM iodd_assets WHERE device_id = ?",
+        "SELECT id, file_name, file_type, length(file_content) FROM iodd_assets WHERE device_id = ?",
         (device_id,)
     )
     assets = cursor.fetchall()
@@ -1916,6 +1983,8 @@ async def export_iodd(device_id: int, format: str = "zip"):
     if not assets:
         raise HTTPException(status_code=404, detail="No files found for this device")
 
+    db_path = manager.storage.db_path
+
     # If XML only format requested
     if format == "xml":
         # Find the XML file
@@ -1923,40 +1992,39 @@ async def export_iodd(device_id: int, format: str = "zip"):
         if not xml_asset:
             raise HTTPException(status_code=404, detail="XML file not found")
 
-        file_name, file_content, _ = xml_asset
+        asset_id, file_name, _, _ = xml_asset
 
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='wb', suffix='.xml', delete=False) as tmp_file:
-            tmp_file.write(file_content if isinstance(file_content, bytes) else file_content.encode())
-            tmp_path = tmp_file.name
+        def xml_chunks():
+            blob_conn = open_export_connection(db_path)
+            try:
+                yield from iter_blob(blob_conn, "iodd_assets", "file_content", asset_id)
+            finally:
+                blob_conn.close()
 
-        return FileResponse(
-            path=tmp_path,
+        return StreamingResponse(
+            xml_chunks(),
             media_type="application/xml",
-            filename=file_name or f"{product_name}.xml"
+            headers={"Content-Disposition": attachment_header(file_name or f"{product_name}.xml")}
         )
 
-    # Create ZIP package with all assets (using original filenames)
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for file_name, file_content, file_type in assets:
-            # Write each file to the ZIP with its original filename
-            zip_file.writestr(file_name, file_content)
-
-    zip_buffer.seek(0)
-
-    # Create temporary file for the ZIP
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp_file:
-        tmp_file.write(zip_buffer.getvalue())
-        tmp_path = tmp_file.name
+    # Stream a ZIP package with all assets (using original filenames)
+    def zip_chunks():
+        blob_conn = open_export_connection(db_path)
+        try:
+            yield from iter_zip(
+                ZipEntry.from_blob(blob_conn, "iodd_assets", "file_content", asset_id, file_name, size)
+                for asset_id, file_name, _, size in assets
+            )
+        finally:
+            blob_conn.close()
 
     # Use product name for the ZIP filename
     safe_product_name = "".join(c for c in product_name if c.isalnum() or c in (' ', '-', '_')).strip()
 
-    return FileResponse(
-        path=tmp_path,
+    return StreamingResponse(
+        zip_chunks(),
         media_type="application/zip",
-        filename=f"{safe_product_name}.zip"
+        headers={"Content-Disposition": attachment_header(f"{safe_product_name}.zip")}
     )
 
 @app.get("/api/iodd/{device_id}/assets",
@@ -2038,35 +2106,9 @@ async def get_device_languages(device_id: int):
             }
         }
     """
-    import sqlite3
-
-    conn = sqlite3.connect(manager.storage.db_path)
-    cursor = conn.cursor()
-
-    # Get all distinct languages for this device
-    cursor.execute(
-        """SELECT DISTINCT language_code FROM iodd_text
-           WHERE device_id = ?
-           ORDER BY language_code""",
-        (device_id,)
-    )
-    languages = [row[0] for row in cursor.fetchall()]
-
-    # Get all text data
-    cursor.execute(
-        """SELECT text_id, language_code, text_value FROM iodd_text
-           WHERE device_id = ?
-           ORDER BY text_id, language_code""",
-        (device_id,)
-    )
-
-    text_data = {}
-    for text_id, language_code, text_value in cursor.fetchall():
-        if text_id not in text_data:
-            text_data[text_id] = {}
-        text_data[text_id][language_code] = text_value
-
-    conn.close()
+    texts = await run_in_threadpool(get_device_text_table, manager.storage.db_path, device_id)
+    languages = sorted(texts.languages)
+    text_data = {text_id: texts.values(text_id) for text_id in sorted(texts.text_ids)}
 
     return {
         "languages": languages,
@@ -2769,7 +2811,16 @@ async def readiness_probe():
 
 @app.get("/api/stats", tags=["System"])
 async def get_statistics():
-    """Get system statistics"""
+    """Get system statistics (row counts from the counters, cached for STATS_CACHE_TTL seconds)"""
+    cache = current_cache_manager()
+    if cache is None:
+        return _compute_statistics()
+    # Imports and deletes drop it through the device and EDS list tags
+    return cache.get_or_set("stats", "api_stats", _compute_statistics, ttl=config.STATS_CACHE_TTL,
+                            tags=["all_devices", "all_eds"])
+
+
+def _compute_statistics() -> Dict[str, Any]:
     import sqlite3
 
     conn = sqlite3.connect(manager.storage.db_path)
@@ -2782,18 +2833,10 @@ async def get_statistics():
     def table_exists(name: str) -> bool:
         return name in existing_tables
 
-    def safe_count(table: str) -> int:
-        if not table_exists(table):
-            logger.debug("Statistics endpoint: table '%s' missing, returning 0", table)
-            return 0
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        value = cursor.fetchone()
-        return value[0] if value else 0
-
-    # Get IO-Link statistics
-    total_devices = safe_count("devices")
-    total_parameters = safe_count("parameters")
-    total_generated = safe_count("generated_adapters")
+    # Missing tables count 0
+    counts = read_row_counts(cursor, (
+        "devices", "parameters", "generated_adapters", "eds_files", "eds_parameters", "eds_packages"
+    ))
 
     platform_stats = {}
     if table_exists("generated_adapters"):
@@ -2806,11 +2849,6 @@ async def get_statistics():
         )
         platform_stats = dict(cursor.fetchall())
 
-    # Get EDS statistics
-    total_eds_files = safe_count("eds_files")
-    total_eds_parameters = safe_count("eds_parameters")
-    total_eds_packages = safe_count("eds_packages")
-
     # Get unique EDS devices (by vendor_code + product_code)
     if table_exists("eds_files"):
         cursor.execute("SELECT COUNT(DISTINCT vendor_code || '_' || product_code) FROM eds_files")
@@ -2821,14 +2859,14 @@ async def get_statistics():
     conn.close()
 
     return {
-        "total_devices": total_devices,
-        "total_parameters": total_parameters,
-        "total_generated_adapters": total_generated,
+        "total_devices": counts["devices"],
+        "total_parameters": counts["parameters"],
+        "total_generated_adapters": counts["generated_adapters"],
         "adapters_by_platform": platform_stats,
         "supported_platforms": list(manager.generators.keys()),
-        "total_eds_files": total_eds_files,
-        "total_eds_parameters": total_eds_parameters,
-        "total_eds_packages": total_eds_packages,
+        "total_eds_files": counts["eds_files"],
+        "total_eds_parameters": counts["eds_parameters"],
+        "total_eds_packages": counts["eds_packages"],
         "unique_eds_devices": unique_eds_devices
     }
 
@@ -2838,16 +2876,20 @@ async def get_statistics():
 
 @app.get("/api/cache/stats", tags=["Admin & Diagnostics"])
 async def get_cache_stats():
-    """Get cache statistics including hit/miss rates and memory usage"""
+    """Get cache statistics per tier (in-process LRU, Redis) including hit rates and memory usage"""
     try:
         stats = manager.storage.get_cache_stats()
+        warmer = get_cache_warmer()
         return {
             "cache": stats,
+            "encoded_responses": encoded_cache_stats(),
+            "text_tables": text_table_cache_stats(),
+            "warmer": warmer.stats() if warmer else None,
             "timestamp": datetime.utcnow().isoformat()
         }
     except AttributeError:
         return {
-            "cache": {"enabled": False, "message": "Caching not enabled (Redis not available)"},
+            "cache": {"enabled": False, "message": "Caching not enabled"},
             "timestamp": datetime.utcnow().isoformat()
         }
 
@@ -2867,7 +2909,7 @@ async def clear_cache(scope: Optional[str] = None):
             "timestamp": datetime.utcnow().isoformat()
         }
     except AttributeError:
-        raise HTTPException(status_code=503, detail="Caching not enabled (Redis not available)")
+        raise HTTPException(status_code=503, detail="Caching not enabled")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
 
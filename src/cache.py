@@ -1,24 +1,24 @@
 """
-Redis caching layer for GreenStack.
+Function-result caching for GreenStack.
 
 This module provides caching functionality with:
 - Decorator-based caching for functions
 - TTL (Time To Live) management
 - Cache invalidation strategies
 - Performance monitoring
+
+Storage, invalidation and statistics are delegated to the shared two-tier
+cache in ``src.cache_manager``; entries live in its ``fn`` namespace, so
+pattern deletes and clears only touch keys written through this module.
 """
 
 import os
-import json
 import logging
 import hashlib
 import functools
-from typing import Any, Callable, Optional, Union
-from datetime import timedelta
+from typing import Any, Callable, Optional
 
-import redis
-from redis import Redis
-from redis.exceptions import RedisError
+from src.cache_manager import CacheManager as _TieredCache, get_cache_manager
 
 logger = logging.getLogger(__name__)
 
@@ -33,56 +33,36 @@ DEVICE_DETAIL_TTL = 1800  # 30 minutes
 PARAMETER_LIST_TTL = 900  # 15 minutes
 SEARCH_RESULTS_TTL = 300  # 5 minutes
 
+NAMESPACE = "fn"
+
 
 class CacheManager:
     """
-    Manages Redis cache connections and operations.
+    Function-result cache on top of the shared tiered cache.
     """
 
-    def __init__(self, redis_url: str = REDIS_URL):
+    def __init__(self, redis_url: str = REDIS_URL, manager: Optional[_TieredCache] = None):
         """
-        Initialize cache manager with Redis connection.
+        Initialize the cache facade.
 
         Args:
-            redis_url: Redis connection URL
+            redis_url: Redis connection URL (used if no shared manager exists yet)
+            manager: Explicit tiered cache to use instead of the shared one
         """
         self.redis_url = redis_url
-        self._client: Optional[Redis] = None
-        self._connect()
-
-    def _connect(self):
-        """Establish connection to Redis."""
-        try:
-            self._client = redis.from_url(
-                self.redis_url,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True,
-            )
-            # Test connection
-            self._client.ping()
-            logger.info(f"Successfully connected to Redis at {self.redis_url}")
-        except RedisError as e:
-            logger.warning(f"Failed to connect to Redis: {e}. Caching will be disabled.")
-            self._client = None
+        self._manager = manager
 
     @property
-    def client(self) -> Optional[Redis]:
-        """Get Redis client, reconnecting if necessary."""
-        if self._client is None:
-            self._connect()
-        return self._client
+    def manager(self) -> _TieredCache:
+        """Shared tiered cache, created on first use."""
+        if self._manager is None:
+            self._manager = get_cache_manager(self.redis_url)
+        return self._manager
 
     @property
     def is_available(self) -> bool:
-        """Check if Redis is available."""
-        if not CACHE_ENABLED:
-            return False
-        try:
-            return self.client is not None and self.client.ping()
-        except RedisError:
-            return False
+        """Check if caching is enabled and a cache tier is usable."""
+        return CACHE_ENABLED and self.manager.is_available()
 
     def get(self, key: str) -> Optional[Any]:
         """
@@ -96,19 +76,9 @@ class CacheManager:
         """
         if not self.is_available:
             return None
+        return self.manager.get(NAMESPACE, key)
 
-        try:
-            value = self.client.get(key)
-            if value:
-                logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
-            logger.debug(f"Cache MISS: {key}")
-            return None
-        except (RedisError, json.JSONDecodeError) as e:
-            logger.error(f"Error getting cache key {key}: {e}")
-            return None
-
-    def set(self, key: str, value: Any, ttl: int = DEFAULT_TTL) -> bool:
+    def set(self, key: str, value: Any, ttl: int = DEFAULT_TTL, tags: Optional[list] = None) -> bool:
         """
         Set value in cache with TTL.
 
@@ -116,21 +86,31 @@ class CacheManager:
             key: Cache key
             value: Value to cache (must be JSON serializable)
             ttl: Time to live in seconds
+            tags: Optional tags for grouped invalidation
 
         Returns:
-            True if successful, False otherwise
+            True if caching is available, False otherwise
         """
         if not self.is_available:
             return False
+        self.manager.set(NAMESPACE, key, value, ttl, tags)
+        return True
 
-        try:
-            serialized = json.dumps(value, default=str)
-            self.client.setex(key, ttl, serialized)
-            logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
-            return True
-        except (RedisError, TypeError) as e:
-            logger.error(f"Error setting cache key {key}: {e}")
-            return False
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: int = DEFAULT_TTL) -> Any:
+        """
+        Get value from cache, computing it once for all concurrent callers on a miss.
+
+        Args:
+            key: Cache key
+            compute: Function producing the value
+            ttl: Time to live in seconds (expired values are served while refreshed)
+
+        Returns:
+            Cached or computed value
+        """
+        if not self.is_available:
+            return compute()
+        return self.manager.get_or_set(NAMESPACE, key, compute, ttl)
 
     def delete(self, key: str) -> bool:
         """
@@ -140,18 +120,12 @@ class CacheManager:
             key: Cache key
 
         Returns:
-            True if successful, False otherwise
+            True if caching is available, False otherwise
         """
         if not self.is_available:
             return False
-
-        try:
-            self.client.delete(key)
-            logger.debug(f"Cache DELETE: {key}")
-            return True
-        except RedisError as e:
-            logger.error(f"Error deleting cache key {key}: {e}")
-            return False
+        self.manager.delete(NAMESPACE, key)
+        return True
 
     def delete_pattern(self, pattern: str) -> int:
         """
@@ -161,39 +135,23 @@ class CacheManager:
             pattern: Key pattern (e.g., "device:*")
 
         Returns:
-            Number of keys deleted
+            Number of Redis keys deleted
         """
         if not self.is_available:
             return 0
-
-        try:
-            keys = self.client.keys(pattern)
-            if keys:
-                deleted = self.client.delete(*keys)
-                logger.debug(f"Cache DELETE pattern {pattern}: {deleted} keys")
-                return deleted
-            return 0
-        except RedisError as e:
-            logger.error(f"Error deleting cache pattern {pattern}: {e}")
-            return 0
+        return self.manager.delete_pattern(NAMESPACE, pattern)
 
     def clear(self) -> bool:
         """
-        Clear all cache entries.
+        Clear all function-cache entries.
 
         Returns:
-            True if successful, False otherwise
+            True if caching is available, False otherwise
         """
         if not self.is_available:
             return False
-
-        try:
-            self.client.flushdb()
-            logger.info("Cache CLEARED")
-            return True
-        except RedisError as e:
-            logger.error(f"Error clearing cache: {e}")
-            return False
+        self.manager.invalidate_namespace(NAMESPACE)
+        return True
 
     def get_stats(self) -> dict:
         """
@@ -202,29 +160,8 @@ class CacheManager:
         Returns:
             Dictionary with cache stats
         """
-        if not self.is_available:
-            return {"available": False}
-
-        try:
-            info = self.client.info("stats")
-            return {
-                "available": True,
-                "hits": info.get("keyspace_hits", 0),
-                "misses": info.get("keyspace_misses", 0),
-                "hit_rate": self._calculate_hit_rate(info),
-                "total_keys": self.client.dbsize(),
-            }
-        except RedisError as e:
-            logger.error(f"Error getting cache stats: {e}")
-            return {"available": False, "error": str(e)}
-
-    @staticmethod
-    def _calculate_hit_rate(info: dict) -> float:
-        """Calculate cache hit rate percentage."""
-        hits = info.get("keyspace_hits", 0)
-        misses = info.get("keyspace_misses", 0)
-        total = hits + misses
-        return (hits / total * 100) if total > 0 else 0.0
+        stats = self.manager.get_stats()
+        return {"available": self.is_available, **stats}
 
 
 # Global cache manager instance
@@ -285,16 +222,8 @@ def cached(
             else:
                 key = f"{prefix}:{cache_key(*args, **kwargs)}"
 
-            # Try to get from cache
-            cached_result = cache_manager.get(key)
-            if cached_result is not None:
-                return cached_result
-
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache_manager.set(key, result, ttl)
-
-            return result
+            # Concurrent misses share one call of func
+            return cache_manager.get_or_set(key, lambda: func(*args, **kwargs), ttl)
 
         # Add cache invalidation method
         def invalidate(*args, **kwargs):
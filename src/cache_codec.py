@@ -0,0 +1,217 @@
+"""
+Cache Value Codec
+
+Encodes cached values as compact bytes for the Redis tier. Every value is
+stored in a small versioned envelope:
+
+    byte 0   envelope version (ENVELOPE_VERSION)
+    byte 1   serializer id (json, orjson, msgpack)
+    byte 2   compressor id (none, zlib, zstd, lz4)
+    byte 3-4 length of the tag list (big-endian)
+    then     the entry's invalidation tags, UTF-8, newline separated
+    then     payload
+
+The envelope names how a value was written, so workers running different
+settings or library sets can read each other's entries, and carries the
+entry's tags, so a worker copying a Redis hit into its in-process tier can
+still invalidate it by tag. Version 1 envelopes (no tag list) and values
+written before the envelope existed (plain JSON text) are still decoded.
+Entries from a newer envelope version, or written with a library that is not
+installed here, raise CacheCodecError and are treated as misses.
+
+msgpack, orjson, zstandard and lz4 are optional; ``auto`` picks the best
+installed serializer and compressor and falls back to the standard library.
+"""
+
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src import config
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, see CacheCodec
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency, see CacheCodec
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, see CacheCodec
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # Optional dependency, see CacheCodec
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_VERSION = 2
+
+# Envelope without a tag list, written by earlier releases
+_UNTAGGED_ENVELOPE_VERSION = 1
+
+# First bytes of values stored as plain JSON text before the envelope existed
+_LEGACY_JSON_START = frozenset(b'{["-0123456789tfn \t\r\n')
+
+
+class CacheCodecError(ValueError):
+    """Stored value cannot be decoded by this process"""
+
+
+@dataclass(frozen=True)
+class Serializer:
+    name: str
+    id: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    name: str
+    id: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+SERIALIZERS: Dict[str, Serializer] = {}
+COMPRESSORS: Dict[str, Compressor] = {}
+
+# Preference order for 'auto'
+_AUTO_SERIALIZERS = ('orjson', 'msgpack', 'json')
+_AUTO_COMPRESSORS = ('zstd', 'lz4', 'zlib')
+
+
+def register_serializer(serializer: Serializer):
+    """Make a serializer available for encoding and decoding (ids are stored, never reuse one)"""
+    SERIALIZERS[serializer.name] = serializer
+
+
+def register_compressor(compressor: Compressor):
+    """Make a compressor available for encoding and decoding (ids are stored, never reuse one)"""
+    COMPRESSORS[compressor.name] = compressor
+
+
+register_serializer(Serializer(
+    'json', 1,
+    lambda value: json.dumps(value, separators=(',', ':')).encode('utf-8'),
+    json.loads,
+))
+if orjson is not None:
+    register_serializer(Serializer(
+        'orjson', 2,
+        lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS),
+        orjson.loads,
+    ))
+if msgpack is not None:
+    register_serializer(Serializer(
+        'msgpack', 3,
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+    ))
+
+register_compressor(Compressor('none', 0, bytes, bytes))
+register_compressor(Compressor('zlib', 1, lambda data: zlib.compress(data, 1), zlib.decompress))
+if zstandard is not None:
+    register_compressor(Compressor(
+        'zstd', 2,
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+    ))
+if lz4_frame is not None:
+    register_compressor(Compressor('lz4', 3, lz4_frame.compress, lz4_frame.decompress))
+
+
+def _pick(registry: Dict[str, Any], name: str, preferred) -> Any:
+    if name == 'auto':
+        return next(registry[candidate] for candidate in preferred if candidate in registry)
+    if name not in registry:
+        fallback = _pick(registry, 'auto', preferred)
+        logger.warning(f"Cache codec '{name}' is not available, using '{fallback.name}'")
+        return fallback
+    return registry[name]
+
+
+class CacheCodec:
+    """
+    Encoder/decoder for cached values
+
+    Args:
+        serializer: Serializer name or 'auto' (default CACHE_SERIALIZER)
+        compression: Compressor name, 'auto' or 'none' (default CACHE_COMPRESSION)
+        compress_min_bytes: Payloads smaller than this are stored uncompressed
+            (default CACHE_COMPRESS_MIN_BYTES)
+    """
+
+    def __init__(self, serializer: Optional[str] = None, compression: Optional[str] = None,
+                 compress_min_bytes: Optional[int] = None):
+        self.serializer = _pick(SERIALIZERS, serializer or config.CACHE_SERIALIZER, _AUTO_SERIALIZERS)
+        self.compressor = _pick(COMPRESSORS, compression or config.CACHE_COMPRESSION, _AUTO_COMPRESSORS)
+        self.compress_min_bytes = (config.CACHE_COMPRESS_MIN_BYTES if compress_min_bytes is None
+                                   else compress_min_bytes)
+        self._serializers_by_id = {s.id: s for s in SERIALIZERS.values()}
+        self._compressors_by_id = {c.id: c for c in COMPRESSORS.values()}
+
+    def encode(self, value: Any) -> bytes:
+        """Value as an enveloped byte string (raises TypeError if not serializable)"""
+        return self.wrap(self.serializer.dumps(value))
+
+    def wrap(self, payload: bytes, tags: Sequence[str] = ()) -> bytes:
+        """Envelope for a payload produced by self.serializer, compressed above the threshold"""
+        compressor = COMPRESSORS['none']
+        if self.compressor.id and len(payload) >= self.compress_min_bytes:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < len(payload):
+                payload, compressor = compressed, self.compressor
+        tag_list = '\n'.join(tags).encode('utf-8')
+        if len(tag_list) > 0xFFFF:
+            raise ValueError("Cache tags exceed 64 KiB")
+        header = bytes((ENVELOPE_VERSION, self.serializer.id, compressor.id)) + len(tag_list).to_bytes(2, 'big')
+        return header + tag_list + payload
+
+    def unwrap(self, data: bytes) -> Tuple[bytes, Serializer]:
+        """Uncompressed payload of an enveloped (or legacy JSON text) value and its serializer"""
+        payload, serializer, _ = self.unwrap_tagged(data)
+        return payload, serializer
+
+    def unwrap_tagged(self, data: bytes) -> Tuple[bytes, Serializer, List[str]]:
+        """unwrap() plus the tags stored with the value (none for older envelopes)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not data:
+            raise CacheCodecError("Empty cache value")
+        if data[0] in _LEGACY_JSON_START:
+            return data, SERIALIZERS['json'], []
+        if data[0] == ENVELOPE_VERSION and len(data) >= 5:
+            end = 5 + int.from_bytes(data[3:5], 'big')
+            tags = data[5:end].decode('utf-8').split('\n') if end > 5 else []
+        elif data[0] == _UNTAGGED_ENVELOPE_VERSION and len(data) >= 3:
+            end, tags = 3, []
+        else:
+            raise CacheCodecError(f"Unsupported cache envelope version {data[0]}")
+
+        serializer = self._serializers_by_id.get(data[1])
+        compressor = self._compressors_by_id.get(data[2])
+        if serializer is None or compressor is None:
+            raise CacheCodecError(f"Cache value uses unavailable codec ({data[1]}, {data[2]})")
+        return compressor.decompress(data[end:]), serializer, tags
+
+    def decode(self, data: bytes) -> Any:
+        """Value of an enveloped (or legacy JSON text) byte string"""
+        payload, serializer = self.unwrap(data)
+        return serializer.loads(payload)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer.name,
+            "compression": self.compressor.name,
+            "compress_min_bytes": self.compress_min_bytes,
+        }
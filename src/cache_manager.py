@@ -1,75 +1,439 @@
 """
 Database Query Caching Manager
-Redis-based caching layer for frequently accessed queries
+Two-tier caching layer for frequently accessed queries
+
+- Tier 1: bounded in-process LRU (``LocalCache``) with TTL and a byte budget,
+  always available, so single-process deployments without Redis still cache
+- Tier 2: Redis, optional, shared between processes
+
+Invalidations are applied to both tiers and published on a Redis pub/sub
+channel, so the in-process tiers of other uvicorn workers drop the same
+entries. Values served from the in-process tier are shared objects and must
+be treated as read-only.
+
+Redis round trips are kept to one per operation: a value and its tag sets
+are written atomically by a Lua script, tag invalidation reads and unlinks
+the tagged keys in a second script, and pattern deletes SCAN only our
+``cache:`` prefix and release memory with UNLINK (never KEYS or FLUSHDB).
+Redis values are encoded by ``CacheCodec`` (compact serializer, compression
+above a size threshold, versioned envelope carrying the entry's tags).
+
+``get_or_set`` protects expensive values from thundering herds: concurrent
+misses for a key in one process share a single computation (``SingleFlight``),
+other processes wait on a short-lived Redis lock for the value to appear,
+and entries past their TTL are served stale for CACHE_STALE_TTL seconds while
+one caller refreshes them in the background.
 """
 import json
 import logging
 import hashlib
-from typing import Any, Optional, Callable, List
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Optional, Callable, List, Set
 from functools import wraps
-import redis
 from datetime import timedelta
 
+try:
+    import redis
+except ImportError:  # Optional dependency (the "advanced" extra); the in-process tier still works
+    redis = None
+
+from src import config
+from src.cache_codec import CacheCodec, CacheCodecError
+
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+KEY_PREFIX = "cache:"
+
+# Keys unlinked per UNLINK call (scripts and SCAN batches)
+UNLINK_BATCH = 500
+
+# KEYS[1] = value key, KEYS[2..] = tag sets; ARGV[1] = value, ARGV[2] = TTL.
+# Tag sets outlive their members by a minute and are never shortened.
+SET_WITH_TAGS_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+local tag_ttl = tonumber(ARGV[2]) + 60
+for i = 2, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < tag_ttl then
+        redis.call('EXPIRE', KEYS[i], tag_ttl)
+    end
+end
+"""
+
+# KEYS[1] = compute lock; deleted only by the holder of the token in ARGV[1]
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Seconds between checks while another process computes a value
+LOCK_POLL_INTERVAL = 0.05
+
+# KEYS = tag sets; unlinks every tagged key and the sets, returns the key count
+INVALIDATE_TAGS_SCRIPT = """
+local count = 0
+for _, tag_key in ipairs(KEYS) do
+    local keys = redis.call('SMEMBERS', tag_key)
+    for i = 1, #keys, tonumber(ARGV[1]) do
+        redis.call('UNLINK', unpack(keys, i, math.min(i + tonumber(ARGV[1]) - 1, #keys)))
+    end
+    count = count + #keys
+    redis.call('UNLINK', tag_key)
+end
+return count
+"""
+
+
+def _hit_rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+
+class _LocalEntry:
+    __slots__ = ('value', 'expires_at', 'size', 'tags')
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: List[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache
+
+    Entries expire after their TTL (capped at max_ttl) and the least recently
+    used entries are evicted once max_entries or max_bytes (measured as the
+    serialized size) would be exceeded. Thread-safe.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_ttl: Optional[int] = None):
+        self.max_entries = config.CACHE_LOCAL_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = config.CACHE_LOCAL_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_ttl = config.CACHE_LOCAL_MAX_TTL if max_ttl is None else max_ttl
+        self._entries: "OrderedDict[str, _LocalEntry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Any:
+        """Cached value, or _MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, size: int, ttl: float, tags: Optional[List[str]] = None):
+        """Store value; size is its serialized size in bytes"""
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            entry = _LocalEntry(value, time.monotonic() + min(ttl, self.max_ttl), size, list(tags or ()))
+            self._entries[key] = entry
+            self.bytes += size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = self._tags.pop(tag, ())
+            return sum(self._remove(key) for key in list(keys))
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            return sum(self._remove(key) for key in keys)
+
+    def invalidate_matching(self, pattern: str) -> int:
+        """Drop keys matching a Redis-style glob pattern"""
+        with self._lock:
+            keys = [key for key in self._entries if fnmatchcase(key, pattern)]
+            return sum(self._remove(key) for key in keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+            self.bytes = 0
+            return count
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": _hit_rate(self.hits, self.misses),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _as_entry(value: Any) -> Optional[Dict[str, Any]]:
+    """get_or_set entry ({"fresh_until", "value"}) or None"""
+    if isinstance(value, dict) and "fresh_until" in value:
+        return value
+    return None
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key
+
+    The first caller for a key runs the function; callers arriving while it
+    runs block until it finishes and get the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
 
 class CacheManager:
     """
-    Centralized cache manager for database queries using Redis
+    Centralized two-tier cache manager for database queries
 
     Features:
+    - In-process LRU in front of optional Redis
     - Automatic cache invalidation
     - TTL-based expiration
-    - Tag-based invalidation
-    - Cache statistics
+    - Tag-based invalidation, propagated to other processes via pub/sub
+    - Coalesced computation and stale-while-revalidate via get_or_set
+    - Per-tier cache statistics
     """
 
-    def __init__(self, redis_url: str = "redis://localhost:6379/0"):
+    def __init__(self, redis_url: str = "redis://localhost:6379/0", local: Optional[LocalCache] = None,
+                 codec: Optional[CacheCodec] = None):
         """
         Initialize cache manager
 
         Args:
             redis_url: Redis connection URL
+            local: In-process tier (default sized from CACHE_LOCAL_* settings)
+            codec: Redis value codec (default from CACHE_SERIALIZER/CACHE_COMPRESSION)
         """
         self.redis_url = redis_url
-        self.client: Optional[redis.Redis] = None
+        self.codec = codec if codec is not None else CacheCodec()
+        self.client: Optional["redis.Redis"] = None
         self.enabled = True
+        self.local = local if local is not None else LocalCache()
+        self.instance_id = uuid.uuid4().hex
+        self.channel = config.CACHE_INVALIDATION_CHANNEL
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.stale_served = 0
+        self.lock_waits = 0
+        self._flight = SingleFlight()
+        self._refreshing: Set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+        # Bumped on every invalidation; a computation that overlaps one is not stored
+        self._generation = 0
+        self._pubsub = None
+        self._subscriber = None
+        self._set_with_tags = None
+        self._invalidate_tags = None
+        self._release_lock = None
         self._connect()
 
     def _connect(self):
-        """Establish Redis connection"""
+        """Establish Redis connection and subscribe to invalidations"""
+        if redis is None:
+            logger.info("redis package not installed, using in-process cache only")
+            self.enabled = False
+            return
+
         try:
             self.client = redis.from_url(
                 self.redis_url,
-                decode_responses=True,
+                decode_responses=False,
                 socket_timeout=5,
                 socket_connect_timeout=5
             )
             self.client.ping()
+            self._set_with_tags = self.client.register_script(SET_WITH_TAGS_SCRIPT)
+            self._invalidate_tags = self.client.register_script(INVALIDATE_TAGS_SCRIPT)
+            self._release_lock = self.client.register_script(RELEASE_LOCK_SCRIPT)
             logger.info(f"Cache manager connected to Redis: {self.redis_url}")
         except Exception as e:
-            logger.warning(f"Failed to connect to Redis, caching disabled: {e}")
+            logger.warning(f"Failed to connect to Redis, using in-process cache only: {e}")
             self.client = None
             self.enabled = False
+            return
+
+        try:
+            self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_invalidation})
+            self._subscriber = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"Cache invalidation subscription failed, other workers may serve stale entries: {e}")
+            self._pubsub = None
+
+    def close(self):
+        """Stop the invalidation subscriber and background refreshes"""
+        if self._refresher is not None:
+            self._refresher.shutdown(wait=False)
+            self._refresher = None
+        if self._subscriber is not None:
+            self._subscriber.stop()
+            self._subscriber = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
 
     def is_available(self) -> bool:
-        """Check if cache is available"""
-        if not self.client or not self.enabled:
-            return False
+        """Check if any cache tier is available"""
+        return self.local.enabled or self.redis_available()
 
-        try:
-            self.client.ping()
-            return True
-        except:
-            return False
+    def redis_available(self) -> bool:
+        """Check if the Redis tier is connected (errors are handled per operation)"""
+        return self.client is not None and self.enabled
 
     def _make_key(self, namespace: str, key: str) -> str:
         """Create namespaced cache key"""
-        return f"cache:{namespace}:{key}"
+        return f"{KEY_PREFIX}{namespace}:{key}"
 
     def _make_tag_key(self, tag: str) -> str:
         """Create tag key for grouping"""
-        return f"cache:tag:{tag}"
+        return f"{KEY_PREFIX}tag:{tag}"
+
+    def _make_lock_key(self, cache_key: str) -> str:
+        """Create compute-lock key for a cache key"""
+        return f"{KEY_PREFIX}lock:{cache_key[len(KEY_PREFIX):]}"
+
+    # ------------------------------------------------------------------------
+    # Cross-process invalidation
+    # ------------------------------------------------------------------------
+
+    def _publish(self, op: str, value: Any = None):
+        """Tell other processes to apply an invalidation to their in-process tier"""
+        if not self.redis_available():
+            return
+        try:
+            self.client.publish(self.channel, json.dumps({"origin": self.instance_id, "op": op, "value": value}))
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+
+    def _on_invalidation(self, message: Dict[str, Any]):
+        try:
+            event = json.loads(message["data"])
+        except (TypeError, ValueError, KeyError):
+            return
+        if event.get("origin") == self.instance_id:
+            return
+        self._invalidate_local(event.get("op"), event.get("value"))
+
+    def _invalidate_local(self, op: str, value: Any) -> int:
+        self._generation += 1
+        if op == "key":
+            return int(self.local.delete(value))
+        if op == "tags":
+            return sum(self.local.invalidate_tag(tag) for tag in value)
+        if op == "prefix":
+            return self.local.invalidate_prefix(value)
+        if op == "pattern":
+            return self.local.invalidate_matching(value)
+        if op == "clear":
+            return self.local.clear()
+        return 0
+
+    # ------------------------------------------------------------------------
+    # Cache operations
+    # ------------------------------------------------------------------------
 
     def get(self, namespace: str, key: str) -> Optional[Any]:
         """
@@ -82,18 +446,49 @@ class CacheManager:
         Returns:
             Cached value or None if not found
         """
-        if not self.is_available():
+        cache_key = self._make_key(namespace, key)
+        value = self.local.get(cache_key)
+        if value is not _MISSING:
+            return value
+        return self._get_redis(cache_key)
+
+    def _get_redis(self, cache_key: str) -> Optional[Any]:
+        """
+        Value from the Redis tier, copied into the in-process tier on a hit
+
+        The copy keeps the entry's tags (stored in its envelope) and expires
+        with the Redis entry, so tag invalidations reach it like any other
+        in-process entry.
+        """
+        if not self.redis_available():
             return None
 
         try:
-            cache_key = self._make_key(namespace, key)
-            value = self.client.get(cache_key)
-
-            if value:
+            generation = self._generation
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(cache_key)
+            pipe.pttl(cache_key)
+            raw, pttl = pipe.execute()
+
+            if raw:
+                payload, serializer, tags = self.codec.unwrap_tagged(raw)
+                value = serializer.loads(payload)
                 logger.debug(f"Cache HIT: {cache_key}")
-                return json.loads(value)
+                self.redis_hits += 1
+                # An invalidation that arrived while reading may already cover this value
+                if generation == self._generation:
+                    ttl = pttl / 1000 if pttl > 0 else self.local.max_ttl
+                    self.local.set(cache_key, value, len(payload), ttl, tags)
+                return value
 
             logger.debug(f"Cache MISS: {cache_key}")
+            self.redis_misses += 1
+            return None
+
+        except CacheCodecError as e:
+            # Written by a newer release or with a codec not installed here
+            logger.debug(f"Cache MISS (undecodable): {cache_key}: {e}")
+            self.redis_misses += 1
             return None
 
         except Exception as e:
@@ -123,31 +518,182 @@ class CacheManager:
 
         try:
             cache_key = self._make_key(namespace, key)
-            serialized = json.dumps(value)
+            payload = self.codec.serializer.dumps(value)
+            self.local.set(cache_key, value, len(payload), ttl, tags)
 
-            # Set value with TTL
-            self.client.setex(cache_key, ttl, serialized)
+            if not self.redis_available():
+                return
 
-            # Add to tag sets for grouped invalidation
+            serialized = self.codec.wrap(payload, tags or ())
             if tags:
-                for tag in tags:
-                    tag_key = self._make_tag_key(tag)
-                    self.client.sadd(tag_key, cache_key)
-                    self.client.expire(tag_key, ttl + 60)  # Tag lives slightly longer
+                # Value and tag memberships in one atomic round trip
+                tag_keys = [self._make_tag_key(tag) for tag in tags]
+                self._set_with_tags(keys=[cache_key, *tag_keys], args=[serialized, ttl])
+            else:
+                self.client.setex(cache_key, ttl, serialized)
 
             logger.debug(f"Cache SET: {cache_key} (TTL: {ttl}s, tags: {tags})")
 
         except Exception as e:
             logger.error(f"Cache set error: {e}")
 
+    # ------------------------------------------------------------------------
+    # Coalesced computation
+    # ------------------------------------------------------------------------
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int = 300,
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Cached value, computing it at most once per key across callers
+
+        Entries are fresh for ttl seconds and then served stale for up to
+        stale_ttl more while a single background refresh recomputes them.
+        On a miss, concurrent callers in this process share one computation
+        and other processes wait (up to CACHE_LOCK_WAIT) for the process
+        holding the Redis compute lock. None results are returned but not
+        cached.
+
+        Values written here carry their freshness, so read them back through
+        get_or_set rather than get.
+
+        Args:
+            namespace: Cache namespace
+            key: Cache key
+            compute: Zero-argument function producing the value
+            ttl: Seconds the value is fresh
+            tags: Optional tags for grouped invalidation
+            stale_ttl: Seconds a soft-expired value may still be served
+                (default CACHE_STALE_TTL, 0 disables)
+        """
+        if not self.is_available():
+            return compute()
+
+        stale_ttl = config.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        cache_key = self._make_key(namespace, key)
+        entry = self._get_entry(namespace, key)
+        if entry is not None and time.time() >= entry["fresh_until"] and self.redis_available():
+            # Another worker may already have refreshed it
+            entry = _as_entry(self._get_redis(cache_key)) or entry
+        if entry is not None:
+            if time.time() < entry["fresh_until"]:
+                return entry["value"]
+            self.stale_served += 1
+            self._refresh_in_background(namespace, key, compute, ttl, tags, stale_ttl)
+            return entry["value"]
+
+        return self._flight.do(
+            cache_key, lambda: self._compute(namespace, key, compute, ttl, tags, stale_ttl, wait=True)
+        )
+
+    def _get_entry(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        return _as_entry(self.get(namespace, key))
+
+    def _compute(self, namespace: str, key: str, compute: Callable[[], Any], ttl: int,
+                 tags: Optional[List[str]], stale_ttl: int, wait: bool) -> Any:
+        """Compute and store a value while holding the cross-process compute lock"""
+        cache_key = self._make_key(namespace, key)
+        token = self._acquire_lock(cache_key)
+        if token is None:
+            # Another process is computing this key
+            if not wait:
+                return None
+            entry = self._wait_for_entry(namespace, key)
+            if entry is not None:
+                return entry["value"]
+        elif token and wait:
+            # Stored by another process between our miss and taking the lock
+            entry = _as_entry(self._get_redis(cache_key))
+            if entry is not None and time.time() < entry["fresh_until"]:
+                self._unlock(cache_key, token)
+                return entry["value"]
+
+        try:
+            generation = self._generation
+            value = compute()
+            if value is not None and generation == self._generation:
+                entry = {"fresh_until": time.time() + ttl, "value": value}
+                self.set(namespace, key, entry, ttl=ttl + stale_ttl, tags=tags)
+            return value
+        finally:
+            if token:
+                self._unlock(cache_key, token)
+
+    def _acquire_lock(self, cache_key: str) -> Optional[str]:
+        """Lock token, "" when Redis is not in use, or None if another process holds the lock"""
+        if not self.redis_available():
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            if self.client.set(self._make_lock_key(cache_key), token, nx=True, ex=config.CACHE_LOCK_TIMEOUT):
+                return token
+            return None
+        except Exception as e:
+            logger.error(f"Cache lock error: {e}")
+            return ""
+
+    def _unlock(self, cache_key: str, token: str):
+        try:
+            self._release_lock(keys=[self._make_lock_key(cache_key)], args=[token])
+        except Exception as e:
+            logger.error(f"Cache unlock error: {e}")
+
+    def _wait_for_entry(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Poll until the lock holder has stored the entry, its lock is gone, or CACHE_LOCK_WAIT passes"""
+        self.lock_waits += 1
+        cache_key = self._make_key(namespace, key)
+        deadline = time.monotonic() + config.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = self._get_entry(namespace, key)
+            if entry is not None:
+                return entry
+            try:
+                if not self.client.exists(self._make_lock_key(cache_key)):
+                    return None
+            except Exception:
+                return None
+        return None
+
+    def _refresh_in_background(self, namespace: str, key: str, compute: Callable[[], Any], ttl: int,
+                               tags: Optional[List[str]], stale_ttl: int):
+        cache_key = self._make_key(namespace, key)
+        with self._refresh_lock:
+            if cache_key in self._refreshing or self._flight.in_flight(cache_key):
+                return
+            self._refreshing.add(cache_key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=config.CACHE_REFRESH_WORKERS,
+                                                     thread_name_prefix="cache-refresh")
+
+        def refresh():
+            try:
+                self._flight.do(cache_key, lambda: self._compute(namespace, key, compute, ttl, tags,
+                                                                 stale_ttl, wait=False))
+            except Exception as e:
+                logger.error(f"Cache refresh of {cache_key} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        self._refresher.submit(refresh)
+
     def delete(self, namespace: str, key: str):
         """Delete specific cache entry"""
-        if not self.is_available():
+        cache_key = self._make_key(namespace, key)
+        self._invalidate_local("key", cache_key)
+        if not self.redis_available():
             return
 
         try:
-            cache_key = self._make_key(namespace, key)
-            self.client.delete(cache_key)
+            self.client.unlink(cache_key)
+            self._publish("key", cache_key)
             logger.debug(f"Cache DELETE: {cache_key}")
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
@@ -159,22 +705,73 @@ class CacheManager:
         Args:
             tag: Tag to invalidate (e.g., 'device:123', 'all_devices')
         """
-        if not self.is_available():
-            return
+        self.invalidate_by_tags([tag])
 
-        try:
-            tag_key = self._make_tag_key(tag)
-            cache_keys = self.client.smembers(tag_key)
+    def invalidate_by_tags(self, tags: List[str]) -> int:
+        """
+        Invalidate all cache entries carrying any of the tags in one round trip
 
-            if cache_keys:
-                # Delete all cached entries with this tag
-                self.client.delete(*cache_keys)
-                # Delete the tag set itself
-                self.client.delete(tag_key)
-                logger.info(f"Cache invalidated by tag '{tag}': {len(cache_keys)} entries")
+        Args:
+            tags: Tags to invalidate
+
+        Returns:
+            Number of Redis entries removed
+        """
+        tags = list(tags)
+        self._invalidate_local("tags", tags)
+        if not tags or not self.redis_available():
+            return 0
+
+        try:
+            count = self._invalidate_tags(keys=[self._make_tag_key(tag) for tag in tags], args=[UNLINK_BATCH])
+            self._publish("tags", tags)
+            if count:
+                logger.info(f"Cache invalidated by tags {tags}: {count} entries")
+            return count
 
         except Exception as e:
             logger.error(f"Cache invalidation error: {e}")
+            return 0
+
+    def _unlink_matching(self, pattern: str) -> int:
+        """SCAN for keys matching pattern (always under KEY_PREFIX) and UNLINK them in batches"""
+        if not pattern.startswith(KEY_PREFIX):
+            raise ValueError(f"Cache patterns must start with {KEY_PREFIX!r}")
+        deleted = 0
+        batch = []
+        for key in self.client.scan_iter(match=pattern, count=UNLINK_BATCH):
+            batch.append(key)
+            if len(batch) >= UNLINK_BATCH:
+                deleted += self.client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += self.client.unlink(*batch)
+        return deleted
+
+    def delete_pattern(self, namespace: str, pattern: str) -> int:
+        """
+        Delete entries of a namespace whose key matches a glob pattern
+
+        Args:
+            namespace: Cache namespace
+            pattern: Key pattern within the namespace (e.g., 'device:*')
+
+        Returns:
+            Number of Redis entries removed
+        """
+        full_pattern = self._make_key(namespace, pattern)
+        self._invalidate_local("pattern", full_pattern)
+        if not self.redis_available():
+            return 0
+
+        try:
+            deleted = self._unlink_matching(full_pattern)
+            self._publish("pattern", full_pattern)
+            logger.debug(f"Cache DELETE pattern {full_pattern}: {deleted} keys")
+            return deleted
+        except Exception as e:
+            logger.error(f"Cache pattern delete error: {e}")
+            return 0
 
     def invalidate_namespace(self, namespace: str):
         """
@@ -183,72 +780,74 @@ class CacheManager:
         Args:
             namespace: Namespace to clear (e.g., 'devices', 'parameters')
         """
-        if not self.is_available():
+        prefix = self._make_key(namespace, "")
+        self._invalidate_local("prefix", prefix)
+        if not self.redis_available():
             return
 
         try:
-            pattern = self._make_key(namespace, "*")
-            cursor = 0
-            deleted = 0
-
-            # Use SCAN to avoid blocking Redis
-            while True:
-                cursor, keys = self.client.scan(cursor, match=pattern, count=100)
-                if keys:
-                    self.client.delete(*keys)
-                    deleted += len(keys)
-
-                if cursor == 0:
-                    break
-
+            deleted = self._unlink_matching(f"{prefix}*")
+            self._publish("prefix", prefix)
             logger.info(f"Cache namespace '{namespace}' cleared: {deleted} entries")
 
         except Exception as e:
             logger.error(f"Cache namespace invalidation error: {e}")
 
     def clear_all(self):
-        """Clear all cache entries (use with caution!)"""
-        if not self.is_available():
+        """Clear all cache entries (only keys under our prefix, never the whole database)"""
+        self._invalidate_local("clear", None)
+        if not self.redis_available():
             return
 
         try:
-            pattern = "cache:*"
-            cursor = 0
-            deleted = 0
-
-            while True:
-                cursor, keys = self.client.scan(cursor, match=pattern, count=100)
-                if keys:
-                    self.client.delete(*keys)
-                    deleted += len(keys)
-
-                if cursor == 0:
-                    break
-
+            deleted = self._unlink_matching(f"{KEY_PREFIX}*")
+            self._publish("clear")
             logger.warning(f"All cache cleared: {deleted} entries")
 
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
 
     def get_stats(self) -> dict:
-        """Get cache statistics"""
-        if not self.is_available():
-            return {"enabled": False, "connected": False}
-
-        try:
-            info = self.client.info("stats")
-
-            return {
-                "enabled": self.enabled,
-                "connected": True,
-                "keyspace_hits": info.get("keyspace_hits", 0),
-                "keyspace_misses": info.get("keyspace_misses", 0),
-                "total_commands_processed": info.get("total_commands_processed", 0),
-                "used_memory_human": self.client.info("memory").get("used_memory_human"),
-            }
-        except Exception as e:
-            logger.error(f"Error getting cache stats: {e}")
-            return {"enabled": self.enabled, "connected": False, "error": str(e)}
+        """Get per-tier and overall cache statistics"""
+        local = self.local.stats()
+        redis_stats: Dict[str, Any] = {
+            "enabled": self.redis_available(),
+            "connected": False,
+            "hits": self.redis_hits,
+            "misses": self.redis_misses,
+            "hit_rate": _hit_rate(self.redis_hits, self.redis_misses),
+            "invalidation_subscriber": self._subscriber is not None,
+            "codec": self.codec.describe(),
+        }
+        coalescing = {
+            "shared_computations": self._flight.shared,
+            "stale_served": self.stale_served,
+            "lock_waits": self.lock_waits,
+        }
+
+        if self.redis_available():
+            try:
+                info = self.client.info("stats")
+                redis_stats.update({
+                    "connected": True,
+                    "keyspace_hits": info.get("keyspace_hits", 0),
+                    "keyspace_misses": info.get("keyspace_misses", 0),
+                    "total_commands_processed": info.get("total_commands_processed", 0),
+                    "used_memory_human": self.client.info("memory").get("used_memory_human"),
+                })
+            except Exception as e:
+                logger.error(f"Error getting cache stats: {e}")
+                redis_stats["error"] = str(e)
+
+        # Lookups answered by either tier, out of all lookups (Redis only sees local misses)
+        hits = local["hits"] + self.redis_hits
+        return {
+            "enabled": self.is_available(),
+            "connected": redis_stats["connected"],
+            "hit_rate": _hit_rate(hits, local["misses"] - self.redis_hits),
+            "tiers": {"local": local, "redis": redis_stats},
+            "coalescing": coalescing,
+        }
 
 
 def cached(
@@ -288,19 +887,9 @@ def cached(
                 key_data = f"{func.__name__}:{args}:{kwargs}"
                 cache_key = hashlib.md5(key_data.encode()).hexdigest()
 
-            # Try to get from cache
-            cached_value = cache.get(namespace, cache_key)
-            if cached_value is not None:
-                return cached_value
-
-            # Execute function
-            result = func(*args, **kwargs)
-
-            # Cache result
+            # Concurrent misses share one call of func
             tags = tags_func(*args, **kwargs) if tags_func else None
-            cache.set(namespace, cache_key, result, ttl=ttl, tags=tags)
-
-            return result
+            return cache.get_or_set(namespace, cache_key, lambda: func(*args, **kwargs), ttl=ttl, tags=tags)
 
         return wrapper
     return decorator
@@ -320,6 +909,11 @@ def get_cache_manager(redis_url: str = "redis://localhost:6379/0") -> CacheManag
     return _cache_manager
 
 
+def current_cache_manager() -> Optional[CacheManager]:
+    """Global cache manager if one has been created (never connects)"""
+    return _cache_manager
+
+
 def setup_cache(redis_url: str = "redis://localhost:6379/0") -> CacheManager:
     """Initialize cache manager (call at application startup)"""
     return get_cache_manager(redis_url)
@@ -1,6 +1,7 @@
 """
 Cached Storage Layer
-Wraps StorageManager with Redis caching for frequently accessed queries
+Wraps StorageManager with two-tier caching (in-process LRU, optional Redis)
+for frequently accessed queries
 """
 import inspect
 import logging
@@ -14,7 +15,13 @@ logger = logging.getLogger(__name__)
 
 class CachedStorageManager:
     """
-    Wrapper around StorageManager with Redis caching
+    Wrapper around StorageManager with two-tier caching
+
+    Reads are answered from the in-process LRU first, then Redis (when
+    configured), then the database. Concurrent misses for the same entry run
+    a single query, and expired entries are served briefly while refreshed
+    (see CacheManager.get_or_set). Cached values are shared between callers
+    and must not be mutated.
 
     Automatically caches and invalidates:
     - Device lists
@@ -46,50 +53,25 @@ class CachedStorageManager:
 
     def list_devices(self) -> List[Dict[str, Any]]:
         """List all devices with caching"""
-        cache_key = "all_devices"
-
-        # Try cache first
-        cached = self.cache.get("devices", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        devices = self.storage.list_devices()
-
-        # Cache for 5 minutes
-        self.cache.set(
+        # Cache for 5 minutes; rebuilt once (not per request) after each import
+        return self.cache.get_or_set(
             "devices",
-            cache_key,
-            devices,
+            "all_devices",
+            self.storage.list_devices,
             ttl=300,
             tags=["all_devices"]
         )
 
-        return devices
-
     def get_device(self, device_id: int) -> Optional[Dict[str, Any]]:
         """Get device details with caching"""
-        cache_key = f"device:{device_id}"
-
-        # Try cache first
-        cached = self.cache.get("devices", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        device = self.storage.get_device(device_id)
-
-        if device:
-            # Cache for 10 minutes
-            self.cache.set(
-                "devices",
-                cache_key,
-                device,
-                ttl=600,
-                tags=["all_devices", f"device:{device_id}"]
-            )
-
-        return device
+        # Cache for 10 minutes (missing devices are not cached)
+        return self.cache.get_or_set(
+            "devices",
+            f"device:{device_id}",
+            lambda: self.storage.get_device(device_id),
+            ttl=600,
+            tags=["all_devices", f"device:{device_id}"]
+        )
 
     def save_device(self, device_data: Dict[str, Any], device_id: Optional[int] = None) -> int:
         """Save device and invalidate caches"""
@@ -101,10 +83,11 @@ class CachedStorageManager:
         else:
             saved_id = save_method(device_data, device_id)
 
-        # Invalidate caches
-        self.cache.invalidate_by_tag("all_devices")
-        if device_id:
-            self.cache.invalidate_by_tag(f"device:{device_id}")
+        # Invalidate caches (a re-import keeps the device's id)
+        tags = ["all_devices", f"device:{saved_id}"]
+        if device_id and device_id != saved_id:
+            tags.append(f"device:{device_id}")
+        self.cache.invalidate_by_tags(tags)
 
         logger.info(f"Device {saved_id} saved, caches invalidated")
 
@@ -121,56 +104,38 @@ class CachedStorageManager:
 
         logger.info(f"Device {device_id} deleted, caches invalidated")
 
+    def invalidate_devices(self, device_ids: List[int]):
+        """Invalidate caches for devices changed or deleted outside this wrapper"""
+        tags = ["all_devices"]
+        for device_id in device_ids:
+            tags += [f"device:{device_id}", f"device:{device_id}_assets"]
+        self.cache.invalidate_by_tags(tags)
+
     # ========================================================================
     # EDS File Operations with Caching
     # ========================================================================
 
     def list_eds_files(self) -> List[Dict[str, Any]]:
         """List all EDS files with caching"""
-        cache_key = "all_eds_files"
-
-        # Try cache first
-        cached = self.cache.get("eds", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        eds_files = self.storage.list_eds_files()
-
         # Cache for 5 minutes
-        self.cache.set(
+        return self.cache.get_or_set(
             "eds",
-            cache_key,
-            eds_files,
+            "all_eds_files",
+            self.storage.list_eds_files,
             ttl=300,
             tags=["all_eds"]
         )
 
-        return eds_files
-
     def get_eds_file(self, eds_id: int) -> Optional[Dict[str, Any]]:
         """Get EDS file details with caching"""
-        cache_key = f"eds:{eds_id}"
-
-        # Try cache first
-        cached = self.cache.get("eds", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        eds_file = self.storage.get_eds_file(eds_id)
-
-        if eds_file:
-            # Cache for 10 minutes
-            self.cache.set(
-                "eds",
-                cache_key,
-                eds_file,
-                ttl=600,
-                tags=["all_eds", f"eds:{eds_id}"]
-            )
-
-        return eds_file
+        # Cache for 10 minutes (missing files are not cached)
+        return self.cache.get_or_set(
+            "eds",
+            f"eds:{eds_id}",
+            lambda: self.storage.get_eds_file(eds_id),
+            ttl=600,
+            tags=["all_eds", f"eds:{eds_id}"]
+        )
 
     def save_eds_file(self, eds_data: Dict[str, Any], eds_id: Optional[int] = None) -> int:
         """Save EDS file and invalidate caches"""
@@ -199,26 +164,19 @@ class CachedStorageManager:
 
     def get_device_assets(self, device_id: int) -> List[Dict[str, Any]]:
         """Get device assets with caching"""
-        cache_key = f"assets:device:{device_id}"
-
-        # Try cache first
-        cached = self.cache.get("assets", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        assets = self.storage.get_device_assets(device_id)
-
         # Cache for 15 minutes (assets change less frequently)
-        self.cache.set(
+        return self.cache.get_or_set(
             "assets",
-            cache_key,
-            assets,
+            f"assets:device:{device_id}",
+            lambda: self.storage.get_device_assets(device_id),
             ttl=900,
             tags=[f"device:{device_id}_assets"]
         )
 
-        return assets
+    def save_assets(self, device_id: int, assets: List[Dict[str, Any]]):
+        """Save device assets and invalidate caches"""
+        self.storage.save_assets(device_id, assets)
+        self.cache.invalidate_by_tags([f"device:{device_id}", f"device:{device_id}_assets"])
 
     # ========================================================================
     # Search Operations (No caching - results vary too much)
@@ -234,20 +192,8 @@ class CachedStorageManager:
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics with short caching"""
-        cache_key = "db_statistics"
-
-        # Try cache first
-        cached = self.cache.get("stats", cache_key)
-        if cached is not None:
-            return cached
-
-        # Fetch from database
-        stats = self.storage.get_statistics()
-
         # Cache for 1 minute only (stats change frequently)
-        self.cache.set("stats", cache_key, stats, ttl=60)
-
-        return stats
+        return self.cache.get_or_set("stats", "db_statistics", self.storage.get_statistics, ttl=60)
 
     # ========================================================================
     # Cache Management
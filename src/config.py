@@ -141,6 +141,70 @@ LOG_SQL_QUERIES = os.getenv('LOG_SQL_QUERIES', 'false').lower() == 'true'
 REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
 MAX_CONNECTIONS = int(os.getenv('MAX_CONNECTIONS', '100'))
 ENABLE_COMPRESSION = os.getenv('ENABLE_COMPRESSION', 'true').lower() == 'true'
+EDS_PACKAGE_WORKERS = int(os.getenv('EDS_PACKAGE_WORKERS', '0'))  # 0 = one per CPU
+BULK_DELETE_CHUNK_SIZE = int(os.getenv('BULK_DELETE_CHUNK_SIZE', '100'))  # root rows per delete transaction
+EXPORT_FETCH_SIZE = int(os.getenv('EXPORT_FETCH_SIZE', '500'))  # rows fetched per batch by streamed exports
+EXPORT_BATCH_MAX_DEVICES = int(os.getenv('EXPORT_BATCH_MAX_DEVICES', '5000'))  # devices per batch export
+EXPORT_CHUNK_BYTES = int(os.getenv('EXPORT_CHUNK_BYTES', str(256 * 1024)))  # bytes read per chunk by streamed ZIP exports
+EXPORT_BATCH_WORKERS = int(os.getenv('EXPORT_BATCH_WORKERS', '0'))  # 0 = one per CPU
+EXPORT_BATCH_CHUNK_SIZE = int(os.getenv('EXPORT_BATCH_CHUNK_SIZE', '200'))  # devices loaded per batch export query
+
+# ============================================================================
+# PQA Retention Settings
+# ============================================================================
+
+PQA_RETAIN_ANALYSES = int(os.getenv('PQA_RETAIN_ANALYSES', '5'))  # analyses kept per file
+PQA_RETAIN_DIFF_DETAILS = int(os.getenv('PQA_RETAIN_DIFF_DETAILS', '1'))  # newest analyses keeping full diffs
+PQA_COMPACTION_INTERVAL = int(os.getenv('PQA_COMPACTION_INTERVAL', '3600'))  # seconds
+PQA_BATCH_WORKERS = int(os.getenv('PQA_BATCH_WORKERS', '1'))  # reconstruction processes for analyze-all runs
+
+# ============================================================================
+# Database Maintenance Settings
+# ============================================================================
+
+MAINTENANCE_INTERVAL = int(os.getenv('MAINTENANCE_INTERVAL', '86400'))  # seconds, 0 = disabled
+MAINTENANCE_TIME_BUDGET = int(os.getenv('MAINTENANCE_TIME_BUDGET', '60'))  # seconds per scheduled run
+MAINTENANCE_PAGES_PER_STEP = int(os.getenv('MAINTENANCE_PAGES_PER_STEP', '1024'))  # backup/vacuum step size
+MAINTENANCE_STEP_PAUSE = float(os.getenv('MAINTENANCE_STEP_PAUSE', '0.01'))  # seconds between steps
+MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv('MAINTENANCE_ANALYSIS_LIMIT', '1000'))  # rows sampled per index
+STATS_HEALTH_INTERVAL = int(os.getenv('STATS_HEALTH_INTERVAL', '300'))  # seconds between background health checks, 0 = on demand
+STATS_RECONCILE_INTERVAL = int(os.getenv('STATS_RECONCILE_INTERVAL', '3600'))  # seconds between row counter recounts
+STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', '30'))  # seconds /api/stats responses are cached
+
+# ============================================================================
+# Cache Settings
+# ============================================================================
+
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', '2048'))  # 0 = in-process tier disabled
+CACHE_LOCAL_MAX_BYTES = int(os.getenv('CACHE_LOCAL_MAX_BYTES', str(64 * 1024 * 1024)))  # serialized size budget
+CACHE_LOCAL_MAX_TTL = int(os.getenv('CACHE_LOCAL_MAX_TTL', '300'))  # seconds, caps entry TTLs in-process
+CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')  # Redis pub/sub channel
+CACHE_SERIALIZER = os.getenv('CACHE_SERIALIZER', 'auto')  # auto, msgpack, orjson or json
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'auto')  # auto, zstd, lz4, zlib or none
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))  # smaller values are stored uncompressed
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', '60'))  # seconds expired entries are served while refreshing
+CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', '30'))  # seconds before a crashed computation's lock expires
+CACHE_LOCK_WAIT = float(os.getenv('CACHE_LOCK_WAIT', '5'))  # seconds to wait for another worker's computation
+CACHE_REFRESH_WORKERS = int(os.getenv('CACHE_REFRESH_WORKERS', '2'))  # background stale-while-revalidate threads
+DEVICE_VIEW_CACHE_TTL = int(os.getenv('DEVICE_VIEW_CACHE_TTL', '3600'))  # seconds, views are also dropped on device save
+CACHE_WARM_ON_IMPORT = os.getenv('CACHE_WARM_ON_IMPORT', 'true').lower() == 'true'  # precompute views of imported devices
+CACHE_WARM_TOP_DEVICES = int(os.getenv('CACHE_WARM_TOP_DEVICES', '25'))  # most requested devices warmed at startup, 0 = off
+CACHE_WARM_WORKERS = int(os.getenv('CACHE_WARM_WORKERS', '1'))  # background warming threads
+DEVICE_ACCESS_FLUSH_INTERVAL = int(os.getenv('DEVICE_ACCESS_FLUSH_INTERVAL', '30'))  # seconds between request count writes
+TEXT_TABLE_CACHE_MAX_ENTRIES = int(os.getenv('TEXT_TABLE_CACHE_MAX_ENTRIES', '256'))  # device text tables kept in-process, 0 = not cached
+TEXT_TABLE_CACHE_MAX_BYTES = int(os.getenv('TEXT_TABLE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))  # estimated size budget
+TEXT_TABLE_CACHE_TTL = int(os.getenv('TEXT_TABLE_CACHE_TTL', '3600'))  # seconds, entries are keyed by device version anyway
+
+# ============================================================================
+# Conditional Request Settings (device-scoped responses)
+# ============================================================================
+
+DEVICE_VERSION_CACHE_TTL = int(os.getenv('DEVICE_VERSION_CACHE_TTL', '300'))  # seconds a device version stamp is cached
+HTTP_ENCODED_CACHE_MAX_ENTRIES = int(os.getenv('HTTP_ENCODED_CACHE_MAX_ENTRIES', '512'))  # 0 = encoded bodies not cached
+HTTP_ENCODED_CACHE_MAX_BYTES = int(os.getenv('HTTP_ENCODED_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))  # compressed size budget
+HTTP_ENCODED_CACHE_TTL = int(os.getenv('HTTP_ENCODED_CACHE_TTL', '3600'))  # seconds, entries are keyed by ETag anyway
+HTTP_COMPRESS_MIN_BYTES = int(os.getenv('HTTP_COMPRESS_MIN_BYTES', '1024'))  # smaller bodies are sent uncompressed
+HTTP_COMPRESS_MAX_BYTES = int(os.getenv('HTTP_COMPRESS_MAX_BYTES', str(8 * 1024 * 1024)))  # larger bodies pass through
 
 # ============================================================================
 # Feature Flags
@@ -66,6 +66,7 @@ from src.generation import AdapterGenerator, NodeREDGenerator
 
 # Import modular storage system
 from src.storage import StorageManager as ModularStorageManager
+from src.utils.table_counters import install_row_counters
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -722,6 +723,24 @@ class StorageManager:
             )
         """)
 
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS device_versions (
+                device_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS device_access_stats (
+                device_id INTEGER PRIMARY KEY,
+                request_count INTEGER NOT NULL DEFAULT 0,
+                last_accessed REAL,
+                FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+            )
+        """)
+
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS error_types (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -1264,6 +1283,9 @@ class StorageManager:
             )
         """)
 
+        # Row counters read by the statistics endpoints
+        install_row_counters(cursor)
+
         conn.commit()
         conn.close()
     
@@ -2314,16 +2336,8 @@ class IODDManager:
         return str(output_dir)
     
     def list_devices(self) -> List[Dict[str, Any]]:
-        """List all imported devices"""
-        conn = sqlite3.connect(self.storage.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM devices ORDER BY import_date DESC")
-        devices = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
-        return devices
+        """List all imported devices (cached when storage is wrapped by CachedStorageManager)"""
+        return self.storage.list_devices()
 
 # ============================================================================
 # CLI Interface
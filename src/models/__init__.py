@@ -2,12 +2,33 @@
 Data models for IODD Management System
 
 This module contains all the dataclasses and enums used throughout the system.
+
+The dataclasses use ``__slots__``: a parsed profile holds thousands of
+parameters, record items and single values, and most of their optional
+fields stay None. Without a per-instance ``__dict__`` each of them takes a
+fraction of the memory. Identifier-like strings that repeat across a
+profile (datatype names, xsi types, text ids, unit codes) are interned on
+construction so equal values share one string object; see
+scripts/benchmark_model_memory.py for the measured savings.
 """
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _InternedStrings:
+    """Interns the string fields named in ``_interned_fields`` on construction"""
+    __slots__ = ()
+    _interned_fields: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        for name in self._interned_fields:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
 
 
 class IODDDataType(Enum):
@@ -30,7 +51,7 @@ class AccessRights(Enum):
     READ_WRITE = "rw"
 
 
-@dataclass
+@dataclass(slots=True)
 class VendorInfo:
     """Vendor information from IODD"""
     id: int
@@ -39,7 +60,7 @@ class VendorInfo:
     url: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceInfo:
     """Device identification information"""
     vendor_id: int
@@ -61,16 +82,20 @@ class DeviceInfo:
     additional_device_ids: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Constraint:
     """Parameter constraint definition"""
     type: str  # min, max, enum
     value: Any
 
 
-@dataclass
-class SingleValue:
+@dataclass(slots=True)
+class SingleValue(_InternedStrings):
     """Single value enumeration for parameters/process data"""
+    _interned_fields = (
+        'value', 'text_id', 'xsi_type',
+    )
+
     value: str
     name: str
     description: Optional[str] = None
@@ -79,9 +104,15 @@ class SingleValue:
     xml_order: Optional[int] = None  # Preserves original XML element order for forensic reconstruction
 
 
-@dataclass
-class Parameter:
+@dataclass(slots=True)
+class Parameter(_InternedStrings):
     """Device parameter definition"""
+    _interned_fields = (
+        'unit_code', 'array_element_type', 'array_element_value_range_xsi_type',
+        'array_element_value_range_name_text_id', 'string_encoding', 'name_text_id', 'description_text_id',
+        'datatype_ref', 'value_range_xsi_type', 'value_range_name_text_id', 'datatype_name_text_id',
+    )
+
     id: str
     index: int
     subindex: Optional[int]
@@ -130,11 +161,19 @@ class Parameter:
     datatype_name_text_id: Optional[str] = None  # Stores Datatype/Name textId (direct child) for reconstruction
     # PQA Fix #127: StdDirectParameterRef support
     is_std_direct_parameter_ref: bool = False  # True if this should be reconstructed as StdDirectParameterRef
+    # RecordT Variable RecordItemInfo (subindex, defaultValue, flags), saved to variable_record_item_info
+    record_item_info: List[Dict[str, Any]] = field(default_factory=list)
 
 
-@dataclass
-class RecordItem:
+@dataclass(slots=True)
+class RecordItem(_InternedStrings):
     """Record item within process data"""
+    _interned_fields = (
+        'data_type', 'name_text_id', 'description_text_id', 'value_range_xsi_type',
+        'value_range_name_text_id', 'access_right_restriction', 'encoding', 'datatype_id',
+        'simpledatatype_name_text_id',
+    )
+
     subindex: int
     name: str
     bit_offset: Optional[int]  # None when not explicitly in original IODD (preserves original structure)
@@ -158,7 +197,7 @@ class RecordItem:
     simpledatatype_name_text_id: Optional[str] = None  # Stores SimpleDatatype/Name@textId for reconstruction
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessDataCondition:
     """Conditional process data definition"""
     variable_id: str
@@ -166,9 +205,14 @@ class ProcessDataCondition:
     subindex: Optional[str] = None  # Condition element can have subindex attribute
 
 
-@dataclass
-class ProcessData:
+@dataclass(slots=True)
+class ProcessData(_InternedStrings):
     """Process data definition"""
+    _interned_fields = (
+        'data_type', 'name_text_id', 'datatype_ref_id', 'datatype_name_text_id', 'array_element_type',
+        'array_element_value_range_xsi_type',
+    )
+
     id: str
     name: str
     bit_length: int
@@ -200,7 +244,7 @@ class ProcessData:
     array_element_value_range_name_text_id: Optional[str] = None  # SimpleDatatype/ValueRange/Name textId
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessDataCollection:
     """Collection of process data inputs and outputs"""
     inputs: List[ProcessData] = field(default_factory=list)
@@ -209,7 +253,7 @@ class ProcessDataCollection:
     total_output_bits: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorType:
     """Device error type definition"""
     code: int
@@ -225,7 +269,7 @@ class ErrorType:
     description_text_id: Optional[str] = None  # Original textId for custom ErrorType
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Device event definition"""
     code: int
@@ -239,7 +283,7 @@ class Event:
     mode: Optional[str] = None  # Stores Event@mode attribute (e.g., AppearDisappear) for reconstruction
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentInfo:
     """IODD document metadata"""
     copyright: Optional[str] = None
@@ -247,7 +291,7 @@ class DocumentInfo:
     version: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceFeatures:
     """Device capabilities and features"""
     block_parameter: bool = False
@@ -263,7 +307,7 @@ class DeviceFeatures:
     has_data_storage: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class CommunicationProfile:
     """IO-Link communication network profile"""
     iolink_revision: Optional[str] = None
@@ -283,7 +327,7 @@ class CommunicationProfile:
     uses_baudrate: bool = False  # Tracks if original used baudrate vs bitrate attribute name
 
 
-@dataclass
+@dataclass(slots=True)
 class MenuButton:
     """UI menu button configuration"""
     button_value: str
@@ -294,9 +338,14 @@ class MenuButton:
     action_started_message_text_id: Optional[str] = None  # Original textId for ActionStartedMessage
 
 
-@dataclass
-class MenuItem:
+@dataclass(slots=True)
+class MenuItem(_InternedStrings):
     """User interface menu item reference"""
+    _interned_fields = (
+        'variable_id', 'record_item_ref', 'access_right_restriction', 'display_format', 'unit_code',
+        'menu_ref', 'condition_variable_id',
+    )
+
     variable_id: Optional[str] = None
     record_item_ref: Optional[str] = None
     subindex: Optional[int] = None
@@ -319,7 +368,7 @@ class MenuItem:
     condition_subindex: Optional[str] = None  # PQA: MenuRef Condition@subindex
 
 
-@dataclass
+@dataclass(slots=True)
 class Menu:
     """User interface menu definition"""
     id: str
@@ -330,7 +379,7 @@ class Menu:
     name_text_id: Optional[str] = None  # Original textId for Name element
 
 
-@dataclass
+@dataclass(slots=True)
 class UserInterfaceMenus:
     """Complete user interface menu structure"""
     menus: List[Menu] = field(default_factory=list)
@@ -343,9 +392,13 @@ class UserInterfaceMenus:
     specialist_role_menus_xsi_type: Dict[str, bool] = field(default_factory=dict)
 
 
-@dataclass
-class ProcessDataUIInfo:
+@dataclass(slots=True)
+class ProcessDataUIInfo(_InternedStrings):
     """UI rendering metadata for process data record items"""
+    _interned_fields = (
+        'process_data_id', 'unit_code', 'display_format',
+    )
+
     process_data_id: str
     subindex: int
     gradient: Optional[float] = None
@@ -359,7 +412,7 @@ class ProcessDataUIInfo:
     offset_str: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceVariant:
     """Device variant information"""
     product_id: str
@@ -381,7 +434,7 @@ class DeviceVariant:
     firmware_revision: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WireConfiguration:
     """Wire connection configuration"""
     connection_type: str
@@ -394,14 +447,14 @@ class WireConfiguration:
     xsi_type: Optional[str] = None  # PQA Fix #25: Wire@xsi:type attribute (e.g., Wire1T)
 
 
-@dataclass
+@dataclass(slots=True)
 class TestEventTrigger:
     """Test event trigger configuration"""
     appear_value: str
     disappear_value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceTestConfig:
     """Device test configuration"""
     config_type: str
@@ -411,7 +464,7 @@ class DeviceTestConfig:
     config_xsi_type: Optional[str] = None  # PQA Fix #4: xsi:type attribute (e.g., IOLinkTestConfig7T)
 
 
-@dataclass
+@dataclass(slots=True)
 class CustomDatatype:
     """Custom datatype definition"""
     datatype_id: str
@@ -437,16 +490,20 @@ class CustomDatatype:
     datatype_name_text_id: Optional[str] = None  # Name child element textId
 
 
-@dataclass
-class StdVariableRefSingleValue:
+@dataclass(slots=True)
+class StdVariableRefSingleValue(_InternedStrings):
     """SingleValue or StdSingleValueRef child of StdVariableRef"""
+    _interned_fields = (
+        'value', 'name_text_id',
+    )
+
     value: str  # The value attribute
     name_text_id: Optional[str] = None  # textId for Name element (SingleValue only)
     is_std_ref: bool = False  # True for StdSingleValueRef, False for SingleValue
     order_index: int = 0  # Original order
 
 
-@dataclass
+@dataclass(slots=True)
 class StdVariableRefValueRange:
     """ValueRange or StdValueRangeRef child of StdVariableRef - PQA Fix #5"""
     lower_value: str  # The lowerValue attribute
@@ -455,7 +512,7 @@ class StdVariableRefValueRange:
     order_index: int = 0  # Original order
 
 
-@dataclass
+@dataclass(slots=True)
 class StdRecordItemRef:
     """StdRecordItemRef child of StdVariableRef - specifies default values for record items"""
     subindex: int
@@ -463,7 +520,7 @@ class StdRecordItemRef:
     single_values: List['StdVariableRefSingleValue'] = field(default_factory=list)  # PQA Fix #76
 
 
-@dataclass
+@dataclass(slots=True)
 class StdVariableRef:
     """Standard variable reference from VariableCollection"""
     variable_id: str  # e.g., V_VendorName, V_ProductName
@@ -476,7 +533,7 @@ class StdVariableRef:
     record_item_refs: List['StdRecordItemRef'] = field(default_factory=list)  # StdRecordItemRef children
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceProfile:
     """Complete device profile from IODD"""
     vendor_info: VendorInfo
@@ -499,6 +556,7 @@ class DeviceProfile:
     text_xml_order: Dict[str, Dict[str, int]] = field(default_factory=dict)  # PQA: Original XML order of Text elements per language
     language_order: Dict[str, int] = field(default_factory=dict)  # PQA: Order of Language elements
     text_redefine_ids: set = field(default_factory=set)  # PQA Fix #66: Text IDs that are TextRedefine elements
+    text_table: Optional[Any] = None  # TextTable (src/utils/text_table) the text fields above are derived from
 
     # Phase 1: UI Rendering metadata
     process_data_ui_info: List[ProcessDataUIInfo] = field(default_factory=list)
@@ -535,17 +593,26 @@ class DeviceProfile:
 
 
 # PQA Fix #131: DirectParameterOverlay support
-@dataclass
-class DirectParameterOverlayRecordItemSingleValue:
+@dataclass(slots=True)
+class DirectParameterOverlayRecordItemSingleValue(_InternedStrings):
     """SingleValue element within RecordItem of DirectParameterOverlay"""
+    _interned_fields = (
+        'value', 'name_text_id',
+    )
+
     value: str
     name: Optional[str] = None
     name_text_id: Optional[str] = None  # For PQA reconstruction
 
 
-@dataclass
-class DirectParameterOverlayRecordItem:
+@dataclass(slots=True)
+class DirectParameterOverlayRecordItem(_InternedStrings):
     """RecordItem within DirectParameterOverlay's RecordT Datatype"""
+    _interned_fields = (
+        'datatype_ref', 'simple_datatype', 'name_text_id', 'description_text_id', 'access_right_restriction',
+        'value_range_xsi_type',
+    )
+
     subindex: int
     bit_offset: Optional[int] = None
     bit_length: Optional[int] = None
@@ -565,7 +632,7 @@ class DirectParameterOverlayRecordItem:
     value_range_name_text_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DirectParameterOverlayRecordItemInfo:
     """RecordItemInfo metadata for DirectParameterOverlay"""
     subindex: int
@@ -573,7 +640,7 @@ class DirectParameterOverlayRecordItemInfo:
     modifies_other_variables: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class DirectParameterOverlay:
     """DirectParameterOverlay element from VariableCollection"""
     overlay_id: str  # id attribute
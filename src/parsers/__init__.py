@@ -5,12 +5,17 @@ Parsers for EDS and IODD file formats.
 """
 
 from .eds_diagnostics import Diagnostic, DiagnosticCollector, Severity
+from .eds_lexer import EDSEntry, EDSTokenStream
 from .eds_package_parser import EDSPackageParser
 from .eds_parser import EDSParser
+from .eds_section_index import EDSSectionIndex
 
 __all__ = [
     "EDSParser",
     "EDSPackageParser",
+    "EDSSectionIndex",
+    "EDSTokenStream",
+    "EDSEntry",
     "DiagnosticCollector",
     "Severity",
     "Diagnostic",
@@ -7,50 +7,29 @@ import logging
 import re
 from typing import Any, Dict, List, Optional
 
+from src.parsers.eds_lexer import EDSTokenStream
+
 logger = logging.getLogger(__name__)
 
 
 class EDSAdvancedSectionsParser:
     """Parser for advanced EtherNet/IP EDS sections"""
 
-    def __init__(self, sections: Dict[str, str]):
+    def __init__(self, sections: Dict[str, str], tokens: Optional[EDSTokenStream] = None):
         """
         Initialize with parsed sections from EDSParser
 
         Args:
             sections: Dictionary of section_name -> section_content
+            tokens: Token stream of the same file (EDSParser.tokens); tokenized
+                from ``sections`` when not given
         """
         self.sections = sections
+        self.tokens = tokens or EDSTokenStream.from_sections(sections)
 
     def _parse_key_value(self, content: str) -> Dict[str, str]:
         """Parse key-value pairs from section content"""
-        result = {}
-        lines = content.split('\n')
-
-        for line in lines:
-            line = line.strip()
-
-            # Skip empty lines and comments
-            if not line or line.startswith('$'):
-                continue
-
-            # Check if line contains a key-value pair
-            if '=' in line and not line.startswith('='):
-                key, value = line.split('=', 1)
-                key = key.strip()
-                value = value.strip()
-
-                # Remove inline comments
-                if '$' in value:
-                    value = value.split('$')[0].strip()
-
-                # Remove trailing semicolon
-                if value.endswith(';'):
-                    value = value[:-1].strip()
-
-                result[key] = value
-
-        return result
+        return EDSTokenStream.tokenize(f'[_]\n{content}').key_values('_')
 
     def _parse_integer(self, value: str) -> Optional[int]:
         """Safely parse integer value (handles hex, decimal)"""
@@ -148,7 +127,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('DLR Class')
 
         # Extract common CIP attributes
         cip_attrs = self._extract_common_cip_attributes(kv_pairs)
@@ -194,7 +173,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('TCP/IP Interface Class')
         cip_attrs = self._extract_common_cip_attributes(kv_pairs)
 
         handled_keys = {
@@ -235,7 +214,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('Ethernet Link Class')
         cip_attrs = self._extract_common_cip_attributes(kv_pairs)
 
         # Extract numbered interface labels (InterfaceLabel1, InterfaceLabel2, etc.)
@@ -282,7 +261,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('QoS Class')
         cip_attrs = self._extract_common_cip_attributes(kv_pairs)
 
         handled_keys = {
@@ -323,7 +302,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('LLDP Management Class')
         cip_attrs = self._extract_common_cip_attributes(kv_pairs)
 
         handled_keys = {
@@ -362,7 +341,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('File')
 
         return {
             'home_url': kv_pairs.get('HomeURL'),
@@ -383,7 +362,7 @@ class EDSAdvancedSectionsParser:
         if not section_content:
             return None
 
-        kv_pairs = self._parse_key_value(section_content)
+        kv_pairs = self.tokens.key_values('Device')
 
         # Handle multi-line IconContents
         icon_contents = None
@@ -421,7 +400,7 @@ class EDSAdvancedSectionsParser:
             if not section_content:
                 continue
 
-            kv_pairs = self._parse_key_value(section_content)
+            kv_pairs = self.tokens.key_values(section_name)
 
             object_name = kv_pairs.get('Object_Name')
             object_class_code = kv_pairs.get('Object_Class_Code')
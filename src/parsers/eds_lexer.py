@@ -0,0 +1,336 @@
+"""
+EDS Lexer
+
+Tokenizes an EDS file in a single pass into typed entries. Each entry records
+its section, key, the 1-based line number of the key, and the value lines with
+``$`` comments separated out. Values end at the first ``;`` outside quotes and
+may span any number of lines. ``$`` and ``;`` inside quoted strings are
+treated as text.
+
+EDSParser and EDSAdvancedSectionsParser read every section from this token
+stream instead of re-scanning the raw section text with per-getter regexes.
+Sections are split eagerly, but each section's entries are tokenized the
+first time the section is read, and an entry's lines and fields are split on
+first use, so sections no getter asks for cost only the header scan.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Section header: '[' ... ']' at the end of a line. Only whitespace may precede
+# the '[' (checked by the caller so the scan can start from the literal '[').
+_HEADER_RE = re.compile(r'\[(.*)\][^\S\n]*$', re.MULTILINE)
+
+# Key of an entry: at the start of a line or right after a previous ';'
+_KEY_RE = re.compile(r'(?:^|(?<=;))[^\S\n]*([^\s=$";\[][^=\n$";]*?)[^\S\n]*=', re.MULTILINE)
+
+# Quoted string (possibly unterminated at end of line) or a comment/terminator character
+_SPECIAL_RE = re.compile(r'"[^"\n]*(?:"|$)|[$;]')
+
+# A line inside a value that looks like a new key; the entry before it is missing its ';'
+_KEY_LINE_RE = re.compile(r'\n(?=[^\S\n]*[A-Za-z_][\w.]*[^\S\n]*=)')
+
+# Code of one line without surrounding whitespace; '$' inside quotes is text.
+# No possessive quantifiers (Python 3.11+); nothing after a repetition in
+# these patterns can fail, so the greedy first attempt is always the match.
+_CODE = r'(?:[^\s"$]+|"[^"\n]*"?)(?:[^\s"$]+|"[^"\n]*"?|[^\S\n]+(?=[^\s$]))*'
+
+# Code and comment of each value line
+_LINE_RE = re.compile(rf'[^\S\n]*({_CODE})?[^\S\n]*(?:\$[^\S\n]*([^\n]*))?')
+
+# Quoted string, possibly unterminated at the end of its line
+_QUOTED_RE = re.compile(r'"[^"\n]*"?')
+
+# A '$' comment, to the end of its line
+_COMMENT_RE = re.compile(r'\$[^\n]*')
+
+# One field per leading comma (the caller prepends one); quoted commas are text
+_FIELD_RE = re.compile(r',\s*((?:[^,"\s]+|"[^"]*"?|\s+(?=[^,\s]))*)')
+
+# Numbered keys such as Param12, Enum12, AssemExa134, Connection1
+_NUMBERED_KEY_RE = re.compile(r'(.*\D)(\d+)$')
+
+
+def split_lines(body: str) -> List[Tuple[str, str]]:
+    """
+    Split a raw value into (code, comment) pairs, one per line that has code
+
+    ``$`` starts a comment unless it is inside a quoted string.
+    """
+    lines = []
+    for line in body.split('\n'):
+        code, dollar, comment = line.partition('$')
+        if dollar and code.count('"') % 2:
+            # '$' inside a quoted string; let the regex find the real comment
+            code, comment = _LINE_RE.match(line).groups()
+            comment = comment.rstrip() if comment else ''
+        else:
+            code = code.strip()
+            if comment:
+                comment = comment.strip()
+        if code:
+            lines.append((code, comment))
+    return lines
+
+
+def join_code(body: str, separator: str = ' ') -> str:
+    """Value text of a raw value without comments, non-empty lines joined by separator"""
+    if '$' in body:
+        if '"' in body and '$' in ''.join(_QUOTED_RE.findall(body)):
+            return _join_code_lines(body, separator)
+        # No quoted '$', so every '$' starts a comment
+        body = _COMMENT_RE.sub('', body)
+    if '\n' not in body:
+        return body.strip()
+    return separator.join([code for code in map(str.strip, body.split('\n')) if code])
+
+
+def _join_code_lines(body: str, separator: str) -> str:
+    """join_code for values with a '$' inside a quoted string, line by line"""
+    codes = []
+    for line in body.split('\n'):
+        code, dollar, _ = line.partition('$')
+        if dollar and code.count('"') % 2:
+            code = _LINE_RE.match(line).group(1)
+        else:
+            code = code.strip()
+        if code:
+            codes.append(code)
+    return separator.join(codes)
+
+
+def _has_quoted_comma(text: str) -> bool:
+    return '"' in text and ',' in ''.join(text.split('"')[1::2])
+
+
+def split_fields(text: str) -> List[str]:
+    """Split a value on commas outside quotes; fields keep their quotes"""
+    if _has_quoted_comma(text):
+        return _FIELD_RE.findall(',' + text)
+    return [field.strip() for field in text.split(',')]
+
+
+def _context(prefix: str) -> str:
+    """What the character after ``prefix`` on the same line belongs to: 'code', 'quote' or 'comment'"""
+    code, dollar, _ = prefix.partition('$')
+    if not code.count('"') % 2:
+        return 'comment' if dollar else 'code'
+    # Inside a quote at the first '$' (or at the end): walk the quoted strings
+    for match in _SPECIAL_RE.finditer(prefix):
+        token = match.group()
+        if token == '$':
+            return 'comment'
+        if token[0] == '"' and (len(token) == 1 or token[-1] != '"'):
+            return 'quote'
+    return 'code'
+
+
+def _find_terminator(content: str, pos: int, end: int) -> int:
+    """Offset of the first ';' in content[pos:end] outside quotes and comments, or -1"""
+    semi = content.find(';', pos, end)
+    while semi >= 0:
+        line_start = max(content.rfind('\n', pos, semi) + 1, pos)
+        context = _context(content[line_start:semi])
+        if context == 'code':
+            return semi
+        if context == 'comment':
+            line_end = content.find('\n', semi, end)
+            if line_end < 0:
+                return -1
+            semi = content.find(';', line_end, end)
+        else:
+            semi = content.find(';', semi + 1, end)
+    return -1
+
+
+def _find_headers(content: str) -> List[Tuple[str, int, int]]:
+    """(name, start of header line, end of header line) for every section header"""
+    headers = []
+    for match in _HEADER_RE.finditer(content):
+        line_start = content.rfind('\n', 0, match.start()) + 1
+        if not content[line_start:match.start()].strip():
+            headers.append((match.group(1), line_start, match.end()))
+    return headers
+
+
+def _section_bounds(content: str, headers: List[Tuple[str, int, int]]) -> Iterator[Tuple[str, int, int]]:
+    """(name, start, end) of the raw text of every section"""
+    for index, (name, _, header_end) in enumerate(headers):
+        start = header_end + 1
+        end = headers[index + 1][1] - 1 if index + 1 < len(headers) else len(content)
+        yield name, start, max(start, end)
+
+
+def split_sections(content: str) -> Dict[str, str]:
+    """
+    Section name -> raw section text, without tokenizing the entries
+
+    Matches ``EDSTokenStream.tokenize(content).sections``.
+    """
+    return {name: content[start:end] for name, start, end in _section_bounds(content, _find_headers(content))}
+
+
+class EDSEntry:
+    """A single ``Key = value;`` entry"""
+
+    __slots__ = ('section', 'key', 'line', 'body', 'terminated', '_lines', '_text', '_fields')
+
+    def __init__(self, section: str, key: str, line: int, body: str, terminated: bool = True):
+        self.section = section
+        self.key = key
+        self.line = line          # 1-based line number of the key
+        self.body = body          # Raw value text, comments included, terminator excluded
+        self.terminated = terminated
+        self._lines: Optional[List[Tuple[str, str]]] = None
+        self._text: Optional[str] = None
+        self._fields: Optional[List[str]] = None
+
+    @property
+    def lines(self) -> List[Tuple[str, str]]:
+        """(code, comment) for every value line that has code"""
+        if self._lines is None:
+            self._lines = split_lines(self.body)
+        return self._lines
+
+    @property
+    def value(self) -> str:
+        """Value text without comments or terminator, lines joined by newlines"""
+        return join_code(self.body, '\n')
+
+    @property
+    def text(self) -> str:
+        """Value text with lines joined by spaces"""
+        if self._text is None:
+            self._text = join_code(self.body)
+        return self._text
+
+    @property
+    def fields(self) -> List[str]:
+        """Comma separated fields with surrounding whitespace removed, quotes kept"""
+        if self._fields is None:
+            text = self.text
+            self._fields = split_fields(text) if text else []
+        return self._fields
+
+    @property
+    def values(self) -> List[str]:
+        """Fields with surrounding quotes removed"""
+        if self._fields is None:
+            text = self.text
+            if text and not _has_quoted_comma(text):
+                # Split and unquote in one pass; fields are not cached
+                return [field.strip().strip('"') for field in text.split(',')]
+        return [field.strip('"') for field in self.fields]
+
+    def __repr__(self) -> str:
+        return f"EDSEntry({self.section!r}, {self.key!r}, line={self.line}, value={self.value!r})"
+
+
+class EDSTokenStream:
+    """Entries of an EDS file grouped by section, tokenized per section on first use"""
+
+    def __init__(self, content: str, bounds: Dict[str, Tuple[int, int, int]]):
+        # (start, end, line number of start) of every section's raw text; a
+        # repeated section replaces the earlier one
+        self.content = content
+        self.sections = {name: content[start:end] for name, (start, end, _) in bounds.items()}
+        self._bounds = bounds
+        self._entries: Dict[str, List[EDSEntry]] = {}
+        self._key_values: Dict[str, Dict[str, str]] = {}
+        self._numbered: Dict[str, Dict[str, List[Tuple[int, EDSEntry]]]] = {}
+
+    @classmethod
+    def tokenize(cls, content: str) -> 'EDSTokenStream':
+        """
+        Split EDS content into sections in a single pass
+
+        Args:
+            content: Raw EDS file content
+
+        Returns:
+            EDSTokenStream for the content
+        """
+        bounds: Dict[str, Tuple[int, int, int]] = {}
+        line = 1
+        position = 0
+        for name, start, end in _section_bounds(content, _find_headers(content)):
+            line += content.count('\n', position, start)
+            position = start
+            bounds[name] = (start, end, line)
+        return cls(content, bounds)
+
+    @classmethod
+    def from_sections(cls, sections: Dict[str, str]) -> 'EDSTokenStream':
+        """Tokenize a section name -> raw content mapping (e.g. EDSParser.sections)"""
+        return cls.tokenize('\n'.join(f'[{name}]\n{content}' for name, content in sections.items()))
+
+    @property
+    def entries(self) -> Dict[str, List[EDSEntry]]:
+        """Entries of every section (tokenizes all sections)"""
+        return {name: self.section_entries(name) for name in self._bounds}
+
+    def _tokenize_section(self, name: str) -> List[EDSEntry]:
+        content = self.content
+        start, end, line = self._bounds[name]
+        section_entries = []
+        position = start
+        pos = start
+        while pos < end:
+            match = _KEY_RE.search(content, pos, end)
+            if not match:
+                break
+            body_start = match.end()
+            semi = _find_terminator(content, body_start, end)
+            body = content[body_start:semi if semi >= 0 else end]
+            terminated = semi >= 0
+            pos = semi + 1 if terminated else end
+            if '=' in body:
+                split = _KEY_LINE_RE.search(body)
+                if split:
+                    # The next key starts before the ';', so this entry is missing its ';'
+                    body = body[:split.start()]
+                    terminated = False
+                    pos = body_start + split.end()
+
+            key_start = match.start(1)
+            line += content.count('\n', position, key_start)
+            position = key_start
+            section_entries.append(EDSEntry(name, match.group(1), line, body, terminated))
+        return section_entries
+
+    def section_entries(self, section: str) -> List[EDSEntry]:
+        """Entries of a section in file order (empty if the section is missing)"""
+        entries = self._entries.get(section)
+        if entries is None:
+            if section not in self._bounds:
+                return []
+            entries = self._entries[section] = self._tokenize_section(section)
+        return entries
+
+    def key_values(self, section: str) -> Dict[str, str]:
+        """
+        Key -> value mapping of a section
+
+        Later entries with the same key replace earlier ones.
+        """
+        if section not in self._key_values:
+            self._key_values[section] = {entry.key: entry.value for entry in self.section_entries(section)}
+        return self._key_values[section]
+
+    def numbered(self, section: str, prefix: str) -> Iterator[Tuple[int, EDSEntry]]:
+        """
+        Yield (number, entry) for keys like ``<prefix><number>`` in file order
+
+        Args:
+            section: Section name, e.g. 'Params'
+            prefix: Key prefix, e.g. 'Param' or 'Enum'
+        """
+        by_prefix = self._numbered.get(section)
+        if by_prefix is None:
+            by_prefix = {}
+            for entry in self.section_entries(section):
+                match = _NUMBERED_KEY_RE.match(entry.key)
+                if match:
+                    by_prefix.setdefault(match.group(1), []).append((int(match.group(2)), entry))
+            self._numbered[section] = by_prefix
+        return iter(by_prefix.get(prefix, []))
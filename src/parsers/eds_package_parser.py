@@ -3,20 +3,56 @@ EDS Package Parser
 Handles extraction and parsing of EDS package ZIP files
 """
 
+import fnmatch
 import hashlib
 import logging
+import multiprocessing
+import os
 import re
 import tempfile
+import time
 import zipfile
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from src import config
 from src.parsers.eds_parser import parse_eds_file
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Metadata files collected from a package, by file name pattern
+METADATA_PATTERNS = {
+    'readme': '*[Rr]eadme*.txt',
+    'changelog': '*[Cc]hange*.txt',
+    'iolm_xml': '*.xml',
+    'image': '*.png',
+}
+
+# Below this many EDS files, process start-up costs more than it saves
+MIN_FILES_FOR_POOL = 4
+
+
+def _parse_eds_worker(path: str) -> Tuple[Optional[Dict], float, Optional[str]]:
+    """
+    Read and parse one EDS file (runs in a worker process)
+
+    Returns:
+        (parsed_data, elapsed_ms, error)
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            eds_content = f.read()
+        # Diagnostics are not kept for package imports
+        parsed_data, _ = parse_eds_file(eds_content, path)
+        return parsed_data, (time.perf_counter() - start) * 1000, None
+    except Exception as e:
+        return None, (time.perf_counter() - start) * 1000, f"{type(e).__name__}: {e}"
 
 
 class EDSPackageParser:
@@ -32,11 +68,21 @@ class EDSPackageParser:
     # Version folder pattern
     VERSION_PATTERN = r'V(\d+)\.(\d+)'
 
-    def __init__(self, zip_path: str):
-        """Initialize parser with ZIP file path."""
+    def __init__(self, zip_path: str, workers: Optional[int] = None):
+        """
+        Initialize parser with ZIP file path.
+
+        Args:
+            zip_path: Path to the package ZIP file
+            workers: Worker processes for parsing EDS files (defaults to
+                EDS_PACKAGE_WORKERS, 0 meaning one per CPU)
+        """
         self.zip_path = zip_path
         self.package_name = Path(zip_path).stem
         self.temp_dir = None
+        if workers is None:
+            workers = config.EDS_PACKAGE_WORKERS
+        self.workers = max(workers or os.cpu_count() or 1, 1)
 
     def calculate_checksum(self) -> str:
         """Calculate MD5 checksum of ZIP file."""
@@ -60,6 +106,62 @@ class EDSPackageParser:
             return f"V{match.group(1)}.{match.group(2)}"
         return None
 
+    def _list_package_files(self, temp_path: Path) -> Dict[str, List[Path]]:
+        """
+        Walk the extracted package once and group files by kind
+
+        Returns:
+            Dict of kind -> sorted file paths ('eds', 'readme', 'changelog',
+            'iolm_xml', 'image'), plus 'ico' with every icon file
+        """
+        files: Dict[str, List[Path]] = {kind: [] for kind in ('eds', 'ico', *METADATA_PATTERNS)}
+        for dirpath, _, filenames in os.walk(temp_path):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if fnmatch.fnmatchcase(filename, '*.eds'):
+                    files['eds'].append(path)
+                elif fnmatch.fnmatchcase(filename, '*.ico'):
+                    files['ico'].append(path)
+                for kind, pattern in METADATA_PATTERNS.items():
+                    if fnmatch.fnmatchcase(filename, pattern):
+                        files[kind].append(path)
+        for paths in files.values():
+            paths.sort()
+        return files
+
+    def _pool_size(self, file_count: int) -> int:
+        """Worker processes to use for parsing file_count EDS files (1 = in-process)"""
+        if file_count < MIN_FILES_FOR_POOL:
+            return 1
+        return min(self.workers, file_count)
+
+    def _parse_eds_files(self, eds_files: List[Path]) -> Iterator[Tuple[Path, Optional[Dict], float, Optional[str]]]:
+        """
+        Parse EDS files, fanning out over a process pool when worthwhile
+
+        Yields:
+            (path, parsed_data, elapsed_ms, error) per file, in input order
+        """
+        paths = [str(path) for path in eds_files]
+        done = 0
+
+        workers = self._pool_size(len(paths))
+        if workers > 1:
+            try:
+                # Spawn, not fork: the API process runs background threads whose
+                # locks a forked child could inherit in a held state
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    for outcome in executor.map(_parse_eds_worker, paths):
+                        yield (eds_files[done], *outcome)
+                        done += 1
+                return
+            except (OSError, BrokenProcessPool) as e:
+                # Finish in-process (e.g. fork/spawn not permitted or a worker died)
+                logger.warning(f"EDS package worker pool failed after {done} files, parsing the rest serially: {e}")
+
+        for eds_file, path in zip(eds_files[done:], paths[done:]):
+            yield (eds_file, *_parse_eds_worker(path))
+
     def parse_package(self) -> Dict:
         """
         Parse entire EDS package ZIP file.
@@ -87,29 +189,29 @@ class EDSPackageParser:
             with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
                 zip_ref.extractall(temp_dir)
 
-            # Find all files
+            # List the package once; icons are looked up per directory from this listing
             temp_path = Path(temp_dir)
+            package_files = self._list_package_files(temp_path)
+            icons_by_dir: Dict[Path, Path] = {}
+            for icon_file in package_files['ico']:
+                icons_by_dir.setdefault(icon_file.parent, icon_file)
 
             # Parse EDS files
-            eds_files = list(temp_path.rglob('*.eds'))
+            parse_start = time.perf_counter()
+            timings = []
+            for eds_file, parsed_data, elapsed_ms, error in self._parse_eds_files(package_files['eds']):
+                rel_path = str(eds_file.relative_to(temp_path))
+                timings.append({'file_path': rel_path, 'parse_ms': round(elapsed_ms, 1), 'error': error})
+                if error:
+                    logger.error(f"parsing {eds_file}: {error}")
+                    continue
 
-            for eds_file in eds_files:
                 try:
-                    # Read EDS content
-                    with open(eds_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        eds_content = f.read()
-
-                    # Parse EDS (returns tuple of parsed_data and diagnostics)
-                    parsed_data, diagnostics = parse_eds_file(eds_content, str(eds_file))
-
-                    # Validate that we got a dictionary
-                    if not isinstance(parsed_data, dict):
-                        logger.error("parsing {eds_file}: parse_eds_file returned {type(parsed_data)} instead of dict")
+                    # Validate that we got a mapping
+                    if not isinstance(parsed_data, Mapping):
+                        logger.error(f"parsing {eds_file}: parse_eds_file returned {type(parsed_data)} instead of a mapping")
                         continue
 
-                    # Get relative path within package
-                    rel_path = str(eds_file.relative_to(temp_path))
-
                     # Identify variant and version
                     variant = self.identify_variant(rel_path)
                     version = self.extract_version(rel_path)
@@ -117,9 +219,8 @@ class EDSPackageParser:
                     # Read icon file if exists in same directory
                     icon_data = None
                     icon_filename = None
-                    ico_files = list(eds_file.parent.glob('*.ico'))
-                    if ico_files:
-                        icon_file = ico_files[0]
+                    icon_file = icons_by_dir.get(eds_file.parent)
+                    if icon_file:
                         with open(icon_file, 'rb') as f:
                             icon_data = f.read()
                         icon_filename = icon_file.name
@@ -132,6 +233,7 @@ class EDSPackageParser:
                         'parsed_data': parsed_data,
                         'icon_data': icon_data,
                         'icon_filename': icon_filename,
+                        'parse_ms': round(elapsed_ms, 1),
                     }
 
                     result['eds_files'].append(eds_info)
@@ -149,14 +251,23 @@ class EDSPackageParser:
                             result['product_name'] = device_info.get('product_name')
 
                 except Exception as e:
-                    logger.error("parsing {eds_file}: {e}")
+                    logger.error(f"parsing {eds_file}: {e}")
                     import traceback
                     traceback.print_exc()
                     continue
 
+            result['parse_timings'] = {
+                'workers': self._pool_size(len(timings)),
+                'total_ms': round((time.perf_counter() - parse_start) * 1000, 1),
+                'files': timings,
+            }
+            if timings:
+                slowest = max(timings, key=lambda t: t['parse_ms'])
+                logger.info(f"Parsed {len(timings)} EDS files in {result['parse_timings']['total_ms']:.0f} ms "
+                            f"(slowest: {slowest['file_path']} {slowest['parse_ms']:.0f} ms)")
+
             # Parse readme files
-            readme_files = list(temp_path.rglob('*[Rr]eadme*.txt'))
-            for readme_file in readme_files:
+            for readme_file in package_files['readme']:
                 try:
                     with open(readme_file, 'r', encoding='utf-8', errors='ignore') as f:
                         content = f.read()
@@ -173,11 +284,10 @@ class EDSPackageParser:
                         'content': content.encode('utf-8'),
                     })
                 except Exception as e:
-                    logger.error("reading {readme_file}: {e}")
+                    logger.error(f"reading {readme_file}: {e}")
 
             # Parse changelog files
-            changelog_files = list(temp_path.rglob('*[Cc]hange*.txt'))
-            for changelog_file in changelog_files:
+            for changelog_file in package_files['changelog']:
                 try:
                     with open(changelog_file, 'r', encoding='utf-8', errors='ignore') as f:
                         content = f.read()
@@ -189,39 +299,23 @@ class EDSPackageParser:
                         'content': content.encode('utf-8'),
                     })
                 except Exception as e:
-                    logger.error("reading {changelog_file}: {e}")
-
-            # Parse IOLM XML files
-            iolm_files = list(temp_path.rglob('*.xml'))
-            for iolm_file in iolm_files:
-                try:
-                    with open(iolm_file, 'rb') as f:
-                        content = f.read()
-
-                    rel_path = str(iolm_file.relative_to(temp_path))
-                    result['metadata_files'].append({
-                        'file_path': rel_path,
-                        'file_type': 'iolm_xml',
-                        'content': content,
-                    })
-                except Exception as e:
-                    logger.error("reading {iolm_file}: {e}")
-
-            # Parse images (PNG logos, etc.)
-            image_files = list(temp_path.rglob('*.png'))
-            for image_file in image_files:
-                try:
-                    with open(image_file, 'rb') as f:
-                        content = f.read()
-
-                    rel_path = str(image_file.relative_to(temp_path))
-                    result['metadata_files'].append({
-                        'file_path': rel_path,
-                        'file_type': 'image',
-                        'content': content,
-                    })
-                except Exception as e:
-                    logger.error("reading {image_file}: {e}")
+                    logger.error(f"reading {changelog_file}: {e}")
+
+            # IOLM XML files and images (PNG logos, etc.) are stored as-is
+            for kind in ('iolm_xml', 'image'):
+                for metadata_file in package_files[kind]:
+                    try:
+                        with open(metadata_file, 'rb') as f:
+                            content = f.read()
+
+                        rel_path = str(metadata_file.relative_to(temp_path))
+                        result['metadata_files'].append({
+                            'file_path': rel_path,
+                            'file_type': kind,
+                            'content': content,
+                        })
+                    except Exception as e:
+                        logger.error(f"reading {metadata_file}: {e}")
 
         # Convert sets to lists for JSON serialization
         result['versions'] = sorted(list(result['versions']))
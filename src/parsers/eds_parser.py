@@ -8,14 +8,24 @@ import hashlib
 import json
 import logging
 import re
+from collections.abc import MutableMapping
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from src.parsers.eds_advanced_sections import EDSAdvancedSectionsParser
 from src.parsers.eds_diagnostics import DiagnosticCollector, validate_eds_data
+from src.parsers.eds_lexer import EDSTokenStream, split_sections
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# One enum entry: value,"label" or value,"label (default)"
+_ENUM_ENTRY_RE = re.compile(r'(-?(?:0[xX][0-9A-Fa-f]+|\d+))\s*,\s*"([^"]+)"')
+# '(default)' marker in an enum label
+_DEFAULT_MARK_RE = re.compile(r'\s*\(default[^)]*\)', re.IGNORECASE)
+
+# Fields of a [Params] ParamN entry (index 0 through decimal places)
+_PARAM_FIELD_COUNT = 21
 
 
 class EDSParser:
@@ -24,90 +34,19 @@ class EDSParser:
     def __init__(self, content: str):
         """Initialize parser with EDS file content."""
         self.content = content
-        self.sections = {}
-        self._parse_sections()
-
-    def _parse_sections(self):
-        """Parse EDS file into sections with full content preservation."""
-        current_section = None
-        current_content = []
-
-        for line in self.content.split('\n'):
-            # Preserve original line for content
-            original_line = line
-            line = line.strip()
-
-            # Check for section header
-            if line.startswith('[') and line.endswith(']'):
-                # Save previous section
-                if current_section:
-                    self.sections[current_section] = '\n'.join(current_content)
-
-                # Start new section
-                current_section = line[1:-1]
-                current_content = []
-            elif current_section:
-                # Add all lines to content (including comments and empty lines)
-                current_content.append(original_line)
-
-        # Save last section
-        if current_section:
-            self.sections[current_section] = '\n'.join(current_content)
+        self.tokens = EDSTokenStream.tokenize(content)
+        self.sections = self.tokens.sections
 
     def _parse_key_value(self, content: str) -> Dict[str, str]:
         """Parse key-value pairs from section content, handling multi-line values."""
-        result = {}
-        lines = content.split('\n')
-        current_key = None
-        current_value = []
-
-        for line in lines:
-            line = line.strip()
-
-            # Skip empty lines and comments
-            if not line or line.startswith('$'):
-                continue
-
-            # Check if line contains a key-value pair
-            if '=' in line and not line.startswith('='):
-                # Save previous key-value
-                if current_key:
-                    value = '\n'.join(current_value).strip()
-                    # Remove inline comments (starting with $)
-                    if '$' in value:
-                        value = value.split('$')[0].strip()
-                    # Remove trailing semicolon
-                    if value.endswith(';'):
-                        value = value[:-1].strip()
-                    result[current_key] = value
-
-                # Parse new key-value
-                key, value = line.split('=', 1)
-                current_key = key.strip()
-                current_value = [value.strip()]
-            elif current_key:
-                # Continuation of previous value (multi-line)
-                current_value.append(line)
-
-        # Save last key-value
-        if current_key:
-            value = '\n'.join(current_value).strip()
-            # Remove inline comments (starting with $)
-            if '$' in value:
-                value = value.split('$')[0].strip()
-            # Remove trailing semicolon
-            if value.endswith(';'):
-                value = value[:-1].strip()
-            result[current_key] = value
-
-        return result
+        return EDSTokenStream.tokenize(f'[_]\n{content}').key_values('_')
 
     def get_file_info(self) -> Dict[str, Optional[str]]:
         """Extract file metadata from [File] section."""
         if 'File' not in self.sections:
             return {}
 
-        data = self._parse_key_value(self.sections['File'])
+        data = self.tokens.key_values('File')
         return {
             'description': data.get('DescText', '').strip('"'),
             'create_date': data.get('CreateDate'),
@@ -123,7 +62,7 @@ class EDSParser:
         if 'Device' not in self.sections:
             return {}
 
-        data = self._parse_key_value(self.sections['Device'])
+        data = self.tokens.key_values('Device')
 
         # Extract icon data if present
         icon_data = None
@@ -156,7 +95,7 @@ class EDSParser:
         if 'Device Classification' not in self.sections:
             return {}
 
-        data = self._parse_key_value(self.sections['Device Classification'])
+        data = self.tokens.key_values('Device Classification')
         return {
             'class1': data.get('Class1', ''),
             'class2': data.get('Class2', ''),
@@ -170,30 +109,13 @@ class EDSParser:
             return []
 
         params = []
-        content = self.sections['Params']
 
-        # Parse individual parameters - they can span multiple lines
-        param_pattern = r'Param(\d+)\s*=\s*(.*?);'
-        matches = re.finditer(param_pattern, content, re.MULTILINE | re.DOTALL)
-
-        for match in matches:
-            param_num = int(match.group(1))
-            param_data = match.group(2).strip()
-
-            # Remove comments and extra whitespace
-            lines = []
-            for line in param_data.split('\n'):
-                # Remove inline comments
-                if '$' in line:
-                    line = line.split('$')[0]
-                line = line.strip()
-                if line:
-                    lines.append(line)
-
-            param_data = ' '.join(lines)
-
-            # Parse comma-separated values
-            values = [v.strip().strip('"') for v in param_data.split(',')]
+        # Parameters can span multiple lines; the lexer has already joined them
+        for param_num, entry in self.tokens.numbered('Params', 'Param'):
+            values = entry.values
+            if len(values) < _PARAM_FIELD_COUNT:
+                # Missing trailing fields read as None
+                values += [None] * (_PARAM_FIELD_COUNT - len(values))
 
             # EDS Parameter format (corrected mapping based on actual EDS files):
             # Index 0:  reserved (skip)
@@ -214,28 +136,28 @@ class EDSParser:
             params.append({
                 'param_number': param_num,
                 # Skip index 0 (reserved)
-                'link_path_size': values[1] if len(values) > 1 else None,
-                'link_path': values[2] if len(values) > 2 else None,
-                'descriptor': values[3] if len(values) > 3 else None,
-                'data_type': self._parse_hex(values[4]) if len(values) > 4 else None,  # FIXED: Use _parse_hex
-                'data_size': self._parse_int(values[5]) if len(values) > 5 else None,
-                'param_name': values[6] if len(values) > 6 else f'Param{param_num}',
-                'units': values[7] if len(values) > 7 else '',  # NEW: Units field
-                'help_string_1': values[8] if len(values) > 8 else '',  # FIXED: Correct index
+                'link_path_size': values[1],
+                'link_path': values[2],
+                'descriptor': values[3],
+                'data_type': self._parse_hex(values[4]),  # FIXED: Use _parse_hex
+                'data_size': self._parse_int(values[5]),
+                'param_name': values[6] if values[6] is not None else f'Param{param_num}',
+                'units': values[7] if values[7] is not None else '',  # NEW: Units field
+                'help_string_1': values[8] if values[8] is not None else '',  # FIXED: Correct index
                 'help_string_2': '',  # Not used in this format
                 'help_string_3': '',  # Not used in this format
-                'min_value': values[9] if len(values) > 9 else None,  # FIXED: Correct order
-                'max_value': values[10] if len(values) > 10 else None,  # FIXED: Correct order
-                'default_value': values[11] if len(values) > 11 else None,  # FIXED: Correct order
-                'scaling_multiplier': values[12] if len(values) > 12 else None,  # NEW
-                'scaling_divisor': values[13] if len(values) > 13 else None,  # NEW
-                'scaling_base': values[14] if len(values) > 14 else None,  # NEW
-                'scaling_offset': values[15] if len(values) > 15 else None,  # NEW
-                'link_scaling_multiplier': values[16] if len(values) > 16 else None,  # NEW
-                'link_scaling_divisor': values[17] if len(values) > 17 else None,  # NEW
-                'link_scaling_base': values[18] if len(values) > 18 else None,  # NEW
-                'link_scaling_offset': values[19] if len(values) > 19 else None,  # NEW
-                'decimal_places': self._parse_int(values[20]) if len(values) > 20 else None,  # NEW
+                'min_value': values[9],  # FIXED: Correct order
+                'max_value': values[10],  # FIXED: Correct order
+                'default_value': values[11],  # FIXED: Correct order
+                'scaling_multiplier': values[12],  # NEW
+                'scaling_divisor': values[13],  # NEW
+                'scaling_base': values[14],  # NEW
+                'scaling_offset': values[15],  # NEW
+                'link_scaling_multiplier': values[16],  # NEW
+                'link_scaling_divisor': values[17],  # NEW
+                'link_scaling_base': values[18],  # NEW
+                'link_scaling_offset': values[19],  # NEW
+                'decimal_places': self._parse_int(values[20]),  # NEW
             })
 
         return params
@@ -250,49 +172,24 @@ class EDSParser:
             return {}
 
         enums = {}
-        content = self.sections['Params']
 
-        # Parse Enum definitions - they follow the pattern:
+        # Enum definitions follow the pattern:
         # Enum22 =
         #     0,"Label for value 0 (default)",
         #     1,"Label for value 1",
         #     2,"Label for value 2";
-        enum_pattern = r'Enum(\d+)\s*=\s*(.*?);'
-        matches = re.finditer(enum_pattern, content, re.MULTILINE | re.DOTALL)
-
-        for match in matches:
-            param_num = int(match.group(1))
-            enum_data = match.group(2).strip()
-
-            # Remove comments
-            lines = []
-            for line in enum_data.split('\n'):
-                if '$' in line:
-                    line = line.split('$')[0]
-                line = line.strip()
-                if line:
-                    lines.append(line)
-
-            enum_data = ' '.join(lines)
-
-            # Parse comma-separated enum entries
-            # Format: value,"label (default)" or value,"label"
+        for param_num, entry in self.tokens.numbered('Params', 'Enum'):
             enum_values = []
-
-            # Match pattern: number,"text" or number,"text (default)"
-            entry_pattern = r'(\d+)\s*,\s*"([^"]+)"'
-            entry_matches = re.finditer(entry_pattern, enum_data)
-
-            for entry_match in entry_matches:
-                value = int(entry_match.group(1))
-                label = entry_match.group(2).strip()
+            for raw_value, label in _ENUM_ENTRY_RE.findall(entry.text):
+                value = self._parse_hex(raw_value)
+                label = label.strip()
 
                 # Check if this is marked as default
                 is_default = False
                 if '(default' in label.lower():
                     is_default = True
                     # Remove the (default) marker from the label
-                    label = re.sub(r'\s*\(default[^)]*\)', '', label, flags=re.IGNORECASE).strip()
+                    label = _DEFAULT_MARK_RE.sub('', label).strip()
 
                 # Remove trailing commas and clean up
                 label = label.rstrip(',').strip()
@@ -320,37 +217,12 @@ class EDSParser:
 
         fixed_assemblies = []
         variable_assemblies = []
-        content = self.sections['Assembly']
 
-        # Pattern 1: Fixed assemblies - more flexible pattern to handle various formats
+        # Fixed assemblies, e.g.:
         # Format 1: Assem100 = "Digital Input", 0x64, 0, 1, 0x0000, , "20 04 24 65 30 03", , ;
         # Format 2: Assem100 = "InputAssem", , , 0x0021, , ;
-        fixed_pattern = r'Assem(\d+)\s*=\s*(.+?);'
-        fixed_matches = re.finditer(fixed_pattern, content, re.MULTILINE | re.DOTALL)
-
-        for match in fixed_matches:
-            assembly_num = int(match.group(1))
-            assembly_data = match.group(2).strip()
-
-            # Remove comments
-            if '$' in assembly_data:
-                assembly_data = assembly_data.split('$')[0].strip()
-
-            # Split by commas, handling quoted strings
-            parts = []
-            current = ''
-            in_quotes = False
-            for char in assembly_data:
-                if char == '"':
-                    in_quotes = not in_quotes
-                    current += char
-                elif char == ',' and not in_quotes:
-                    parts.append(current.strip())
-                    current = ''
-                else:
-                    current += char
-            if current.strip():
-                parts.append(current.strip())
+        for assembly_num, entry in self.tokens.numbered('Assembly', 'Assem'):
+            parts = entry.fields
 
             # Extract assembly name (first quoted field)
             assembly_name = ''
@@ -378,18 +250,19 @@ class EDSParser:
                 'is_variable': False
             })
 
-        # Pattern 2: Variable assemblies
+        # Variable assemblies
         # AssemExa134 = 34, 32, "IO-Link Process Data from IO Device";
-        variable_pattern = r'AssemExa(\d+)\s*=\s*(\d+),\s*(\d+),\s*"([^"]+)"\s*;'
-        variable_matches = re.finditer(variable_pattern, content, re.MULTILINE)
-
-        for match in variable_matches:
+        for assembly_num, entry in self.tokens.numbered('Assembly', 'AssemExa'):
+            parts = entry.fields
+            if (len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit()
+                    or len(parts[2]) < 3 or parts[2][0] != '"' or parts[2][-1] != '"'):
+                continue
             variable_assemblies.append({
-                'assembly_number': int(match.group(1)),
-                'assembly_name': f"AssemExa{match.group(1)}",
-                'unknown_value1': int(match.group(2)),
-                'max_size': int(match.group(3)),
-                'description': match.group(4)
+                'assembly_number': assembly_num,
+                'assembly_name': f"AssemExa{assembly_num}",
+                'unknown_value1': int(parts[0]),
+                'max_size': int(parts[1]),
+                'description': parts[2][1:-1]
             })
 
         return {
@@ -403,34 +276,11 @@ class EDSParser:
             return []
 
         connections = []
-        content = self.sections['Connection Manager']
-
-        # Parse individual connections
-        conn_pattern = r'Connection(\d+)\s*=\s*(.*?);'
-        matches = re.finditer(conn_pattern, content, re.MULTILINE | re.DOTALL)
-
-        for match in matches:
-            conn_num = int(match.group(1))
-            conn_data = match.group(2).strip()
-
-            # Parse connection data, preserving comments for documentation
-            lines = []
-            line_comments = []
 
-            for line in conn_data.split('\n'):
-                original = line
-                comment = ''
-
-                # Extract comment if present
-                if '$' in line:
-                    parts = line.split('$', 1)
-                    line = parts[0]
-                    comment = parts[1].strip() if len(parts) > 1 else ''
-
-                line = line.strip()
-                if line:
-                    lines.append(line)
-                    line_comments.append(comment)
+        for conn_num, entry in self.tokens.numbered('Connection Manager', 'Connection'):
+            # Connection data is line oriented; keep each line's comment for documentation
+            lines = [code for code, _ in entry.lines]
+            line_comments = [comment for _, comment in entry.lines]
 
             # Connection format:
             # 0: Trigger & Transport
@@ -472,23 +322,9 @@ class EDSParser:
             return []
 
         ports = []
-        content = self.sections['Port']
-
-        # Parse individual ports
-        port_pattern = r'Port(\d+)\s*=\s*(.*?);'
-        matches = re.finditer(port_pattern, content, re.MULTILINE | re.DOTALL)
 
-        for match in matches:
-            port_num = int(match.group(1))
-            port_data = match.group(2).strip()
-
-            # Parse port data
-            lines = [line.strip() for line in port_data.split('\n')
-                    if line.strip() and not line.strip().startswith('$')]
-
-            values = []
-            for line in lines:
-                values.extend([v.strip().strip('"') for v in line.split(',')])
+        for port_num, entry in self.tokens.numbered('Port', 'Port'):
+            values = entry.values
 
             # Port format:
             # 0: Port type (TCP, etc)
@@ -524,35 +360,11 @@ class EDSParser:
             return []
 
         modules = []
-        content = self.sections['Module']
 
-        # Pattern 1: Try to match Module entries with quoted names
         # Module1 = "Name", DeviceType, CatalogNumber, MajorRev, MinorRev, ConfigSize, InputSize, OutputSize, ...
-        module_pattern = r'Module(\d+)\s*=\s*(.+?)(?:;|$)'
-        matches = re.finditer(module_pattern, content, re.MULTILINE | re.DOTALL)
-
-        for match in matches:
-            module_num = int(match.group(1))
-            module_data = match.group(2).strip()
-
-            # Remove comments and clean up
-            module_data = re.sub(r'\$.*', '', module_data)
-
-            # Try to parse comma-separated values
-            # Handle quoted strings properly
-            values = []
-            current = []
-            in_quotes = False
-            for char in module_data:
-                if char == '"':
-                    in_quotes = not in_quotes
-                elif char == ',' and not in_quotes:
-                    values.append(''.join(current).strip().strip('"'))
-                    current = []
-                else:
-                    current.append(char)
-            if current:
-                values.append(''.join(current).strip().strip('"'))
+        for module_num, entry in self.tokens.numbered('Module', 'Module'):
+            module_data = entry.text
+            values = entry.values
 
             # Build module dict with flexible field mapping
             module_dict = {
@@ -592,40 +404,19 @@ class EDSParser:
             return []
 
         groups = []
-        content = self.sections['Groups']
-
-        # Pattern for Group entries: Group1 = "Name", count, param_numbers;
-        group_pattern = r'Group(\d+)\s*=\s*(.+?)(?:;|(?=Group\d+\s*=)|$)'
-        matches = re.finditer(group_pattern, content, re.MULTILINE | re.DOTALL)
 
-        for match in matches:
-            group_num = int(match.group(1))
-            group_data = match.group(2).strip()
-
-            # Remove comments
-            group_data = re.sub(r'\$.*', '', group_data)
-
-            # Parse the group definition
+        for group_num, entry in self.tokens.numbered('Groups', 'Group'):
             # Format: "Name", count, param1,param2,param3,...
+            fields = entry.fields
 
-            # Extract the group name (quoted string)
-            name_match = re.search(r'"([^"]+)"', group_data)
-            if not name_match:
+            # The group name is the first quoted field
+            name_index = next((i for i, field in enumerate(fields)
+                               if len(field) > 2 and field[0] == '"' and field[-1] == '"'), None)
+            if name_index is None:
                 continue  # Skip malformed groups
 
-            group_name = name_match.group(1)
-
-            # Remove the name from data to parse remaining fields
-            remaining_data = group_data[name_match.end():].strip()
-            if remaining_data.startswith(','):
-                remaining_data = remaining_data[1:].strip()
-
-            # Parse count and parameter list
-            # Remove all whitespace and newlines for easier parsing
-            remaining_data = re.sub(r'\s+', '', remaining_data)
-
-            # Split by comma to get count and parameters
-            parts = [p.strip() for p in remaining_data.split(',') if p.strip()]
+            group_name = fields[name_index][1:-1]
+            parts = [field for field in fields[name_index + 1:] if field]
 
             parameter_count = None
             parameter_numbers = []
@@ -674,7 +465,7 @@ class EDSParser:
                 'unrecognized_fields': []
             }
 
-        data = self._parse_key_value(self.sections['Capacity'])
+        data = self.tokens.key_values('Capacity')
 
         # Known capacity field mappings (multiple variations supported)
         KNOWN_FIELDS = {
@@ -752,7 +543,63 @@ class EDSParser:
             return None
 
 
-def parse_eds_file(content: str, file_path: str = None, strict_mode: bool = False) -> Tuple[Dict[str, Any], DiagnosticCollector]:
+class EDSParseResult(MutableMapping):
+    """
+    Parsed EDS data returned by parse_eds_file
+
+    Behaves like the parsed data dictionary, but keeps the file content only
+    once, as UTF-8 bytes in ``source``. The large derived values are rebuilt
+    from it on each access instead of being stored:
+
+    - ``eds_content``: the file content as a string
+    - ``all_sections``: section name -> raw section text
+
+    A package upload holds the results of every EDS file at once, so the
+    content is no longer kept a second (and, for non-ASCII text, a wider)
+    time per file.
+    """
+
+    DERIVED_KEYS = ('all_sections', 'eds_content')
+
+    __slots__ = ('source', '_data')
+
+    def __init__(self, source: bytes, data: Dict[str, Any]):
+        self.source = source
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._data:
+            return self._data[key]
+        if key == 'eds_content':
+            return self.source.decode('utf-8')
+        if key == 'all_sections':
+            return split_sections(self.source.decode('utf-8'))
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        self._data[key] = value
+
+    def __delitem__(self, key: str):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._data
+        for key in self.DERIVED_KEYS:
+            if key not in self._data:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._data) + sum(1 for key in self.DERIVED_KEYS if key not in self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data or key in self.DERIVED_KEYS
+
+    def __repr__(self) -> str:
+        return f"EDSParseResult({self._data.get('source', {}).get('file_path')!r}, {len(self.source)} bytes)"
+
+
+def parse_eds_file(content: str, file_path: str = None, strict_mode: bool = False,
+                   advanced_sections: bool = False) -> Tuple[EDSParseResult, DiagnosticCollector]:
     """
     Parse an EDS file and return all extracted information with diagnostics.
 
@@ -760,11 +607,15 @@ def parse_eds_file(content: str, file_path: str = None, strict_mode: bool = Fals
         content: The EDS file content as a string
         file_path: Optional file path for diagnostics
         strict_mode: If True, use strict validation
+        advanced_sections: If True, also parse the DLR, TCP/IP, Ethernet, QoS,
+            LLDP and metadata sections from the same token stream, under
+            'advanced_sections' (empty if they cannot be parsed)
 
     Returns:
-        Tuple of (parsed data dictionary, diagnostic collector)
+        Tuple of (EDSParseResult, diagnostic collector)
     """
     parser = EDSParser(content)
+    source = content.encode()
     collector = DiagnosticCollector()
 
     if file_path:
@@ -786,13 +637,15 @@ def parse_eds_file(content: str, file_path: str = None, strict_mode: bool = Fals
     # Extract assemblies
     assemblies = parser.get_assemblies()
 
-    parsed_data = {
+    # Hash the encoded content once; checksum and checksum_md5 are the same MD5
+    checksum = hashlib.md5(source).hexdigest()
+    parsed_data = EDSParseResult(source, {
         'source': {
             'file_path': file_path,
-            'file_hash': hashlib.sha256(content.encode()).hexdigest(),
+            'file_hash': hashlib.sha256(source).hexdigest(),
             'dialect_id': 'CIP_INI',
             'parsed_at': datetime.now().isoformat(),
-            'checksum_md5': parser.get_checksum()
+            'checksum_md5': checksum
         },
         'file_info': parser.get_file_info(),
         'device': parser.get_device_info(),
@@ -804,10 +657,17 @@ def parse_eds_file(content: str, file_path: str = None, strict_mode: bool = Fals
         'modules': parser.get_modules(),  # New: module definitions for modular devices
         'groups': parser.get_groups(),  # New: parameter group organization
         'capacity': parser.get_capacity(),
-        'all_sections': parser.get_all_sections(),
-        'checksum': parser.get_checksum(),
-        'eds_content': content
-    }
+        'checksum': checksum,
+    })
+
+    if advanced_sections:
+        try:
+            parsed_data['advanced_sections'] = EDSAdvancedSectionsParser(
+                parser.sections, parser.tokens).parse_all_advanced_sections()
+        except Exception as e:
+            # Don't fail the entire parse if advanced sections fail
+            logger.warning(f"Could not parse advanced sections for EDS {file_path}: {e}")
+            parsed_data['advanced_sections'] = {}
 
     # Validate and generate diagnostics
     validate_eds_data(parsed_data, collector, strict_mode)
@@ -827,4 +687,4 @@ def parse_eds_file_legacy(content: str) -> Dict[str, Any]:
         Dictionary containing all parsed EDS data
     """
     parsed_data, _ = parse_eds_file(content)
-    return parsed_data
+    return dict(parsed_data)
@@ -0,0 +1,285 @@
+"""
+EDS Section Index
+
+Tokenizes an EDS file once into an ordered section -> key/value representation
+with source offsets. The index is computed at import time and stored in the
+``eds_section_index`` table so PQA reconstruction and diffing can reuse it
+instead of re-scanning (or re-parsing with configparser) the original file.
+Each stored index carries the SHA-256 of the content it was built from, so
+readers check freshness without loading the content blob.
+
+Tokenization follows the configparser settings used by EDSDiffAnalyzer
+(``allow_no_value=True``, ``strict=False``, ``$`` full-line comments, no
+interpolation, case-preserving keys) so both produce the same key/value view.
+"""
+
+import configparser
+import hashlib
+import json
+import logging
+import sqlite3
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reuse configparser's own patterns so the index stays in lockstep with it
+_SECTION_RE = configparser.ConfigParser.SECTCRE
+_OPTION_RE = configparser.ConfigParser.OPTCRE_NV
+_NONSPACE_RE = configparser.ConfigParser.NONSPACECRE
+_COMMENT_PREFIX = '$'
+_DEFAULT_SECTION = configparser.DEFAULTSECT
+
+INDEX_FORMAT_VERSION = 1
+
+# (key, value, offset of the key line in the source)
+Entry = Tuple[str, Optional[str], int]
+
+
+@dataclass
+class EDSSection:
+    """One occurrence of a section header and the entries that follow it"""
+    name: str
+    start: int  # Offset of the '[' of the header
+    end: int    # End offset of the raw section text (trailing whitespace excluded)
+    entries: List[Entry] = field(default_factory=list)
+
+
+class EDSSectionIndex:
+    """Ordered, tokenized view of an EDS file's sections"""
+
+    def __init__(self, sections: List[EDSSection], defaults: Optional[List[Entry]] = None,
+                 parse_error: Optional[str] = None):
+        self.sections = sections
+        self.defaults = defaults or []
+        self.parse_error = parse_error
+        self._first_occurrence: Dict[str, EDSSection] = {}
+        for section in sections:
+            self._first_occurrence.setdefault(section.name, section)
+
+    @classmethod
+    def tokenize(cls, content: str) -> 'EDSSectionIndex':
+        """
+        Tokenize EDS content in a single pass
+
+        Args:
+            content: Raw EDS file content
+
+        Returns:
+            EDSSectionIndex for the content
+        """
+        sections: List[EDSSection] = []
+        defaults: List[Entry] = []
+        parse_error = None
+
+        current: Optional[List[Entry]] = None   # entries list receiving options
+        current_section: Optional[EDSSection] = None
+        value_lines: Optional[List[str]] = None  # lines of the option being read
+        indent_level = 0
+        offset = 0
+
+        def close_value():
+            # Mirror configparser._join_multiline_values()
+            if value_lines is not None:
+                key, _, entry_offset = current[-1]
+                current[-1] = (key, '\n'.join(value_lines).rstrip(), entry_offset)
+
+        def close_section(end: int):
+            if current_section is not None:
+                while end > current_section.start and content[end - 1].isspace():
+                    end -= 1
+                current_section.end = end
+
+        # configparser reads through StringIO, which splits lines on '\n' only
+        for line in content.split('\n'):
+            line_start = offset
+            offset += len(line) + 1
+
+            # Raw section spans end at the next line starting with '['
+            if line.startswith('[') and current_section is not None:
+                close_section(line_start - 1)
+                current_section = None
+
+            stripped = line.strip()
+            if not stripped or stripped.startswith(_COMMENT_PREFIX):
+                if not stripped and current is not None and value_lines is not None:
+                    value_lines.append('')
+                continue
+
+            first_nonspace = _NONSPACE_RE.search(line)
+            cur_indent_level = first_nonspace.start() if first_nonspace else 0
+
+            if current is not None and value_lines is not None and cur_indent_level > indent_level:
+                value_lines.append(stripped)
+                continue
+
+            indent_level = cur_indent_level
+            section_match = _SECTION_RE.match(stripped)
+            if section_match:
+                close_value()
+                value_lines = None
+                name = section_match.group('header')
+                if name == _DEFAULT_SECTION:
+                    current = defaults
+                else:
+                    close_section(line_start - 1)
+                    current_section = EDSSection(name, line_start + cur_indent_level, len(content))
+                    sections.append(current_section)
+                    current = current_section.entries
+                continue
+
+            if current is None:
+                parse_error = parse_error or f"File contains no section headers (line: {stripped!r})"
+                continue
+
+            option_match = _OPTION_RE.match(stripped)
+            key, value = option_match.group('option', 'value')
+            close_value()
+            if not key:
+                parse_error = parse_error or f"Source contains parsing errors (line: {stripped!r})"
+            key = key.rstrip()
+            value_lines = [value.strip()] if value is not None else None
+            current.append((key, None, line_start))
+
+        close_value()
+        close_section(len(content))
+
+        return cls(sections, defaults, parse_error)
+
+    def section_names(self) -> List[str]:
+        """Distinct section names in order of first appearance"""
+        return list(self._first_occurrence)
+
+    def raw_section(self, content: str, name: str) -> Optional[str]:
+        """
+        Return a section verbatim (header included) from the original content
+
+        Args:
+            content: The original EDS content this index was built from
+            name: Section name without brackets
+
+        Returns:
+            Section text with trailing whitespace stripped, or None if absent
+        """
+        section = self._first_occurrence.get(name)
+        if section is None:
+            return None
+        return content[section.start:section.end]
+
+    def as_dict(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Merged key/value view per section, equivalent to reading the file
+        with configparser (duplicate sections merge, later keys win).
+        Returns an empty dict if the content could not be parsed.
+        """
+        if self.parse_error:
+            return {}
+
+        merged: Dict[str, Dict[str, Optional[str]]] = {}
+        for section in self.sections:
+            target = merged.setdefault(section.name, {})
+            for key, value, _ in section.entries:
+                target[key] = value
+
+        if self.defaults:
+            default_values = {key: value for key, value, _ in self.defaults}
+            for values in merged.values():
+                for key, value in default_values.items():
+                    values.setdefault(key, value)
+
+        return merged
+
+    def iter_entries(self, name: str) -> Iterator[Entry]:
+        """Iterate entries of every occurrence of a section, in file order"""
+        for section in self.sections:
+            if section.name == name:
+                yield from section.entries
+
+    def to_bytes(self) -> bytes:
+        """Serialize to zlib-compressed compact JSON for storage"""
+        return zlib.compress(json.dumps({
+            'v': INDEX_FORMAT_VERSION,
+            'error': self.parse_error,
+            'defaults': self.defaults,
+            'sections': [[s.name, s.start, s.end, s.entries] for s in self.sections],
+        }, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'EDSSectionIndex':
+        """Deserialize an index produced by to_bytes()"""
+        payload = json.loads(zlib.decompress(data).decode('utf-8'))
+        sections = [
+            EDSSection(name, start, end, [tuple(entry) for entry in entries])
+            for name, start, end, entries in payload['sections']
+        ]
+        defaults = [tuple(entry) for entry in payload.get('defaults', [])]
+        return cls(sections, defaults, payload.get('error'))
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 hex digest of EDS content, as stored with its index"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def save_section_index(cursor: sqlite3.Cursor, eds_file_id: int, content: str) -> EDSSectionIndex:
+    """
+    Tokenize EDS content and store the index for an EDS file
+
+    Args:
+        cursor: Database cursor (caller commits)
+        eds_file_id: ID of the eds_files row
+        content: Raw EDS file content
+
+    Returns:
+        The stored EDSSectionIndex
+    """
+    index = EDSSectionIndex.tokenize(content)
+    cursor.execute("""
+        INSERT OR REPLACE INTO eds_section_index (eds_file_id, format_version, content_hash, index_data)
+        VALUES (?, ?, ?, ?)
+    """, (eds_file_id, INDEX_FORMAT_VERSION, content_hash(content), index.to_bytes()))
+    return index
+
+
+def load_section_index(conn: sqlite3.Connection, eds_file_id: int,
+                       content: Optional[str] = None) -> Optional[EDSSectionIndex]:
+    """
+    Load the stored index for an EDS file
+
+    Read-only: indexes are written on upload (``save_section_index``) and
+    backfilled by migration. If the stored index is missing, of another
+    format version, or was built from content other than ``content``, the
+    given content is tokenized in memory instead.
+
+    Args:
+        conn: Database connection
+        eds_file_id: ID of the eds_files row
+        content: Original EDS content the index must match, if the caller has it
+
+    Returns:
+        EDSSectionIndex, or None if nothing is stored and no content was given
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT format_version, content_hash, index_data FROM eds_section_index WHERE eds_file_id = ?
+        """, (eds_file_id,))
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        # Database predates the eds_section_index table or its content_hash column
+        row = None
+    return section_index_from_row(row, content)
+
+
+def section_index_from_row(row: Optional[Sequence], content: Optional[str] = None) -> Optional[EDSSectionIndex]:
+    """
+    Index from a stored ``(format_version, content_hash, index_data)`` row
+
+    Same freshness rules as ``load_section_index``, for callers that read
+    the rows of many files at once.
+    """
+    if row and row[0] == INDEX_FORMAT_VERSION and (content is None or row[1] == content_hash(content)):
+        return EDSSectionIndex.from_bytes(row[2])
+
+    return EDSSectionIndex.tokenize(content) if content else None
@@ -43,6 +43,7 @@ from src.models import (
     VendorInfo,
     WireConfiguration,
 )
+from src.utils.text_table import TextTable
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +68,7 @@ class IODDParser:
         # Detect and set the correct namespace based on the XML file
         self.NAMESPACES = self._detect_namespace()
         self.detected_schema_version = self._detected_schema_version
-        self.text_lookup = self._build_text_lookup()
+        self.text_table = TextTable.from_xml(self.root, self.NAMESPACES)
         self.all_text_data, self.text_xml_order, self.language_order = self._build_all_text_data()
 
     def _detect_namespace(self) -> Dict[str, str]:
@@ -102,21 +103,8 @@ class IODDParser:
         self._detected_schema_version = '1.1'
         return self.DEFAULT_NAMESPACES.copy()
 
-    def _build_text_lookup(self) -> Dict[str, str]:
-        """Build lookup table for textId references from ExternalTextCollection (English only for backwards compatibility)"""
-        text_map = {}
-
-        # Find all PrimaryLanguage/Text elements
-        for text_elem in self.root.findall('.//iodd:PrimaryLanguage/iodd:Text', self.NAMESPACES):
-            text_id = text_elem.get('id')
-            text_value = text_elem.get('value', '')
-            if text_id:
-                text_map[text_id] = text_value
-
-        return text_map
-
     def _build_all_text_data(self) -> tuple:
-        """Build complete text lookup for ALL languages from ExternalTextCollection
+        """Nested-dict form of the text table for the DeviceProfile fields
 
         Returns:
             Tuple of:
@@ -129,77 +117,7 @@ class IODDParser:
                 {'en': 0, 'de': 1, 'fr': 2}
             )
         """
-        all_text = {}
-        xml_order = {}  # PQA: Track original XML order of Text elements per language
-        language_order = {}  # PQA: Track order of Language elements
-
-        # PQA Fix #66: Track which text IDs are TextRedefine elements
-        text_redefine_ids = set()
-
-        # Extract primary language (usually English) - language_order 0
-        primary_lang = self.root.find('.//iodd:ExternalTextCollection/iodd:PrimaryLanguage', self.NAMESPACES)
-        if primary_lang is not None:
-            lang_code = primary_lang.get('{http://www.w3.org/XML/1998/namespace}lang', 'en')
-            language_order[lang_code] = 0  # Primary is always first
-            # PQA Fix #66: Extract both Text and TextRedefine elements in order
-            order_idx = 0
-            for child in primary_lang:
-                local_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                if local_name == 'Text':
-                    text_id = child.get('id')
-                    text_value = child.get('value', '')
-                    if text_id:
-                        if text_id not in all_text:
-                            all_text[text_id] = {}
-                        all_text[text_id][lang_code] = text_value
-                        if text_id not in xml_order:
-                            xml_order[text_id] = {}
-                        xml_order[text_id][lang_code] = order_idx
-                        order_idx += 1
-                elif local_name == 'TextRedefine':
-                    text_id = child.get('id')
-                    text_value = child.get('value', '')
-                    if text_id:
-                        if text_id not in all_text:
-                            all_text[text_id] = {}
-                        all_text[text_id][lang_code] = text_value
-                        text_redefine_ids.add(text_id)  # PQA Fix #66
-                        if text_id not in xml_order:
-                            xml_order[text_id] = {}
-                        xml_order[text_id][lang_code] = order_idx
-                        order_idx += 1
-
-        # Extract all secondary languages - language_order starts at 1
-        for lang_idx, language_elem in enumerate(self.root.findall('.//iodd:ExternalTextCollection/iodd:Language', self.NAMESPACES)):
-            lang_code = language_elem.get('{http://www.w3.org/XML/1998/namespace}lang', 'unknown')
-            language_order[lang_code] = lang_idx + 1  # +1 because primary is 0
-            # PQA Fix #66: Extract both Text and TextRedefine elements in order
-            order_idx = 0
-            for child in language_elem:
-                local_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
-                if local_name == 'Text':
-                    text_id = child.get('id')
-                    text_value = child.get('value', '')
-                    if text_id:
-                        if text_id not in all_text:
-                            all_text[text_id] = {}
-                        all_text[text_id][lang_code] = text_value
-                        if text_id not in xml_order:
-                            xml_order[text_id] = {}
-                        xml_order[text_id][lang_code] = order_idx
-                        order_idx += 1
-                elif local_name == 'TextRedefine':
-                    text_id = child.get('id')
-                    text_value = child.get('value', '')
-                    if text_id:
-                        if text_id not in all_text:
-                            all_text[text_id] = {}
-                        all_text[text_id][lang_code] = text_value
-                        text_redefine_ids.add(text_id)  # PQA Fix #66
-                        if text_id not in xml_order:
-                            xml_order[text_id] = {}
-                        xml_order[text_id][lang_code] = order_idx
-                        order_idx += 1
+        all_text, xml_order, language_order, text_redefine_ids = self.text_table.to_dicts()
 
         # Store text_redefine_ids on self for use by storage
         self.text_redefine_ids = text_redefine_ids
@@ -207,10 +125,8 @@ class IODDParser:
         return all_text, xml_order, language_order
 
     def _resolve_text(self, text_id: Optional[str]) -> Optional[str]:
-        """Resolve a textId reference to its actual text value (English only for backwards compatibility)"""
-        if not text_id:
-            return None
-        return self.text_lookup.get(text_id)
+        """Resolve a textId reference to its value in the primary language"""
+        return self.text_table.resolve(text_id)
 
 
     def _build_datatype_lookup(self) -> Dict[str, Any]:
@@ -285,6 +201,7 @@ class IODDParser:
             text_xml_order=self.text_xml_order,  # PQA: Original XML order of Text elements
             language_order=self.language_order,  # PQA: Order of Language elements
             text_redefine_ids=getattr(self, 'text_redefine_ids', set()),  # PQA Fix #66
+            text_table=self.text_table,
             # Phase 1: UI Rendering metadata
             process_data_ui_info=self._extract_process_data_ui_info(),
             # Phase 2: Device Variants and Conditions
@@ -745,11 +662,9 @@ class IODDParser:
             datatype_name_text_id=datatype_info.get('datatype_name_text_id'),  # PQA Fix #95: Datatype/Name textId
             # PQA Fix #127: StdDirectParameterRef support
             is_std_direct_parameter_ref=is_std_direct_parameter_ref,
+            record_item_info=record_item_info,
         )
 
-        # Store RecordItemInfo as an attribute (not in Parameter model, will be saved separately)
-        param._record_item_info = record_item_info
-
         return param
 
     def _parse_std_variable_ref(self, std_var_elem, synthetic_index: int) -> Optional[Parameter]:
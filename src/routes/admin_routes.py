@@ -10,11 +10,17 @@ import sqlite3
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import Dict
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+from src.cache_manager import current_cache_manager
 from src.database import get_db_path
+from src.utils import db_maintenance, system_stats
+from src.utils.cascade_delete import CascadePlan, eds_file_plan, iodd_device_plan
+from src.utils.table_counters import read_row_counts
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -22,6 +28,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/admin", tags=["Admin Console"])
 
 
+def _clear_caches():
+    """Drop cached query results and statistics reports after deleting data directly in the database"""
+    cache = current_cache_manager()
+    if cache:
+        cache.clear_all()
+    for report in system_stats.REPORTS:
+        system_stats.discard_report(report)
+
+
 def _get_existing_tables(cursor) -> set:
     """Return set of existing tables for defensive operations."""
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -46,32 +61,53 @@ def _delete_all_rows(cursor, tables: set, table_name: str):
         logger.debug("Skipping delete for missing table '%s'", table_name)
 
 
+def _submit_maintenance_job(kind: str, operation):
+    """Start a background maintenance job, or 409 while another one runs"""
+    try:
+        return db_maintenance.submit_job(kind, operation)
+    except db_maintenance.MaintenanceBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def _cascade_delete_all(conn, plan: CascadePlan) -> Dict[str, int]:
+    """
+    Delete every root row of plan with its dependents, then rows left without a parent
+
+    PQA tables are shared by IODD and EDS, so only the rows linked to the plan's
+    root rows are removed there.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id FROM {plan.root}")
+    rows_deleted = plan.delete(conn, [row[0] for row in cursor.fetchall()])
+
+    for table in reversed(plan.order):
+        if not table.startswith("pqa_"):
+            cursor.execute(f"DELETE FROM {table}")
+            if cursor.rowcount:
+                rows_deleted[table] = rows_deleted.get(table, 0) + cursor.rowcount
+    conn.commit()
+    return rows_deleted
+
+
 @router.get("/stats/overview")
 async def get_system_overview():
     """
     Get comprehensive system statistics and overview
 
+    Counts come from the row counters; recent activity, diagnostics and
+    storage sizes from the last background refresh (see src/utils/system_stats.py).
+
     Returns:
         System-wide metrics including device counts, storage info, and health status
     """
     conn = sqlite3.connect(get_db_path())
     cursor = conn.cursor()
 
-    # Device counts
-    cursor.execute("SELECT COUNT(*) FROM devices")
-    iodd_count = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM eds_files")
-    eds_count = cursor.fetchone()[0]
-
-    # Parameter counts
-    cursor.execute("SELECT COUNT(*) FROM parameters")
-    iodd_param_count = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM eds_parameters")
-    eds_param_count = cursor.fetchone()[0]
+    counts = read_row_counts(cursor, ("devices", "eds_files", "parameters", "eds_parameters"))
+    iodd_count, eds_count = counts["devices"], counts["eds_files"]
+    iodd_param_count, eds_param_count = counts["parameters"], counts["eds_parameters"]
 
-    # Ticket statistics
+    # Ticket statistics (small table, status changes are not counted)
     cursor.execute("""
         SELECT
             COUNT(*) as total,
@@ -83,60 +119,9 @@ async def get_system_overview():
     """)
     ticket_stats = cursor.fetchone()
 
-    # Recent activity (last 7 days)
-    cursor.execute("""
-        SELECT COUNT(*) FROM devices
-        WHERE import_date >= datetime('now', '-7 days')
-    """)
-    recent_iodd_imports = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*) FROM eds_files
-        WHERE import_date >= datetime('now', '-7 days')
-    """)
-    recent_eds_imports = cursor.fetchone()[0]
-
-    cursor.execute("""
-        SELECT COUNT(*) FROM tickets
-        WHERE created_at >= datetime('now', '-7 days')
-    """)
-    recent_tickets = cursor.fetchone()[0]
-
-    # EDS diagnostics summary
-    cursor.execute("""
-        SELECT
-            SUM(diagnostic_error_count + diagnostic_fatal_count) as total_issues,
-            SUM(CASE WHEN has_parsing_issues = 1 THEN 1 ELSE 0 END) as files_with_issues
-        FROM eds_files
-    """)
-    eds_diag = cursor.fetchone()
-
-    # Database info
-    cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-    db_size = cursor.fetchone()[0]
-
-    # Table counts
-    cursor.execute("""
-        SELECT name FROM sqlite_master
-        WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        ORDER BY name
-    """)
-    table_count = len(cursor.fetchall())
-
     conn.close()
 
-    # File system info
-    db_file_size = os.path.getsize(get_db_path()) if os.path.exists(get_db_path()) else 0
-
-    # Check for attachments directory
-    attachments_dir = Path("ticket_attachments")
-    attachments_size = 0
-    attachment_count = 0
-    if attachments_dir.exists():
-        for root, dirs, files in os.walk(attachments_dir):
-            attachment_count += len(files)
-            for file in files:
-                attachments_size += os.path.getsize(os.path.join(root, file))
+    activity = await run_in_threadpool(system_stats.get_report, "activity", get_db_path())
 
     return {
         "devices": {
@@ -156,25 +141,11 @@ async def get_system_overview():
             "resolved": ticket_stats[3] or 0,
             "closed": ticket_stats[4] or 0
         },
-        "recent_activity": {
-            "iodd_imports": recent_iodd_imports,
-            "eds_imports": recent_eds_imports,
-            "new_tickets": recent_tickets
-        },
-        "diagnostics": {
-            "total_issues": eds_diag[0] or 0,
-            "files_with_issues": eds_diag[1] or 0
-        },
-        "storage": {
-            "database_size_bytes": db_file_size,
-            "database_size_mb": round(db_file_size / (1024 * 1024), 2),
-            "attachments_size_bytes": attachments_size,
-            "attachments_size_mb": round(attachments_size / (1024 * 1024), 2),
-            "attachment_count": attachment_count,
-            "total_size_mb": round((db_file_size + attachments_size) / (1024 * 1024), 2)
-        },
+        "recent_activity": activity["recent_activity"],
+        "diagnostics": activity["diagnostics"],
+        "storage": activity["storage"],
         "database": {
-            "table_count": table_count,
+            "table_count": activity["table_count"],
             "path": get_db_path()
         },
         "timestamp": datetime.now().isoformat()
@@ -220,217 +191,41 @@ async def get_database_health():
     """
     Comprehensive database health check with actionable diagnostics
 
-    Returns detailed issue detection and resolution recommendations
+    Returns detailed issue detection and resolution recommendations from the
+    last background check (its time is in "timestamp")
     """
-    conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-
-    issues = []
-    recommendations = []
-
-    # 1. Integrity check
-    cursor.execute("PRAGMA integrity_check")
-    integrity = cursor.fetchone()[0]
-
-    if integrity != "ok":
-        issues.append({
-            "type": "corruption",
-            "severity": "critical",
-            "title": "Database Corruption Detected",
-            "description": f"Integrity check failed: {integrity}",
-            "action": "backup",
-            "action_label": "Create Backup Now"
-        })
-        recommendations.append("Immediately create a backup before attempting any repairs")
-
-    # 2. Foreign key violations
-    cursor.execute("PRAGMA foreign_key_check")
-    fk_violations = cursor.fetchall()
-
-    if len(fk_violations) > 0:
-        # Group violations by table to provide specific details
-        violations_by_table = {}
-        for violation in fk_violations[:10]:  # Limit to first 10 for display
-            table = violation[0]
-            rowid = violation[1]
-            if table not in violations_by_table:
-                violations_by_table[table] = []
-            violations_by_table[table].append(rowid)
-
-        # Create detailed description
-        violation_details = []
-        for table, rowids in violations_by_table.items():
-            count = len(rowids)
-            violation_details.append(f"{table} ({count} records)")
-
-        issues.append({
-            "type": "foreign_keys",
-            "severity": "high",
-            "title": f"{len(fk_violations)} Foreign Key Violations Detected",
-            "description": f"Orphaned records in: {', '.join(violation_details)}. These records reference parent data that no longer exists. Click 'Clean Orphaned Records' to remove them safely.",
-            "action": "clean_fk",
-            "action_label": "Clean Orphaned Records"
-        })
-        recommendations.append("Foreign key violations indicate data inconsistency. Use the 'Clean Orphaned Records' button to safely remove orphaned data.")
-
-    # 3. Check for database bloat
-    db_size = os.path.getsize(get_db_path())
-    cursor.execute("PRAGMA page_count")
-    page_count = cursor.fetchone()[0]
-    cursor.execute("PRAGMA freelist_count")
-    freelist_count = cursor.fetchone()[0]
-
-    if freelist_count > 0:
-        bloat_pct = (freelist_count / page_count * 100) if page_count > 0 else 0
-        if bloat_pct > 10:
-            issues.append({
-                "type": "bloat",
-                "severity": "medium",
-                "title": f"Database Bloat Detected ({bloat_pct:.1f}%)",
-                "description": f"{freelist_count} unused pages wasting space",
-                "action": "vacuum",
-                "action_label": "Optimize Database (VACUUM)"
-            })
-            recommendations.append(f"Run VACUUM to reclaim ~{bloat_pct:.1f}% of database space")
-
-    # 4. Check for missing recommended indexes
-    expected_indexes = {
-        "eds_files": ["vendor_name", "product_code"],
-        "devices": ["vendor_id"],
-        "iodd_files": ["device_id"],
-        "parameters": ["device_id"],
-        "tickets": ["status", "priority", "created_at"]
-    }
-
-    cursor.execute("""
-        SELECT tbl_name, name
-        FROM sqlite_master
-        WHERE type='index' AND name NOT LIKE 'sqlite_%'
-    """)
-    existing_indexes = {}
-    for tbl, idx in cursor.fetchall():
-        if tbl not in existing_indexes:
-            existing_indexes[tbl] = []
-        existing_indexes[tbl].append(idx)
-
-    missing_indexes = []
-    for table, columns in expected_indexes.items():
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
-        if cursor.fetchone():
-            for col in columns:
-                # Simple check - in production you'd verify actual index coverage
-                has_index = any(col in idx.lower() for idx in existing_indexes.get(table, []))
-                if not has_index:
-                    missing_indexes.append(f"{table}.{col}")
-
-    if missing_indexes:
-        issues.append({
-            "type": "performance",
-            "severity": "low",
-            "title": f"{len(missing_indexes)} Recommended Indexes Missing",
-            "description": f"Adding indexes could improve query performance: {', '.join(missing_indexes[:3])}",
-            "action": "info",
-            "action_label": "View Documentation"
-        })
-
-    # 5. Check for orphaned IODD assets
-    cursor.execute("""
-        SELECT COUNT(*)
-        FROM iodd_assets
-        WHERE device_id NOT IN (SELECT id FROM devices)
-    """)
-    orphaned_assets = cursor.fetchone()[0]
-
-    if orphaned_assets > 0:
-        issues.append({
-            "type": "orphaned_data",
-            "severity": "medium",
-            "title": f"{orphaned_assets} Orphaned IODD Assets",
-            "description": "Asset files exist but their parent IODD files have been deleted",
-            "action": "vacuum",
-            "action_label": "Clean Up Orphaned Data"
-        })
-
-    # Get index list
-    cursor.execute("""
-        SELECT name, tbl_name
-        FROM sqlite_master
-        WHERE type='index' AND name NOT LIKE 'sqlite_%'
-        ORDER BY tbl_name, name
-    """)
-    indexes = cursor.fetchall()
-
-    # Get table sizes
-    cursor.execute("""
-        SELECT
-            name,
-            (SELECT COUNT(*) FROM sqlite_master sm WHERE sm.tbl_name = m.name AND sm.type='index') as index_count
-        FROM sqlite_master m
-        WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        ORDER BY name
-    """)
-    tables = []
-    for table_name, index_count in cursor.fetchall():
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-        row_count = cursor.fetchone()[0]
-        tables.append({
-            "name": table_name,
-            "row_count": row_count,
-            "index_count": index_count
-        })
-
-    conn.close()
-
-    # Determine overall health status
-    critical_issues = [i for i in issues if i["severity"] == "critical"]
-    high_issues = [i for i in issues if i["severity"] == "high"]
-
-    health_status = "healthy"
-    if critical_issues:
-        health_status = "critical"
-    elif high_issues:
-        health_status = "warning"
-    elif issues:
-        health_status = "needs_attention"
-
-    return {
-        "integrity": integrity,
-        "healthy": len(issues) == 0,
-        "health_status": health_status,
-        "foreign_key_violations": len(fk_violations),
-        "index_count": len(indexes),
-        "issues": issues,
-        "recommendations": recommendations,
-        "tables": tables,
-        "timestamp": datetime.now().isoformat()
-    }
+    return await run_in_threadpool(system_stats.get_report, "database_health", get_db_path())
 
 
 @router.post("/database/vacuum")
 async def vacuum_database():
-    """Optimize database by running VACUUM"""
-    try:
-        # Get size before
-        size_before = os.path.getsize(get_db_path())
-
-        conn = sqlite3.connect(get_db_path())
-        conn.execute("VACUUM")
-        conn.close()
+    """
+    Optimize the database in the background
 
-        # Get size after
-        size_after = os.path.getsize(get_db_path())
-        saved = size_before - size_after
+    Releases free pages with incremental vacuum steps and refreshes planner
+    statistics table by table. A database still in auto_vacuum=NONE mode is
+    converted once with a full VACUUM. Poll the returned job for progress.
+    """
+    db_path = get_db_path()
 
+    def run(progress):
+        vacuum = db_maintenance.incremental_vacuum(db_path, convert=True, progress=progress)
+        analyze = db_maintenance.analyze_tables(db_path)
         return {
-            "success": True,
-            "size_before_mb": round(size_before / (1024 * 1024), 2),
-            "size_after_mb": round(size_after / (1024 * 1024), 2),
-            "space_saved_mb": round(saved / (1024 * 1024), 2),
-            "timestamp": datetime.now().isoformat()
+            "size_before_mb": round(vacuum["size_before"] / (1024 * 1024), 2),
+            "size_after_mb": round(vacuum["size_after"] / (1024 * 1024), 2),
+            "space_saved_mb": round((vacuum["size_before"] - vacuum["size_after"]) / (1024 * 1024), 2),
+            "vacuum": vacuum,
+            "analyze": analyze,
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to vacuum database: {str(e)}")
+
+    job = _submit_maintenance_job("vacuum", run)
+    return {
+        "success": True,
+        "message": "Database optimization started",
+        "job": job.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 @router.post("/database/clean-fk-violations")
@@ -491,6 +286,7 @@ async def clean_fk_violations():
         conn = sqlite3.connect(get_db_path())
         conn.execute("VACUUM")
         conn.close()
+        system_stats.discard_report("database_health")
 
         return {
             "success": True,
@@ -507,53 +303,71 @@ async def clean_fk_violations():
 
 @router.post("/database/backup")
 async def backup_database():
-    """Create a backup of the database"""
-    try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"greenstack_backup_{timestamp}.db"
-        backup_path = Path("backups") / backup_name
+    """Create a backup of the database in the background with the online backup API"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    backup_name = f"greenstack_backup_{timestamp}.db"
+    backup_path = Path("backups") / backup_name
+    db_path = get_db_path()
 
-        # Create backups directory
+    def run(progress):
         backup_path.parent.mkdir(exist_ok=True)
+        size = db_maintenance.online_backup(db_path, str(backup_path), progress=progress)
+        return {"backup_file": backup_name, "size_mb": round(size / (1024 * 1024), 2)}
 
-        # Copy database
-        shutil.copy2(get_db_path(), backup_path)
+    job = _submit_maintenance_job("backup", run)
+    return {
+        "success": True,
+        "backup_file": backup_name,
+        "backup_path": str(backup_path),
+        "job": job.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
 
-        backup_size = os.path.getsize(backup_path)
 
-        return {
-            "success": True,
-            "backup_file": backup_name,
-            "backup_path": str(backup_path),
-            "size_mb": round(backup_size / (1024 * 1024), 2),
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+@router.get("/database/backup/download")
+async def download_backup(compress: bool = False):
+    """
+    Download a consistent snapshot of the database
 
+    The file is streamed straight from the database under a read
+    transaction, without a temporary copy.
 
-@router.get("/database/backup/download", response_class=FileResponse)
-async def download_backup():
-    """Download a database backup"""
+    Args:
+        compress: Send a gzip-compressed file (.db.gz)
+    """
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        temp_backup = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        tmp_path = temp_backup.name
-
-        # Copy database to temp file
-        shutil.copy2(get_db_path(), tmp_path)
-        temp_backup.close()
-
-        # Return file with background task to clean up temp file after response
-        return FileResponse(
-            path=tmp_path,
-            media_type="application/x-sqlite3",
-            filename=f"greenstack_backup_{timestamp}.db",
-            background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
-        )
+        snapshot = db_maintenance.DatabaseSnapshot(get_db_path())
+    except db_maintenance.MaintenanceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to download backup: {str(e)}")
 
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"greenstack_backup_{timestamp}.db" + (".gz" if compress else "")
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if not compress:
+        headers["Content-Length"] = str(snapshot.size)
+    return StreamingResponse(
+        snapshot.iter_bytes(compress=compress),
+        media_type="application/gzip" if compress else "application/x-sqlite3",
+        headers=headers
+    )
+
+
+@router.get("/database/maintenance/jobs")
+async def list_maintenance_jobs():
+    """Recent background maintenance jobs (backup, vacuum, scheduled), newest first"""
+    return {"jobs": [job.to_dict() for job in db_maintenance.list_jobs()]}
+
+
+@router.get("/database/maintenance/jobs/{job_id}")
+async def get_maintenance_job(job_id: str):
+    """Progress and result of a background maintenance job"""
+    job = db_maintenance.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Maintenance job not found")
+    return job.to_dict()
+
 
 @router.get("/diagnostics/eds-summary")
 async def get_eds_diagnostics_summary():
@@ -792,64 +606,18 @@ async def delete_all_iodd_devices():
             ticket_count = cursor.rowcount
             logger.info(f"Deleted {ticket_count} PQA tickets for IODD devices")
 
-        # Delete IODD PQA data
-        for table in [
-            "pqa_diff_details",
-            "pqa_quality_metrics",
-            "pqa_analysis_queue",
-            "pqa_file_archive",
-        ]:
-            _delete_all_rows(cursor, tables, table)
-
-        # Delete ALL IODD-related data in correct order (respecting foreign keys)
-        # Child tables first, parent tables last
-        for table in [
-            "record_item_single_values",
-            "parameter_record_items",
-            "parameter_single_values",
-            "std_variable_ref_single_values",
-            "std_record_item_refs",
-            "std_variable_refs",
-            "parameters",
-            "process_data_conditions",
-            "process_data_ui_info",
-            "process_data_record_items",
-            "process_data_single_values",
-            "process_data",
-            "variable_record_item_info",
-            "custom_datatype_record_items",
-            "custom_datatype_single_values",
-            "custom_datatypes",
-            "error_types",
-            "events",
-            "communication_profile",
-            "device_features",
-            "device_variants",
-            "device_test_event_triggers",
-            "device_test_config",
-            "document_info",
-            "ui_menu_buttons",
-            "ui_menu_items",
-            "ui_menu_roles",
-            "ui_menus",
-            "generated_adapters",
-            "wire_configurations",
-            "iodd_build_format",
-            "iodd_text",
-            "iodd_assets",
-            "devices",
-            "iodd_files",
-        ]:
-            _delete_all_rows(cursor, tables, table)
-
+        # Delete all devices with every dependent row, including their PQA analyses
+        rows_deleted = _cascade_delete_all(conn, iodd_device_plan(cursor)) if "devices" in tables else {}
         conn.commit()
+        _clear_caches()
 
         return {
             "success": True,
             "message": "All IODD devices and related data deleted",
             "devices_deleted": iodd_file_count,
             "parameters_deleted": param_count,
-            "assets_deleted": asset_count
+            "assets_deleted": asset_count,
+            "rows_deleted": rows_deleted
         }
     except Exception as e:
         conn.rollback()
@@ -883,33 +651,13 @@ async def delete_all_eds_files():
             ticket_count = cursor.rowcount
             logger.info(f"Deleted {ticket_count} PQA tickets for EDS files")
 
-        # Delete ALL EDS-related data in correct order (child to parent)
-        for table in [
-            "eds_connections",
-            "eds_ports",
-            "eds_variable_assemblies",
-            "eds_modules",
-            "eds_assemblies",
-            "eds_enum_values",
-            "eds_parameters",
-            "eds_diagnostics",
-            "eds_groups",
-            "eds_tspecs",
-            "eds_capacity",
-            "eds_dlr_config",
-            "eds_ethernet_link",
-            "eds_lldp_management",
-            "eds_qos_config",
-            "eds_tcpip_interface",
-            "eds_object_metadata",
-            "eds_file_metadata",
-            "eds_package_files",
-            "eds_package_metadata",
-            "eds_files",
-            "eds_packages",
-        ]:
-            _delete_all_rows(cursor, tables, table)
-
+        # Delete all EDS files with every dependent row, including their PQA analyses
+        rows_deleted = _cascade_delete_all(conn, eds_file_plan(cursor)) if "eds_files" in tables else {}
+        if "eds_packages" in tables:
+            package_rows = _cascade_delete_all(conn, CascadePlan.from_schema(cursor, "eds_packages"))
+            for table, count in package_rows.items():
+                rows_deleted[table] = rows_deleted.get(table, 0) + count
+        _delete_all_rows(cursor, tables, "eds_device_index")
         conn.commit()
 
         return {
@@ -917,7 +665,8 @@ async def delete_all_eds_files():
             "message": "All EDS files and related data deleted",
             "files_deleted": file_count,
             "parameters_deleted": param_count,
-            "packages_deleted": package_count
+            "packages_deleted": package_count,
+            "rows_deleted": rows_deleted
         }
     except Exception as e:
         conn.rollback()
@@ -1002,7 +751,13 @@ async def delete_all_data():
             "tickets",
 
             # PQA tables
+            "pqa_dashboard_xpath_patterns",
+            "pqa_dashboard_daily",
+            "pqa_dashboard_diff_counts",
+            "pqa_dashboard_devices",
+            "pqa_dashboard_totals",
             "pqa_diff_details",
+            "pqa_diff_summary",
             "pqa_quality_metrics",
             "pqa_analysis_queue",
             "pqa_file_archive",
@@ -1015,6 +770,7 @@ async def delete_all_data():
             "eds_assemblies",
             "eds_enum_values",
             "eds_parameters",
+            "eds_section_index",
             "eds_diagnostics",
             "eds_groups",
             "eds_tspecs",
@@ -1065,6 +821,8 @@ async def delete_all_data():
             "iodd_build_format",
             "iodd_text",
             "iodd_assets",
+            "device_versions",
+            "device_access_stats",
             "devices",
             "iodd_files",
         ]
@@ -1093,6 +851,8 @@ async def delete_all_data():
         conn.execute("VACUUM")
         conn.close()
 
+        _clear_caches()
+
         # Delete attachment files from filesystem
         attachments_dir = Path("ticket_attachments")
         if attachments_dir.exists():
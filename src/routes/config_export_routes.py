@@ -3,137 +3,149 @@ Configuration Export API Routes
 Provides endpoints to export device configurations in various formats (JSON, CSV, Excel)
 """
 
-import csv
-import io
-import json
 import sqlite3
-import tempfile
+from typing import Iterator, List
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
+
+from src import config
+from src.utils.streaming_export import (
+    JSONArray, JSONObject, attachment_header, gzip_chunks, iter_csv, iter_json, iter_rows, open_export_connection
+)
 
 router = APIRouter(prefix="/api/config-export", tags=["Configuration Export"])
 
 DB_PATH = "greenstack.db"
 
+# Largest IN list per existence query in batch exports
+MAX_IN_PARAMETERS = 500
 
-@router.get("/iodd/{device_id}/json", response_class=FileResponse)
-async def export_iodd_config_json(device_id: int):
-    """
-    Export IODD device configuration as JSON
 
-    Includes:
-    - Device information
-    - All parameters with values and metadata
-    - Process data configuration
-    - Error types and events
-    """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    # Get device info
-    cursor.execute("""
-        SELECT d.*, df.iodd_version
-        FROM devices d
-        LEFT JOIN iodd_files df ON d.id = df.device_id
-        WHERE d.id = ?
-    """, (device_id,))
+def _export_response(chunks: Iterator, filename: str, media_type: str, compress: bool) -> StreamingResponse:
+    """Stream an export as an attachment, gzip-compressed on the fly if requested"""
+    if compress:
+        chunks, filename, media_type = gzip_chunks(chunks), f"{filename}.gz", "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": attachment_header(filename)}
+    )
+
 
-    device_row = cursor.fetchone()
-    if not device_row:
+def _stream_json(document_pairs) -> Iterator[str]:
+    """JSON text of a lazily built export; document_pairs(conn) yields (key, value) pairs"""
+    conn = open_export_connection(DB_PATH)
+    try:
+        yield from iter_json(JSONObject(document_pairs(conn)))
+    finally:
         conn.close()
-        raise HTTPException(status_code=404, detail="Device not found")
 
-    device_info = dict(device_row)
 
-    # Get parameters
-    cursor.execute("""
-        SELECT param_index, name, data_type, access_rights, default_value,
-               min_value, max_value, unit, description, enumeration_values,
-               bit_length, dynamic, excluded_from_data_storage,
-               modifies_other_variables, unit_code, value_range_name
-        FROM parameters
-        WHERE device_id = ?
-        ORDER BY param_index
-    """, (device_id,))
+def _stream_csv(header: List[str], query: str, params) -> Iterator[str]:
+    """CSV text of a query, read in batches"""
+    conn = open_export_connection(DB_PATH)
+    try:
+        yield from iter_csv(header, (tuple(row) for row in iter_rows(conn, query, params)))
+    finally:
+        conn.close()
 
-    parameters = [dict(row) for row in cursor.fetchall()]
 
-    # Get process data
-    cursor.execute("""
-        SELECT pd_id, name, direction, bit_length, data_type, description
-        FROM process_data
-        WHERE device_id = ?
-    """, (device_id,))
+def _rows(conn: sqlite3.Connection, query: str, params) -> JSONArray:
+    """Query rows as a lazily encoded JSON array of objects"""
+    return JSONArray(dict(row) for row in iter_rows(conn, query, params))
 
-    process_data = [dict(row) for row in cursor.fetchall()]
 
-    # Get error types
-    cursor.execute("""
-        SELECT code, additional_code, name, description
-        FROM error_types
-        WHERE device_id = ?
-        ORDER BY code, additional_code
-    """, (device_id,))
+def _fetch_one(query: str, params):
+    """Single row lookup (run before a response starts streaming, e.g. for 404s)"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
 
-    error_types = [dict(row) for row in cursor.fetchall()]
 
-    # Get events
-    cursor.execute("""
-        SELECT code, name, description, event_type
-        FROM events
-        WHERE device_id = ?
-        ORDER BY code
-    """, (device_id,))
+IODD_DEVICE_QUERY = """
+    SELECT d.*
+    FROM devices d
+    WHERE d.id = ?
+"""
 
-    events = [dict(row) for row in cursor.fetchall()]
-
-    conn.close()
-
-    # Build configuration object
-    config = {
-        "device": device_info,
-        "parameters": parameters,
-        "process_data": process_data,
-        "error_types": error_types,
-        "events": events,
-        "export_format": "IODD Configuration Export v1.0"
-    }
-
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp_file:
-        json.dump(config, tmp_file, indent=2)
-        tmp_path = tmp_file.name
-
-    safe_name = device_info.get('product_name', 'device').replace(' ', '_')
-
-    # Return file with background task to clean up temp file after response
-    return FileResponse(
-        path=tmp_path,
-        media_type="application/json",
-        filename=f"{safe_name}_config.json",
-        background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
-    )
+EDS_DEVICE_QUERY = """
+    SELECT id, vendor_code, vendor_name, product_code, product_type,
+           product_name, catalog_number, major_revision, minor_revision,
+           description, home_url
+    FROM eds_files
+    WHERE id = ?
+"""
+
+
+@router.get("/iodd/{device_id}/json", response_class=StreamingResponse)
+async def export_iodd_config_json(device_id: int, compress: bool = False):
+    """
+    Export IODD device configuration as JSON
+
+    Includes:
+    - Device information
+    - All parameters with values and metadata
+    - Process data configuration
+    - Error types and events
+
+    Args:
+        device_id: Device ID
+        compress: Gzip the file on the fly (.json.gz)
+    """
+    device_info = _fetch_one(IODD_DEVICE_QUERY, (device_id,))
+    if not device_info:
+        raise HTTPException(status_code=404, detail="Device not found")
+
+    def document(conn):
+        yield "device", device_info
+        yield "parameters", _rows(conn, """
+            SELECT param_index, name, data_type, access_rights, default_value,
+                   min_value, max_value, unit, description, enumeration_values,
+                   bit_length, dynamic, excluded_from_data_storage,
+                   modifies_other_variables, unit_code, value_range_name
+            FROM parameters
+            WHERE device_id = ?
+            ORDER BY param_index
+        """, (device_id,))
+        yield "process_data", _rows(conn, """
+            SELECT pd_id, name, direction, bit_length, data_type, description
+            FROM process_data
+            WHERE device_id = ?
+        """, (device_id,))
+        yield "error_types", _rows(conn, """
+            SELECT code, additional_code, name, description
+            FROM error_types
+            WHERE device_id = ?
+            ORDER BY code, additional_code
+        """, (device_id,))
+        yield "events", _rows(conn, """
+            SELECT code, name, description, event_type
+            FROM events
+            WHERE device_id = ?
+            ORDER BY code
+        """, (device_id,))
+        yield "export_format", "IODD Configuration Export v1.0"
+
+    safe_name = (device_info.get('product_name') or 'device').replace(' ', '_')
+    return _export_response(_stream_json(document), f"{safe_name}_config.json", "application/json", compress)
 
 
 @router.get("/iodd/{device_id}/csv", response_class=StreamingResponse)
-async def export_iodd_config_csv(device_id: int):
+async def export_iodd_config_csv(device_id: int, compress: bool = False):
     """Export IODD device parameters as CSV"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Get device info
-    cursor.execute("SELECT product_name FROM devices WHERE id = ?", (device_id,))
-    device = cursor.fetchone()
+    device = _fetch_one("SELECT product_name FROM devices WHERE id = ?", (device_id,))
     if not device:
-        conn.close()
         raise HTTPException(status_code=404, detail="Device not found")
 
-    product_name = device[0]
-
-    # Get parameters
-    cursor.execute("""
+    chunks = _stream_csv([
+        'Parameter Index', 'Name', 'Data Type', 'Access Rights',
+        'Default Value', 'Min Value', 'Max Value', 'Unit', 'Description'
+    ], """
         SELECT param_index, name, data_type, access_rights, default_value,
                min_value, max_value, unit, description
         FROM parameters
@@ -141,36 +153,12 @@ async def export_iodd_config_csv(device_id: int):
         ORDER BY param_index
     """, (device_id,))
 
-    parameters = cursor.fetchall()
-    conn.close()
-
-    # Create CSV
-    csv_output = io.StringIO()
-    writer = csv.writer(csv_output)
-
-    # Write header
-    writer.writerow([
-        'Parameter Index', 'Name', 'Data Type', 'Access Rights',
-        'Default Value', 'Min Value', 'Max Value', 'Unit', 'Description'
-    ])
-
-    # Write parameters
-    for param in parameters:
-        writer.writerow(param)
+    safe_name = (device['product_name'] or 'device').replace(' ', '_')
+    return _export_response(chunks, f"{safe_name}_parameters.csv", "text/csv", compress)
 
-    csv_output.seek(0)
 
-    safe_name = product_name.replace(' ', '_')
-
-    return StreamingResponse(
-        iter([csv_output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={safe_name}_parameters.csv"}
-    )
-
-
-@router.get("/eds/{eds_id}/json", response_class=FileResponse)
-async def export_eds_config_json(eds_id: int):
+@router.get("/eds/{eds_id}/json", response_class=StreamingResponse)
+async def export_eds_config_json(eds_id: int, compress: bool = False):
     """
     Export EDS device configuration as JSON
 
@@ -180,263 +168,175 @@ async def export_eds_config_json(eds_id: int):
     - Assemblies
     - Connections
     - Capacity information
-    """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
 
-    # Get EDS file info
-    cursor.execute("""
-        SELECT id, vendor_code, vendor_name, product_code, product_type,
-               product_name, catalog_number, major_revision, minor_revision,
-               description, home_url
-        FROM eds_files
-        WHERE id = ?
-    """, (eds_id,))
-
-    eds_row = cursor.fetchone()
-    if not eds_row:
-        conn.close()
+    Args:
+        eds_id: EDS file ID
+        compress: Gzip the file on the fly (.json.gz)
+    """
+    eds_info = _fetch_one(EDS_DEVICE_QUERY, (eds_id,))
+    if not eds_info:
         raise HTTPException(status_code=404, detail="EDS file not found")
 
-    eds_info = dict(eds_row)
-
-    # Get parameters
-    cursor.execute("""
-        SELECT param_number, param_name, data_type, access, default_value,
-               min_value, max_value, units, description, help_string_1,
-               help_string_2, help_string_3, enum_values
-        FROM eds_parameters
-        WHERE eds_file_id = ?
-        ORDER BY param_number
-    """, (eds_id,))
-
-    parameters = [dict(row) for row in cursor.fetchall()]
-
-    # Get assemblies
-    cursor.execute("""
-        SELECT assembly_number, assembly_name, assembly_type, description,
-               size, path, input_size, output_size, config_size
-        FROM eds_assemblies
-        WHERE eds_file_id = ?
-        ORDER BY assembly_number
-    """, (eds_id,))
-
-    assemblies = [dict(row) for row in cursor.fetchall()]
-
-    # Get connections
-    cursor.execute("""
-        SELECT connection_number, connection_name, connection_type,
-               trigger_config, transport_class, produced_size, consumed_size,
-               description
-        FROM eds_connections
-        WHERE eds_file_id = ?
-        ORDER BY connection_number
-    """, (eds_id,))
-
-    connections = [dict(row) for row in cursor.fetchall()]
-
-    # Get capacity info
-    cursor.execute("""
-        SELECT max_cip_connections, max_consumed_size, max_produced_size,
-               max_nodes_per_msg, max_assembly_object, max_class3_connections
-        FROM eds_capacity
-        WHERE eds_file_id = ?
-    """, (eds_id,))
-
-    capacity_row = cursor.fetchone()
-    capacity = dict(capacity_row) if capacity_row else {}
-
-    conn.close()
-
-    # Build configuration object
-    config = {
-        "device": eds_info,
-        "parameters": parameters,
-        "assemblies": assemblies,
-        "connections": connections,
-        "capacity": capacity,
-        "export_format": "EDS Configuration Export v1.0"
-    }
-
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp_file:
-        json.dump(config, tmp_file, indent=2)
-        tmp_path = tmp_file.name
-
-    safe_name = eds_info.get('product_name', 'device').replace(' ', '_')
-
-    # Return file with background task to clean up temp file after response
-    return FileResponse(
-        path=tmp_path,
-        media_type="application/json",
-        filename=f"{safe_name}_config.json",
-        background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
-    )
+    def document(conn):
+        yield "device", eds_info
+        yield "parameters", _rows(conn, """
+            SELECT param_number, param_name, data_type, data_size, descriptor, default_value,
+                   min_value, max_value, units, description, help_string_1,
+                   help_string_2, help_string_3, enum_values
+            FROM eds_parameters
+            WHERE eds_file_id = ?
+            ORDER BY param_number
+        """, (eds_id,))
+        yield "assemblies", _rows(conn, """
+            SELECT assembly_number, assembly_name, assembly_type, help_string AS description,
+                   size, path, is_variable
+            FROM eds_assemblies
+            WHERE eds_file_id = ?
+            ORDER BY assembly_number
+        """, (eds_id,))
+        yield "connections", _rows(conn, """
+            SELECT connection_number, connection_name, trigger_transport,
+                   connection_params, output_assembly, input_assembly,
+                   o_to_t_params, t_to_o_params, path, help_string AS description
+            FROM eds_connections
+            WHERE eds_file_id = ?
+            ORDER BY connection_number
+        """, (eds_id,))
+        capacity_row = conn.execute("""
+            SELECT max_msg_connections, max_io_producers, max_io_consumers,
+                   max_cx_per_config_tool
+            FROM eds_capacity
+            WHERE eds_file_id = ?
+        """, (eds_id,)).fetchone()
+        yield "capacity", dict(capacity_row) if capacity_row else {}
+        yield "export_format", "EDS Configuration Export v1.0"
+
+    safe_name = (eds_info.get('product_name') or 'device').replace(' ', '_')
+    return _export_response(_stream_json(document), f"{safe_name}_config.json", "application/json", compress)
 
 
 @router.get("/eds/{eds_id}/csv", response_class=StreamingResponse)
-async def export_eds_config_csv(eds_id: int):
+async def export_eds_config_csv(eds_id: int, compress: bool = False):
     """Export EDS device parameters as CSV"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Get EDS info
-    cursor.execute("SELECT product_name FROM eds_files WHERE id = ?", (eds_id,))
-    eds = cursor.fetchone()
+    eds = _fetch_one("SELECT product_name FROM eds_files WHERE id = ?", (eds_id,))
     if not eds:
-        conn.close()
         raise HTTPException(status_code=404, detail="EDS file not found")
 
-    product_name = eds[0]
-
-    # Get parameters
-    cursor.execute("""
-        SELECT param_number, param_name, data_type, access, default_value,
+    chunks = _stream_csv([
+        'Parameter Number', 'Name', 'Data Type', 'Descriptor',
+        'Default Value', 'Min Value', 'Max Value', 'Units', 'Description'
+    ], """
+        SELECT param_number, param_name, data_type, descriptor, default_value,
                min_value, max_value, units, description
         FROM eds_parameters
         WHERE eds_file_id = ?
         ORDER BY param_number
     """, (eds_id,))
 
-    parameters = cursor.fetchall()
-    conn.close()
-
-    # Create CSV
-    csv_output = io.StringIO()
-    writer = csv.writer(csv_output)
-
-    # Write header
-    writer.writerow([
-        'Parameter Number', 'Name', 'Data Type', 'Access',
-        'Default Value', 'Min Value', 'Max Value', 'Units', 'Description'
-    ])
+    safe_name = (eds['product_name'] or 'device').replace(' ', '_')
+    return _export_response(chunks, f"{safe_name}_parameters.csv", "text/csv", compress)
 
-    # Write parameters
-    for param in parameters:
-        writer.writerow(param)
 
-    csv_output.seek(0)
+# Batch export queries per device type: (table, device query, parameter query)
+BATCH_QUERIES = {
+    "IODD": ("devices", IODD_DEVICE_QUERY, """
+        SELECT param_index, name, data_type, default_value,
+               min_value, max_value, unit
+        FROM parameters
+        WHERE device_id = ?
+        ORDER BY param_index
+    """),
+    "EDS": ("eds_files", """
+        SELECT id, vendor_name, product_name, product_code,
+               major_revision, minor_revision, description
+        FROM eds_files
+        WHERE id = ?
+    """, """
+        SELECT param_number, param_name, data_type, default_value,
+               min_value, max_value, units
+        FROM eds_parameters
+        WHERE eds_file_id = ?
+        ORDER BY param_number
+    """),
+}
 
-    safe_name = product_name.replace(' ', '_')
 
-    return StreamingResponse(
-        iter([csv_output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={safe_name}_parameters.csv"}
-    )
+def _existing_ids(table: str, ids: List[int]) -> set:
+    """Requested ids present in table"""
+    unique_ids = sorted(set(ids))
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        found = set()
+        for start in range(0, len(unique_ids), MAX_IN_PARAMETERS):
+            chunk = unique_ids[start:start + MAX_IN_PARAMETERS]
+            found.update(row[0] for row in conn.execute(
+                f"SELECT id FROM {table} WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ))
+        return found
+    finally:
+        conn.close()
 
 
-@router.get("/batch/json", response_class=FileResponse)
+@router.get("/batch/json", response_class=StreamingResponse)
 async def export_batch_configs_json(
     device_type: str = Query(..., description="Device type: IODD or EDS"),
-    device_ids: str = Query(..., description="Comma-separated device IDs")
+    device_ids: str = Query(..., description="Comma-separated device IDs"),
+    compress: bool = False
 ):
     """
     Export multiple device configurations as a single JSON file
 
+    Devices are read and written one at a time, so memory use does not grow
+    with the number of devices.
+
     Args:
         device_type: Either "IODD" or "EDS"
         device_ids: Comma-separated list of device IDs (e.g., "1,2,3")
+        compress: Gzip the file on the fly
     """
     ids = [int(id.strip()) for id in device_ids.split(',')]
 
     if len(ids) == 0:
         raise HTTPException(status_code=400, detail="No device IDs provided")
 
-    if len(ids) > 50:
-        raise HTTPException(status_code=400, detail="Maximum 50 devices can be exported at once")
+    max_devices = config.EXPORT_BATCH_MAX_DEVICES
+    if len(ids) > max_devices:
+        raise HTTPException(status_code=400, detail=f"Maximum {max_devices} devices can be exported at once")
 
-    configs = []
-
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    try:
-        for device_id in ids:
-            if device_type.upper() == "IODD":
-                # Get IODD device config
-                cursor.execute("""
-                    SELECT d.*, df.iodd_version
-                    FROM devices d
-                    LEFT JOIN iodd_files df ON d.id = df.device_id
-                    WHERE d.id = ?
-                """, (device_id,))
-
-                device_row = cursor.fetchone()
-                if device_row:
-                    device_info = dict(device_row)
-
-                    # Get parameters
-                    cursor.execute("""
-                        SELECT param_index, name, data_type, default_value,
-                               min_value, max_value, unit
-                        FROM parameters
-                        WHERE device_id = ?
-                        ORDER BY param_index
-                    """, (device_id,))
-
-                    parameters = [dict(row) for row in cursor.fetchall()]
-
-                    configs.append({
-                        "device": device_info,
-                        "parameters": parameters,
-                        "type": "IODD"
-                    })
-
-            elif device_type.upper() == "EDS":
-                # Get EDS device config
-                cursor.execute("""
-                    SELECT id, vendor_name, product_name, product_code,
-                           major_revision, minor_revision, description
-                    FROM eds_files
-                    WHERE id = ?
-                """, (device_id,))
-
-                eds_row = cursor.fetchone()
-                if eds_row:
-                    eds_info = dict(eds_row)
-
-                    # Get parameters
-                    cursor.execute("""
-                        SELECT param_number, param_name, data_type, default_value,
-                               min_value, max_value, units
-                        FROM eds_parameters
-                        WHERE eds_file_id = ?
-                        ORDER BY param_number
-                    """, (device_id,))
-
-                    parameters = [dict(row) for row in cursor.fetchall()]
-
-                    configs.append({
-                        "device": eds_info,
-                        "parameters": parameters,
-                        "type": "EDS"
-                    })
-    finally:
-        conn.close()
+    kind = device_type.upper()
+    if kind not in BATCH_QUERIES:
+        raise HTTPException(status_code=404, detail="No devices found")
 
-    if len(configs) == 0:
+    table, device_query, parameter_query = BATCH_QUERIES[kind]
+    found = _existing_ids(table, ids)
+    export_ids = [device_id for device_id in ids if device_id in found]
+    if len(export_ids) == 0:
         raise HTTPException(status_code=404, detail="No devices found")
 
-    # Build batch export object
-    batch_export = {
-        "devices": configs,
-        "total_count": len(configs),
-        "device_type": device_type.upper(),
-        "export_format": "Batch Configuration Export v1.0"
-    }
-
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp_file:
-        json.dump(batch_export, tmp_file, indent=2)
-        tmp_path = tmp_file.name
-
-    # Return file with background task to clean up temp file after response
-    return FileResponse(
-        path=tmp_path,
-        media_type="application/json",
-        filename=f"batch_export_{device_type.lower()}_{len(configs)}_devices.json",
-        background=lambda: os.unlink(tmp_path) if os.path.exists(tmp_path) else None
+    exported = []
+
+    def device_configs(conn):
+        for device_id in export_ids:
+            device_row = conn.execute(device_query, (device_id,)).fetchone()
+            if device_row is None:
+                # Deleted since the existence check
+                continue
+            exported.append(device_id)
+            yield JSONObject([
+                ("device", dict(device_row)),
+                ("parameters", _rows(conn, parameter_query, (device_id,))),
+                ("type", kind),
+            ])
+
+    def document(conn):
+        yield "devices", JSONArray(device_configs(conn))
+        yield "total_count", len(exported)
+        yield "device_type", kind
+        yield "export_format", "Batch Configuration Export v1.0"
+
+    return _export_response(
+        _stream_json(document),
+        f"batch_export_{device_type.lower()}_{len(export_ids)}_devices.json",
+        "application/json",
+        compress
     )
@@ -3,25 +3,31 @@ EDS (Electronic Data Sheet) API Routes
 Endpoints for managing EDS files for EtherNet/IP devices
 """
 
-import io
 import json
 import logging
 import os
 import re
 import sqlite3
 import tempfile
-import zipfile
 from datetime import datetime
 
 from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from src.database import get_db_path
-from src.parsers.eds_diagnostics import Severity
 from src.parsers.eds_package_parser import EDSPackageParser
-from src.parsers.eds_parser import parse_eds_file, EDSParser
-from src.parsers.eds_advanced_sections import EDSAdvancedSectionsParser
+from src.parsers.eds_parser import parse_eds_file
+from src.parsers.eds_section_index import save_section_index
+from src.storage.eds import save_eds_details
+from src.utils.cascade_delete import eds_file_plan
+from src.utils.eds_device_index import (
+    FILE_FEATURES_SELECT, device_keys, ensure_device_index, refresh_device_index, refreshing_device_index,
+    variant_info
+)
 from src.utils.pqa_orchestrator import UnifiedPQAOrchestrator, FileType
+from src.utils.streaming_export import open_export_connection
+from src.utils.streaming_zip import ZipEntry, iter_zip
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -81,7 +87,7 @@ async def upload_eds_file(background_tasks: BackgroundTasks, file: UploadFile =
         eds_content = content.decode('utf-8')
 
         # Parse EDS file with diagnostics
-        parsed_data, diagnostics = parse_eds_file(eds_content, file_path=file.filename)
+        parsed_data, diagnostics = parse_eds_file(eds_content, file_path=file.filename, advanced_sections=True)
 
         device_info = parsed_data['device']
         file_info = parsed_data['file_info']
@@ -145,287 +151,18 @@ async def upload_eds_file(background_tasks: BackgroundTasks, file: UploadFile =
 
         eds_id = cursor.lastrowid
 
-        # Store diagnostics summary counts
-        diag_counts = {
-            'info': sum(1 for d in diagnostics.diagnostics if d.severity == Severity.INFO),
-            'warn': sum(1 for d in diagnostics.diagnostics if d.severity == Severity.WARN),
-            'error': sum(1 for d in diagnostics.diagnostics if d.severity == Severity.ERROR),
-            'fatal': sum(1 for d in diagnostics.diagnostics if d.severity == Severity.FATAL)
-        }
-        has_issues = diagnostics.has_errors() or diag_counts['warn'] > 0
-
-        cursor.execute("""
-            UPDATE eds_files
-            SET diagnostic_info_count = ?,
-                diagnostic_warn_count = ?,
-                diagnostic_error_count = ?,
-                diagnostic_fatal_count = ?,
-                has_parsing_issues = ?
-            WHERE id = ?
-        """, (
-            diag_counts['info'],
-            diag_counts['warn'],
-            diag_counts['error'],
-            diag_counts['fatal'],
-            has_issues,
-            eds_id
-        ))
-
-        # Store individual diagnostics
-        for diag in diagnostics.diagnostics:
-            cursor.execute("""
-                INSERT INTO eds_diagnostics (
-                    eds_file_id, severity, code, message,
-                    section, line, column, context, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                diag.severity.value,
-                diag.code,
-                diag.message,
-                diag.location.section if diag.location else None,
-                diag.location.line if diag.location else None,
-                diag.location.column if diag.location else None,
-                diag.context,
-                datetime.now().isoformat()
-            ))
-
-        # Insert parameters with all fields including enum_values
-        for param in parsed_data.get('parameters', []):
-            cursor.execute("""
-                INSERT INTO eds_parameters (
-                    eds_file_id, param_number, param_name, data_type,
-                    data_size, default_value, min_value, max_value,
-                    description, link_path_size, link_path, descriptor,
-                    help_string_1, help_string_2, help_string_3, enum_values,
-                    units, scaling_multiplier, scaling_divisor, scaling_base, scaling_offset,
-                    link_scaling_multiplier, link_scaling_divisor, link_scaling_base, link_scaling_offset,
-                    decimal_places
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                param.get('param_number'),
-                param.get('param_name'),
-                param.get('data_type'),
-                param.get('data_size'),
-                param.get('default_value'),
-                param.get('min_value'),
-                param.get('max_value'),
-                param.get('help_string_1', ''),  # Use first help string as description
-                param.get('link_path_size'),
-                param.get('link_path'),
-                param.get('descriptor'),
-                param.get('help_string_1'),
-                param.get('help_string_2'),
-                param.get('help_string_3'),
-                param.get('enum_values'),  # JSON string or None
-                param.get('units'),
-                param.get('scaling_multiplier'),
-                param.get('scaling_divisor'),
-                param.get('scaling_base'),
-                param.get('scaling_offset'),
-                param.get('link_scaling_multiplier'),
-                param.get('link_scaling_divisor'),
-                param.get('link_scaling_base'),
-                param.get('link_scaling_offset'),
-                param.get('decimal_places')
-            ))
+        # Tokenize sections once so PQA reconstruction/diffing can reuse them
+        save_section_index(cursor, eds_id, eds_content)
 
-            # Get the inserted parameter ID for enum linking
-            parameter_id = cursor.lastrowid
-
-            # Insert enum values into eds_enum_values table
-            enum_values_json = param.get('enum_values')
-            if enum_values_json:
-                try:
-                    enum_values = json.loads(enum_values_json)
-                    # enum_values is a list of dicts: [{"value": 0, "label": "...", "is_default": True}, ...]
-                    for enum_entry in enum_values:
-                        cursor.execute("""
-                            INSERT INTO eds_enum_values (
-                                parameter_id, enum_name, enum_value, enum_display, is_default
-                            ) VALUES (?, ?, ?, ?, ?)
-                        """, (
-                            parameter_id,
-                            f"Enum{param.get('param_number')}",  # e.g., "Enum1", "Enum2"
-                            enum_entry.get('value'),
-                            enum_entry.get('label'),
-                            1 if enum_entry.get('is_default') else 0
-                        ))
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.warning(f"Failed to parse enum values for param {param.get('param_number')}: {e}")
-
-        # Insert connections with all fields
-        for conn_info in parsed_data.get('connections', []):
-            cursor.execute("""
-                INSERT INTO eds_connections (
-                    eds_file_id, connection_number, connection_name,
-                    trigger_transport, connection_params,
-                    output_assembly, input_assembly, help_string,
-                    o_to_t_params, t_to_o_params, config_part1, config_part2,
-                    path, trigger_transport_comment, connection_params_comment
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                conn_info.get('connection_number'),
-                conn_info.get('connection_name'),
-                conn_info.get('trigger_transport'),
-                conn_info.get('connection_params'),
-                conn_info.get('o_to_t_params'),  # Output assembly
-                conn_info.get('t_to_o_params'),  # Input assembly
-                conn_info.get('help_string'),
-                conn_info.get('o_to_t_params'),
-                conn_info.get('t_to_o_params'),
-                conn_info.get('config_part1'),
-                conn_info.get('config_part2'),
-                conn_info.get('path'),
-                conn_info.get('trigger_transport_comment'),
-                conn_info.get('connection_params_comment')
-            ))
-
-        # Insert assemblies
-        assemblies = parsed_data.get('assemblies', {})
-
-        # Insert fixed assemblies
-        for assembly in assemblies.get('fixed', []):
-            cursor.execute("""
-                INSERT INTO eds_assemblies (
-                    eds_file_id, assembly_number, assembly_name, assembly_type,
-                    unknown_field1, size, unknown_field2, path,
-                    help_string, is_variable
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                assembly.get('assembly_number'),
-                assembly.get('assembly_name'),
-                assembly.get('assembly_type'),
-                assembly.get('unknown_field1'),
-                assembly.get('size'),
-                assembly.get('unknown_field2'),
-                assembly.get('path'),
-                assembly.get('help_string'),
-                assembly.get('is_variable', False)
-            ))
-
-        # Insert variable assemblies
-        for var_assembly in assemblies.get('variable', []):
-            cursor.execute("""
-                INSERT INTO eds_variable_assemblies (
-                    eds_file_id, assembly_name, assembly_number,
-                    unknown_value1, max_size, description
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                var_assembly.get('assembly_name'),
-                var_assembly.get('assembly_number'),
-                var_assembly.get('unknown_value1'),
-                var_assembly.get('max_size'),
-                var_assembly.get('description')
-            ))
-
-        # Insert ports
-        for port in parsed_data.get('ports', []):
-            cursor.execute("""
-                INSERT INTO eds_ports (
-                    eds_file_id, port_number, port_type, port_name,
-                    port_path, link_number
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                port.get('port_number'),
-                port.get('port_type'),
-                port.get('port_name'),
-                port.get('port_path'),
-                port.get('link_number')
-            ))
-
-        # Insert modules
-        for module in parsed_data.get('modules', []):
-            cursor.execute("""
-                INSERT INTO eds_modules (
-                    eds_file_id, module_number, module_name, device_type,
-                    catalog_number, major_revision, minor_revision,
-                    config_size, config_data, input_size, output_size,
-                    module_description, slot_number, module_class,
-                    vendor_code, product_code, raw_definition
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                module.get('module_number'),
-                module.get('module_name'),
-                module.get('device_type'),
-                module.get('catalog_number'),
-                module.get('major_revision'),
-                module.get('minor_revision'),
-                module.get('config_size'),
-                module.get('config_data'),
-                module.get('input_size'),
-                module.get('output_size'),
-                module.get('module_description'),
-                module.get('slot_number'),
-                module.get('module_class'),
-                module.get('vendor_code'),
-                module.get('product_code'),
-                module.get('raw_definition')
-            ))
-
-        # Insert groups
-        for group in parsed_data.get('groups', []):
-            cursor.execute("""
-                INSERT INTO eds_groups (
-                    eds_file_id, group_number, group_name,
-                    parameter_count, parameter_list
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                group.get('group_number'),
-                group.get('group_name'),
-                group.get('parameter_count'),
-                group.get('parameter_list')
-            ))
-
-        # Insert capacity
-        capacity = parsed_data.get('capacity', {})
-        if capacity:
-            # Log diagnostic information about capacity data
-            if capacity.get('unrecognized_fields'):
-                logger.warning(f"EDS {file_path}: Unrecognized capacity fields: {capacity['unrecognized_fields']}")
-            if capacity.get('max_io_connections') and not capacity.get('max_io_producers'):
-                logger.info(f"EDS {file_path}: Using MaxIOConnections ({capacity['max_io_connections']}) for producers/consumers")
-
-            cursor.execute("""
-                INSERT INTO eds_capacity (
-                    eds_file_id, max_msg_connections, max_io_producers,
-                    max_io_consumers, max_cx_per_config_tool
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                eds_id,
-                capacity.get('max_msg_connections'),
-                capacity.get('max_io_producers'),
-                capacity.get('max_io_consumers'),
-                capacity.get('max_cx_per_config_tool')
-            ))
-
-            # Insert TSpecs
-            for tspec in capacity.get('tspecs', []):
-                cursor.execute("""
-                    INSERT INTO eds_tspecs (
-                        eds_file_id, tspec_name, direction, data_size, rate
-                    ) VALUES (?, ?, ?, ?, ?)
-                """, (
-                    eds_id,
-                    tspec.get('tspec_name'),
-                    tspec.get('direction'),
-                    tspec.get('data_size'),
-                    tspec.get('rate')
-                ))
+        # Store diagnostics, parameters/enums, connections, assemblies, ports,
+        # modules, groups and capacity with one bulk insert per table
+        save_eds_details(cursor, eds_id, parsed_data, diagnostics)
+        refresh_device_index(cursor, [(device_info.get('vendor_code'), device_info.get('product_code'))])
 
         # Parse and store advanced sections (DLR, TCP/IP, Ethernet, QoS, LLDP, metadata)
         try:
-            # Create EDSParser instance to get sections
-            eds_parser_instance = EDSParser(eds_content)
-            advanced_parser = EDSAdvancedSectionsParser(eds_parser_instance.sections)
-            advanced_data = advanced_parser.parse_all_advanced_sections()
+            # Parsed from the same token stream as the rest of the file
+            advanced_data = parsed_data['advanced_sections']
 
             # Store DLR configuration
             if advanced_data.get('dlr_config'):
@@ -705,43 +442,41 @@ def detect_eds_variant_features(cursor, eds_file_id: int) -> dict:
     Returns:
         dict with variant_label, assembly_count, and feature_flags
     """
-    # Get assembly count and specific feature assemblies
-    cursor.execute("""
-        SELECT assembly_number, assembly_name
-        FROM eds_assemblies
-        WHERE eds_file_id = ?
+    cursor.execute(f"""
+        SELECT {FILE_FEATURES_SELECT}
+        FROM eds_files f
+        LEFT JOIN eds_assemblies a ON a.eds_file_id = f.id
+        WHERE f.id = ?
+        GROUP BY f.id
     """, (eds_file_id,))
+    row = cursor.fetchone()
+    return variant_info(*row) if row else variant_info(0)
 
-    assemblies = cursor.fetchall()
-    assembly_count = len(assemblies)
-    assembly_numbers = {row[0] for row in assemblies}
-
-    # Detect specific features
-    features = []
-    has_opcua = 210 in assembly_numbers
-    has_mqtt = 211 in assembly_numbers
-    has_json = 213 in assembly_numbers
-
-    if has_opcua:
-        features.append("OPC-UA")
-    if has_mqtt:
-        features.append("MQTT")
-    if has_json:
-        features.append("JSON")
-
-    # Determine variant label
-    if features:
-        variant_label = "Extended"
-        feature_set = ", ".join(features)
-    else:
-        variant_label = "Standard"
-        feature_set = "Basic"
 
+def _index_row_to_listing(row: sqlite3.Row) -> dict:
+    """Grouped listing entry from an eds_device_index row"""
     return {
-        "variant_label": variant_label,
-        "assembly_count": assembly_count,
-        "features": features,
-        "feature_set": feature_set
+        "id": row["eds_file_id"],
+        "vendor_code": row["vendor_code"],
+        "vendor_name": row["vendor_name"],
+        "product_code": row["product_code"],
+        "product_type": row["product_type"],
+        "product_type_str": row["product_type_str"],
+        "product_name": row["product_name"],
+        "catalog_number": row["catalog_number"],
+        "major_revision": row["major_revision"],
+        "minor_revision": row["minor_revision"],
+        "description": row["description"],
+        "import_date": row["import_date"],
+        "home_url": row["home_url"],
+        "diagnostics": {
+            "info_count": row["diagnostic_info_count"] or 0,
+            "warn_count": row["diagnostic_warn_count"] or 0,
+            "error_count": row["diagnostic_error_count"] or 0,
+            "fatal_count": row["diagnostic_fatal_count"] or 0,
+            "has_issues": bool(row["has_parsing_issues"])
+        },
+        **variant_info(row["assembly_count"], row["has_opcua"], row["has_mqtt"], row["has_json"])
     }
 
 
@@ -755,77 +490,22 @@ async def list_eds_files_grouped():
         List of EDS file information with revision_count and variant information
     """
     conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-
-    # Use window functions to get latest revision per device
-    cursor.execute("""
-        WITH ranked AS (
-            SELECT
-                id, vendor_code, vendor_name, product_code, product_type,
-                product_type_str, product_name, catalog_number,
-                major_revision, minor_revision, description,
-                import_date, home_url,
-                diagnostic_info_count, diagnostic_warn_count,
-                diagnostic_error_count, diagnostic_fatal_count,
-                has_parsing_issues,
-                ROW_NUMBER() OVER (
-                    PARTITION BY vendor_code, product_code
-                    ORDER BY major_revision DESC, minor_revision DESC, import_date DESC
-                ) as rn,
-                COUNT(*) OVER (
-                    PARTITION BY vendor_code, product_code
-                ) as revision_count
-            FROM eds_files
-        )
-        SELECT
-            id, vendor_code, vendor_name, product_code, product_type,
-            product_type_str, product_name, catalog_number,
-            major_revision, minor_revision, description,
-            import_date, home_url,
-            diagnostic_info_count, diagnostic_warn_count,
-            diagnostic_error_count, diagnostic_fatal_count,
-            has_parsing_issues, revision_count
-        FROM ranked
-        WHERE rn = 1
-        ORDER BY vendor_name, product_name
-    """)
+    conn.row_factory = sqlite3.Row
+    try:
+        ensure_device_index(conn)
+        rows = conn.execute("""
+            SELECT * FROM eds_device_index
+            WHERE is_latest_revision = 1
+            ORDER BY vendor_name, product_name, vendor_code, product_code
+        """).fetchall()
+    finally:
+        conn.close()
 
     eds_files = []
-    for row in cursor.fetchall():
-        eds_id = row[0]
-
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
-
-        eds_files.append({
-            "id": eds_id,
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_type": row[4],
-            "product_type_str": row[5],
-            "product_name": row[6],
-            "catalog_number": row[7],
-            "major_revision": row[8],
-            "minor_revision": row[9],
-            "description": row[10],
-            "import_date": row[11],
-            "home_url": row[12],
-            "diagnostics": {
-                "info_count": row[13] or 0,
-                "warn_count": row[14] or 0,
-                "error_count": row[15] or 0,
-                "fatal_count": row[16] or 0,
-                "has_issues": bool(row[17])
-            },
-            "revision_count": row[18],  # Number of revisions for this device
-            "variant_label": variant_info["variant_label"],
-            "assembly_count": variant_info["assembly_count"],
-            "features": variant_info["features"],
-            "feature_set": variant_info["feature_set"]
-        })
-
-    conn.close()
+    for row in rows:
+        entry = _index_row_to_listing(row)
+        entry["revision_count"] = row["revision_count"]  # Number of revisions for this device
+        eds_files.append(entry)
     return eds_files
 
 
@@ -839,75 +519,18 @@ async def list_eds_files_by_variant():
         List of EDS file information with all unique variants
     """
     conn = sqlite3.connect(get_db_path())
-    cursor = conn.cursor()
-
-    # Get one representative per unique variant (grouped by vendor, product, revision, and assembly count)
-    cursor.execute("""
-        WITH ranked AS (
-            SELECT
-                id, vendor_code, vendor_name, product_code, product_type,
-                product_type_str, product_name, catalog_number,
-                major_revision, minor_revision, description,
-                import_date, home_url,
-                diagnostic_info_count, diagnostic_warn_count,
-                diagnostic_error_count, diagnostic_fatal_count,
-                has_parsing_issues,
-                ROW_NUMBER() OVER (
-                    PARTITION BY vendor_code, product_code, major_revision, minor_revision,
-                                 (SELECT COUNT(*) FROM eds_assemblies WHERE eds_file_id = eds_files.id)
-                    ORDER BY import_date DESC
-                ) as rn
-            FROM eds_files
-        )
-        SELECT
-            id, vendor_code, vendor_name, product_code, product_type,
-            product_type_str, product_name, catalog_number,
-            major_revision, minor_revision, description,
-            import_date, home_url,
-            diagnostic_info_count, diagnostic_warn_count,
-            diagnostic_error_count, diagnostic_fatal_count,
-            has_parsing_issues
-        FROM ranked
-        WHERE rn = 1
-        ORDER BY vendor_name, product_name, major_revision DESC, minor_revision DESC
-    """)
-
-    eds_files = []
-    for row in cursor.fetchall():
-        eds_id = row[0]
-
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
-
-        eds_files.append({
-            "id": eds_id,
-            "vendor_code": row[1],
-            "vendor_name": row[2],
-            "product_code": row[3],
-            "product_type": row[4],
-            "product_type_str": row[5],
-            "product_name": row[6],
-            "catalog_number": row[7],
-            "major_revision": row[8],
-            "minor_revision": row[9],
-            "description": row[10],
-            "import_date": row[11],
-            "home_url": row[12],
-            "diagnostics": {
-                "info_count": row[13] or 0,
-                "warn_count": row[14] or 0,
-                "error_count": row[15] or 0,
-                "fatal_count": row[16] or 0,
-                "has_issues": bool(row[17])
-            },
-            "variant_label": variant_info["variant_label"],
-            "assembly_count": variant_info["assembly_count"],
-            "features": variant_info["features"],
-            "feature_set": variant_info["feature_set"]
-        })
+    conn.row_factory = sqlite3.Row
+    try:
+        ensure_device_index(conn)
+        rows = conn.execute("""
+            SELECT * FROM eds_device_index
+            ORDER BY vendor_name, product_name, major_revision DESC, minor_revision DESC,
+                     vendor_code, product_code, assembly_count
+        """).fetchall()
+    finally:
+        conn.close()
 
-    conn.close()
-    return eds_files
+    return [_index_row_to_listing(row) for row in rows]
 
 
 @router.get("/device/{vendor_code}/{product_code}/revisions")
@@ -926,25 +549,24 @@ async def get_device_revisions(vendor_code: int, product_code: int):
     conn = sqlite3.connect(get_db_path())
     cursor = conn.cursor()
 
-    cursor.execute("""
+    # Variant features of every revision in the same query
+    cursor.execute(f"""
         SELECT
-            id, vendor_code, vendor_name, product_code, product_name,
-            catalog_number, major_revision, minor_revision,
-            import_date, description, mod_date, mod_time
-        FROM eds_files
-        WHERE vendor_code = ? AND product_code = ?
-        ORDER BY major_revision DESC, minor_revision DESC, import_date DESC
+            f.id, f.vendor_code, f.vendor_name, f.product_code, f.product_name,
+            f.catalog_number, f.major_revision, f.minor_revision,
+            f.import_date, f.description, f.mod_date, f.mod_time,
+            {FILE_FEATURES_SELECT}
+        FROM eds_files f
+        LEFT JOIN eds_assemblies a ON a.eds_file_id = f.id
+        WHERE f.vendor_code = ? AND f.product_code = ?
+        GROUP BY f.id
+        ORDER BY f.major_revision DESC, f.minor_revision DESC, f.import_date DESC
     """, (vendor_code, product_code))
 
     revisions = []
     for row in cursor.fetchall():
-        eds_id = row[0]
-
-        # Detect variant features
-        variant_info = detect_eds_variant_features(cursor, eds_id)
-
         revisions.append({
-            "id": eds_id,
+            "id": row[0],
             "vendor_code": row[1],
             "vendor_name": row[2],
             "product_code": row[3],
@@ -957,10 +579,7 @@ async def get_device_revisions(vendor_code: int, product_code: int):
             "mod_date": row[10],
             "mod_time": row[11],
             "revision_string": f"v{row[6]}.{row[7]}",
-            "variant_label": variant_info["variant_label"],
-            "assembly_count": variant_info["assembly_count"],
-            "features": variant_info["features"],
-            "feature_set": variant_info["feature_set"]
+            **variant_info(*row[12:])
         })
 
     conn.close()
@@ -1268,41 +887,38 @@ async def export_eds_zip(eds_id: int):
         - Icon file (if available)
         - Metadata JSON
     """
-    from fastapi.responses import Response
-
-    conn = sqlite3.connect(get_db_path())
+    db_path = get_db_path()
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    # Get EDS file data
+    # Get EDS file metadata; the EDS text and icon are streamed into the ZIP
     cursor.execute("""
         SELECT vendor_name, product_name, product_code, major_revision, minor_revision,
-               eds_content, icon_filename, icon_data, catalog_number
+               icon_filename, icon_data IS NOT NULL, length(icon_data), catalog_number
         FROM eds_files WHERE id = ?
     """, (eds_id,))
 
     row = cursor.fetchone()
+    conn.close()
     if not row:
-        conn.close()
         raise HTTPException(status_code=404, detail="EDS file not found")
 
-    vendor, product, code, maj_rev, min_rev, eds_content, icon_name, icon_data, catalog = row
+    vendor, product, code, maj_rev, min_rev, icon_name, has_icon, icon_size, catalog = row
 
     # Create safe filename
     safe_vendor = re.sub(r'[^\w\s-]', '', vendor or 'Unknown').replace(' ', '_')
     safe_product = re.sub(r'[^\w\s-]', '', product or 'Unknown').replace(' ', '_')
     zip_filename = f"{safe_vendor}_{safe_product}_{code}_v{maj_rev}.{min_rev}.zip"
 
-    # Create ZIP in memory
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+    def entries(blob_conn):
         # Add EDS file
-        eds_filename = f"{catalog or product}.eds"
-        zip_file.writestr(eds_filename, eds_content.encode('utf-8'))
+        yield ZipEntry.from_blob(blob_conn, 'eds_files', 'eds_content', eds_id, f"{catalog or product}.eds")
 
         # Add icon if available
-        if icon_data:
+        if has_icon and icon_size:
             icon_ext = icon_name.split('.')[-1] if icon_name else 'ico'
-            zip_file.writestr(f"{catalog or product}.{icon_ext}", icon_data)
+            yield ZipEntry.from_blob(blob_conn, 'eds_files', 'icon_data', eds_id,
+                                     f"{catalog or product}.{icon_ext}", icon_size)
 
         # Add metadata JSON
         metadata = {
@@ -1314,14 +930,17 @@ async def export_eds_zip(eds_id: int):
             'catalog_number': catalog,
             'export_date': datetime.now().isoformat()
         }
-        zip_file.writestr('metadata.json', json.dumps(metadata, indent=2))
+        yield ZipEntry.from_bytes('metadata.json', json.dumps(metadata, indent=2))
 
-    conn.close()
+    def zip_chunks():
+        blob_conn = open_export_connection(db_path)
+        try:
+            yield from iter_zip(entries(blob_conn))
+        finally:
+            blob_conn.close()
 
-    # Return ZIP file
-    zip_buffer.seek(0)
     return StreamingResponse(
-        zip_buffer,
+        zip_chunks(),
         media_type="application/zip",
         headers={
             "Content-Disposition": f"attachment; filename={zip_filename}"
@@ -1341,34 +960,13 @@ async def delete_eds_file(eds_id: int):
         Success message
     """
     conn = sqlite3.connect(get_db_path())
-    # Enable foreign keys for this connection
-    conn.execute("PRAGMA foreign_keys = ON")
-    cursor = conn.cursor()
-
-    # Check if EDS exists
-    cursor.execute("SELECT id FROM eds_files WHERE id = ?", (eds_id,))
-    if not cursor.fetchone():
+    try:
+        plan = eds_file_plan(conn.cursor())
+        if not plan.existing_ids(conn.cursor(), [eds_id]):
+            raise HTTPException(status_code=404, detail="EDS file not found")
+        plan.delete(conn, [eds_id], hooks=[refreshing_device_index])
+    finally:
         conn.close()
-        raise HTTPException(status_code=404, detail="EDS file not found")
-
-    # Delete all associated data in correct order (child tables first)
-    # This is necessary as a fallback if foreign keys are not enabled
-    cursor.execute("DELETE FROM eds_diagnostics WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_tspecs WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_capacity WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_groups WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_ports WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_modules WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_variable_assemblies WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_assemblies WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_connections WHERE eds_file_id = ?", (eds_id,))
-    cursor.execute("DELETE FROM eds_parameters WHERE eds_file_id = ?", (eds_id,))
-
-    # Finally delete the EDS file itself
-    cursor.execute("DELETE FROM eds_files WHERE id = ?", (eds_id,))
-
-    conn.commit()
-    conn.close()
 
     return {"message": f"EDS file {eds_id} deleted successfully"}
 
@@ -1393,86 +991,40 @@ async def bulk_delete_eds_files(request: dict):
         raise HTTPException(status_code=400, detail="No EDS IDs provided")
 
     conn = sqlite3.connect(get_db_path())
-    # Enable foreign keys for this connection
-    conn.execute("PRAGMA foreign_keys = ON")
     cursor = conn.cursor()
 
     try:
-        # First, get vendor_code and product_code for selected EDS files
-        placeholders_str = ','.join('?' * len(eds_ids))
-        cursor.execute(f"""
-            SELECT DISTINCT vendor_code, product_code
-            FROM eds_files
-            WHERE id IN ({placeholders_str})
-        """, eds_ids)
-
-        device_keys = cursor.fetchall()
-
-        if not device_keys:
-            conn.close()
+        # All revisions of the selected devices (same vendor_code and product_code)
+        devices = device_keys(cursor, eds_ids)
+        if not devices:
             raise HTTPException(status_code=404, detail="No matching EDS files found")
 
-        # Now find ALL IDs (all revisions) for these vendor_code/product_code combinations
         all_ids_to_delete = []
-        for vendor_code, product_code in device_keys:
+        for vendor_code, product_code in devices:
             cursor.execute("""
                 SELECT id FROM eds_files
-                WHERE vendor_code = ? AND product_code = ?
+                WHERE vendor_code IS ? AND product_code IS ?
             """, (vendor_code, product_code))
+            all_ids_to_delete.extend(row[0] for row in cursor.fetchall())
 
-            for row in cursor.fetchall():
-                all_ids_to_delete.append(row[0])
-
-        # Remove duplicates
-        all_ids_to_delete = list(set(all_ids_to_delete))
-
-        if not all_ids_to_delete:
-            conn.close()
-            return {"message": "No EDS files to delete", "deleted_count": 0}
-
-        # Create new placeholders for all IDs
-        all_placeholders = ','.join('?' * len(all_ids_to_delete))
-
-        # List of tables to delete from (in order of dependencies)
-        tables_to_delete = [
-            "eds_diagnostics",
-            "eds_tspecs",
-            "eds_capacity",
-            "eds_groups",
-            "eds_ports",
-            "eds_modules",
-            "eds_variable_assemblies",
-            "eds_assemblies",
-            "eds_connections",
-            "eds_parameters"
-        ]
-
-        # Delete from child tables first
-        for table in tables_to_delete:
-            query = f"DELETE FROM {table} WHERE eds_file_id IN ({all_placeholders})"
-            cursor.execute(query, all_ids_to_delete)
-            print(f"Deleted from {table}: {cursor.rowcount} rows")
-
-        # Finally delete all EDS files (all revisions)
-        cursor.execute(f"DELETE FROM eds_files WHERE id IN ({all_placeholders})", all_ids_to_delete)
-        deleted_count = cursor.rowcount
-
-        # Commit the transaction
-        conn.commit()
-        print(f"Successfully deleted {deleted_count} EDS file(s) including all revisions from database")
+        # Every child table is cleared in chunked, short transactions
+        rows_deleted = eds_file_plan(cursor).delete(conn, all_ids_to_delete, hooks=[refreshing_device_index])
+        deleted_count = rows_deleted.get('eds_files', 0)
+        logger.info(f"Deleted {deleted_count} EDS file(s) including all revisions: {rows_deleted}")
 
     except HTTPException:
-        conn.close()
         raise
     except Exception as e:
-        conn.rollback()
-        conn.close()
-        print(f"Error during bulk delete: {str(e)}")
+        logger.error(f"Error during bulk delete: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to delete EDS files: {str(e)}")
     finally:
         conn.close()
 
-    return {"message": f"Successfully deleted {deleted_count} EDS file(s) and all revisions", "deleted_count": deleted_count}
+    return {
+        "message": f"Successfully deleted {deleted_count} EDS file(s) and all revisions",
+        "deleted_count": deleted_count,
+        "rows_deleted": rows_deleted,
+    }
 
 
 @router.post("/upload-package")
@@ -1503,9 +1055,9 @@ async def upload_eds_package(background_tasks: BackgroundTasks, file: UploadFile
 
         logger.info(f"Parsing EDS package: {file.filename}")
 
-        # Parse package
+        # Parse package off the event loop (the EDS files fan out over worker processes)
         parser = EDSPackageParser(tmp_path)
-        package_data = parser.parse_package()
+        package_data = await run_in_threadpool(parser.parse_package)
 
         logger.info(f"Package parsed successfully: {package_data.get('package_name')}")
 
@@ -1575,6 +1127,7 @@ async def upload_eds_package(background_tasks: BackgroundTasks, file: UploadFile
         imported_count = 0
         skipped_count = 0
         imported_eds_ids = []  # Track IDs for PQA analysis
+        imported_devices = set()  # (vendor_code, product_code) for the device index
 
         for idx, eds_info in enumerate(package_data['eds_files']):
             try:
@@ -1641,166 +1194,16 @@ async def upload_eds_package(background_tasks: BackgroundTasks, file: UploadFile
 
                 eds_id = cursor.lastrowid
 
-                # Insert parameters
-                for param in parsed.get('parameters', []):
-                    cursor.execute("""
-                        INSERT INTO eds_parameters (
-                            eds_file_id, param_number, param_name, data_type,
-                            data_size, default_value, min_value, max_value,
-                            description, link_path_size, link_path, descriptor,
-                            help_string_1, help_string_2, help_string_3, enum_values,
-                            units, scaling_multiplier, scaling_divisor, scaling_base, scaling_offset,
-                            link_scaling_multiplier, link_scaling_divisor, link_scaling_base, link_scaling_offset,
-                            decimal_places
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        eds_id, param.get('param_number'), param.get('param_name'),
-                        param.get('data_type'), param.get('data_size'),
-                        param.get('default_value'), param.get('min_value'), param.get('max_value'),
-                        param.get('help_string_1', ''), param.get('link_path_size'),
-                        param.get('link_path'), param.get('descriptor'),
-                        param.get('help_string_1'), param.get('help_string_2'), param.get('help_string_3'),
-                        param.get('enum_values'),  # JSON string or None
-                        param.get('units'),
-                        param.get('scaling_multiplier'),
-                        param.get('scaling_divisor'),
-                        param.get('scaling_base'),
-                        param.get('scaling_offset'),
-                        param.get('link_scaling_multiplier'),
-                        param.get('link_scaling_divisor'),
-                        param.get('link_scaling_base'),
-                        param.get('link_scaling_offset'),
-                        param.get('decimal_places')
-                    ))
+                # Tokenize sections once so PQA reconstruction/diffing can reuse them
+                save_section_index(cursor, eds_id, parsed['eds_content'])
 
-                    # Get the inserted parameter ID for enum linking
-                    parameter_id = cursor.lastrowid
-
-                    # Insert enum values into eds_enum_values table
-                    enum_values_json = param.get('enum_values')
-                    if enum_values_json:
-                        try:
-                            enum_values = json.loads(enum_values_json)
-                            # enum_values is a list of dicts: [{"value": 0, "label": "...", "is_default": True}, ...]
-                            for enum_entry in enum_values:
-                                cursor.execute("""
-                                    INSERT INTO eds_enum_values (
-                                        parameter_id, enum_name, enum_value, enum_display, is_default
-                                    ) VALUES (?, ?, ?, ?, ?)
-                                """, (
-                                    parameter_id,
-                                    f"Enum{param.get('param_number')}",  # e.g., "Enum1", "Enum2"
-                                    enum_entry.get('value'),
-                                    enum_entry.get('label'),
-                                    1 if enum_entry.get('is_default') else 0
-                                ))
-                        except (json.JSONDecodeError, TypeError) as e:
-                            logger.warning(f"Failed to parse enum values for param {param.get('param_number')}: {e}")
-
-                # Insert connections
-                for conn_info in parsed.get('connections', []):
-                    cursor.execute("""
-                        INSERT INTO eds_connections (
-                            eds_file_id, connection_number, connection_name,
-                            trigger_transport, connection_params,
-                            output_assembly, input_assembly, help_string,
-                            o_to_t_params, t_to_o_params, config_part1, config_part2,
-                            path, trigger_transport_comment, connection_params_comment
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        eds_id, conn_info.get('connection_number'), conn_info.get('connection_name'),
-                        conn_info.get('trigger_transport'), conn_info.get('connection_params'),
-                        conn_info.get('o_to_t_params'), conn_info.get('t_to_o_params'),
-                        conn_info.get('help_string'), conn_info.get('o_to_t_params'),
-                        conn_info.get('t_to_o_params'), conn_info.get('config_part1'),
-                        conn_info.get('config_part2'), conn_info.get('path'),
-                        conn_info.get('trigger_transport_comment'), conn_info.get('connection_params_comment')
-                    ))
-
-                # Insert assemblies
-                assemblies = parsed.get('assemblies', {})
-
-                # Insert fixed assemblies
-                for assembly in assemblies.get('fixed', []):
-                    cursor.execute("""
-                        INSERT INTO eds_assemblies (
-                            eds_file_id, assembly_number, assembly_name, assembly_type,
-                            unknown_field1, size, unknown_field2, path,
-                            help_string, is_variable
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        eds_id,
-                        assembly.get('assembly_number'),
-                        assembly.get('assembly_name'),
-                        assembly.get('assembly_type'),
-                        assembly.get('unknown_field1'),
-                        assembly.get('size'),
-                        assembly.get('unknown_field2'),
-                        assembly.get('path'),
-                        assembly.get('help_string'),
-                        False  # is_variable
-                    ))
-
-                # Insert variable assemblies
-                for assembly in assemblies.get('variable', []):
-                    cursor.execute("""
-                        INSERT INTO eds_variable_assemblies (
-                            eds_file_id, assembly_number, assembly_name,
-                            max_size, unknown_value1, unknown_value2,
-                            description
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        eds_id,
-                        assembly.get('assembly_number'),
-                        assembly.get('assembly_name'),
-                        assembly.get('max_size'),
-                        assembly.get('unknown_value1'),
-                        assembly.get('unknown_value2'),
-                        assembly.get('description')
-                    ))
-
-                # Insert ports
-                for port in parsed.get('ports', []):
-                    cursor.execute("""
-                        INSERT INTO eds_ports (
-                            eds_file_id, port_number, port_type, port_name,
-                            port_path, link_number
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        eds_id, port.get('port_number'), port.get('port_type'),
-                        port.get('port_name'), port.get('port_path'), port.get('link_number')
-                    ))
-
-                # Insert capacity
-                capacity = parsed.get('capacity', {})
-                if capacity:
-                    msg_conn = capacity.get('max_msg_connections')
-                    io_prod = capacity.get('max_io_producers')
-                    io_cons = capacity.get('max_io_consumers')
-                    logger.info(f"Inserting capacity for EDS {eds_id}: msg={msg_conn}, prod={io_prod}, cons={io_cons}")
-                    cursor.execute("""
-                        INSERT INTO eds_capacity (
-                            eds_file_id, max_msg_connections, max_io_producers,
-                            max_io_consumers, max_cx_per_config_tool
-                        ) VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        eds_id, msg_conn, io_prod, io_cons,
-                        capacity.get('max_cx_per_config_tool')
-                    ))
-
-                    # Insert TSpecs
-                    for tspec in capacity.get('tspecs', []):
-                        cursor.execute("""
-                            INSERT INTO eds_tspecs (
-                                eds_file_id, tspec_name, direction, data_size, rate
-                            ) VALUES (?, ?, ?, ?, ?)
-                        """, (
-                            eds_id, tspec.get('tspec_name'), tspec.get('direction'),
-                            tspec.get('data_size'), tspec.get('rate')
-                        ))
+                # Store parameters/enums, connections, assemblies, ports, modules,
+                # groups and capacity with one bulk insert per table
+                save_eds_details(cursor, eds_id, parsed)
 
                 imported_count += 1
                 imported_eds_ids.append(eds_id)  # Track for PQA analysis
+                imported_devices.add((device_info.get('vendor_code'), device_info.get('product_code')))
 
             except Exception as e:
                 logger.error(f"Error importing EDS from package: {e}")
@@ -1819,6 +1222,8 @@ async def upload_eds_package(background_tasks: BackgroundTasks, file: UploadFile
                 metadata['content']
             ))
 
+        refresh_device_index(cursor, imported_devices)
+
         conn.commit()
         conn.close()
 
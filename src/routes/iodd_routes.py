@@ -9,14 +9,19 @@ from pydantic import BaseModel
 
 import sqlite3
 
+from src.utils.cache_warmer import device_view
+from src.utils.text_table import get_device_text_table
+
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/iodd", tags=["IODD"])
 
+DB_PATH = "greenstack.db"
+
 
 # Database helper
 def get_db():
     """Get database connection"""
-    conn = sqlite3.connect("greenstack.db")
+    conn = sqlite3.connect(DB_PATH)
     conn.row_factory = lambda cursor, row: dict(zip([col[0] for col in cursor.description], row))
     return conn
 
@@ -72,9 +77,11 @@ class DeviceMenusResponse(BaseModel):
 
 
 @router.get("/{device_id}/menus", response_model=DeviceMenusResponse)
+@device_view("menus", role=None, lang=None)
 async def get_device_menus(
     device_id: int,
-    role: Optional[str] = Query(None, description="Filter by role: observer, maintenance, or specialist")
+    role: Optional[str] = Query(None, description="Filter by role: observer, maintenance, or specialist"),
+    lang: Optional[str] = Query(None, description="Language of menu names (default: the device's primary language)")
 ):
     """
     Get complete menu structure for an IODD device
@@ -85,6 +92,7 @@ async def get_device_menus(
     Args:
         device_id: IODD device ID
         role: Optional filter by role type
+        lang: Optional language code for menu names
 
     Returns:
         Complete menu structure with resolved text and parameter data
@@ -95,7 +103,7 @@ async def get_device_menus(
 
         # Fetch all menus for this device
         cursor.execute("""
-            SELECT id, menu_id, name FROM ui_menus
+            SELECT id, menu_id, name, name_text_id FROM ui_menus
             WHERE device_id = ?
             ORDER BY menu_id
         """, (device_id,))
@@ -104,19 +112,8 @@ async def get_device_menus(
         if not menus_raw:
             raise HTTPException(status_code=404, detail=f"No menus found for device {device_id}")
 
-        # Helper function to resolve text ID
-        def resolve_text_id(text_value: str, lang: str = 'en') -> str:
-            """Resolve text ID to actual text value"""
-            if not text_value:
-                return text_value
-
-            cursor.execute("""
-                SELECT text_id FROM iodd_text
-                WHERE device_id = ? AND text_value = ? AND language_code = ?
-                LIMIT 1
-            """, (device_id, text_value, lang))
-            result = cursor.fetchone()
-            return text_value  # Return original if not found (it's already the text value)
+        # Menu names are resolved from their textId through the device's text table
+        texts = get_device_text_table(DB_PATH, device_id, conn)
 
         # Build menus with items
         menus = []
@@ -211,7 +208,7 @@ async def get_device_menus(
 
             menus.append(MenuResponse(
                 menu_id=menu_raw['menu_id'],
-                name=menu_raw['name'],
+                name=texts.resolve(menu_raw['name_text_id'], lang) or menu_raw['name'],
                 items=menu_items
             ))
 
@@ -10,11 +10,17 @@ from typing import List, Optional, Dict, Any
 import sqlite3
 import logging
 
+from src import config
 from ..utils.pqa_orchestrator import (
     UnifiedPQAOrchestrator, FileType, analyze_iodd_quality, analyze_eds_quality
 )
 from ..utils.forensic_reconstruction_v2 import reconstruct_iodd_xml
+from ..utils.cache_warmer import device_view
 from ..utils.eds_reconstruction import reconstruct_eds_file
+from ..utils.pqa_dashboard import (
+    SCOPE_ALL, check_dashboard_aggregates, ensure_dashboard_aggregates, load_totals,
+    rebuild_dashboard_aggregates
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/pqa", tags=["Parser Quality Assurance"])
@@ -99,6 +105,16 @@ def get_db():
     return conn
 
 
+def _dashboard_scope(file_type: Optional[str]) -> str:
+    """Validate a file_type filter and map it to a dashboard aggregate scope"""
+    if not file_type:
+        return SCOPE_ALL
+    file_type_upper = file_type.upper()
+    if file_type_upper not in ['IODD', 'EDS']:
+        raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
+    return file_type_upper
+
+
 # ============================================================================
 # ANALYSIS ENDPOINTS
 # ============================================================================
@@ -203,7 +219,8 @@ async def run_pqa_analysis_all(
     Run PQA analysis on all devices/files
 
     This endpoint queues analysis for all IODD devices and/or EDS files.
-    Analysis runs in background for optimal performance.
+    Analysis runs in background, one batch run per file type: files are
+    reconstructed in chunks that share their database reads.
 
     Args:
         file_type: Optional filter - 'IODD', 'EDS', or None for both
@@ -215,77 +232,51 @@ async def run_pqa_analysis_all(
         conn = get_db()
         cursor = conn.cursor()
 
-        queued_count = 0
-        iodd_count = 0
-        eds_count = 0
+        iodd_ids: List[int] = []
+        eds_ids: List[int] = []
 
-        # Queue IODD analyses
+        # Devices with their original XML
         if not file_type or file_type.upper() == 'IODD':
-            cursor.execute("SELECT id, product_name FROM devices")
-            iodd_devices = cursor.fetchall()
-
-            for device in iodd_devices:
-                device_id = device['id']
-
-                # Get XML content
-                cursor.execute("""
-                    SELECT file_content FROM iodd_assets
-                    WHERE device_id = ? AND file_type = 'xml'
-                    LIMIT 1
-                """, (device_id,))
-                xml_row = cursor.fetchone()
-
-                if xml_row:
-                    xml_content = xml_row['file_content']
-                    if isinstance(xml_content, bytes):
-                        xml_content = xml_content.decode('utf-8')
-
-                    # Queue analysis using functools.partial to avoid closure issues
-                    from functools import partial
-
-                    def run_iodd_analysis(device_id: int, xml_content: str):
-                        try:
-                            orchestrator = UnifiedPQAOrchestrator()
-                            orchestrator.run_full_analysis(device_id, FileType.IODD, xml_content)
-                            logger.info(f"Completed PQA analysis for IODD device {device_id}")
-                        except Exception as e:
-                            logger.error(f"PQA analysis failed for IODD {device_id}: {e}", exc_info=True)
-
-                    background_tasks.add_task(run_iodd_analysis, device_id, xml_content)
-                    queued_count += 1
-                    iodd_count += 1
-
-        # Queue EDS analyses
+            cursor.execute("""
+                SELECT id FROM devices d
+                WHERE EXISTS (SELECT 1 FROM iodd_assets a WHERE a.device_id = d.id AND a.file_type = 'xml')
+                ORDER BY id
+            """)
+            iodd_ids = [row['id'] for row in cursor.fetchall()]
+
+        # EDS files with their original content
         if not file_type or file_type.upper() == 'EDS':
-            cursor.execute("SELECT id, product_name, eds_content FROM eds_files")
-            eds_files = cursor.fetchall()
-
-            for eds_file in eds_files:
-                eds_id = eds_file['id']
-                eds_content = eds_file['eds_content']
-
-                if eds_content:
-                    # Queue analysis
-                    def run_eds_analysis(eds_id: int, eds_content: str):
-                        try:
-                            orchestrator = UnifiedPQAOrchestrator()
-                            orchestrator.run_full_analysis(eds_id, FileType.EDS, eds_content)
-                            logger.info(f"Completed PQA analysis for EDS file {eds_id}")
-                        except Exception as e:
-                            logger.error(f"PQA analysis failed for EDS {eds_id}: {e}", exc_info=True)
-
-                    background_tasks.add_task(run_eds_analysis, eds_id, eds_content)
-                    queued_count += 1
-                    eds_count += 1
+            cursor.execute("""
+                SELECT id FROM eds_files
+                WHERE eds_content IS NOT NULL AND eds_content != ''
+                ORDER BY id
+            """)
+            eds_ids = [row['id'] for row in cursor.fetchall()]
 
         conn.close()
 
+        def run_batch_analysis(batch_type: FileType, file_ids: List[int]):
+            try:
+                counts = UnifiedPQAOrchestrator().run_batch_analysis(
+                    batch_type, file_ids, workers=config.PQA_BATCH_WORKERS
+                )
+                logger.info(f"Completed PQA analysis for {counts['analyzed']} {batch_type.value} files "
+                            f"({counts['failed']} failed)")
+            except Exception as e:
+                logger.error(f"PQA batch analysis failed for {batch_type.value}: {e}", exc_info=True)
+
+        if iodd_ids:
+            background_tasks.add_task(run_batch_analysis, FileType.IODD, iodd_ids)
+        if eds_ids:
+            background_tasks.add_task(run_batch_analysis, FileType.EDS, eds_ids)
+
+        queued_count = len(iodd_ids) + len(eds_ids)
         return {
             "status": "queued",
-            "message": f"Queued {queued_count} analyses ({iodd_count} IODD, {eds_count} EDS)",
+            "message": f"Queued {queued_count} analyses ({len(iodd_ids)} IODD, {len(eds_ids)} EDS)",
             "total_queued": queued_count,
-            "iodd_queued": iodd_count,
-            "eds_queued": eds_count
+            "iodd_queued": len(iodd_ids),
+            "eds_queued": len(eds_ids)
         }
 
     except Exception as e:
@@ -388,6 +379,7 @@ async def get_analyzed_devices():
 
 
 @router.get("/metrics/{device_id}", response_model=QualityMetricsResponse)
+@device_view("pqa-metrics", file_type="IODD")
 async def get_latest_metrics(device_id: int, file_type: str = Query("IODD", description="IODD or EDS")):
     """Get latest quality metrics for a device"""
     try:
@@ -839,37 +831,21 @@ async def get_dashboard_summary(file_type: Optional[str] = Query(None, descripti
         # Build WHERE clause for file_type filtering
         file_type_filter = ""
         params = []
-        if file_type:
-            file_type_upper = file_type.upper()
-            if file_type_upper not in ['IODD', 'EDS']:
-                raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
+        scope = _dashboard_scope(file_type)
+        if scope != SCOPE_ALL:
             file_type_filter = "WHERE file_type = ?"
-            params.append(file_type_upper)
+            params.append(scope)
 
-        # Total analyses
-        cursor.execute(f"SELECT COUNT(*) FROM pqa_quality_metrics {file_type_filter}", params)
-        total_analyses = cursor.fetchone()[0]
-
-        # Passed/Failed
-        cursor.execute(f"SELECT COUNT(*) FROM pqa_quality_metrics {file_type_filter} {'AND' if file_type_filter else 'WHERE'} passed_threshold = 1",
-                      params)
-        passed = cursor.fetchone()[0]
+        # Counts and averages from the materialized totals
+        totals = load_totals(conn, scope)
+        total_analyses = totals['total_analyses']
+        passed = totals['passed_analyses']
         failed = total_analyses - passed
+        avg_score = totals['score_sum'] / total_analyses if total_analyses else 0.0
+        devices_analyzed = totals['devices_analyzed']
+        critical_failures = totals['critical_failures']
 
-        # Average score
-        cursor.execute(f"SELECT AVG(overall_score) FROM pqa_quality_metrics {file_type_filter}", params)
-        avg_score = cursor.fetchone()[0] or 0.0
-
-        # Unique devices
-        cursor.execute(f"SELECT COUNT(DISTINCT device_id) FROM pqa_quality_metrics {file_type_filter}", params)
-        devices_analyzed = cursor.fetchone()[0]
-
-        # Critical failures
-        cursor.execute(f"SELECT COUNT(*) FROM pqa_quality_metrics {file_type_filter} {'AND' if file_type_filter else 'WHERE'} critical_data_loss = 1",
-                      params)
-        critical_failures = cursor.fetchone()[0]
-
-        # Recent analyses
+        # Recent analyses (indexed by analysis_timestamp)
         cursor.execute(f"""
             SELECT
                 id,
@@ -919,20 +895,20 @@ async def get_quality_trends(days: int = Query(30, ge=1, le=365)):
     """Get quality score trends over time"""
     try:
         conn = get_db()
+        ensure_dashboard_aggregates(conn)
         cursor = conn.cursor()
 
         cursor.execute("""
             SELECT
-                DATE(analysis_timestamp) as date,
-                AVG(overall_score) as avg_score,
-                MIN(overall_score) as min_score,
-                MAX(overall_score) as max_score,
-                COUNT(*) as analysis_count
-            FROM pqa_quality_metrics
-            WHERE analysis_timestamp >= datetime('now', '-' || ? || ' days')
-            GROUP BY DATE(analysis_timestamp)
-            ORDER BY date
-        """, (days,))
+                day as date,
+                score_sum / analysis_count as avg_score,
+                min_score,
+                max_score,
+                analysis_count
+            FROM pqa_dashboard_daily
+            WHERE scope = ? AND day >= DATE('now', '-' || ? || ' days')
+            ORDER BY day
+        """, (SCOPE_ALL, days))
 
         trends = cursor.fetchall()
         conn.close()
@@ -1008,33 +984,14 @@ async def get_score_distribution(file_type: Optional[str] = Query(None, descript
     """
     try:
         conn = get_db()
-        cursor = conn.cursor()
-
-        # Build filter
-        file_type_filter = ""
-        params = []
-        if file_type:
-            file_type_upper = file_type.upper()
-            if file_type_upper not in ['IODD', 'EDS']:
-                raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
-            file_type_filter = "WHERE file_type = ?"
-            params.append(file_type_upper)
 
         # Get distribution counts
-        cursor.execute(f"""
-            SELECT
-                SUM(CASE WHEN overall_score = 100.0 THEN 1 ELSE 0 END) as perfect,
-                SUM(CASE WHEN overall_score >= 99.900 AND overall_score < 100.0 THEN 1 ELSE 0 END) as near_perfect,
-                SUM(CASE WHEN overall_score >= 99.500 AND overall_score < 99.900 THEN 1 ELSE 0 END) as excellent,
-                SUM(CASE WHEN overall_score >= 99.000 AND overall_score < 99.500 THEN 1 ELSE 0 END) as good,
-                SUM(CASE WHEN overall_score >= 95.000 AND overall_score < 99.000 THEN 1 ELSE 0 END) as acceptable,
-                SUM(CASE WHEN overall_score < 95.000 THEN 1 ELSE 0 END) as below_threshold,
-                COUNT(*) as total
-            FROM pqa_quality_metrics
-            {file_type_filter}
-        """, params)
-
-        counts = cursor.fetchone()
+        totals = load_totals(conn, _dashboard_scope(file_type))
+        counts = {
+            bucket: totals[f'bucket_{bucket}']
+            for bucket in ('perfect', 'near_perfect', 'excellent', 'good', 'acceptable', 'below_threshold')
+        }
+        counts['total'] = totals['total_analyses']
         conn.close()
 
         total = counts['total'] or 1  # Avoid division by zero
@@ -1107,42 +1064,19 @@ async def get_diff_distribution(file_type: Optional[str] = Query(None, descripti
         conn = get_db()
         cursor = conn.cursor()
 
-        # Build filter - need to join with metrics to filter by file_type
-        file_type_filter = ""
-        params = []
-        if file_type:
-            file_type_upper = file_type.upper()
-            if file_type_upper not in ['IODD', 'EDS']:
-                raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
-            file_type_filter = "WHERE pqm.file_type = ?"
-            params.append(file_type_upper)
+        scope = _dashboard_scope(file_type)
+        totals = load_totals(conn, scope)
+        totals = {'total_diffs': totals['diff_total'], 'devices_analyzed': totals['diff_devices']}
 
         # Get diff type counts
-        cursor.execute(f"""
-            SELECT
-                pdd.diff_type,
-                pdd.severity,
-                COUNT(*) as count
-            FROM pqa_diff_details pdd
-            JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
-            {file_type_filter}
-            GROUP BY pdd.diff_type, pdd.severity
-            ORDER BY count DESC
-        """, params)
+        cursor.execute("""
+            SELECT diff_type, severity, diff_count as count
+            FROM pqa_dashboard_diff_counts
+            WHERE scope = ?
+            ORDER BY diff_count DESC
+        """, (scope,))
 
         diffs = cursor.fetchall()
-
-        # Get total diffs and device count
-        cursor.execute(f"""
-            SELECT
-                COUNT(DISTINCT pdd.id) as total_diffs,
-                COUNT(DISTINCT pqm.device_id) as devices_analyzed
-            FROM pqa_diff_details pdd
-            JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
-            {file_type_filter}
-        """, params)
-
-        totals = cursor.fetchone()
         conn.close()
 
         diff_list = [
@@ -1192,40 +1126,31 @@ async def get_xpath_patterns(
         cursor = conn.cursor()
 
         # Build filters
-        filters = []
-        params = []
+        filters = ["scope = ?"]
+        params = [_dashboard_scope(file_type)]
 
         if severity:
             severity_upper = severity.upper()
             if severity_upper not in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFO']:
                 raise HTTPException(status_code=400, detail="Invalid severity")
-            filters.append("pdd.severity = ?")
+            filters.append("severity = ?")
             params.append(severity_upper)
 
-        if file_type:
-            file_type_upper = file_type.upper()
-            if file_type_upper not in ['IODD', 'EDS']:
-                raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
-            filters.append("pqm.file_type = ?")
-            params.append(file_type_upper)
-
-        where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+        ensure_dashboard_aggregates(conn)
 
         # Get XPath patterns
         cursor.execute(f"""
             SELECT
-                pdd.xpath,
-                pdd.diff_type,
-                pdd.severity,
-                COUNT(*) as occurrences,
-                GROUP_CONCAT(DISTINCT pqm.device_id) as device_ids,
-                MIN(pdd.expected_value) as example_expected,
-                MIN(pdd.actual_value) as example_actual,
-                MIN(pdd.description) as description
-            FROM pqa_diff_details pdd
-            JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
-            {where_clause}
-            GROUP BY pdd.xpath, pdd.diff_type, pdd.severity
+                xpath,
+                diff_type,
+                severity,
+                occurrences,
+                device_ids,
+                example_expected,
+                example_actual,
+                description
+            FROM pqa_dashboard_xpath_patterns
+            WHERE {" AND ".join(filters)}
             ORDER BY occurrences DESC
             LIMIT ?
         """, params + [limit])
@@ -1406,37 +1331,14 @@ async def get_phase_breakdown(
     """
     try:
         conn = get_db()
-        cursor = conn.cursor()
-
-        # Build filter
-        file_type_filter = ""
-        params = []
-        if file_type:
-            file_type_upper = file_type.upper()
-            if file_type_upper not in ['IODD', 'EDS']:
-                raise HTTPException(status_code=400, detail="file_type must be 'IODD' or 'EDS'")
-            file_type_filter = "WHERE file_type = ?"
-            params.append(file_type_upper)
 
         # Get phase statistics
-        cursor.execute(f"""
-            SELECT
-                AVG(phase1_score) as avg_phase1,
-                AVG(phase2_score) as avg_phase2,
-                AVG(phase3_score) as avg_phase3,
-                AVG(phase4_score) as avg_phase4,
-                AVG(phase5_score) as avg_phase5,
-                SUM(CASE WHEN phase1_score = 100.0 THEN 1 ELSE 0 END) as perfect_phase1,
-                SUM(CASE WHEN phase2_score = 100.0 THEN 1 ELSE 0 END) as perfect_phase2,
-                SUM(CASE WHEN phase3_score = 100.0 THEN 1 ELSE 0 END) as perfect_phase3,
-                SUM(CASE WHEN phase4_score = 100.0 THEN 1 ELSE 0 END) as perfect_phase4,
-                SUM(CASE WHEN phase5_score = 100.0 THEN 1 ELSE 0 END) as perfect_phase5,
-                COUNT(*) as total
-            FROM pqa_quality_metrics
-            {file_type_filter}
-        """, params)
-
-        stats = cursor.fetchone()
+        totals = load_totals(conn, _dashboard_scope(file_type))
+        stats = {'total': totals['total_analyses']}
+        for n in range(1, 6):
+            count = totals[f'phase{n}_count']
+            stats[f'avg_phase{n}'] = totals[f'phase{n}_sum'] / count if count else None
+            stats[f'perfect_phase{n}'] = totals[f'phase{n}_perfect']
         conn.close()
 
         total = stats['total'] or 1
@@ -1498,3 +1400,40 @@ async def get_phase_breakdown(
     except Exception as e:
         logger.error(f"Error fetching phase breakdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/dashboard/rebuild")
+async def rebuild_dashboard():
+    """Recompute the materialized dashboard aggregates from the PQA tables"""
+    try:
+        conn = get_db()
+        try:
+            counts = rebuild_dashboard_aggregates(conn)
+        finally:
+            conn.close()
+        return {"success": True, "rows": counts}
+
+    except Exception as e:
+        logger.error(f"Error rebuilding dashboard aggregates: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/dashboard/consistency")
+async def check_dashboard_consistency(limit: int = Query(50, ge=1, le=1000)):
+    """Compare the materialized dashboard aggregates against the PQA tables"""
+    try:
+        conn = get_db()
+        try:
+            ensure_dashboard_aggregates(conn)
+            problems = check_dashboard_aggregates(conn)
+        finally:
+            conn.close()
+        return {
+            "consistent": not problems,
+            "mismatch_count": len(problems),
+            "mismatches": problems[:limit]
+        }
+
+    except Exception as e:
+        logger.error(f"Error checking dashboard aggregates: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,20 +1,22 @@
 """
 Statistics API Routes
 Provides codebase and project statistics
+
+Statistics are generated in a background thread (see src/utils/codebase_stats.py);
+requests are answered from the last saved result.
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, List, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, List, Any, Optional
 import logging
-import json
-from pathlib import Path
-from src.utils.codebase_stats import generate_stats
+from src.utils import codebase_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Cache for statistics (regenerated on server start)
-_stats_cache = None
+# Seconds a request waits for the first statistics run before giving up
+FIRST_RUN_WAIT = 30
 
 
 class CodebaseStatsResponse(BaseModel):
@@ -30,34 +32,18 @@ class CodebaseStatsResponse(BaseModel):
     totals: Dict[str, int]
 
 
-def load_or_generate_stats():
-    """Load cached stats or generate new ones"""
-    global _stats_cache
-
-    # Try to load from file first
-    stats_file = Path("codebase_stats.json")
-    if stats_file.exists():
-        try:
-            with open(stats_file, 'r') as f:
-                _stats_cache = json.load(f)
-                logger.info("Loaded codebase statistics from cache file")
-                return _stats_cache
-        except Exception as e:
-            logger.warning(f"Failed to load stats cache: {e}")
-
-    # Generate new stats
-    logger.info("Generating fresh codebase statistics...")
-    _stats_cache = generate_stats()
+def load_or_generate_stats() -> Optional[Dict[str, Any]]:
+    """Saved stats, or None while the first background run is generating them"""
+    stats = codebase_stats.load_saved_stats()
+    if stats is None:
+        logger.info("Generating fresh codebase statistics in the background...")
+        codebase_stats.start_refresh()
+    return stats
 
-    # Save to file
-    try:
-        with open(stats_file, 'w') as f:
-            json.dump(_stats_cache, f, indent=2)
-        logger.info("Saved statistics to cache file")
-    except Exception as e:
-        logger.warning(f"Failed to save stats cache: {e}")
 
-    return _stats_cache
+def init_codebase_stats():
+    """Load saved statistics at server start, generating them in the background if there are none"""
+    load_or_generate_stats()
 
 
 @router.get("/codebase", response_model=CodebaseStatsResponse)
@@ -72,51 +58,46 @@ async def get_codebase_stats():
     - Project structure breakdown
     - Package dependencies
     """
-    try:
-        stats = load_or_generate_stats()
-        if not stats:
-            raise HTTPException(status_code=500, detail="Failed to generate statistics")
+    stats = load_or_generate_stats()
+    if stats is None:
+        await run_in_threadpool(codebase_stats.wait_for_refresh, FIRST_RUN_WAIT)
+        stats = codebase_stats.load_saved_stats()
+    if not stats:
+        raise HTTPException(status_code=503, detail="Codebase statistics are still being generated",
+                            headers={"Retry-After": "10"})
 
+    try:
         return CodebaseStatsResponse(**stats)
-
     except Exception as e:
         logger.error(f"Error fetching codebase stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/codebase/refresh")
+@router.post("/codebase/refresh", status_code=202)
 async def refresh_codebase_stats():
     """
-    Force refresh of codebase statistics
+    Refresh codebase statistics in the background
 
-    This will regenerate all statistics from scratch.
-    Use sparingly as it can be CPU-intensive.
+    Only files changed since the last run are read again. Poll
+    /codebase/refresh/status for progress.
     """
-    try:
-        global _stats_cache
-
-        logger.info("Force refreshing codebase statistics...")
-        _stats_cache = generate_stats()
-
-        # Save to file
-        stats_file = Path("codebase_stats.json")
-        with open(stats_file, 'w') as f:
-            json.dump(_stats_cache, f, indent=2)
-
-        return {
-            "status": "success",
-            "message": "Statistics refreshed successfully",
-            "generated_at": _stats_cache['generated_at']
-        }
-
-    except Exception as e:
-        logger.error(f"Error refreshing stats: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-# Initialize statistics on module import (server start)
-try:
-    logger.info("Initializing codebase statistics...")
-    load_or_generate_stats()
-except Exception as e:
-    logger.error(f"Failed to initialize statistics: {e}")
+    refresh = codebase_stats.start_refresh()
+    logger.info("Refreshing codebase statistics in the background...")
+    return {
+        "status": "accepted",
+        "message": "Statistics refresh started",
+        "refresh": refresh.to_dict()
+    }
+
+
+@router.get("/codebase/refresh/status")
+async def get_codebase_refresh_status():
+    """Progress of the current or last statistics refresh"""
+    refresh = codebase_stats.get_refresh_status()
+    if refresh is None:
+        raise HTTPException(status_code=404, detail="No statistics refresh has run yet")
+    stats = codebase_stats.load_saved_stats()
+    return {
+        **refresh.to_dict(),
+        "generated_at": stats['generated_at'] if stats else None
+    }
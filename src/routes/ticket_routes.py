@@ -9,7 +9,6 @@ import logging
 import os
 import shutil
 import sqlite3
-import zipfile
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
@@ -18,6 +17,9 @@ from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
+from src.utils.streaming_export import open_export_connection
+from src.utils.streaming_zip import ZipEntry, iter_zip
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
@@ -788,12 +790,10 @@ async def export_tickets_with_attachments(
 
     cursor.execute(query, params)
     tickets = cursor.fetchall()
+    conn.close()
 
-    # Create in-memory ZIP file
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Create CSV
+    def entries(cursor):
+        # Create CSV (written last, once the attachments that made it in are known)
         csv_output = io.StringIO()
         writer = csv.writer(csv_output)
 
@@ -826,12 +826,11 @@ async def export_tickets_with_attachments(
             """, (ticket_id,))
             attachments = cursor.fetchall()
 
-            # Add attachments to ZIP with ticket folder structure
+            # Stream attachments into the ZIP with ticket folder structure
             attachment_names = []
             for filename, file_path in attachments:
                 if os.path.exists(file_path):
-                    arc_name = f"{ticket_number}/{filename}"
-                    zip_file.write(file_path, arc_name)
+                    yield ZipEntry.from_file(f"{ticket_number}/{filename}", file_path)
                     attachment_names.append(filename)
 
             all_attachments = " | ".join(attachment_names)
@@ -856,15 +855,18 @@ async def export_tickets_with_attachments(
             ])
 
         # Add CSV to ZIP
-        csv_output.seek(0)
-        zip_file.writestr("tickets.csv", csv_output.getvalue())
+        yield ZipEntry.from_bytes("tickets.csv", csv_output.getvalue())
 
-    conn.close()
+    def zip_chunks():
+        stream_conn = open_export_connection(DB_PATH)
+        try:
+            yield from iter_zip(entries(stream_conn.cursor()))
+        finally:
+            stream_conn.close()
 
     # Return ZIP file
-    zip_buffer.seek(0)
     return StreamingResponse(
-        iter([zip_buffer.getvalue()]),
+        zip_chunks(),
         media_type="application/zip",
         headers={"Content-Disposition": "attachment; filename=tickets_with_attachments.zip"}
     )
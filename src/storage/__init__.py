@@ -26,6 +26,11 @@ from .test_config import TestConfigSaver
 from .std_variable_ref import StdVariableRefSaver
 from .build_format import BuildFormatSaver
 from .direct_parameter_overlay import DirectParameterOverlaySaver  # PQA Fix #131
+from .eds import (
+    EDSAssemblySaver, EDSCapacitySaver, EDSConnectionSaver, EDSDiagnosticSaver, EDSGroupSaver,
+    EDSModuleSaver, EDSParameterSaver, EDSPortSaver, save_eds_details
+)
+from src.utils.device_versions import bump_device_versions
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +125,7 @@ class StorageManager:
             wire_config_saver.save(device_id, getattr(profile, 'wire_configurations', []))
             menu_saver.save(device_id, getattr(profile, 'ui_menus', None))
             # PQA Fix #66: Pass text_redefine_ids to distinguish TextRedefine elements
-            text_saver.save(device_id, getattr(profile, 'all_text_data', {}), getattr(profile, 'text_xml_order', {}), getattr(profile, 'language_order', {}), getattr(profile, 'text_redefine_ids', set()))
+            text_saver.save(device_id, getattr(profile, 'all_text_data', {}), getattr(profile, 'text_xml_order', {}), getattr(profile, 'language_order', {}), getattr(profile, 'text_redefine_ids', set()), getattr(profile, 'text_table', None))
             custom_datatype_saver.save(device_id, getattr(profile, 'custom_datatypes', []))
             test_config_saver.save(device_id, getattr(profile, 'test_configurations', []))
             std_variable_ref_saver.save(device_id, getattr(profile, 'std_variable_refs', []))
@@ -131,6 +136,7 @@ class StorageManager:
             if hasattr(profile, 'raw_xml') and profile.raw_xml:
                 build_format_saver.extract_and_save(device_id, profile.raw_xml)
 
+            bump_device_versions(cursor, [device_id])
             conn.commit()
             logger.info(f"Successfully saved device profile with ID: {device_id}")
             return device_id
@@ -192,6 +198,8 @@ class StorageManager:
                 ))
                 added_count += 1
 
+            if added_count > 0:
+                bump_device_versions(cursor, [device_id])
             conn.commit()
             if added_count > 0:
                 logger.info(f"Saved {added_count} asset file(s) for device {device_id}")
@@ -221,6 +229,17 @@ class StorageManager:
         finally:
             conn.close()
 
+    def list_devices(self) -> List[Dict[str, Any]]:
+        """List all imported devices, newest first"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+
+        try:
+            cursor = conn.execute("SELECT * FROM devices ORDER BY import_date DESC")
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
     def get_device(self, device_id: int) -> Optional[Dict[str, Any]]:
         """Retrieve device information from database
 
@@ -273,4 +292,13 @@ __all__ = [
     'StdVariableRefSaver',
     'BuildFormatSaver',
     'DirectParameterOverlaySaver',  # PQA Fix #131
+    'EDSParameterSaver',
+    'EDSConnectionSaver',
+    'EDSAssemblySaver',
+    'EDSPortSaver',
+    'EDSModuleSaver',
+    'EDSGroupSaver',
+    'EDSCapacitySaver',
+    'EDSDiagnosticSaver',
+    'save_eds_details',
 ]
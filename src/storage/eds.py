@@ -0,0 +1,398 @@
+"""
+EDS storage handlers
+
+Stores the child rows of an imported EDS file: parameters with their enum
+values, connections, assemblies, ports, modules, groups, capacity/TSpecs and
+diagnostics. Each saver builds its rows first and writes every table with a
+single executemany on the caller's cursor, so a whole EDS import (or package
+import) stays one transaction owned by the route.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Mapping
+
+from .base import BaseSaver
+
+logger = logging.getLogger(__name__)
+
+
+class EDSParameterSaver(BaseSaver):
+    """Handles eds_parameters and their eds_enum_values"""
+
+    def save(self, eds_file_id: int, parameters: List[Dict[str, Any]]) -> int:
+        """
+        Save all parameters of a newly inserted EDS file
+
+        Args:
+            eds_file_id: Database ID of the EDS file
+            parameters: Parameter dicts from EDSParser.get_parameters()
+
+        Returns:
+            int: Number of parameter and enum value rows written
+        """
+        if not parameters:
+            return 0
+
+        self._execute_many("""
+            INSERT INTO eds_parameters (
+                eds_file_id, param_number, param_name, data_type,
+                data_size, default_value, min_value, max_value,
+                description, link_path_size, link_path, descriptor,
+                help_string_1, help_string_2, help_string_3, enum_values,
+                units, scaling_multiplier, scaling_divisor, scaling_base, scaling_offset,
+                link_scaling_multiplier, link_scaling_divisor, link_scaling_base, link_scaling_offset,
+                decimal_places
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            param.get('param_number'),
+            param.get('param_name'),
+            param.get('data_type'),
+            param.get('data_size'),
+            param.get('default_value'),
+            param.get('min_value'),
+            param.get('max_value'),
+            param.get('help_string_1', ''),  # Use first help string as description
+            param.get('link_path_size'),
+            param.get('link_path'),
+            param.get('descriptor'),
+            param.get('help_string_1'),
+            param.get('help_string_2'),
+            param.get('help_string_3'),
+            param.get('enum_values'),  # JSON string or None
+            param.get('units'),
+            param.get('scaling_multiplier'),
+            param.get('scaling_divisor'),
+            param.get('scaling_base'),
+            param.get('scaling_offset'),
+            param.get('link_scaling_multiplier'),
+            param.get('link_scaling_divisor'),
+            param.get('link_scaling_base'),
+            param.get('link_scaling_offset'),
+            param.get('decimal_places')
+        ) for param in parameters])
+
+        # executemany does not report row IDs; the file's rows in ID order are
+        # the parameters in insertion order
+        self._execute("SELECT id FROM eds_parameters WHERE eds_file_id = ? ORDER BY id", (eds_file_id,))
+        parameter_ids = [row[0] for row in self._fetch_all()][-len(parameters):]
+
+        enum_rows = []
+        for parameter_id, param in zip(parameter_ids, parameters):
+            enum_values_json = param.get('enum_values')
+            if not enum_values_json:
+                continue
+            try:
+                # [{"value": 0, "label": "...", "is_default": True}, ...]
+                enum_rows.extend((
+                    parameter_id,
+                    f"Enum{param.get('param_number')}",
+                    enum_entry.get('value'),
+                    enum_entry.get('label'),
+                    1 if enum_entry.get('is_default') else 0
+                ) for enum_entry in json.loads(enum_values_json))
+            except (json.JSONDecodeError, TypeError, AttributeError) as e:
+                logger.warning(f"Failed to parse enum values for param {param.get('param_number')}: {e}")
+
+        if enum_rows:
+            self._execute_many("""
+                INSERT INTO eds_enum_values (
+                    parameter_id, enum_name, enum_value, enum_display, is_default
+                ) VALUES (?, ?, ?, ?, ?)
+            """, enum_rows)
+
+        return len(parameters) + len(enum_rows)
+
+
+class EDSConnectionSaver(BaseSaver):
+    """Handles eds_connections"""
+
+    def save(self, eds_file_id: int, connections: List[Dict[str, Any]]) -> int:
+        if not connections:
+            return 0
+
+        self._execute_many("""
+            INSERT INTO eds_connections (
+                eds_file_id, connection_number, connection_name,
+                trigger_transport, connection_params,
+                output_assembly, input_assembly, help_string,
+                o_to_t_params, t_to_o_params, config_part1, config_part2,
+                path, trigger_transport_comment, connection_params_comment
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            conn_info.get('connection_number'),
+            conn_info.get('connection_name'),
+            conn_info.get('trigger_transport'),
+            conn_info.get('connection_params'),
+            conn_info.get('o_to_t_params'),  # Output assembly
+            conn_info.get('t_to_o_params'),  # Input assembly
+            conn_info.get('help_string'),
+            conn_info.get('o_to_t_params'),
+            conn_info.get('t_to_o_params'),
+            conn_info.get('config_part1'),
+            conn_info.get('config_part2'),
+            conn_info.get('path'),
+            conn_info.get('trigger_transport_comment'),
+            conn_info.get('connection_params_comment')
+        ) for conn_info in connections])
+        return len(connections)
+
+
+class EDSAssemblySaver(BaseSaver):
+    """Handles eds_assemblies (fixed) and eds_variable_assemblies"""
+
+    def save(self, eds_file_id: int, assemblies: Dict[str, List[Dict[str, Any]]]) -> int:
+        fixed = assemblies.get('fixed', []) if assemblies else []
+        variable = assemblies.get('variable', []) if assemblies else []
+
+        if fixed:
+            self._execute_many("""
+                INSERT INTO eds_assemblies (
+                    eds_file_id, assembly_number, assembly_name, assembly_type,
+                    unknown_field1, size, unknown_field2, path,
+                    help_string, is_variable
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
+                eds_file_id,
+                assembly.get('assembly_number'),
+                assembly.get('assembly_name'),
+                assembly.get('assembly_type'),
+                assembly.get('unknown_field1'),
+                assembly.get('size'),
+                assembly.get('unknown_field2'),
+                assembly.get('path'),
+                assembly.get('help_string'),
+                assembly.get('is_variable', False)
+            ) for assembly in fixed])
+
+        if variable:
+            self._execute_many("""
+                INSERT INTO eds_variable_assemblies (
+                    eds_file_id, assembly_name, assembly_number,
+                    unknown_value1, max_size, description
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, [(
+                eds_file_id,
+                assembly.get('assembly_name'),
+                assembly.get('assembly_number'),
+                assembly.get('unknown_value1'),
+                assembly.get('max_size'),
+                assembly.get('description')
+            ) for assembly in variable])
+
+        return len(fixed) + len(variable)
+
+
+class EDSPortSaver(BaseSaver):
+    """Handles eds_ports"""
+
+    def save(self, eds_file_id: int, ports: List[Dict[str, Any]]) -> int:
+        if not ports:
+            return 0
+
+        self._execute_many("""
+            INSERT INTO eds_ports (
+                eds_file_id, port_number, port_type, port_name,
+                port_path, link_number
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            port.get('port_number'),
+            port.get('port_type'),
+            port.get('port_name'),
+            port.get('port_path'),
+            port.get('link_number')
+        ) for port in ports])
+        return len(ports)
+
+
+class EDSModuleSaver(BaseSaver):
+    """Handles eds_modules of modular devices"""
+
+    def save(self, eds_file_id: int, modules: List[Dict[str, Any]]) -> int:
+        if not modules:
+            return 0
+
+        self._execute_many("""
+            INSERT INTO eds_modules (
+                eds_file_id, module_number, module_name, device_type,
+                catalog_number, major_revision, minor_revision,
+                config_size, config_data, input_size, output_size,
+                module_description, slot_number, module_class,
+                vendor_code, product_code, raw_definition
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            module.get('module_number'),
+            module.get('module_name'),
+            module.get('device_type'),
+            module.get('catalog_number'),
+            module.get('major_revision'),
+            module.get('minor_revision'),
+            module.get('config_size'),
+            module.get('config_data'),
+            module.get('input_size'),
+            module.get('output_size'),
+            module.get('module_description'),
+            module.get('slot_number'),
+            module.get('module_class'),
+            module.get('vendor_code'),
+            module.get('product_code'),
+            module.get('raw_definition')
+        ) for module in modules])
+        return len(modules)
+
+
+class EDSGroupSaver(BaseSaver):
+    """Handles eds_groups"""
+
+    def save(self, eds_file_id: int, groups: List[Dict[str, Any]]) -> int:
+        if not groups:
+            return 0
+
+        self._execute_many("""
+            INSERT INTO eds_groups (
+                eds_file_id, group_number, group_name,
+                parameter_count, parameter_list
+            ) VALUES (?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            group.get('group_number'),
+            group.get('group_name'),
+            group.get('parameter_count'),
+            group.get('parameter_list')
+        ) for group in groups])
+        return len(groups)
+
+
+class EDSCapacitySaver(BaseSaver):
+    """Handles eds_capacity and eds_tspecs"""
+
+    def save(self, eds_file_id: int, capacity: Dict[str, Any]) -> int:
+        if not capacity:
+            return 0
+
+        if capacity.get('unrecognized_fields'):
+            logger.warning(f"EDS {eds_file_id}: Unrecognized capacity fields: {capacity['unrecognized_fields']}")
+        if capacity.get('max_io_connections') and not capacity.get('max_io_producers'):
+            logger.info(f"EDS {eds_file_id}: Using MaxIOConnections ({capacity['max_io_connections']}) "
+                        f"for producers/consumers")
+
+        self._execute("""
+            INSERT INTO eds_capacity (
+                eds_file_id, max_msg_connections, max_io_producers,
+                max_io_consumers, max_cx_per_config_tool
+            ) VALUES (?, ?, ?, ?, ?)
+        """, (
+            eds_file_id,
+            capacity.get('max_msg_connections'),
+            capacity.get('max_io_producers'),
+            capacity.get('max_io_consumers'),
+            capacity.get('max_cx_per_config_tool')
+        ))
+
+        tspecs = capacity.get('tspecs', [])
+        if tspecs:
+            self._execute_many("""
+                INSERT INTO eds_tspecs (
+                    eds_file_id, tspec_name, direction, data_size, rate
+                ) VALUES (?, ?, ?, ?, ?)
+            """, [(
+                eds_file_id,
+                tspec.get('tspec_name'),
+                tspec.get('direction'),
+                tspec.get('data_size'),
+                tspec.get('rate')
+            ) for tspec in tspecs])
+        return 1 + len(tspecs)
+
+
+class EDSDiagnosticSaver(BaseSaver):
+    """Handles eds_diagnostics and the per-file diagnostic counts"""
+
+    def save(self, eds_file_id: int, diagnostics) -> int:
+        """
+        Save parser diagnostics of an EDS file
+
+        Args:
+            eds_file_id: Database ID of the EDS file
+            diagnostics: DiagnosticCollector from parse_eds_file
+
+        Returns:
+            int: Number of diagnostic rows written
+        """
+        counts = {'INFO': 0, 'WARN': 0, 'ERROR': 0, 'FATAL': 0}
+        for diag in diagnostics.diagnostics:
+            counts[diag.severity.name] = counts.get(diag.severity.name, 0) + 1
+
+        self._execute("""
+            UPDATE eds_files
+            SET diagnostic_info_count = ?,
+                diagnostic_warn_count = ?,
+                diagnostic_error_count = ?,
+                diagnostic_fatal_count = ?,
+                has_parsing_issues = ?
+            WHERE id = ?
+        """, (
+            counts['INFO'],
+            counts['WARN'],
+            counts['ERROR'],
+            counts['FATAL'],
+            diagnostics.has_errors() or counts['WARN'] > 0,
+            eds_file_id
+        ))
+
+        if not diagnostics.diagnostics:
+            return 0
+
+        created_at = datetime.now().isoformat()
+        self._execute_many("""
+            INSERT INTO eds_diagnostics (
+                eds_file_id, severity, code, message,
+                section, line, column, context, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            eds_file_id,
+            diag.severity.value,
+            diag.code,
+            diag.message,
+            diag.location.section if diag.location else None,
+            diag.location.line if diag.location else None,
+            diag.location.column if diag.location else None,
+            diag.context,
+            created_at
+        ) for diag in diagnostics.diagnostics])
+        return len(diagnostics.diagnostics)
+
+
+def save_eds_details(cursor, eds_file_id: int, parsed_data: Mapping[str, Any],
+                     diagnostics=None) -> Dict[str, int]:
+    """
+    Save everything below an inserted eds_files row
+
+    Runs on the caller's cursor and does not commit.
+
+    Args:
+        cursor: Database cursor
+        eds_file_id: Database ID of the EDS file
+        parsed_data: Result of parse_eds_file
+        diagnostics: Optional DiagnosticCollector to store with the file
+
+    Returns:
+        Dict of rows written per saver
+    """
+    rows = {
+        'parameters': EDSParameterSaver(cursor).save(eds_file_id, parsed_data.get('parameters', [])),
+        'connections': EDSConnectionSaver(cursor).save(eds_file_id, parsed_data.get('connections', [])),
+        'assemblies': EDSAssemblySaver(cursor).save(eds_file_id, parsed_data.get('assemblies', {})),
+        'ports': EDSPortSaver(cursor).save(eds_file_id, parsed_data.get('ports', [])),
+        'modules': EDSModuleSaver(cursor).save(eds_file_id, parsed_data.get('modules', [])),
+        'groups': EDSGroupSaver(cursor).save(eds_file_id, parsed_data.get('groups', [])),
+        'capacity': EDSCapacitySaver(cursor).save(eds_file_id, parsed_data.get('capacity', {})),
+    }
+    if diagnostics is not None:
+        rows['diagnostics'] = EDSDiagnosticSaver(cursor).save(eds_file_id, diagnostics)
+    return rows
@@ -133,7 +133,7 @@ class ParameterSaver(BaseSaver):
                 self._save_single_values(parameter_id, single_values)
 
             # Save RecordItemInfo if present (for RecordT variables)
-            record_item_info = getattr(param, '_record_item_info', [])
+            record_item_info = getattr(param, 'record_item_info', [])
             if record_item_info:
                 self._save_record_item_info(parameter_id, record_item_info)
 
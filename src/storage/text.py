@@ -6,6 +6,7 @@ Manages IODD text entries in multiple languages.
 
 import logging
 from .base import BaseSaver
+from src.utils.text_table import TextTable
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +15,7 @@ class TextSaver(BaseSaver):
     """Handles multi-language text storage"""
 
     def save(self, device_id: int, all_text_data: dict, text_xml_order: dict = None,
-             language_order: dict = None, text_redefine_ids: set = None) -> None:
+             language_order: dict = None, text_redefine_ids: set = None, text_table=None) -> None:
         """
         Save all multi-language text entries for a device
 
@@ -27,18 +28,24 @@ class TextSaver(BaseSaver):
             language_order: Dict mapping language_code to order of Language element
                           Example: {'en': 0, 'de': 1, 'fr': 2}
             text_redefine_ids: Set of text_ids that are TextRedefine elements (PQA Fix #66)
+            text_table: TextTable built by the parser; when given, its rows are
+                        saved and the dicts above are ignored
         """
-        if not all_text_data:
+        if text_table is None:
+            text_table = TextTable()
+            text_xml_order = text_xml_order or {}
+            text_redefine_ids = text_redefine_ids or set()
+            for text_id, languages in (all_text_data or {}).items():
+                text_orders = text_xml_order.get(text_id, {})  # PQA: Get order per language
+                for language_code, text_value in languages.items():
+                    text_table.add(text_id, language_code, text_value, text_orders.get(language_code),
+                                   text_id in text_redefine_ids)  # PQA Fix #66
+            text_table.language_order.update(language_order or {})
+
+        if not len(text_table):
             logger.debug(f"No text data to save for device {device_id}")
             return
 
-        if text_xml_order is None:
-            text_xml_order = {}
-        if language_order is None:
-            language_order = {}
-        if text_redefine_ids is None:
-            text_redefine_ids = set()
-
         # Delete existing
         self._delete_existing('iodd_text', device_id)
 
@@ -48,25 +55,7 @@ class TextSaver(BaseSaver):
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """
 
-        params_list = []
-        for text_id, languages in all_text_data.items():
-            text_orders = text_xml_order.get(text_id, {})  # PQA: Get order per language
-            is_redefine = 1 if text_id in text_redefine_ids else 0  # PQA Fix #66
-            for language_code, text_value in languages.items():
-                xml_order = text_orders.get(language_code)  # PQA: Order for this specific language
-                lang_order = language_order.get(language_code)  # PQA: Order of Language element
-                params_list.append((
-                    device_id,
-                    text_id,
-                    language_code,
-                    text_value,
-                    xml_order,
-                    lang_order,
-                    is_redefine,  # PQA Fix #66
-                ))
-
+        params_list = [(device_id, *row) for row in text_table.rows()]
         if params_list:
             self._execute_many(query, params_list)
-            text_id_count = len(all_text_data)
-            entry_count = len(params_list)
-            logger.info(f"Saved {entry_count} text entries across {text_id_count} text IDs for device {device_id}")
+            logger.info(f"Saved {len(params_list)} text entries across {len(text_table)} text IDs for device {device_id}")
@@ -8,13 +8,16 @@ This module contains background tasks for:
 """
 
 import logging
-import json
-import csv
 import os
+import time
 from typing import Dict, Any, Optional, List
-from celery import Task
+from celery import Task, chord
 from src.celery_app import celery_app, send_to_dlq
+from src.database import get_db_path
 from src.storage import StorageManager
+from src.utils.batch_export import (
+    FORMATS, batch_archive_path, batch_summary, chunk_ids, export_chunk, run_batch_export, write_batch_archive
+)
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +57,7 @@ def export_device_config(
     Args:
         self: Celery task instance
         device_id: Database ID of the device
-        format: Export format (json, csv, xml)
+        format: Export format (json, csv, xml, iodd)
         include_process_data: Whether to include process data
         include_parameters: Whether to include parameters
 
@@ -67,98 +70,29 @@ def export_device_config(
     logger.info(f"Exporting device {device_id} configuration in {format} format")
 
     try:
-        # Initialize storage and fetch device
-        storage = StorageManager()
-        device_profile = storage.get_device_profile(device_id)
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported export format: {format}")
 
-        if not device_profile:
-            raise ValueError(f"Device {device_id} not found or profile unavailable")
+        # Same loader and renderer as batch exports
+        [result] = export_chunk(get_db_path(), [device_id], format,
+                                include_parameters=include_parameters,
+                                include_process_data=include_process_data)
+        if result["error"]:
+            raise ValueError(result["error"])
 
         # Create export directory
         export_dir = f"exports/{format}"
         os.makedirs(export_dir, exist_ok=True)
+        file_path = os.path.join(export_dir, result["filename"])
 
-        # Generate export filename
-        filename = f"device_{device_id}_{device_profile.device_info.product_name.replace(' ', '_').lower()}.{format}"
-        file_path = os.path.join(export_dir, filename)
-
-        # Build export data
-        export_data = {
-            "device_info": {
-                "product_name": device_profile.device_info.product_name,
-                "vendor": device_profile.vendor_info.name,
-                "vendor_id": device_profile.device_info.vendor_id,
-                "device_id": device_profile.device_info.device_id,
-                "hardware_revision": device_profile.device_info.hardware_revision,
-                "firmware_revision": device_profile.device_info.firmware_revision,
-            }
-        }
-
-        if include_parameters:
-            export_data["parameters"] = [
-                {
-                    "index": param.index,
-                    "name": param.name,
-                    "data_type": param.data_type,
-                    "access_rights": param.access_rights,
-                    "default_value": param.default_value,
-                    "unit": param.unit,
-                }
-                for param in device_profile.parameters
-            ]
-
-        if include_process_data:
-            export_data["process_data"] = {
-                "inputs": [
-                    {
-                        "id": pd.id,
-                        "name": pd.name,
-                        "data_type": pd.data_type,
-                        "bit_length": pd.bit_length,
-                    }
-                    for pd in device_profile.process_data_collection.inputs
-                ],
-                "outputs": [
-                    {
-                        "id": pd.id,
-                        "name": pd.name,
-                        "data_type": pd.data_type,
-                        "bit_length": pd.bit_length,
-                    }
-                    for pd in device_profile.process_data_collection.outputs
-                ],
-            }
-
-        # Export based on format
-        if format == "json":
-            with open(file_path, "w") as f:
-                json.dump(export_data, f, indent=2)
-
-        elif format == "csv":
-            # Export parameters to CSV
-            if include_parameters:
-                with open(file_path, "w", newline="") as f:
-                    writer = csv.DictWriter(f, fieldnames=["index", "name", "data_type", "access_rights", "default_value", "unit"])
-                    writer.writeheader()
-                    writer.writerows(export_data["parameters"])
-
-        elif format == "xml":
-            # Simple XML export (could be enhanced with proper XML library)
-            xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<device>
-    <info>
-        <product_name>{device_profile.device_info.product_name}</product_name>
-        <vendor>{device_profile.vendor_info.name}</vendor>
-    </info>
-</device>"""
-            with open(file_path, "w") as f:
-                f.write(xml_content)
+        with open(file_path, "w", newline="") as f:
+            f.write(result["content"])
 
         logger.info(f"Successfully exported device {device_id} to {file_path}")
 
         return {
             "device_id": device_id,
-            "device_name": device_profile.device_info.product_name,
+            "device_name": result["device_name"],
             "format": format,
             "file_path": file_path,
             "success": True,
@@ -185,72 +119,104 @@ def batch_export_devices(
     """
     Export multiple devices in batch.
 
+    Devices are split into chunks that are loaded and rendered in parallel:
+    as a chord of export_device_chunk tasks when running on a worker (this
+    task is replaced by the chord, so it never blocks on subtask results), or
+    on an in-process pool when run eagerly or called directly (no broker).
+    Either way the results are streamed into one archive.
+
     Args:
         self: Celery task instance
         device_ids: List of device database IDs
-        format: Export format (json, csv, xml)
-        combine: Whether to combine all exports into a single file
+        format: Export format (json, csv, xml, iodd)
+        combine: Whether to combine all exports into a single JSON file
+            instead of a ZIP with one file per device
 
     Returns:
-        dict: Batch export results
+        dict: Batch export results with archive path and throughput metrics
     """
     logger.info(f"Batch exporting {len(device_ids)} devices in {format} format")
 
-    results = {
-        "total": len(device_ids),
-        "successful": [],
-        "failed": [],
-    }
-
-    if combine:
-        # Combine all device exports into a single file
-        combined_data = []
-
-        for device_id in device_ids:
-            try:
-                storage = StorageManager()
-                device_profile = storage.get_device_profile(device_id)
-                if device_profile:
-                    combined_data.append({
-                        "device_id": device_id,
-                        "product_name": device_profile.device_info.product_name,
-                        "vendor": device_profile.vendor_info.name,
-                    })
-                    results["successful"].append(device_id)
-            except Exception as e:
-                logger.error(f"Failed to export device {device_id}: {e}")
-                results["failed"].append({"device_id": device_id, "error": str(e)})
-
-        # Save combined export
-        export_dir = f"exports/{format}"
-        os.makedirs(export_dir, exist_ok=True)
-        combined_file = os.path.join(export_dir, f"batch_export_{len(device_ids)}_devices.{format}")
-
-        with open(combined_file, "w") as f:
-            json.dump(combined_data, f, indent=2)
-
-        results["combined_file"] = combined_file
-
-    else:
-        # Export each device separately
-        for device_id in device_ids:
-            try:
-                result = export_device_config.delay(device_id, format)
-                export_info = result.get(timeout=180)
-                results["successful"].append({
-                    "device_id": device_id,
-                    "file_path": export_info["file_path"],
-                })
-            except Exception as e:
-                logger.error(f"Failed to export device {device_id}: {e}")
-                results["failed"].append({
-                    "device_id": device_id,
-                    "error": str(e),
-                })
-
-    logger.info(f"Batch export complete: {len(results['successful'])} successful, {len(results['failed'])} failed")
-
-    return results
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    if self.request.is_eager or self.request.called_directly:
+        return run_batch_export(device_ids, format, db_path=get_db_path(), combine=combine)
+
+    chunks = chunk_ids(device_ids)
+    header = [export_device_chunk.s(chunk, format, combine) for chunk in chunks]
+    callback = assemble_batch_export.s(
+        device_count=sum(map(len, chunks)),
+        format=format,
+        combine=combine,
+        started_at=time.time(),
+    )
+    raise self.replace(chord(header, callback))
+
+
+@celery_app.task(
+    base=ExportTask,
+    name="src.tasks.export_tasks.export_device_chunk",
+    bind=True,
+    soft_time_limit=300,
+    time_limit=600
+)
+def export_device_chunk(
+    self,
+    device_ids: List[int],
+    format: str = "json",
+    combine: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Load and render one chunk of a batch export on a single connection.
+
+    Args:
+        self: Celery task instance
+        device_ids: Device database IDs in this chunk
+        format: Export format (json, csv, xml, iodd)
+        combine: Return export records instead of rendered files
+
+    Returns:
+        list: One result per device (see src.utils.batch_export.export_chunk)
+    """
+    return export_chunk(get_db_path(), device_ids, format, combine)
+
+
+@celery_app.task(
+    base=ExportTask,
+    name="src.tasks.export_tasks.assemble_batch_export",
+    bind=True,
+    soft_time_limit=600,
+    time_limit=1200
+)
+def assemble_batch_export(
+    self,
+    chunk_results: List[List[Dict[str, Any]]],
+    device_count: int,
+    format: str = "json",
+    combine: bool = False,
+    started_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Chord callback that streams all chunk results into one archive.
+
+    Args:
+        self: Celery task instance
+        chunk_results: export_device_chunk results, in chunk order
+        device_count: Number of devices in the batch
+        format: Export format (json, csv, xml, iodd)
+        combine: Whether to write one combined JSON file
+        started_at: Batch start time (epoch seconds) for throughput metrics
+
+    Returns:
+        dict: Batch export results with archive path and throughput metrics
+    """
+    output_path = batch_archive_path(device_count, format, combine)
+    written = write_batch_archive(
+        (result for results in chunk_results for result in results), output_path, combine
+    )
+    elapsed = time.time() - started_at if started_at else 0.0
+    return batch_summary(device_count, written, output_path, elapsed, len(chunk_results), len(chunk_results))
 
 
 @celery_app.task(
@@ -0,0 +1,382 @@
+"""
+Batch Device Export Engine
+
+Exports many IODD devices in one pass. Device rows, variant revisions,
+parameters and process data are loaded for a whole chunk of devices with
+set-based ``IN (...)`` queries on one shared connection, rendered to JSON,
+CSV or XML, and written to a single archive as the results arrive. The
+``iodd`` format exports the reconstructed IODD XML of each device, using the
+chunked reads of batch reconstruction on the same connection:
+
+- ``export_chunk`` loads and renders one chunk; it returns plain dicts so it
+  can run in a worker process or as a Celery task in a chord
+- ``write_batch_archive`` streams rendered exports into a ZIP (one file per
+  device plus ``manifest.json``) or, when combining, into one JSON document
+- ``run_batch_export`` fans chunks out over an in-process pool, for callers
+  without a Celery broker
+
+Every archive comes with ``BatchExportMetrics`` (devices and bytes per second).
+"""
+
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+from src import config
+from src.utils.forensic_reconstruction_v2 import IODDReconstructor
+from src.utils.streaming_export import JSONArray, iter_json
+from src.utils.streaming_zip import ZipEntry, iter_zip
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('json', 'csv', 'xml', 'iodd')
+
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_IN_PARAMETERS = 500
+
+PARAMETER_FIELDS = ["index", "name", "data_type", "access_rights", "default_value", "unit"]
+
+
+@dataclass
+class BatchExportMetrics:
+    """Throughput of one batch export"""
+    devices: int
+    successful: int
+    failed: int
+    bytes_written: int
+    elapsed_s: float
+    chunks: int
+    workers: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(self.elapsed_s, 1e-9)
+        return {
+            **asdict(self),
+            'elapsed_s': round(self.elapsed_s, 3),
+            'devices_per_s': round(self.devices / elapsed, 1),
+            'mb_per_s': round(self.bytes_written / elapsed / 2 ** 20, 2),
+        }
+
+
+def chunk_ids(device_ids: Iterable[int], chunk_size: Optional[int] = None) -> List[List[int]]:
+    """Deduplicated device IDs (order kept) in chunks of chunk_size (default EXPORT_BATCH_CHUNK_SIZE)"""
+    ids = list(dict.fromkeys(device_ids))
+    size = max(1, min(chunk_size or config.EXPORT_BATCH_CHUNK_SIZE, MAX_IN_PARAMETERS))
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
+def _placeholders(count: int) -> str:
+    return ','.join('?' * count)
+
+
+def load_export_data(conn: sqlite3.Connection, device_ids: List[int], include_parameters: bool = True,
+                     include_process_data: bool = True) -> Dict[int, Optional[Dict[str, Any]]]:
+    """
+    Export records for a chunk of devices, keyed by device ID (None if missing)
+
+    Args:
+        conn: Database connection with sqlite3.Row rows
+        device_ids: At most MAX_IN_PARAMETERS device IDs
+        include_parameters: Add the "parameters" list
+        include_process_data: Add the "process_data" inputs/outputs
+    """
+    marks = _placeholders(len(device_ids))
+    cursor = conn.cursor()
+    records: Dict[int, Optional[Dict[str, Any]]] = dict.fromkeys(device_ids)
+
+    cursor.execute(f"""
+        SELECT id, product_name, manufacturer, vendor_id, device_id
+        FROM devices WHERE id IN ({marks})
+    """, device_ids)
+    for row in cursor.fetchall():
+        records[row['id']] = {
+            "device_info": {
+                "product_name": row['product_name'],
+                "vendor": row['manufacturer'],
+                "vendor_id": row['vendor_id'],
+                "device_id": row['device_id'],
+                "hardware_revision": None,
+                "firmware_revision": None,
+            }
+        }
+
+    # Revisions of the first variant per device
+    cursor.execute(f"""
+        SELECT device_id, hardware_revision, firmware_revision FROM device_variants
+        WHERE device_id IN ({marks})
+        ORDER BY device_id DESC, id DESC
+    """, device_ids)
+    for row in cursor.fetchall():
+        if records[row['device_id']]:
+            info = records[row['device_id']]["device_info"]
+            info["hardware_revision"] = row['hardware_revision']
+            info["firmware_revision"] = row['firmware_revision']
+
+    if include_parameters:
+        for record in records.values():
+            if record:
+                record["parameters"] = []
+        cursor.execute(f"""
+            SELECT device_id, param_index, name, data_type, access_rights, default_value, unit
+            FROM parameters WHERE device_id IN ({marks})
+            ORDER BY device_id, id
+        """, device_ids)
+        for row in cursor.fetchall():
+            if records[row['device_id']]:
+                records[row['device_id']]["parameters"].append({
+                    "index": row['param_index'],
+                    "name": row['name'],
+                    "data_type": row['data_type'],
+                    "access_rights": row['access_rights'],
+                    "default_value": row['default_value'],
+                    "unit": row['unit'],
+                })
+
+    if include_process_data:
+        for record in records.values():
+            if record:
+                record["process_data"] = {"inputs": [], "outputs": []}
+        cursor.execute(f"""
+            SELECT device_id, pd_id, name, data_type, bit_length, direction
+            FROM process_data WHERE device_id IN ({marks})
+            ORDER BY device_id, id
+        """, device_ids)
+        for row in cursor.fetchall():
+            record = records[row['device_id']]
+            if record and row['direction'] in ('input', 'output'):
+                record["process_data"][f"{row['direction']}s"].append({
+                    "id": row['pd_id'],
+                    "name": row['name'],
+                    "data_type": row['data_type'],
+                    "bit_length": row['bit_length'],
+                })
+
+    return records
+
+
+def export_filename(device_id: int, export_data: Dict[str, Any], format: str) -> str:
+    """File name of a device export, e.g. device_12_my_sensor.json (IODD exports end in _iodd.xml)"""
+    product_name = export_data["device_info"]["product_name"] or "device"
+    slug = re.sub(r'[^\w.-]', '', product_name.replace(' ', '_').lower())
+    if format == "iodd":
+        return f"device_{device_id}_{slug}_iodd.xml"
+    return f"device_{device_id}_{slug}.{format}"
+
+
+def render_export(export_data: Dict[str, Any], format: str) -> str:
+    """Export record as JSON, a CSV of its parameters, or a short XML summary"""
+    if format == "json":
+        return json.dumps(export_data, indent=2)
+
+    if format == "csv":
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=PARAMETER_FIELDS)
+        writer.writeheader()
+        writer.writerows(export_data.get("parameters", []))
+        return output.getvalue()
+
+    if format == "xml":
+        info = export_data["device_info"]
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<device>
+    <info>
+        <product_name>{escape(str(info['product_name']))}</product_name>
+        <vendor>{escape(str(info['vendor']))}</vendor>
+    </info>
+</device>"""
+
+    raise ValueError(f"Unsupported export format: {format}")
+
+
+def export_chunk(db_path: str, device_ids: List[int], format: str = "json", combine: bool = False,
+                 include_parameters: bool = True, include_process_data: bool = True) -> List[Dict[str, Any]]:
+    """
+    Load and render one chunk of devices on a single connection
+
+    Returns:
+        One dict per device, in input order, with device_id, device_name,
+        filename, content and error; when combining, the unrendered export data is
+        returned as record instead of content
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        records = load_export_data(conn, device_ids, include_parameters, include_process_data)
+        if format == "iodd" and not combine:
+            return _reconstructed_exports(conn, db_path, device_ids, records)
+    finally:
+        conn.close()
+
+    results = []
+    for device_id in device_ids:
+        record = records[device_id]
+        result = {"device_id": device_id, "device_name": None, "filename": None, "content": None, "error": None}
+        if record is None:
+            result["error"] = f"Device {device_id} not found"
+            results.append(result)
+            continue
+        result["device_name"] = record["device_info"]["product_name"]
+        if combine:
+            result["record"] = record
+        else:
+            try:
+                result["filename"] = export_filename(device_id, record, format)
+                result["content"] = render_export(record, format)
+            except Exception as e:
+                logger.warning(f"Batch export failed for device {device_id}: {e}")
+                result["error"] = str(e)
+        results.append(result)
+    return results
+
+
+def _reconstructed_exports(conn: sqlite3.Connection, db_path: str, device_ids: List[int],
+                           records: Dict[int, Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """export_chunk results holding each device's reconstructed IODD XML"""
+    reconstructor = IODDReconstructor(db_path)
+    chunk = reconstructor.load_chunk(conn, [device_id for device_id in device_ids if records[device_id]])
+    results = []
+    for device_id in device_ids:
+        record = records[device_id]
+        result = {"device_id": device_id, "device_name": None, "filename": None, "content": None, "error": None}
+        if record is None:
+            result["error"] = f"Device {device_id} not found"
+            results.append(result)
+            continue
+        result["device_name"] = record["device_info"]["product_name"]
+        try:
+            result["content"] = reconstructor.reconstruct_with_connection(conn, device_id, chunk)
+            result["filename"] = export_filename(device_id, record, "iodd")
+        except Exception as e:
+            logger.warning(f"IODD export failed for device {device_id}: {e}")
+            result["error"] = str(e)
+        results.append(result)
+    return results
+
+
+def write_batch_archive(results: Iterable[Dict[str, Any]], output_path: str, combine: bool = False) -> Dict[str, Any]:
+    """
+    Stream export results into one file
+
+    Without combine this is a ZIP with one file per device and a
+    manifest.json; with combine, a single JSON array of export records.
+
+    Args:
+        results: export_chunk result dicts (may be a generator)
+        output_path: Archive path (parent directories are created)
+        combine: Write one combined JSON document instead of a ZIP
+
+    Returns:
+        dict with successful device entries, failed entries and bytes_written
+    """
+    successful: List[Dict[str, Any]] = []
+    failed: List[Dict[str, Any]] = []
+
+    def collect() -> Iterator[Dict[str, Any]]:
+        for result in results:
+            if result["error"]:
+                failed.append({"device_id": result["device_id"], "error": result["error"]})
+            else:
+                successful.append({"device_id": result["device_id"], "file_name": result["filename"]})
+                yield result
+
+    if combine:
+        records = (dict(device_id=result["device_id"], **result["record"]) for result in collect())
+        chunks = (text.encode('utf-8') for text in iter_json(JSONArray(records)))
+    else:
+        def entries() -> Iterator[ZipEntry]:
+            for result in collect():
+                yield ZipEntry.from_bytes(result["filename"], result["content"])
+            manifest = {"successful": successful, "failed": failed}
+            yield ZipEntry.from_bytes("manifest.json", json.dumps(manifest, indent=2))
+        chunks = iter_zip(entries())
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    bytes_written = 0
+    with open(output_path, 'wb') as archive:
+        for chunk in chunks:
+            archive.write(chunk)
+            bytes_written += len(chunk)
+
+    return {"successful": successful, "failed": failed, "bytes_written": bytes_written}
+
+
+def batch_archive_path(device_count: int, format: str, combine: bool = False) -> str:
+    """Default output path of a batch export"""
+    suffix = "json" if combine else "zip"
+    return os.path.join("exports", "batch", f"batch_export_{device_count}_devices_{format}.{suffix}")
+
+
+def run_batch_export(device_ids: Iterable[int], format: str = "json", db_path: str = "greenstack.db",
+                     output_path: Optional[str] = None, combine: bool = False, workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Export many devices into one archive using an in-process pool
+
+    Args:
+        device_ids: Device IDs (duplicates are dropped, order is kept)
+        format: json, csv, xml or iodd (reconstructed IODD XML)
+        db_path: Path to database file
+        output_path: Archive path (default batch_archive_path())
+        combine: Write one combined JSON document instead of a ZIP
+        workers: Worker processes (default EXPORT_BATCH_WORKERS, 0 = one per CPU)
+        chunk_size: Devices loaded per query batch (default EXPORT_BATCH_CHUNK_SIZE)
+
+    Returns:
+        dict with total, successful, failed, archive and metrics
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    start = time.perf_counter()
+    chunks = chunk_ids(device_ids, chunk_size)
+    device_count = sum(map(len, chunks))
+    if workers is None:
+        workers = config.EXPORT_BATCH_WORKERS
+    workers = min(max(workers or os.cpu_count() or 1, 1), len(chunks)) or 1
+    output_path = output_path or batch_archive_path(device_count, format, combine)
+
+    if workers == 1:
+        results = (result for chunk in chunks for result in export_chunk(db_path, chunk, format, combine))
+        written = write_batch_archive(results, output_path, combine)
+    else:
+        # Spawned, not forked: callers may run inside the API server's event loop
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            chunk_results = executor.map(export_chunk, [db_path] * len(chunks), chunks,
+                                         [format] * len(chunks), [combine] * len(chunks))
+            written = write_batch_archive((result for results in chunk_results for result in results),
+                                          output_path, combine)
+
+    return batch_summary(device_count, written, output_path, time.perf_counter() - start, len(chunks), workers)
+
+
+def batch_summary(device_count: int, written: Dict[str, Any], output_path: str, elapsed_s: float,
+                  chunks: int, workers: int) -> Dict[str, Any]:
+    """Result of a batch export: write_batch_archive output plus metrics"""
+    metrics = BatchExportMetrics(
+        devices=device_count,
+        successful=len(written["successful"]),
+        failed=len(written["failed"]),
+        bytes_written=written["bytes_written"],
+        elapsed_s=elapsed_s,
+        chunks=chunks,
+        workers=workers,
+    )
+    logger.info(f"Batch exported {metrics.successful}/{metrics.devices} devices to {output_path} "
+                f"in {metrics.elapsed_s:.2f}s using {workers} worker(s)")
+
+    return {
+        "total": device_count,
+        "successful": written["successful"],
+        "failed": written["failed"],
+        "archive": output_path,
+        "metrics": metrics.to_dict(),
+    }
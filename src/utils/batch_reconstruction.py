@@ -0,0 +1,207 @@
+"""
+Batch Reconstruction Engine
+
+Reconstructs many IODD devices or EDS files in one pass for exports and full
+PQA runs. Instead of opening a connection per file, each worker shares one
+connection and reads every table the reconstructors need once per chunk with
+set-based ``IN (...)`` queries (src/utils/chunk_rows.py), then yields
+reconstructed documents as a stream with per-file timing. The reconstructors
+read the same chunk queries for a single file, so batch output matches
+per-file output.
+"""
+
+import logging
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from .eds_reconstruction import EDSReconstructor
+from .forensic_reconstruction_v2 import IODDReconstructor
+
+logger = logging.getLogger(__name__)
+
+IODD = 'IODD'
+EDS = 'EDS'
+
+# Stay well below SQLite's default limit on host parameters per statement
+# (some chunk queries bind the chunk's ids twice)
+MAX_IN_PARAMETERS = 400
+
+
+@dataclass
+class ReconstructionResult:
+    """Outcome of reconstructing a single file in a batch"""
+    file_id: int
+    file_type: str
+    content: Optional[str]
+    elapsed_ms: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _chunks(ids: Sequence[int], size: int) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield list(ids[start:start + size])
+
+
+def _reconstruct_chunk(db_path: str, file_type: str, file_ids: List[int]) -> List[ReconstructionResult]:
+    """Reconstruct one chunk of files on a single connection (runs in worker processes)"""
+    return list(_iter_chunk(db_path, file_type, file_ids))
+
+
+def _iter_chunk(db_path: str, file_type: str, file_ids: List[int],
+                conn: Optional[sqlite3.Connection] = None) -> Iterator[ReconstructionResult]:
+    own_connection = conn is None
+    if own_connection:
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+
+    try:
+        if file_type == IODD:
+            reconstructor = IODDReconstructor(db_path)
+        else:
+            reconstructor = EDSReconstructor(db_path)
+        # Child tables are read on first use, for every file of the chunk at once
+        chunk = reconstructor.load_chunk(conn, file_ids)
+
+        for file_id in file_ids:
+            start = time.perf_counter()
+            try:
+                content = reconstructor.reconstruct_with_connection(conn, file_id, chunk)
+                error = None
+            except Exception as e:
+                logger.warning(f"Batch reconstruction failed for {file_type} {file_id}: {e}")
+                content = None
+                error = str(e)
+            yield ReconstructionResult(
+                file_id=file_id,
+                file_type=file_type,
+                content=content,
+                elapsed_ms=(time.perf_counter() - start) * 1000,
+                error=error,
+            )
+    finally:
+        if own_connection:
+            conn.close()
+
+
+class BatchReconstructor:
+    """
+    Reconstructs many IODD devices or EDS files in one pass
+
+    Results are yielded in input order as they are produced. With ``workers``
+    greater than 1, chunks are reconstructed in separate processes (XML/INI
+    generation is CPU bound), each with its own SQLite connection. Workers
+    are spawned rather than forked, so they never inherit the server's event
+    loop, threads or open connections.
+    """
+
+    def __init__(self, db_path: str = "greenstack.db", workers: int = 1,
+                 chunk_size: int = 200):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if not 1 <= chunk_size <= MAX_IN_PARAMETERS:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_IN_PARAMETERS}")
+        self.db_path = db_path
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def reconstruct_iodd_batch(self, device_ids: Iterable[int]) -> Iterator[ReconstructionResult]:
+        """
+        Reconstruct IODD XML for many devices
+
+        Args:
+            device_ids: Device IDs to reconstruct
+
+        Yields:
+            ReconstructionResult per device, in input order
+        """
+        return self._run(IODD, device_ids)
+
+    def reconstruct_eds_batch(self, eds_file_ids: Iterable[int]) -> Iterator[ReconstructionResult]:
+        """
+        Reconstruct EDS files for many EDS file IDs
+
+        Args:
+            eds_file_ids: EDS file IDs to reconstruct
+
+        Yields:
+            ReconstructionResult per EDS file, in input order
+        """
+        return self._run(EDS, eds_file_ids)
+
+    def _run(self, file_type: str, file_ids: Iterable[int]) -> Iterator[ReconstructionResult]:
+        # Deduplicate while preserving order so each file is reconstructed once
+        ids = list(dict.fromkeys(file_ids))
+        if not ids:
+            return
+
+        batch_start = time.perf_counter()
+        failed = 0
+        chunks = list(_chunks(ids, self.chunk_size))
+
+        if self.workers == 1 or len(chunks) == 1:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                for chunk in chunks:
+                    for result in _iter_chunk(self.db_path, file_type, chunk, conn):
+                        failed += not result.ok
+                        yield result
+            finally:
+                conn.close()
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                chunk_results = executor.map(
+                    _reconstruct_chunk,
+                    [self.db_path] * len(chunks),
+                    [file_type] * len(chunks),
+                    chunks,
+                )
+                for results in chunk_results:
+                    for result in results:
+                        failed += not result.ok
+                        yield result
+
+        logger.info(f"Batch reconstructed {len(ids)} {file_type} files "
+                    f"({failed} failed) in {time.perf_counter() - batch_start:.2f}s "
+                    f"using {self.workers} worker(s)")
+
+
+def reconstruct_iodd_batch(device_ids: Iterable[int], db_path: str = "greenstack.db",
+                           workers: int = 1) -> Iterator[ReconstructionResult]:
+    """
+    Reconstruct IODD XML for many devices
+
+    Args:
+        device_ids: Device IDs to reconstruct
+        db_path: Path to database file
+        workers: Number of worker processes
+
+    Returns:
+        Iterator of ReconstructionResult, in input order
+    """
+    return BatchReconstructor(db_path, workers=workers).reconstruct_iodd_batch(device_ids)
+
+
+def reconstruct_eds_batch(eds_file_ids: Iterable[int], db_path: str = "greenstack.db",
+                          workers: int = 1) -> Iterator[ReconstructionResult]:
+    """
+    Reconstruct EDS files for many EDS file IDs
+
+    Args:
+        eds_file_ids: EDS file IDs to reconstruct
+        db_path: Path to database file
+        workers: Number of worker processes
+
+    Returns:
+        Iterator of ReconstructionResult, in input order
+    """
+    return BatchReconstructor(db_path, workers=workers).reconstruct_eds_batch(eds_file_ids)
@@ -0,0 +1,309 @@
+"""
+Device View Cache and Warming
+
+The heaviest per-device views (config schema, menus, process data, latest
+PQA metrics) are computed by their route handlers with dozens of queries.
+Handlers decorated with ``device_view`` are served through the cache
+manager (``get_or_set``, tagged ``device:<id>``, so saving or deleting the
+device drops them) and registered for warming. Only the default variant of
+a view (the query parameters given to ``device_view``) is cached and
+warmed; other variants run the handler directly.
+
+``CacheWarmer`` precomputes the registered views in background threads:
+- after an import, for the imported devices (``warm_imported_devices``)
+- at startup, for the CACHE_WARM_TOP_DEVICES most requested devices
+
+Requests per device are counted in memory (``record_device_access``) and
+added to ``device_access_stats`` every DEVICE_ACCESS_FLUSH_INTERVAL seconds
+and at shutdown.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from src import config
+from src.cache_manager import current_cache_manager
+
+logger = logging.getLogger(__name__)
+
+VIEW_NAMESPACE = "views"
+
+
+@dataclass
+class DeviceView:
+    name: str
+    func: Callable
+    ttl: Optional[int]
+    params: Dict[str, Any]
+    computations: int = 0
+    compute_seconds: float = 0.0
+
+    def compute(self, device_id: int) -> Any:
+        started = time.perf_counter()
+        result = self.func(device_id=device_id, **self.params)
+        if asyncio.iscoroutine(result):
+            result = asyncio.run(result)
+        value = jsonable_encoder(result)
+        self.computations += 1
+        self.compute_seconds += time.perf_counter() - started
+        return value
+
+
+_views: Dict[str, DeviceView] = {}
+
+
+def device_view(name: str, ttl: Optional[int] = None, **params):
+    """
+    Cache a device route handler and register it for warming
+
+    Args:
+        name: View name, part of the cache key
+        ttl: Seconds the cached view is fresh (default DEVICE_VIEW_CACHE_TTL)
+        **params: Query parameter values of the cached variant (the handler's
+            defaults, which are Query objects and cannot be used directly)
+    """
+    def decorator(func: Callable) -> Callable:
+        view = DeviceView(name, func, ttl, params)
+        _views[name] = view
+
+        @wraps(func)
+        async def wrapper(device_id: int, **kwargs):
+            if kwargs != view.params:
+                return await func(device_id=device_id, **kwargs)
+            return await run_in_threadpool(load_device_view, name, device_id)
+        return wrapper
+    return decorator
+
+
+def registered_views() -> List[str]:
+    return list(_views)
+
+
+def load_device_view(name: str, device_id: int) -> Any:
+    """Cached value of a registered view, computed on a miss (errors are not cached)"""
+    view = _views[name]
+    cache = current_cache_manager()
+    if cache is None:
+        return view.compute(device_id)
+    return cache.get_or_set(
+        VIEW_NAMESPACE, f"{name}:{device_id}", lambda: view.compute(device_id),
+        ttl=view.ttl or config.DEVICE_VIEW_CACHE_TTL, tags=[f"device:{device_id}"]
+    )
+
+
+def invalidate_device_view(name: str, device_id: int):
+    """Drop one cached view of a device, for data outside the device's own tables"""
+    cache = current_cache_manager()
+    if cache:
+        cache.delete(VIEW_NAMESPACE, f"{name}:{device_id}")
+
+
+def invalidate_all_device_views():
+    cache = current_cache_manager()
+    if cache:
+        cache.invalidate_namespace(VIEW_NAMESPACE)
+
+
+class DeviceAccessStats:
+    """Request counts per device, buffered in memory and added to device_access_stats"""
+
+    def __init__(self, db_path: str, flush_interval: Optional[int] = None):
+        self.db_path = db_path
+        self.flush_interval = config.DEVICE_ACCESS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._pending: Counter = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, device_id: int) -> bool:
+        """Count one request; True once a flush is due"""
+        with self._lock:
+            self._pending[device_id] += 1
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                return False
+            self._last_flush = time.monotonic()
+            return True
+
+    def flush(self) -> int:
+        """Add buffered counts to the table, returns the number of devices counted"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        now = time.time()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Deleted devices are skipped, the foreign key cascade removes their rows
+            conn.executemany("""
+                INSERT INTO device_access_stats (device_id, request_count, last_accessed)
+                SELECT id, ?, ? FROM devices WHERE id = ?
+                ON CONFLICT (device_id) DO UPDATE SET
+                    request_count = device_access_stats.request_count + excluded.request_count,
+                    last_accessed = excluded.last_accessed
+            """, [(count, now, device_id) for device_id, count in pending.items()])
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            if 'no such table' not in str(e):
+                raise
+            logger.debug("device_access_stats table missing, request counts dropped")
+        finally:
+            conn.close()
+        return len(pending)
+
+    def top_devices(self, limit: int) -> List[int]:
+        """Most requested devices, most recently requested first on ties"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("""
+                SELECT device_id FROM device_access_stats
+                ORDER BY request_count DESC, last_accessed DESC
+                LIMIT ?
+            """, (limit,)).fetchall()
+        except sqlite3.OperationalError as e:
+            if 'no such table' not in str(e):
+                raise
+            rows = []
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+
+@dataclass
+class WarmRun:
+    reason: str
+    devices: int = 0
+    views: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+    finished: float = field(default_factory=time.time)
+
+
+class CacheWarmer:
+    """Precomputes registered device views in background threads"""
+
+    def __init__(self, db_path: str, workers: Optional[int] = None):
+        self.db_path = db_path
+        self.workers = config.CACHE_WARM_WORKERS if workers is None else workers
+        self.access = DeviceAccessStats(db_path)
+        self.last_run: Optional[WarmRun] = None
+        self.runs = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _submit(self, func: Callable, *args) -> Optional[Future]:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(self.workers, 1),
+                                                    thread_name_prefix="cache-warmer")
+            return self._executor.submit(func, *args)
+
+    def submit(self, device_ids: Iterable[int], reason: str) -> Optional[Future]:
+        """Warm the devices' views in the background"""
+        device_ids = list(dict.fromkeys(device_ids))
+        if not device_ids or not _views or current_cache_manager() is None:
+            return None
+        return self._submit(self.warm_devices, device_ids, reason)
+
+    def submit_top_devices(self, limit: Optional[int] = None) -> Optional[Future]:
+        """Warm the most requested devices in the background"""
+        limit = config.CACHE_WARM_TOP_DEVICES if limit is None else limit
+        if limit <= 0 or not _views or current_cache_manager() is None:
+            return None
+        return self._submit(lambda: self.warm_devices(self.access.top_devices(limit), "startup"))
+
+    def warm_devices(self, device_ids: List[int], reason: str) -> WarmRun:
+        """Compute every registered view of the devices that is not cached yet"""
+        run = WarmRun(reason)
+        started = time.perf_counter()
+        for device_id in device_ids:
+            run.devices += 1
+            for name in list(_views):
+                try:
+                    load_device_view(name, device_id)
+                    run.views += 1
+                except Exception as e:
+                    # 404s for views without data (e.g. no PQA analysis yet) land here too
+                    run.failures += 1
+                    logger.debug(f"Warming view {name} of device {device_id} failed: {e}")
+        run.seconds = time.perf_counter() - started
+        run.finished = time.time()
+        self.last_run = run
+        self.runs += 1
+        logger.info(f"Warmed {run.views} view(s) of {run.devices} device(s) ({reason}) in {run.seconds:.2f}s")
+        return run
+
+    def record_access(self, device_id: int):
+        if self.access.record(device_id):
+            self._submit(self.access.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "last_run": vars(self.last_run) if self.last_run else None,
+            "views": {
+                view.name: {
+                    "computations": view.computations,
+                    "avg_compute_ms": round(view.compute_seconds / view.computations * 1000, 2)
+                    if view.computations else None,
+                }
+                for view in _views.values()
+            },
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        try:
+            self.access.flush()
+        except Exception as e:
+            logger.warning(f"Could not save device request counts: {e}")
+
+
+_warmer: Optional[CacheWarmer] = None
+
+
+def init_cache_warmer(db_path: str) -> CacheWarmer:
+    """Initialize the global cache warmer and warm the most requested devices"""
+    global _warmer
+
+    if _warmer is None:
+        _warmer = CacheWarmer(db_path)
+        _warmer.submit_top_devices()
+
+    return _warmer
+
+
+def get_cache_warmer() -> Optional[CacheWarmer]:
+    return _warmer
+
+
+def shutdown_cache_warmer():
+    """Stop warming and save buffered request counts"""
+    global _warmer
+
+    if _warmer:
+        _warmer.close()
+        _warmer = None
+
+
+def warm_imported_devices(device_ids: Iterable[int]):
+    """Warm the views of freshly imported devices (CACHE_WARM_ON_IMPORT)"""
+    if _warmer and config.CACHE_WARM_ON_IMPORT:
+        _warmer.submit(device_ids, "import")
+
+
+def record_device_access(device_id: int):
+    if _warmer:
+        _warmer.record_access(device_id)
@@ -0,0 +1,294 @@
+"""
+Set-Based Cascade Deletes
+
+Deleting a device or an EDS file touches dozens of child tables, and foreign
+key enforcement is off on most connections, so ON DELETE CASCADE cannot be
+relied on. A ``CascadePlan`` reads the foreign keys once (PRAGMA
+foreign_key_list), adds the links SQLite does not know about (e.g. PQA rows
+of EDS files, which reuse ``device_id``) and orders the reachable tables so
+parents come before children.
+
+``CascadePlan.delete`` then works through the root ids in chunks, each in
+its own short transaction:
+1. Collect the rowids to delete per table into temp tables, parents first,
+   with one INSERT ... SELECT per link (no per-id statements).
+2. Apply ON DELETE SET NULL links.
+3. Delete children first with ``rowid IN (SELECT id FROM <temp table>)``.
+
+Analyses removed from pqa_quality_metrics keep the dashboard aggregates in
+sync through ``removing_analyses``. Callers can wrap each chunk in further
+context managers (e.g. to refresh the EDS device index).
+"""
+
+import logging
+import sqlite3
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from src import config
+from src.utils.pqa_dashboard import removing_analyses
+
+logger = logging.getLogger(__name__)
+
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_IN_PARAMETERS = 500
+
+# Wraps the deletes of one chunk: (cursor, root ids in the chunk) -> context manager
+ChunkHook = Callable[[sqlite3.Cursor, List[int]], ContextManager]
+
+IODD_PQA = "file_type = 'IODD'"
+EDS_PQA = "file_type = 'EDS'"
+
+
+def _queue_condition(file_type: str) -> str:
+    """pqa_analysis_queue has no file_type; scope it through its archive row"""
+    return f"archive_id IN (SELECT id FROM pqa_file_archive WHERE file_type = '{file_type}')"
+
+
+@dataclass(frozen=True)
+class CascadeLink:
+    """Rows of ``child`` whose ``column`` references a deleted ``parent`` row"""
+    parent: str
+    child: str
+    column: str
+    parent_column: Optional[str] = None  # None: the parent's rowid (INTEGER PRIMARY KEY)
+    condition: Optional[str] = None  # extra SQL filter on the child rows
+    set_null: bool = False  # ON DELETE SET NULL: clear the column instead of deleting
+
+
+class CascadePlan:
+    """Delete order and links for one root table, computed once per schema"""
+
+    def __init__(self, root: str, order: Sequence[str], links: Sequence[CascadeLink]):
+        self.root = root
+        self.order = list(order)
+        self.links = list(links)
+
+    @classmethod
+    def from_schema(cls, cursor: sqlite3.Cursor, root: str,
+                    extra_links: Iterable[CascadeLink] = (),
+                    conditions: Optional[Mapping[Tuple[str, str], str]] = None,
+                    exclude: Iterable[str] = ()) -> 'CascadePlan':
+        """
+        Build the plan from the database's foreign keys
+
+        Args:
+            cursor: Database cursor
+            root: Table whose rows are deleted
+            extra_links: Links without a foreign key
+            conditions: Extra SQL filter per foreign key, keyed by (child, column)
+            exclude: Tables never deleted from
+
+        Returns:
+            CascadePlan covering every table reachable from root
+
+        Raises:
+            ValueError: If the reachable tables reference each other in a cycle
+        """
+        conditions = conditions or {}
+        excluded = set(exclude)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        children = defaultdict(list)
+        for table in sorted(tables - excluded):
+            cursor.execute(f'PRAGMA foreign_key_list("{table}")')
+            for _, seq, parent, column, parent_column, _, on_delete, _ in cursor.fetchall():
+                if seq or parent == table:
+                    continue  # the schema has no composite or self references
+                if parent_column is not None:
+                    cursor.execute(f'PRAGMA table_info("{parent}")')
+                    if any(info[1] == parent_column and info[5] for info in cursor.fetchall()):
+                        parent_column = None  # the parent's INTEGER PRIMARY KEY is its rowid
+                children[parent].append(CascadeLink(
+                    parent, table, column, parent_column,
+                    condition=conditions.get((table, column)),
+                    set_null=on_delete.upper() == 'SET NULL',
+                ))
+        for link in extra_links:
+            if link.child in tables and link.parent in tables:
+                children[link.parent].append(link)
+
+        # Tables reachable through deleting links
+        reachable, pending = {root}, [root]
+        while pending:
+            for link in children[pending.pop()]:
+                if not link.set_null and link.child not in reachable:
+                    reachable.add(link.child)
+                    pending.append(link.child)
+
+        links = [link for parent in sorted(reachable) for link in children[parent]
+                 if link.set_null or link.child in reachable]
+        return cls(root, cls._parents_first(root, reachable, links), links)
+
+    @staticmethod
+    def _parents_first(root: str, reachable: set, links: Sequence[CascadeLink]) -> List[str]:
+        """Topological order (Kahn) of the reachable tables"""
+        incoming = {table: set() for table in reachable}
+        for link in links:
+            if not link.set_null:
+                incoming[link.child].add(link.parent)
+
+        # Every other table is reached through a link, so only an unreferenced root can start
+        order, ready = [], [root] if not incoming[root] else []
+        while ready:
+            table = ready.pop(0)
+            order.append(table)
+            for child in sorted(incoming):
+                if table in incoming[child]:
+                    incoming[child].discard(table)
+                    if not incoming[child] and child not in order and child not in ready:
+                        ready.append(child)
+        if len(order) != len(reachable):
+            raise ValueError(f"Cyclic references between {sorted(reachable - set(order))}")
+        return order
+
+    def _temp(self, table: str) -> str:
+        return f'"_cascade_{table}"'
+
+    def _parent_values(self, link: CascadeLink) -> str:
+        """Subquery of the referenced values of the parent rows being deleted"""
+        if link.parent_column is None:
+            return f'(SELECT id FROM {self._temp(link.parent)})'
+        return f'(SELECT "{link.parent_column}" FROM "{link.parent}" ' \
+            f'WHERE rowid IN (SELECT id FROM {self._temp(link.parent)}))'
+
+    def _collect(self, cursor: sqlite3.Cursor, chunk: List[int]) -> None:
+        """Fill the temp tables with the rowids to delete, parents first"""
+        for table in self.order:
+            cursor.execute(f"DELETE FROM {self._temp(table)}")
+        cursor.execute(f"""
+            INSERT INTO {self._temp(self.root)}
+            SELECT rowid FROM "{self.root}" WHERE rowid IN ({','.join('?' * len(chunk))})
+        """, chunk)
+        for table in self.order[1:]:
+            for link in self.links:
+                if link.child != table or link.set_null:
+                    continue
+                condition = f' AND ({link.condition})' if link.condition else ''
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO {self._temp(table)}
+                    SELECT rowid FROM "{table}" WHERE "{link.column}" IN {self._parent_values(link)}{condition}
+                """)
+
+    def _ids(self, cursor: sqlite3.Cursor, table: str) -> List[int]:
+        cursor.execute(f"SELECT id FROM {self._temp(table)}")
+        return [row[0] for row in cursor.fetchall()]
+
+    def _delete_collected(self, cursor: sqlite3.Cursor, counts: Dict[str, int]) -> None:
+        """SET NULL links first, then every collected row, children first"""
+        for link in self.links:
+            if not link.set_null:
+                continue
+            # Rows deleted anyway are left alone
+            surviving = f' AND rowid NOT IN (SELECT id FROM {self._temp(link.child)})' \
+                if link.child in self.order else ''
+            cursor.execute(f"""
+                UPDATE "{link.child}" SET "{link.column}" = NULL
+                WHERE "{link.column}" IN {self._parent_values(link)}{surviving}
+            """)
+            if cursor.rowcount:
+                counts[f'{link.child}.{link.column} (set NULL)'] += cursor.rowcount
+        for table in reversed(self.order):
+            cursor.execute(f'DELETE FROM "{table}" WHERE rowid IN (SELECT id FROM {self._temp(table)})')
+            counts[table] += cursor.rowcount
+
+    def existing_ids(self, cursor: sqlite3.Cursor, root_ids: Iterable[int]) -> set:
+        """The root ids that are present in the root table"""
+        ids, existing = sorted(set(root_ids)), set()
+        for start in range(0, len(ids), MAX_IN_PARAMETERS):
+            chunk = ids[start:start + MAX_IN_PARAMETERS]
+            cursor.execute(f"""
+                SELECT rowid FROM "{self.root}" WHERE rowid IN ({','.join('?' * len(chunk))})
+            """, chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    def delete(self, conn: sqlite3.Connection, root_ids: Iterable[int],
+               chunk_size: Optional[int] = None, hooks: Sequence[ChunkHook] = ()) -> Dict[str, int]:
+        """
+        Delete root rows and everything referencing them
+
+        Every chunk of root ids is collected, deleted and committed on its
+        own, so other connections are only blocked for one chunk at a time.
+
+        Args:
+            conn: Database connection
+            root_ids: Row ids in the root table (missing ids are ignored)
+            chunk_size: Root rows per transaction (default config.BULK_DELETE_CHUNK_SIZE)
+            hooks: Context managers entered around the deletes of every chunk
+
+        Returns:
+            Rows removed per table (tables without removed rows are omitted)
+        """
+        ids = sorted(set(root_ids))
+        chunk_size = max(1, min(chunk_size or config.BULK_DELETE_CHUNK_SIZE, MAX_IN_PARAMETERS))
+        counts = defaultdict(int)
+        if not ids:
+            return {}
+
+        conn.commit()
+        # Children are deleted explicitly and in order; per-row FK actions would only repeat that work.
+        # The caller's setting is restored afterwards.
+        foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        conn.execute("PRAGMA foreign_keys = OFF")
+        for table in self.order:
+            conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {self._temp(table)} (id INTEGER PRIMARY KEY)")
+
+        cursor = conn.cursor()
+        try:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                try:
+                    self._collect(cursor, chunk)
+                    with ExitStack() as stack:
+                        for hook in hooks:
+                            stack.enter_context(hook(cursor, chunk))
+                        if 'pqa_quality_metrics' in self.order:
+                            stack.enter_context(removing_analyses(cursor, self._ids(cursor, 'pqa_quality_metrics')))
+                        self._delete_collected(cursor, counts)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            for table in self.order:
+                conn.execute(f"DROP TABLE IF EXISTS {self._temp(table)}")
+            conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+
+        counts = {table: count for table, count in counts.items() if count}
+        logger.info(f"Deleted {counts.get(self.root, 0)} {self.root} rows in "
+                    f"{(len(ids) + chunk_size - 1) // chunk_size} chunk(s), "
+                    f"{sum(counts.values())} rows in {len(counts)} tables")
+        return counts
+
+
+def iodd_device_plan(cursor: sqlite3.Cursor) -> CascadePlan:
+    """Plan for deleting devices: all IODD tables and the devices' IODD PQA data"""
+    return CascadePlan.from_schema(
+        cursor, 'devices',
+        extra_links=[
+            # Single values of simple process data carry no record item
+            CascadeLink('process_data', 'process_data_single_values', 'process_data_id'),
+        ],
+        conditions={
+            ('pqa_quality_metrics', 'device_id'): IODD_PQA,
+            ('pqa_file_archive', 'device_id'): IODD_PQA,
+            ('pqa_analysis_queue', 'device_id'): _queue_condition('IODD'),
+        },
+    )
+
+
+def eds_file_plan(cursor: sqlite3.Cursor) -> CascadePlan:
+    """Plan for deleting EDS files: all EDS child tables and the files' EDS PQA data"""
+    return CascadePlan.from_schema(
+        cursor, 'eds_files',
+        extra_links=[
+            # EDS analyses store the EDS file id in device_id
+            CascadeLink('eds_files', 'pqa_quality_metrics', 'device_id', condition=EDS_PQA),
+            CascadeLink('eds_files', 'pqa_file_archive', 'device_id', condition=EDS_PQA),
+            CascadeLink('eds_files', 'pqa_analysis_queue', 'device_id', condition=_queue_condition('EDS')),
+        ],
+    )
@@ -0,0 +1,72 @@
+"""
+Chunk Row Prefetch
+
+Reconstruction reads a dozen child tables per file (parameters and their
+single values, menus, EDS assemblies, ...). ``ChunkRows`` loads each of these
+tables once for a whole chunk of files with a set-based ``IN (...)`` query
+and groups the rows by their parent key, so the per-file reads are dict
+lookups. A table is loaded the first time any file of the chunk asks for it.
+
+Each reconstructor declares its tables as ``ChildQuery`` entries. The SQL
+selects the rows of every file in the chunk (``{ids}`` expands to the chunk's
+placeholders), ordered the way one file's rows are read, with the row id as
+the last sort key so ties keep insertion order. Reconstructing a single file
+uses a chunk of one, so single and batch reconstruction read the same rows.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class ChildQuery:
+    """Rows of one table for all files of a chunk, grouped by ``key``"""
+    key: str
+    sql: str
+    optional: bool = False  # Table may be missing from older databases
+
+
+class ChunkRows:
+    """
+    Child rows of a chunk of files, loaded per table on first use
+
+    Args:
+        conn: Connection to load with (Row factory)
+        ids: IDs of the files in the chunk (devices or EDS files)
+        queries: Child queries by name
+    """
+
+    def __init__(self, conn: sqlite3.Connection, ids: Sequence[int], queries: Mapping[str, ChildQuery]):
+        self.conn = conn
+        self.ids = list(ids)
+        self.queries = queries
+        self._groups: Dict[str, Dict[Any, List[sqlite3.Row]]] = {}
+
+    def all(self, name: str, key: Any) -> List[sqlite3.Row]:
+        """Rows of a table for one parent key, in query order"""
+        groups = self._groups.get(name)
+        if groups is None:
+            groups = self._groups[name] = self._load(self.queries[name])
+        return groups.get(key, [])
+
+    def first(self, name: str, key: Any) -> Optional[sqlite3.Row]:
+        """First row of a table for one parent key, or None"""
+        rows = self.all(name, key)
+        return rows[0] if rows else None
+
+    def _load(self, query: ChildQuery) -> Dict[Any, List[sqlite3.Row]]:
+        groups: Dict[Any, List[sqlite3.Row]] = {}
+        if not self.ids:
+            return groups
+        marks = ','.join('?' * len(self.ids))
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query.sql.format(ids=marks), self.ids * query.sql.count('{ids}'))
+        except sqlite3.OperationalError:
+            if not query.optional:
+                raise
+            return groups
+        for row in cursor:
+            groups.setdefault(row[query.key], []).append(row)
+        return groups
@@ -1,77 +1,175 @@
 """
 Codebase Statistics Generator
 Analyzes the GreenStack project and generates detailed statistics
+
+The project tree is walked once per run, skipping excluded directories
+instead of descending into them. Line counts are kept per file with the
+file's (mtime, size) in ``codebase_stats_files.json``, so a refresh only
+reads files that changed since the previous run.
+
+``start_refresh`` runs the generation in a background thread and saves
+the result to ``codebase_stats.json``; ``get_refresh_status`` reports its
+progress (files checked of files found).
 """
 import os
 import subprocess
 import json
 import sqlite3
+import threading
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+STATS_FILE = "codebase_stats.json"
+FILE_CACHE_FILE = "codebase_stats_files.json"
+
+# Bump when the way lines are counted changes, to drop cached counts
+FILE_CACHE_VERSION = 1
+
+CODE_EXTENSIONS = {
+    '.py': 'Python',
+    '.jsx': 'JSX',
+    '.js': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.tsx': 'TSX',
+    '.css': 'CSS',
+    '.json': 'JSON',
+    '.md': 'Markdown',
+    '.html': 'HTML',
+    '.sql': 'SQL',
+    '.sh': 'Shell',
+    '.bat': 'Batch',
+    '.yml': 'YAML',
+    '.yaml': 'YAML'
+}
+
+# Documentation file types
+DOC_EXTENSIONS = {'.md'}
+
+EXCLUDE_DIRS = {'node_modules', '__pycache__', 'dist', 'build', '.git', 'venv', 'env', 'test-data'}
+
+# The generator's own output would change on every run
+EXCLUDE_FILES = {STATS_FILE, FILE_CACHE_FILE}
+
+# Reported as (files checked, files found)
+ProgressCallback = Callable[[int, int], None]
+
+
+def count_file_lines(filepath: Path, ext: str) -> Tuple[int, int, int]:
+    """(lines, blank lines, comment lines) of one file"""
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+    blank_lines = sum(1 for line in lines if not line.strip())
+
+    # Simple comment detection
+    comment_lines = 0
+    if ext == '.py':
+        comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
+    elif ext in ['.js', '.jsx', '.ts', '.tsx']:
+        comment_lines = sum(1 for line in lines if line.strip().startswith('//'))
+
+    return len(lines), blank_lines, comment_lines
+
+
+class FileLineCache:
+    """Line counts per file (relative path), valid while the file's mtime and size are unchanged"""
+
+    def __init__(self, entries: Optional[Dict[str, list]] = None):
+        # path -> [mtime_ns, size, lines, blank, comments]
+        self.entries = entries or {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: Path) -> 'FileLineCache':
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == FILE_CACHE_VERSION:
+                return cls(data.get('files', {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable line count cache {path}: {e}")
+        return cls()
+
+    def save(self, path: Path):
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': FILE_CACHE_VERSION, 'files': self.entries}, f)
+        os.replace(tmp_path, path)
+
+    def counts(self, filepath: Path, key: str, ext: str) -> Tuple[int, int, int]:
+        """Line counts of a file, read from disk only when it changed"""
+        st = filepath.stat()
+        entry = self.entries.get(key)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self.hits += 1
+            return entry[2], entry[3], entry[4]
+        self.misses += 1
+        counts = count_file_lines(filepath, ext)
+        self.entries[key] = [st.st_mtime_ns, st.st_size, *counts]
+        return counts
+
+    def prune(self, keep: set):
+        """Forget files that no longer exist"""
+        for key in set(self.entries) - keep:
+            del self.entries[key]
+
+
 class CodebaseStats:
-    def __init__(self, project_root: str = "."):
+    def __init__(self, project_root: str = ".", file_cache: Optional[FileLineCache] = None,
+                 progress: Optional[ProgressCallback] = None):
         self.project_root = Path(project_root)
         self.stats = {}
+        self.file_cache = file_cache if file_cache is not None else FileLineCache()
+        self.progress = progress
+        self._tree: Optional[Tuple[List[Path], int]] = None
+
+    def walk(self) -> Tuple[List[Path], int]:
+        """(files, directory count) of the project, without excluded directories; walked once"""
+        if self._tree is None:
+            files = []
+            total_dirs = 0
+            for root, dirs, filenames in os.walk(self.project_root):
+                dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+                total_dirs += len(dirs)
+                root_path = Path(root)
+                files.extend(root_path / name for name in filenames if name not in EXCLUDE_FILES)
+            self._tree = (files, total_dirs)
+        return self._tree
 
     def count_lines_by_extension(self):
         """Count lines of code by file extension"""
         extensions = defaultdict(lambda: {"files": 0, "lines": 0, "blank": 0, "comments": 0, "is_doc": False})
 
-        # Define which extensions to track
-        code_extensions = {
-            '.py': 'Python',
-            '.jsx': 'JSX',
-            '.js': 'JavaScript',
-            '.ts': 'TypeScript',
-            '.tsx': 'TSX',
-            '.css': 'CSS',
-            '.json': 'JSON',
-            '.md': 'Markdown',
-            '.html': 'HTML',
-            '.sql': 'SQL',
-            '.sh': 'Shell',
-            '.bat': 'Batch',
-            '.yml': 'YAML',
-            '.yaml': 'YAML'
-        }
+        files, _ = self.walk()
+        counted = [(filepath, filepath.suffix) for filepath in files if filepath.suffix in CODE_EXTENSIONS]
+        seen = set()
+        for done, (filepath, ext) in enumerate(counted, 1):
+            key = filepath.relative_to(self.project_root).as_posix()
+            seen.add(key)
+            try:
+                total_lines, blank_lines, comment_lines = self.file_cache.counts(filepath, key, ext)
+            except Exception as e:
+                logger.debug(f"Error reading {filepath}: {e}")
+                continue
 
-        # Mark documentation file types
-        doc_extensions = {'.md'}
-
-        exclude_dirs = {'node_modules', '__pycache__', 'dist', 'build', '.git', 'venv', 'env', 'test-data'}
-
-        for ext, lang in code_extensions.items():
-            for filepath in self.project_root.rglob(f'*{ext}'):
-                # Skip excluded directories
-                if any(excluded in filepath.parts for excluded in exclude_dirs):
-                    continue
-
-                try:
-                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()
-                        total_lines = len(lines)
-                        blank_lines = sum(1 for line in lines if not line.strip())
-
-                        # Simple comment detection
-                        comment_lines = 0
-                        if ext == '.py':
-                            comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
-                        elif ext in ['.js', '.jsx', '.ts', '.tsx']:
-                            comment_lines = sum(1 for line in lines if line.strip().startswith('//'))
-
-                        extensions[lang]["files"] += 1
-                        extensions[lang]["lines"] += total_lines
-                        extensions[lang]["blank"] += blank_lines
-                        extensions[lang]["comments"] += comment_lines
-                        extensions[lang]["is_doc"] = ext in doc_extensions
-                except Exception as e:
-                    logger.debug(f"Error reading {filepath}: {e}")
+            lang = CODE_EXTENSIONS[ext]
+            extensions[lang]["files"] += 1
+            extensions[lang]["lines"] += total_lines
+            extensions[lang]["blank"] += blank_lines
+            extensions[lang]["comments"] += comment_lines
+            extensions[lang]["is_doc"] = ext in DOC_EXTENSIONS
+            if self.progress and (done % 200 == 0 or done == len(counted)):
+                self.progress(done, len(counted))
 
+        self.file_cache.prune(seen)
         return dict(extensions)
 
     def get_git_stats(self):
@@ -182,21 +280,9 @@ class CodebaseStats:
 
     def count_files_and_dirs(self):
         """Count total files and directories"""
-        exclude_dirs = {'node_modules', '__pycache__', 'dist', 'build', '.git', 'venv', 'env', 'test-data'}
-
-        total_files = 0
-        total_dirs = 0
-
-        for item in self.project_root.rglob('*'):
-            if any(excluded in item.parts for excluded in exclude_dirs):
-                continue
-            if item.is_file():
-                total_files += 1
-            elif item.is_dir():
-                total_dirs += 1
-
+        files, total_dirs = self.walk()
         return {
-            'total_files': total_files,
+            'total_files': len(files),
             'total_directories': total_dirs
         }
 
@@ -211,14 +297,7 @@ class CodebaseStats:
             'config': 0
         }
 
-        exclude_dirs = {'node_modules', '__pycache__', 'dist', 'build', '.git', 'venv', 'env', 'test-data'}
-
-        for filepath in self.project_root.rglob('*'):
-            if not filepath.is_file():
-                continue
-            if any(excluded in filepath.parts for excluded in exclude_dirs):
-                continue
-
+        for filepath in self.walk()[0]:
             parts = filepath.parts
             if 'src' in parts and filepath.suffix == '.py':
                 structure['backend'] += 1
@@ -377,10 +456,107 @@ class CodebaseStats:
         logger.info(f"Statistics saved to {output_path}")
 
 
-def generate_stats(project_root: str = "."):
-    """Generate and return codebase statistics"""
-    stats_generator = CodebaseStats(project_root)
-    return stats_generator.generate_all_stats()
+def generate_stats(project_root: str = ".", progress: Optional[ProgressCallback] = None):
+    """Generate and return codebase statistics, reusing and updating the per-file line counts"""
+    cache_path = Path(project_root) / FILE_CACHE_FILE
+    file_cache = FileLineCache.load(cache_path)
+    stats_generator = CodebaseStats(project_root, file_cache=file_cache, progress=progress)
+    stats = stats_generator.generate_all_stats()
+    logger.info(f"Line counts: {file_cache.misses} file(s) read, {file_cache.hits} unchanged")
+    try:
+        file_cache.save(cache_path)
+    except OSError as e:
+        logger.warning(f"Failed to save line count cache: {e}")
+    return stats
+
+
+# ============================================================================
+# Background refresh
+# ============================================================================
+
+@dataclass
+class StatsRefresh:
+    """State of one background statistics run"""
+    status: str = 'running'  # running, completed, failed
+    done: int = 0
+    total: int = 0
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.done, self.total = done, total
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['percent'] = round(self.done / self.total * 100, 1) if self.total else (
+            100.0 if self.status == 'completed' else 0.0)
+        return data
+
+
+_refresh: Optional[StatsRefresh] = None
+_refresh_done = threading.Event()
+_refresh_lock = threading.Lock()
+_latest: Optional[Dict] = None
+
+
+def load_saved_stats(project_root: str = ".") -> Optional[Dict]:
+    """Statistics of the last run: in memory, else from codebase_stats.json"""
+    global _latest
+    if _latest is None:
+        stats_file = Path(project_root) / STATS_FILE
+        if stats_file.exists():
+            try:
+                with open(stats_file, 'r') as f:
+                    _latest = json.load(f)
+                logger.info("Loaded codebase statistics from cache file")
+            except Exception as e:
+                logger.warning(f"Failed to load stats cache: {e}")
+    return _latest
+
+
+def start_refresh(project_root: str = ".") -> StatsRefresh:
+    """
+    Regenerate the statistics in a background thread
+
+    Only files changed since the last run are read. While a run is in
+    progress, its state is returned instead of starting another one.
+    """
+    global _refresh
+    with _refresh_lock:
+        if _refresh is not None and _refresh.status == 'running':
+            return _refresh
+        refresh = _refresh = StatsRefresh()
+        _refresh_done.clear()
+
+    def run():
+        global _latest
+        try:
+            stats = generate_stats(project_root, progress=refresh.update_progress)
+            generator = CodebaseStats(project_root)
+            generator.stats = stats
+            generator.save_to_file(STATS_FILE)
+            _latest = stats
+            refresh.status = 'completed'
+        except Exception as e:
+            logger.error(f"Codebase statistics refresh failed: {e}", exc_info=True)
+            refresh.error = str(e)
+            refresh.status = 'failed'
+        refresh.finished_at = datetime.now().isoformat()
+        _refresh_done.set()
+
+    threading.Thread(target=run, name="codebase-stats", daemon=True).start()
+    return refresh
+
+
+def get_refresh_status() -> Optional[StatsRefresh]:
+    """State of the current or last background run"""
+    return _refresh
+
+
+def wait_for_refresh(timeout: float) -> bool:
+    """Wait for a running refresh; True once none is running"""
+    return _refresh is None or _refresh_done.wait(timeout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+"""
+Conditional Requests for Device-Scoped Responses
+
+Every GET/HEAD response under ``/api/iodd/{id}`` and
+``/api/config-export/iodd/{id}/`` carries an ETag and Last-Modified derived
+from the device's version stamp (src/utils/device_versions.py):
+
+    ETag: W/"<device id>-<version, hex>-<APP_VERSION>"
+
+Requests whose ``If-None-Match`` (or, without it, ``If-Modified-Since``)
+matches the current stamp are answered with 304 before the route runs. The
+stamp comes from the cache subsystem, so a revalidation normally does not
+touch the database.
+
+JSON bodies are compressed with gzip (or brotli, when installed and accepted
+by the client) and kept in an in-process cache keyed by ETag, URL and
+encoding. A repeated request for an unchanged device is served from that
+cache without calling the route. Entries need no invalidation: a new stamp
+means a new ETag. Streaming responses (exports) get the headers only.
+"""
+
+import gzip
+import logging
+import re
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from src import config
+from src.cache_manager import _MISSING, LocalCache
+from src.utils.device_versions import DeviceVersion, get_device_version
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEVICE_PATHS = (
+    re.compile(r'^/api/iodd/(?P<device_id>\d+)(?:/|$)'),
+    re.compile(r'^/api/config-export/iodd/(?P<device_id>\d+)/'),
+)
+
+# Clients must revalidate, which costs one cached stamp lookup
+CACHE_CONTROL = "private, no-cache"
+
+# Preferred first
+ENCODERS = {}
+if brotli is not None:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=5)
+ENCODERS['gzip'] = lambda body: gzip.compress(body, compresslevel=6)
+
+_encoded_bodies = LocalCache(
+    config.HTTP_ENCODED_CACHE_MAX_ENTRIES, config.HTTP_ENCODED_CACHE_MAX_BYTES, config.HTTP_ENCODED_CACHE_TTL
+)
+
+
+def device_id_for_path(path: str) -> Optional[int]:
+    """Device a request path belongs to, or None"""
+    for pattern in DEVICE_PATHS:
+        match = pattern.match(path)
+        if match:
+            return int(match.group('device_id'))
+    return None
+
+
+def make_etag(version: DeviceVersion) -> str:
+    return f'W/"{version.device_id}-{version.version:x}-{config.APP_VERSION}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(headers, version: DeviceVersion, etag: str) -> bool:
+    """Whether the request's validators match the current version"""
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            return version.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding the client accepts, or None"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in ENCODERS:
+        if accepted.get(coding, accepted.get('*', 0.0)) > 0:
+            return coding
+    return None
+
+
+def validator_headers(version: DeviceVersion, etag: str) -> Dict[str, str]:
+    return {
+        'ETag': etag,
+        'Last-Modified': format_datetime(version.last_modified, usegmt=True),
+        'Cache-Control': CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
+
+
+def encoded_cache_stats() -> Dict[str, Any]:
+    return _encoded_bodies.stats()
+
+
+async def conditional_device_response(request: Request, call_next, db_path: str) -> Response:
+    """
+    Middleware body: validators, 304s and encoded bodies for device-scoped reads
+
+    Requests outside device paths, other methods and unknown devices are
+    passed through unchanged.
+    """
+    device_id = device_id_for_path(request.url.path)
+    if device_id is None or request.method not in ('GET', 'HEAD'):
+        return await call_next(request)
+
+    try:
+        version = await run_in_threadpool(get_device_version, db_path, device_id)
+    except Exception as e:
+        logger.warning(f"Device version lookup failed for {device_id}: {e}")
+        version = None
+    if version is None:
+        return await call_next(request)
+
+    etag = make_etag(version)
+    headers = validator_headers(version, etag)
+    if is_not_modified(request.headers, version, etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(request.headers.get('accept-encoding', ''))
+    cache_key = None
+    if encoding and _encoded_bodies.enabled:
+        cache_key = f"{etag}|{request.url.path}?{request.url.query}|{encoding}"
+        cached = _encoded_bodies.get(cache_key)
+        if cached is not _MISSING:
+            body, media_type = cached
+            return _encoded_response(body, media_type, encoding, headers)
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    response.headers.update(headers)
+
+    if not encoding or 'content-encoding' in response.headers:
+        return response
+    length = int(response.headers.get('content-length') or 0)
+    media_type = response.headers.get('content-type', '')
+    if not (config.HTTP_COMPRESS_MIN_BYTES <= length <= config.HTTP_COMPRESS_MAX_BYTES) \
+            or not media_type.startswith('application/json'):
+        return response
+
+    body = b''.join([chunk async for chunk in response.body_iterator])
+    encoded = await run_in_threadpool(ENCODERS[encoding], body)
+    if cache_key is not None:
+        _encoded_bodies.set(cache_key, (encoded, media_type), len(encoded), config.HTTP_ENCODED_CACHE_TTL)
+    return _encoded_response(encoded, media_type, encoding, headers, response.headers.items())
+
+
+def _encoded_response(body: bytes, media_type: str, encoding: str, headers: Dict[str, str],
+                      original=()) -> Response:
+    response = Response(content=body, media_type=media_type)
+    for name, value in original:
+        if name not in ('content-length', 'content-type'):
+            response.headers[name] = value
+    response.headers.update(headers)
+    response.headers['content-encoding'] = encoding
+    return response
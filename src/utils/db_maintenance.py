@@ -0,0 +1,440 @@
+"""
+SQLite Maintenance
+
+Database maintenance that runs outside of request handlers, in small steps
+so readers and writers are only held up for one step at a time:
+- ``online_backup``: ``sqlite3.Connection.backup`` in page-sized steps
+  (consistent even while the database is being written to)
+- ``incremental_vacuum``: ``PRAGMA incremental_vacuum`` in page-sized steps;
+  a database still in auto_vacuum=NONE is converted once with a full VACUUM
+- ``analyze_tables``: ANALYZE one table at a time with a sampling limit,
+  followed by ``PRAGMA optimize``
+- ``DatabaseSnapshot``: streams a consistent copy of the database file,
+  optionally gzip-compressed, without writing a temporary copy
+
+Steps stop once a time budget is used up. Vacuum and analyze pick up where
+they stopped on the next run (free pages remain on the freelist, and the
+next table to analyze is remembered).
+
+Jobs run one at a time in a background thread (``submit_job``) and report
+their progress through ``get_job``/``list_jobs``. ``MaintenanceScheduler``
+runs vacuum and analyze periodically.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Reported as (pages or tables done, total)
+ProgressCallback = Callable[[int, int], None]
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 50
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class MaintenanceBusyError(RuntimeError):
+    """Another maintenance job is running, or the database is too busy for a snapshot"""
+
+
+def _report(progress: Optional[ProgressCallback], done: int, total: int) -> None:
+    if progress:
+        progress(done, total)
+
+
+def _out_of_time(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+# ============================================================================
+# Maintenance operations
+# ============================================================================
+
+def online_backup(db_path: str, dest_path: str, pages_per_step: Optional[int] = None,
+                  pause: Optional[float] = None, progress: Optional[ProgressCallback] = None) -> int:
+    """
+    Copy the database with the SQLite online backup API
+
+    Locks are released between steps; if another connection writes in the
+    meantime, SQLite restarts the copy so the result is always consistent.
+
+    Args:
+        db_path: Source database
+        dest_path: Backup file (overwritten)
+        pages_per_step: Pages copied per step (default MAINTENANCE_PAGES_PER_STEP)
+        pause: Seconds to sleep between steps (default MAINTENANCE_STEP_PAUSE)
+        progress: Called with (pages copied, total pages) after each step
+
+    Returns:
+        Size of the backup in bytes
+    """
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(dest_path)
+    try:
+        source.backup(
+            target,
+            pages=max(pages_per_step or config.MAINTENANCE_PAGES_PER_STEP, 1),
+            progress=lambda status, remaining, total: _report(progress, total - remaining, total),
+            sleep=config.MAINTENANCE_STEP_PAUSE if pause is None else pause,
+        )
+        page_size = target.execute("PRAGMA page_size").fetchone()[0]
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+    logger.info(f"Backed up {db_path} to {dest_path} ({page_count} pages)")
+    return page_size * page_count
+
+
+def incremental_vacuum(db_path: str, pages_per_step: Optional[int] = None, pause: Optional[float] = None,
+                       budget: Optional[float] = None, convert: bool = False,
+                       progress: Optional[ProgressCallback] = None) -> Dict:
+    """
+    Return free pages to the file system in short steps
+
+    Needs auto_vacuum=INCREMENTAL. A database created without it is only
+    converted when ``convert`` is set: that runs one full VACUUM, which
+    blocks writers for its duration.
+
+    Args:
+        db_path: Database to vacuum
+        pages_per_step: Free pages released per step (default MAINTENANCE_PAGES_PER_STEP)
+        pause: Seconds to sleep between steps (default MAINTENANCE_STEP_PAUSE)
+        budget: Stop after this many seconds; the next run continues
+        convert: Switch the database to auto_vacuum=INCREMENTAL if needed
+        progress: Called with (pages released, free pages at start) after each step
+
+    Returns:
+        dict with pages_freed, pages_remaining, converted and size_before/size_after (bytes)
+    """
+    pages_per_step = max(pages_per_step or config.MAINTENANCE_PAGES_PER_STEP, 1)
+    pause = config.MAINTENANCE_STEP_PAUSE if pause is None else pause
+    deadline = time.monotonic() + budget if budget else None
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        size = lambda: conn.execute("PRAGMA page_count").fetchone()[0] * page_size  # noqa: E731
+        free_pages = lambda: conn.execute("PRAGMA freelist_count").fetchone()[0]  # noqa: E731
+        result = {"size_before": size(), "pages_freed": 0, "converted": False}
+
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            if not convert:
+                logger.info("Skipping incremental vacuum: database is not in auto_vacuum=INCREMENTAL mode")
+                return {**result, "pages_remaining": free_pages(), "size_after": result["size_before"]}
+            logger.info("Converting database to auto_vacuum=INCREMENTAL (full VACUUM)")
+            total = free_pages()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            result.update(converted=True, pages_freed=total)
+            _report(progress, total, total)
+        else:
+            total = free_pages()
+            remaining = total
+            while remaining and not _out_of_time(deadline):
+                # Each step is its own short write transaction
+                conn.execute(f"PRAGMA incremental_vacuum({pages_per_step})").fetchall()
+                remaining = free_pages()
+                _report(progress, total - remaining, total)
+                if remaining and pause:
+                    time.sleep(pause)
+            result["pages_freed"] = total - remaining
+
+        return {**result, "pages_remaining": free_pages(), "size_after": size()}
+    finally:
+        conn.close()
+
+
+# Next table for analyze_tables, so a run that ran out of time is resumed
+_analyze_resume: Dict[str, str] = {}
+
+
+def analyze_tables(db_path: str, budget: Optional[float] = None, analysis_limit: Optional[int] = None,
+                   pause: Optional[float] = None, progress: Optional[ProgressCallback] = None) -> Dict:
+    """
+    Refresh planner statistics one table at a time, then run PRAGMA optimize
+
+    Args:
+        db_path: Database to analyze
+        budget: Stop after this many seconds; the next run continues with the next table
+        analysis_limit: Rows sampled per index (default MAINTENANCE_ANALYSIS_LIMIT, 0 = all)
+        pause: Seconds to sleep between tables (default MAINTENANCE_STEP_PAUSE)
+        progress: Called with (tables analyzed, tables) after each table
+
+    Returns:
+        dict with the tables analyzed and whether the pass completed
+    """
+    deadline = time.monotonic() + budget if budget else None
+    limit = config.MAINTENANCE_ANALYSIS_LIMIT if analysis_limit is None else analysis_limit
+    pause = config.MAINTENANCE_STEP_PAUSE if pause is None else pause
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {int(limit)}")
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        resume = _analyze_resume.get(db_path)
+        pending = [table for table in tables if resume is None or table >= resume]
+
+        analyzed: List[str] = []
+        for table in pending:
+            if _out_of_time(deadline):
+                _analyze_resume[db_path] = table
+                break
+            conn.execute(f'ANALYZE "{table}"')
+            analyzed.append(table)
+            _report(progress, len(analyzed), len(pending))
+            if pause:
+                time.sleep(pause)
+        else:
+            _analyze_resume.pop(db_path, None)
+            conn.execute("PRAGMA optimize")
+
+        complete = db_path not in _analyze_resume
+        logger.info(f"Analyzed {len(analyzed)} of {len(pending)} tables"
+                    f"{'' if complete else ', resuming at ' + _analyze_resume[db_path]}")
+        return {"tables_analyzed": analyzed, "complete": complete}
+    finally:
+        conn.close()
+
+
+class DatabaseSnapshot:
+    """
+    A consistent, streamable view of the database file
+
+    Holds a read transaction for its lifetime. In WAL mode the snapshot is
+    only taken once every committed frame is checkpointed into the main
+    file; from then on checkpoints cannot write past this reader, so the
+    main file equals the snapshot until ``close``. In rollback-journal mode
+    the read lock keeps writers from committing.
+    """
+
+    def __init__(self, db_path: str, attempts: int = 10, retry_delay: float = 0.05):
+        self.db_path = db_path
+        # The response body is iterated in the thread pool, one chunk per call
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        try:
+            self.size = self._begin(attempts, retry_delay)
+        except Exception:
+            self._conn.close()
+            raise
+
+    def _begin(self, attempts: int, retry_delay: float) -> int:
+        wal = self._conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+        checkpointer = sqlite3.connect(self.db_path, isolation_level=None) if wal else None
+        try:
+            for _ in range(attempts):
+                self._conn.execute("BEGIN")
+                self._conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                if checkpointer is None:
+                    break
+                # Capped at this reader's snapshot: equal counts mean the file holds exactly the snapshot
+                busy, wal_frames, checkpointed = checkpointer.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+                if wal_frames == checkpointed:
+                    break
+                self._conn.execute("COMMIT")
+                time.sleep(retry_delay)
+            else:
+                raise MaintenanceBusyError("Database is being written to continuously; try again later")
+        finally:
+            if checkpointer is not None:
+                checkpointer.close()
+
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        return page_size * page_count
+
+    def iter_bytes(self, chunk_size: int = 1024 * 1024, compress: bool = False) -> Iterator[bytes]:
+        """Yield the database file (gzip stream if compress), then release the snapshot"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        try:
+            with open(self.db_path, 'rb') as db_file:
+                remaining = self.size
+                while remaining > 0:
+                    chunk = db_file.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    if compressor is None:
+                        yield chunk
+                    else:
+                        compressed = compressor.compress(chunk)
+                        if compressed:
+                            yield compressed
+            if compressor is not None:
+                yield compressor.flush()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# ============================================================================
+# Background jobs
+# ============================================================================
+
+@dataclass
+class MaintenanceJob:
+    """State of one background maintenance run"""
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = 'pending'  # pending, running, completed, failed
+    done: int = 0
+    total: int = 0
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: Optional[str] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.done, self.total = done, total
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['percent'] = round(self.done / self.total * 100, 1) if self.total else (
+            100.0 if self.status == 'completed' else 0.0)
+        return data
+
+
+_jobs: 'OrderedDict[str, MaintenanceJob]' = OrderedDict()
+_jobs_lock = threading.Lock()
+_running: Optional[MaintenanceJob] = None
+
+
+def submit_job(kind: str, operation: Callable[[ProgressCallback], Dict]) -> MaintenanceJob:
+    """
+    Run operation in a background thread as a maintenance job
+
+    Args:
+        kind: Job name shown in status responses (e.g. 'backup', 'vacuum')
+        operation: Called with a progress callback; returns the job result
+
+    Returns:
+        The new job
+
+    Raises:
+        MaintenanceBusyError: If another job is still running
+    """
+    global _running
+    with _jobs_lock:
+        if _running is not None:
+            raise MaintenanceBusyError(f"Maintenance job {_running.id} ({_running.kind}) is still running")
+        job = _running = MaintenanceJob(kind)
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_FINISHED_JOBS:
+            _jobs.popitem(last=False)
+
+    def run():
+        global _running
+        job.status = 'running'
+        result, error = None, None
+        try:
+            result = operation(job.update_progress)
+        except Exception as e:
+            logger.error(f"Maintenance job {job.id} ({kind}) failed: {e}", exc_info=True)
+            error = str(e)
+        # A finished job never shows up as still blocking the next one
+        with _jobs_lock:
+            job.result, job.error = result, error
+            job.status = 'failed' if error is not None else 'completed'
+            job.finished_at = datetime.now().isoformat()
+            _running = None
+
+    threading.Thread(target=run, name=f"maintenance-{kind}", daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[MaintenanceJob]:
+    """Job by id (recent jobs only)"""
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[MaintenanceJob]:
+    """Recent jobs, newest first"""
+    return list(reversed(_jobs.values()))
+
+
+# ============================================================================
+# Scheduled maintenance
+# ============================================================================
+
+class MaintenanceScheduler:
+    """Runs incremental vacuum and table analysis periodically within a time budget"""
+
+    def __init__(self, db_path: str, interval: Optional[int] = None):
+        self.db_path = db_path
+        self.interval = config.MAINTENANCE_INTERVAL if interval is None else interval
+        self._stop_flag = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the maintenance thread (no-op when the interval is 0)"""
+        if self.interval <= 0:
+            logger.info("Scheduled database maintenance is disabled")
+            return
+        self._thread = threading.Thread(target=self._loop, name="db-maintenance", daemon=True)
+        self._thread.start()
+        logger.info(f"Database maintenance thread started (interval: {self.interval}s)")
+
+    def stop(self):
+        """Stop the maintenance thread"""
+        self._stop_flag.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def run_once(self) -> Dict:
+        """One budgeted pass: incremental vacuum, then analyze"""
+        budget = config.MAINTENANCE_TIME_BUDGET
+        started = time.monotonic()
+        vacuum = incremental_vacuum(self.db_path, budget=budget)
+        analyze = analyze_tables(self.db_path, budget=max(budget - (time.monotonic() - started), 1))
+        return {"vacuum": vacuum, "analyze": analyze}
+
+    def _loop(self):
+        # Let startup work (migrations, PQA startup analysis) go first
+        while not self._stop_flag.wait(timeout=max(self.interval, 60)):
+            try:
+                submit_job('scheduled', lambda progress: self.run_once())
+            except MaintenanceBusyError as e:
+                logger.info(f"Skipping scheduled maintenance: {e}")
+            except Exception as e:
+                logger.error(f"Database maintenance error: {e}", exc_info=True)
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def init_maintenance_scheduler(db_path: str) -> MaintenanceScheduler:
+    """Initialize the global maintenance scheduler"""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = MaintenanceScheduler(db_path)
+        _scheduler.start()
+
+    return _scheduler
+
+
+def shutdown_maintenance_scheduler():
+    """Shutdown the global maintenance scheduler"""
+    global _scheduler
+
+    if _scheduler:
+        _scheduler.stop()
+        _scheduler = None
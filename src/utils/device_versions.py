@@ -0,0 +1,113 @@
+"""
+Device Version Stamps
+
+Everything served under a device (parameters, process data, menus, assets,
+exports, ...) only changes when the device is imported again or deleted.
+``device_versions`` holds one stamp per device that the storage layer bumps
+inside the transaction that changes the device:
+- ``bump_device_versions`` after saving a device or its assets
+- rows are removed with the device (foreign key, so cascade deletes and
+  the "delete all" lists include them)
+
+Stamps are microseconds since the epoch, and always greater than the
+previous stamp of the same id. An id that is reused after a delete therefore
+never repeats an old stamp, even if the table was emptied in between.
+
+``get_device_version`` answers from the cache subsystem (tagged with the
+device, so the usual device invalidations drop it) and falls back to one
+primary-key lookup. Devices imported before the table existed get a stamp
+on first lookup.
+"""
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from src import config
+from src.cache_manager import current_cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeviceVersion:
+    device_id: int
+    version: int
+    updated_at: float  # Unix timestamp
+
+    @property
+    def last_modified(self) -> datetime:
+        return datetime.fromtimestamp(int(self.updated_at), tz=timezone.utc)
+
+
+def bump_device_versions(cursor: sqlite3.Cursor, device_ids: Iterable[int]) -> None:
+    """
+    Give the devices a new stamp
+
+    Call inside the transaction that changed the devices; the caller commits.
+    Databases without the device_versions table are left alone.
+    """
+    now = time.time()
+    rows = [(int(now * 1_000_000), now, device_id) for device_id in sorted(set(device_ids))]
+    try:
+        # Only existing devices get a stamp, so a late bump cannot leave an orphan row
+        cursor.executemany("""
+            INSERT INTO device_versions (device_id, version, updated_at)
+            SELECT id, ?, ? FROM devices WHERE id = ?
+            ON CONFLICT (device_id) DO UPDATE SET
+                version = MAX(excluded.version, device_versions.version + 1),
+                updated_at = excluded.updated_at
+        """, rows)
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+        logger.debug("device_versions table missing, version stamps disabled")
+
+
+def load_device_version(db_path: str, device_id: int) -> Optional[DeviceVersion]:
+    """Stamp of a device from the database, created for devices that have none yet"""
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT version, updated_at FROM device_versions WHERE device_id = ?", (device_id,)
+        ).fetchone()
+        if row is None:
+            bump_device_versions(conn.cursor(), [device_id])
+            conn.commit()
+            row = conn.execute(
+                "SELECT version, updated_at FROM device_versions WHERE device_id = ?", (device_id,)
+            ).fetchone()
+            if row is None:
+                return None
+        return DeviceVersion(device_id, row[0], row[1])
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+        return None
+    finally:
+        conn.close()
+
+
+def get_device_version(db_path: str, device_id: int) -> Optional[DeviceVersion]:
+    """
+    Current stamp of a device, or None if the device does not exist
+
+    Served from the cache when one is configured, so repeated lookups do not
+    touch the database.
+    """
+    cache = current_cache_manager()
+    if cache is None:
+        return load_device_version(db_path, device_id)
+
+    def load():
+        version = load_device_version(db_path, device_id)
+        return [version.version, version.updated_at] if version else None
+
+    cached = cache.get_or_set(
+        "versions", f"device:{device_id}", load,
+        ttl=config.DEVICE_VERSION_CACHE_TTL, tags=["all_devices", f"device:{device_id}"]
+    )
+    return DeviceVersion(device_id, cached[0], cached[1]) if cached else None
@@ -0,0 +1,175 @@
+"""
+EDS Device Index
+
+The grouped EDS listings read ``eds_device_index`` instead of ranking every
+eds_files row with window functions and querying assemblies per row.
+
+The table has one row per variant: (vendor_code, product_code,
+major_revision, minor_revision, assembly_count). Each row describes the
+newest file of that variant: its id, listing columns, and OPC-UA/MQTT/JSON
+feature flags from its assemblies. It also holds per-device values:
+- revision_count: files of the device
+- is_latest_revision: set on the variant row holding the device's latest
+  revision (highest revision, then newest import)
+
+Rows are recomputed per device whenever files of that device are imported
+or deleted (``refresh_device_index``, or ``refreshing_device_index`` around
+a delete). ``rebuild_device_index`` recomputes the whole table, and
+``ensure_device_index`` builds it on first use.
+"""
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_IN_PARAMETERS = 500
+
+# Assembly numbers that mark optional interfaces: (flag column, feature name, assembly number)
+FEATURE_ASSEMBLIES = (
+    ('has_opcua', 'OPC-UA', 210),
+    ('has_mqtt', 'MQTT', 211),
+    ('has_json', 'JSON', 213),
+)
+
+# Per-file assembly count and feature flags; needs eds_files f LEFT JOIN eds_assemblies a, GROUP BY f.id
+FILE_FEATURES_SELECT = ', '.join(
+    ['COUNT(a.id) AS assembly_count'] +
+    [f'COALESCE(MAX(a.assembly_number = {number}), 0) AS {flag}' for flag, _, number in FEATURE_ASSEMBLIES]
+)
+
+LISTING_COLUMNS = (
+    'vendor_name', 'product_type', 'product_type_str', 'product_name', 'catalog_number',
+    'description', 'import_date', 'home_url',
+    'diagnostic_info_count', 'diagnostic_warn_count', 'diagnostic_error_count', 'diagnostic_fatal_count',
+    'has_parsing_issues',
+)
+
+INDEX_COLUMNS = (
+    'vendor_code', 'product_code', 'major_revision', 'minor_revision', 'assembly_count',
+    'eds_file_id', 'file_count', 'revision_count', 'is_latest_revision',
+    *(flag for flag, _, _ in FEATURE_ASSEMBLIES),
+    *LISTING_COLUMNS,
+)
+
+DeviceKey = Tuple[Optional[int], Optional[int]]
+
+
+def variant_info(assembly_count: int, *flags) -> Dict:
+    """
+    Variant label and features from an assembly count and feature flags
+
+    Args:
+        assembly_count: Number of fixed assemblies
+        flags: has_opcua, has_mqtt, has_json (in FEATURE_ASSEMBLIES order)
+
+    Returns:
+        dict with variant_label, assembly_count, features and feature_set
+    """
+    features = [name for (_, name, _), flag in zip(FEATURE_ASSEMBLIES, flags) if flag]
+    return {
+        "variant_label": "Extended" if features else "Standard",
+        "assembly_count": assembly_count,
+        "features": features,
+        "feature_set": ", ".join(features) if features else "Basic",
+    }
+
+
+def _insert_index_rows(cursor: sqlite3.Cursor, scope: str = "", params: Sequence = ()) -> None:
+    """Recompute index rows from eds_files for the files matching scope"""
+    listing = ', '.join(f'f.{column}' for column in LISTING_COLUMNS)
+    cursor.execute(f"""
+        INSERT INTO eds_device_index ({', '.join(INDEX_COLUMNS)})
+        WITH files AS (
+            SELECT f.id, f.vendor_code, f.product_code, f.major_revision, f.minor_revision,
+                   {listing}, {FILE_FEATURES_SELECT}
+            FROM eds_files f
+            LEFT JOIN eds_assemblies a ON a.eds_file_id = f.id
+            {scope}
+            GROUP BY f.id
+        ),
+        ranked AS (
+            SELECT files.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vendor_code, product_code, major_revision, minor_revision, assembly_count
+                       ORDER BY import_date DESC, id DESC
+                   ) AS variant_rn,
+                   COUNT(*) OVER (
+                       PARTITION BY vendor_code, product_code, major_revision, minor_revision, assembly_count
+                   ) AS file_count,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY vendor_code, product_code
+                       ORDER BY major_revision DESC, minor_revision DESC, import_date DESC, id DESC
+                   ) AS device_rn,
+                   COUNT(*) OVER (PARTITION BY vendor_code, product_code) AS revision_count
+            FROM files
+        )
+        SELECT vendor_code, product_code, major_revision, minor_revision, assembly_count,
+               id, file_count, revision_count, device_rn = 1,
+               {', '.join(flag for flag, _, _ in FEATURE_ASSEMBLIES)},
+               {', '.join(LISTING_COLUMNS)}
+        FROM ranked
+        WHERE variant_rn = 1
+    """, params)
+
+
+def device_keys(cursor: sqlite3.Cursor, eds_ids: Sequence[int]) -> List[DeviceKey]:
+    """(vendor_code, product_code) of the given EDS files; read these before deleting them"""
+    keys = set()
+    for start in range(0, len(eds_ids), MAX_IN_PARAMETERS):
+        chunk = list(eds_ids[start:start + MAX_IN_PARAMETERS])
+        cursor.execute(f"""
+            SELECT DISTINCT vendor_code, product_code FROM eds_files
+            WHERE id IN ({','.join('?' * len(chunk))})
+        """, chunk)
+        keys.update(cursor.fetchall())
+    return sorted(keys, key=repr)
+
+
+def refresh_device_index(cursor: sqlite3.Cursor, devices: Iterable[DeviceKey]) -> None:
+    """
+    Recompute the index rows of the given devices
+
+    Call after inserting or deleting EDS files (and their assemblies) inside
+    the same transaction; the caller commits.
+
+    Args:
+        cursor: Database cursor
+        devices: (vendor_code, product_code) of every device that changed
+    """
+    for vendor_code, product_code in set(devices):
+        cursor.execute("DELETE FROM eds_device_index WHERE vendor_code IS ? AND product_code IS ?",
+                       (vendor_code, product_code))
+        _insert_index_rows(cursor, "WHERE f.vendor_code IS ? AND f.product_code IS ?",
+                           (vendor_code, product_code))
+
+
+@contextmanager
+def refreshing_device_index(cursor: sqlite3.Cursor, eds_ids: Sequence[int]) -> Iterator[None]:
+    """Refresh the devices of the given EDS files after they are deleted inside the block"""
+    devices = device_keys(cursor, eds_ids)
+    yield
+    refresh_device_index(cursor, devices)
+
+
+def rebuild_device_index(conn: sqlite3.Connection) -> None:
+    """Recompute the whole index from eds_files and eds_assemblies"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM eds_device_index")
+    _insert_index_rows(cursor)
+    conn.commit()
+    cursor.execute("SELECT COUNT(*) FROM eds_device_index")
+    logger.info(f"Rebuilt EDS device index: {cursor.fetchone()[0]} variants")
+
+
+def ensure_device_index(conn: sqlite3.Connection) -> None:
+    """Build the index on first use (e.g. right after the migration)"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT NOT EXISTS (SELECT 1 FROM eds_device_index) AND EXISTS (SELECT 1 FROM eds_files)
+    """)
+    if cursor.fetchone()[0]:
+        rebuild_device_index(conn)
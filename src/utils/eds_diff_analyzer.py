@@ -6,11 +6,12 @@ Handles INI-format specific comparison logic.
 """
 
 import logging
-import configparser
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from src.parsers.eds_section_index import EDSSectionIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -101,19 +102,24 @@ class EDSDiffAnalyzer:
     def __init__(self, db_path: str = "greenstack.db"):
         self.db_path = db_path
 
-    def analyze(self, original_eds: str, reconstructed_eds: str) -> Tuple[EDSQualityMetrics, List[EDSDiffItem]]:
+    def analyze(self, original_eds: str, reconstructed_eds: str,
+                original_index: Optional[EDSSectionIndex] = None) -> Tuple[EDSQualityMetrics, List[EDSDiffItem]]:
         """
         Perform comprehensive EDS diff analysis
 
         Args:
             original_eds: Original EDS file content
             reconstructed_eds: Reconstructed EDS from database
+            original_index: Section index stored at import for the original file;
+                tokenized from original_eds if omitted
 
         Returns:
             Tuple of (EDSQualityMetrics, List[EDSDiffItem])
         """
-        # Parse EDS files as INI
-        original_config = self._parse_eds(original_eds)
+        # Tokenize EDS files (INI format) into section -> key/value views
+        if original_index is None:
+            original_index = EDSSectionIndex.tokenize(original_eds)
+        original_config = self._sections_from_index(original_index)
         reconstructed_config = self._parse_eds(reconstructed_eds)
 
         # Collect statistics
@@ -132,53 +138,43 @@ class EDSDiffAnalyzer:
 
         return metrics, diff_items
 
-    def _parse_eds(self, eds_content: str) -> configparser.ConfigParser:
-        """Parse EDS file (INI format) into ConfigParser"""
-        # Use RawConfigParser behavior by setting interpolation=None
-        # This prevents '%' characters in EDS values (like %QW, %IW for PLC addressing)
-        # from being interpreted as interpolation syntax
-        config = configparser.ConfigParser(
-            allow_no_value=True,
-            strict=False,
-            comment_prefixes=('$',),
-            interpolation=None  # Disable interpolation to handle % characters
-        )
-        config.optionxform = str  # Preserve case sensitivity
-
-        try:
-            config.read_string(eds_content)
-        except configparser.Error as e:
-            logger.error(f"EDS parsing error: {e}")
-            # Create empty config to continue analysis
-            config = configparser.ConfigParser(interpolation=None)
+    def _parse_eds(self, eds_content: str) -> Dict[str, Dict[str, Optional[str]]]:
+        """Tokenize EDS file (INI format) into section -> key/value mapping"""
+        return self._sections_from_index(EDSSectionIndex.tokenize(eds_content))
 
-        return config
+    @staticmethod
+    def _sections_from_index(index: EDSSectionIndex) -> Dict[str, Dict[str, Optional[str]]]:
+        """Merged section view of a tokenized EDS file (same rules as configparser)"""
+        if index.parse_error:
+            # as_dict() is empty for unparseable content so analysis can continue
+            logger.error(f"EDS parsing error: {index.parse_error}")
+        return index.as_dict()
 
-    def _collect_eds_stats(self, config: configparser.ConfigParser) -> Dict:
+    def _collect_eds_stats(self, config: Dict[str, Dict[str, Optional[str]]]) -> Dict:
         """Collect statistics about EDS configuration"""
         stats = {
-            'total_sections': len(config.sections()),
+            'total_sections': len(config),
             'total_keys': 0,
             'sections_by_name': {},
             'keys_by_section': {}
         }
 
-        for section in config.sections():
-            keys = list(config[section].keys())
+        for section, values in config.items():
+            keys = list(values.keys())
             stats['total_keys'] += len(keys)
             stats['sections_by_name'][section] = len(keys)
             stats['keys_by_section'][section] = keys
 
         return stats
 
-    def _find_differences(self, original: configparser.ConfigParser,
-                         reconstructed: configparser.ConfigParser) -> List[EDSDiffItem]:
+    def _find_differences(self, original: Dict[str, Dict[str, Optional[str]]],
+                         reconstructed: Dict[str, Dict[str, Optional[str]]]) -> List[EDSDiffItem]:
         """Find differences between two EDS configurations"""
         diffs = []
 
         # Get all unique sections
-        original_sections = set(original.sections())
-        reconstructed_sections = set(reconstructed.sections())
+        original_sections = set(original)
+        reconstructed_sections = set(reconstructed)
 
         # Missing sections
         for section in original_sections - reconstructed_sections:
@@ -215,8 +211,8 @@ class EDSDiffAnalyzer:
         return diffs
 
     def _compare_section(self, section_name: str,
-                        original_section: configparser.SectionProxy,
-                        reconstructed_section: configparser.SectionProxy) -> List[EDSDiffItem]:
+                        original_section: Dict[str, Optional[str]],
+                        reconstructed_section: Dict[str, Optional[str]]) -> List[EDSDiffItem]:
         """Compare two sections key-by-key"""
         diffs = []
 
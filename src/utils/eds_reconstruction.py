@@ -7,10 +7,82 @@ EDS files use INI-style format for EtherNet/IP devices per ODVA specifications.
 
 import logging
 import sqlite3
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.parsers.eds_section_index import EDSSectionIndex, section_index_from_row
+
+from .chunk_rows import ChildQuery, ChunkRows
 
 logger = logging.getLogger(__name__)
 
+_PARAMETERS = "SELECT id FROM eds_parameters WHERE eds_file_id IN ({ids})"
+
+# Every table the reconstructor reads, for a chunk of EDS files
+EDS_QUERIES: Dict[str, ChildQuery] = {
+    'eds_file': ChildQuery('id', "SELECT * FROM eds_files WHERE id IN ({ids})"),
+    # Key last so the row reads as (format_version, content_hash, index_data)
+    'section_index': ChildQuery('eds_file_id', """
+        SELECT format_version, content_hash, index_data, eds_file_id
+        FROM eds_section_index WHERE eds_file_id IN ({ids})
+    """, optional=True),
+    'parameters': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_parameters WHERE eds_file_id IN ({ids}) ORDER BY param_number, id
+    """),
+    'enum_values': ChildQuery('parameter_id', f"""
+        SELECT parameter_id, enum_name, enum_value, enum_display, is_default
+        FROM eds_enum_values
+        WHERE parameter_id IN ({_PARAMETERS})
+        ORDER BY enum_value, id
+    """),
+    'groups': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_groups WHERE eds_file_id IN ({ids}) ORDER BY group_number, id
+    """),
+    'assemblies': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_assemblies WHERE eds_file_id IN ({ids}) ORDER BY assembly_number, id
+    """),
+    'connections': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_connections WHERE eds_file_id IN ({ids}) ORDER BY connection_number, id
+    """),
+    'ports': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_ports WHERE eds_file_id IN ({ids}) ORDER BY port_number, id
+    """),
+    'capacity': ChildQuery('eds_file_id', "SELECT * FROM eds_capacity WHERE eds_file_id IN ({ids}) ORDER BY id"),
+    'tspecs': ChildQuery('eds_file_id', "SELECT * FROM eds_tspecs WHERE eds_file_id IN ({ids}) ORDER BY id"),
+    'modules': ChildQuery('eds_file_id', """
+        SELECT * FROM eds_modules WHERE eds_file_id IN ({ids}) ORDER BY module_number, id
+    """),
+    'dlr': ChildQuery('file_id', """
+        SELECT file_id, revision, object_name, object_class_code, network_topology,
+               enable_switch, beacon_interval, beacon_timeout, vlan_id,
+               max_inst, num_static_instances, max_dynamic_instances
+        FROM eds_dlr_config WHERE file_id IN ({ids}) ORDER BY id
+    """),
+    'tcpip': ChildQuery('file_id', """
+        SELECT file_id, revision, object_name, object_class_code, interface_config,
+               host_name, ttl_value, mcast_config, select_acd, encap_timeout,
+               max_inst, num_static_instances, max_dynamic_instances
+        FROM eds_tcpip_interface WHERE file_id IN ({ids}) ORDER BY id
+    """),
+    'ethernet': ChildQuery('file_id', """
+        SELECT file_id, revision, object_name, object_class_code, interface_speed,
+               interface_flags, physical_address, interface_label, interface_labels,
+               max_inst, num_static_instances, max_dynamic_instances
+        FROM eds_ethernet_link WHERE file_id IN ({ids}) ORDER BY id
+    """),
+    'qos': ChildQuery('file_id', """
+        SELECT file_id, revision, object_name, object_class_code, qos_tag_enable,
+               dscp_urgent, dscp_scheduled, dscp_high, dscp_low, dscp_explicit,
+               max_inst, num_static_instances, max_dynamic_instances
+        FROM eds_qos_config WHERE file_id IN ({ids}) ORDER BY id
+    """),
+    'lldp': ChildQuery('file_id', """
+        SELECT file_id, revision, object_name, object_class_code, msg_tx_interval,
+               msg_tx_hold, chassis_id_subtype, chassis_id, port_id_subtype, port_id,
+               max_inst, num_static_instances, max_dynamic_instances
+        FROM eds_lldp_management WHERE file_id IN ({ids}) ORDER BY id
+    """),
+}
+
 
 class EDSReconstructor:
     """
@@ -29,6 +101,8 @@ class EDSReconstructor:
 
     def __init__(self, db_path: str = "greenstack.db"):
         self.db_path = db_path
+        # Rows of the chunk the current file belongs to
+        self._chunk: Optional[ChunkRows] = None
 
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection with Row factory"""
@@ -51,133 +125,171 @@ class EDSReconstructor:
         """
         conn = self.get_connection()
         try:
-            # Verify EDS file exists
-            eds_file = self._get_eds_file(conn, eds_file_id)
-            if not eds_file:
-                raise ValueError(f"EDS file {eds_file_id} not found")
-
-            # Build EDS sections
-            sections = []
-
-            # [File] section
-            sections.append(self._create_file_section(eds_file))
-
-            # [Device] section
-            sections.append(self._create_device_section(eds_file))
-
-            # [Device Classification] section
-            device_class = self._create_device_classification_section(eds_file)
-            if device_class:
-                sections.append(device_class)
-
-            # [ParamClass] section (extracted from original file - not yet parsed/stored)
-            param_class_section = self._extract_section_from_original(conn, eds_file_id, 'ParamClass')
-            if param_class_section:
-                sections.append(param_class_section)
-
-            # [Params] section (with inline enum definitions)
-            params_section = self._create_params_section(conn, eds_file_id)
-            if params_section:
-                sections.append(params_section)
-
-            # Note: Enums are now inline in [Params] section, not separate [EnumPar] sections
-            # enum_sections = self._create_enum_sections(conn, eds_file_id)
-            # sections.extend(enum_sections)
-
-            # [Group] sections
-            group_sections = self._create_group_sections(conn, eds_file_id)
-            sections.extend(group_sections)
-
-            # [Assembly] section (extracted from original - field data not yet parsed/stored)
-            assembly_section = self._extract_section_from_original(conn, eds_file_id, 'Assembly')
-            if assembly_section:
-                sections.append(assembly_section)
-
-            # [Connection Manager] section
-            connection_section = self._create_connection_manager_section(conn, eds_file_id)
-            if connection_section:
-                sections.append(connection_section)
-
-            # [Port] section
-            port_section = self._create_port_section(conn, eds_file_id)
-            if port_section:
-                sections.append(port_section)
-
-            # [Capacity] section
-            capacity_section = self._create_capacity_section(conn, eds_file_id)
-            if capacity_section:
-                sections.append(capacity_section)
-
-            # Note: TSpecs are included in [Capacity] section, not separate [TSpecs] section
-            # tspec_section = self._create_tspec_section(conn, eds_file_id)
-            # if tspec_section:
-            #     sections.append(tspec_section)
-
-            # [Modules] section (if applicable)
-            module_sections = self._create_module_sections(conn, eds_file_id)
-            sections.extend(module_sections)
-
-            # [DLR Class] section
-            dlr_section = self._create_dlr_section(conn, eds_file_id)
-            if dlr_section:
-                sections.append(dlr_section)
-
-            # [TCP/IP Interface Class] section
-            tcpip_section = self._create_tcpip_section(conn, eds_file_id)
-            if tcpip_section:
-                sections.append(tcpip_section)
-
-            # [Ethernet Link Class] section
-            ethernet_section = self._create_ethernet_section(conn, eds_file_id)
-            if ethernet_section:
-                sections.append(ethernet_section)
-
-            # [QoS Class] section
-            qos_section = self._create_qos_section(conn, eds_file_id)
-            if qos_section:
-                sections.append(qos_section)
-
-            # [LLDP Management Class] section
-            lldp_section = self._create_lldp_section(conn, eds_file_id)
-            if lldp_section:
-                sections.append(lldp_section)
-
-            # [Safety Supervisor Class] section (extracted from original - not yet parsed/stored)
-            safety_supervisor_section = self._extract_section_from_original(conn, eds_file_id, 'Safety Supervisor Class')
-            if safety_supervisor_section:
-                sections.append(safety_supervisor_section)
-
-            # [Safety Validator Class] section (extracted from original - not yet parsed/stored)
-            safety_validator_section = self._extract_section_from_original(conn, eds_file_id, 'Safety Validator Class')
-            if safety_validator_section:
-                sections.append(safety_validator_section)
-
-            # [Safety Discrete Output Point Class] section (extracted from original - not yet parsed/stored)
-            safety_output_section = self._extract_section_from_original(conn, eds_file_id, 'Safety Discrete Output Point Class')
-            if safety_output_section:
-                sections.append(safety_output_section)
-
-            # [Safety Discrete Input Point Class] section (extracted from original - not yet parsed/stored)
-            safety_input_section = self._extract_section_from_original(conn, eds_file_id, 'Safety Discrete Input Point Class')
-            if safety_input_section:
-                sections.append(safety_input_section)
-
-            # [LLDP Data Table Class] section (extracted from original - not yet parsed/stored)
-            lldp_data_table_section = self._extract_section_from_original(conn, eds_file_id, 'LLDP Data Table Class')
-            if lldp_data_table_section:
-                sections.append(lldp_data_table_section)
-
-            # Join all sections
-            return "\n\n".join(sections)
-
+            return self.reconstruct_with_connection(conn, eds_file_id)
         finally:
             conn.close()
 
+    def load_chunk(self, conn: sqlite3.Connection, eds_file_ids: Sequence[int]) -> ChunkRows:
+        """Rows of a chunk of EDS files, for reconstruct_with_connection"""
+        return ChunkRows(conn, eds_file_ids, EDS_QUERIES)
+
+    def reconstruct_with_connection(self, conn: sqlite3.Connection, eds_file_id: int,
+                                    chunk: Optional[ChunkRows] = None) -> str:
+        """
+        Reconstruct EDS file using an existing connection
+
+        Used by batch reconstruction to share one connection and one set of
+        child table reads across a chunk of files.
+
+        Args:
+            conn: Database connection with Row factory
+            eds_file_id: ID of EDS file to reconstruct
+            chunk: Rows of the chunk containing the file (default: a chunk of
+                just this file)
+
+        Returns:
+            Reconstructed EDS file as string (INI format)
+
+        Raises:
+            ValueError: If EDS file not found
+        """
+        self._chunk = chunk if chunk is not None else self.load_chunk(conn, [eds_file_id])
+        try:
+            return self._reconstruct_file(conn, eds_file_id)
+        finally:
+            self._chunk = None
+
+    def _reconstruct_file(self, conn: sqlite3.Connection, eds_file_id: int) -> str:
+        """Build the sections of one EDS file"""
+        # Verify EDS file exists
+        eds_file = self._get_eds_file(conn, eds_file_id)
+        if not eds_file:
+            raise ValueError(f"EDS file {eds_file_id} not found")
+
+        # Tokenized original sections, used for sections not yet parsed/stored
+        original_content = eds_file['eds_content']
+        original = None
+        if original_content:
+            section_index = section_index_from_row(self._chunk.first('section_index', eds_file_id), original_content)
+            original = (original_content, section_index)
+
+        # Build EDS sections
+        sections = []
+
+        # [File] section
+        sections.append(self._create_file_section(eds_file))
+
+        # [Device] section
+        sections.append(self._create_device_section(eds_file))
+
+        # [Device Classification] section
+        device_class = self._create_device_classification_section(eds_file)
+        if device_class:
+            sections.append(device_class)
+
+        # [ParamClass] section (extracted from original file - not yet parsed/stored)
+        param_class_section = self._extract_section_from_original(original, 'ParamClass')
+        if param_class_section:
+            sections.append(param_class_section)
+
+        # [Params] section (with inline enum definitions)
+        params_section = self._create_params_section(conn, eds_file_id)
+        if params_section:
+            sections.append(params_section)
+
+        # Note: Enums are now inline in [Params] section, not separate [EnumPar] sections
+        # enum_sections = self._create_enum_sections(conn, eds_file_id)
+        # sections.extend(enum_sections)
+
+        # [Group] sections
+        group_sections = self._create_group_sections(conn, eds_file_id)
+        sections.extend(group_sections)
+
+        # [Assembly] section (extracted from original - field data not yet parsed/stored)
+        assembly_section = self._extract_section_from_original(original, 'Assembly')
+        if assembly_section:
+            sections.append(assembly_section)
+
+        # [Connection Manager] section
+        connection_section = self._create_connection_manager_section(conn, eds_file_id)
+        if connection_section:
+            sections.append(connection_section)
+
+        # [Port] section
+        port_section = self._create_port_section(conn, eds_file_id)
+        if port_section:
+            sections.append(port_section)
+
+        # [Capacity] section
+        capacity_section = self._create_capacity_section(conn, eds_file_id)
+        if capacity_section:
+            sections.append(capacity_section)
+
+        # Note: TSpecs are included in [Capacity] section, not separate [TSpecs] section
+        # tspec_section = self._create_tspec_section(conn, eds_file_id)
+        # if tspec_section:
+        #     sections.append(tspec_section)
+
+        # [Modules] section (if applicable)
+        module_sections = self._create_module_sections(conn, eds_file_id)
+        sections.extend(module_sections)
+
+        # [DLR Class] section
+        dlr_section = self._create_dlr_section(conn, eds_file_id)
+        if dlr_section:
+            sections.append(dlr_section)
+
+        # [TCP/IP Interface Class] section
+        tcpip_section = self._create_tcpip_section(conn, eds_file_id)
+        if tcpip_section:
+            sections.append(tcpip_section)
+
+        # [Ethernet Link Class] section
+        ethernet_section = self._create_ethernet_section(conn, eds_file_id)
+        if ethernet_section:
+            sections.append(ethernet_section)
+
+        # [QoS Class] section
+        qos_section = self._create_qos_section(conn, eds_file_id)
+        if qos_section:
+            sections.append(qos_section)
+
+        # [LLDP Management Class] section
+        lldp_section = self._create_lldp_section(conn, eds_file_id)
+        if lldp_section:
+            sections.append(lldp_section)
+
+        # [Safety Supervisor Class] section (extracted from original - not yet parsed/stored)
+        safety_supervisor_section = self._extract_section_from_original(original, 'Safety Supervisor Class')
+        if safety_supervisor_section:
+            sections.append(safety_supervisor_section)
+
+        # [Safety Validator Class] section (extracted from original - not yet parsed/stored)
+        safety_validator_section = self._extract_section_from_original(original, 'Safety Validator Class')
+        if safety_validator_section:
+            sections.append(safety_validator_section)
+
+        # [Safety Discrete Output Point Class] section (extracted from original - not yet parsed/stored)
+        safety_output_section = self._extract_section_from_original(original, 'Safety Discrete Output Point Class')
+        if safety_output_section:
+            sections.append(safety_output_section)
+
+        # [Safety Discrete Input Point Class] section (extracted from original - not yet parsed/stored)
+        safety_input_section = self._extract_section_from_original(original, 'Safety Discrete Input Point Class')
+        if safety_input_section:
+            sections.append(safety_input_section)
+
+        # [LLDP Data Table Class] section (extracted from original - not yet parsed/stored)
+        lldp_data_table_section = self._extract_section_from_original(original, 'LLDP Data Table Class')
+        if lldp_data_table_section:
+            sections.append(lldp_data_table_section)
+
+        # Join all sections
+        return "\n\n".join(sections)
+
     def _get_eds_file(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[sqlite3.Row]:
         """Get EDS file record"""
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM eds_files WHERE id = ?", (eds_file_id,))
-        return cursor.fetchone()
+        return self._chunk.first('eds_file', eds_file_id)
 
     def _create_file_section(self, eds_file: sqlite3.Row) -> str:
         """Create [File] section"""
@@ -258,11 +370,7 @@ class EDSReconstructor:
 
     def _create_params_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [Params] section with inline Enum definitions"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_parameters WHERE eds_file_id = ? ORDER BY param_number
-        """, (eds_file_id,))
-        params = cursor.fetchall()
+        params = self._chunk.all('parameters', eds_file_id)
 
         if not params:
             return None
@@ -357,14 +465,7 @@ class EDSReconstructor:
             Reconstructed enum string like 'Enum1 =\n    0,"Value1",\n    1,"Value2";'
             or None if no enum values exist
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT enum_name, enum_value, enum_display, is_default
-            FROM eds_enum_values
-            WHERE parameter_id = ?
-            ORDER BY enum_value
-        """, (parameter_id,))
-        enum_values = cursor.fetchall()
+        enum_values = self._chunk.all('enum_values', parameter_id)
 
         if not enum_values:
             return None
@@ -389,13 +490,8 @@ class EDSReconstructor:
 
     def _create_enum_sections(self, conn: sqlite3.Connection, eds_file_id: int) -> List[str]:
         """Create [EnumPar] sections for enumerated parameters"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_parameters
-            WHERE eds_file_id = ? AND enum_values IS NOT NULL
-            ORDER BY param_number
-        """, (eds_file_id,))
-        enum_params = cursor.fetchall()
+        enum_params = [param for param in self._chunk.all('parameters', eds_file_id)
+                       if param['enum_values'] is not None]
 
         sections = []
         for param in enum_params:
@@ -425,11 +521,7 @@ class EDSReconstructor:
 
     def _create_group_sections(self, conn: sqlite3.Connection, eds_file_id: int) -> List[str]:
         """Create single [Groups] section with Group1=, Group2=, etc."""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_groups WHERE eds_file_id = ? ORDER BY group_number
-        """, (eds_file_id,))
-        groups = cursor.fetchall()
+        groups = self._chunk.all('groups', eds_file_id)
 
         if not groups:
             return []
@@ -458,11 +550,7 @@ class EDSReconstructor:
 
     def _create_assembly_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [Assembly] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_assemblies WHERE eds_file_id = ? ORDER BY assembly_number
-        """, (eds_file_id,))
-        assemblies = cursor.fetchall()
+        assemblies = self._chunk.all('assemblies', eds_file_id)
 
         if not assemblies:
             return None
@@ -504,11 +592,7 @@ class EDSReconstructor:
     def _create_connection_manager_section(self, conn: sqlite3.Connection,
                                            eds_file_id: int) -> Optional[str]:
         """Create [Connection Manager] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_connections WHERE eds_file_id = ? ORDER BY connection_number
-        """, (eds_file_id,))
-        connections = cursor.fetchall()
+        connections = self._chunk.all('connections', eds_file_id)
 
         if not connections:
             return None
@@ -550,11 +634,7 @@ class EDSReconstructor:
 
     def _create_port_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [Port] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_ports WHERE eds_file_id = ? ORDER BY port_number
-        """, (eds_file_id,))
-        ports = cursor.fetchall()
+        ports = self._chunk.all('ports', eds_file_id)
 
         if not ports:
             return None
@@ -583,11 +663,7 @@ class EDSReconstructor:
 
     def _create_capacity_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [Capacity] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_capacity WHERE eds_file_id = ?
-        """, (eds_file_id,))
-        capacity = cursor.fetchone()
+        capacity = self._chunk.first('capacity', eds_file_id)
 
         if not capacity:
             return None
@@ -607,11 +683,7 @@ class EDSReconstructor:
 
     def _create_tspec_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [TSpecs] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_tspecs WHERE eds_file_id = ?
-        """, (eds_file_id,))
-        tspecs = cursor.fetchall()
+        tspecs = self._chunk.all('tspecs', eds_file_id)
 
         if not tspecs:
             return None
@@ -638,11 +710,7 @@ class EDSReconstructor:
 
     def _create_module_sections(self, conn: sqlite3.Connection, eds_file_id: int) -> List[str]:
         """Create [Module] sections for modular devices"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM eds_modules WHERE eds_file_id = ? ORDER BY module_number
-        """, (eds_file_id,))
-        modules = cursor.fetchall()
+        modules = self._chunk.all('modules', eds_file_id)
 
         sections = []
         for module in modules:
@@ -671,16 +739,7 @@ class EDSReconstructor:
 
     def _create_dlr_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [DLR Class] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT revision, object_name, object_class_code, network_topology,
-                   enable_switch, beacon_interval, beacon_timeout, vlan_id,
-                   max_inst, num_static_instances, max_dynamic_instances
-            FROM eds_dlr_config
-            WHERE file_id = ?
-        """, (eds_file_id,))
-
-        dlr = cursor.fetchone()
+        dlr = self._chunk.first('dlr', eds_file_id)
         if not dlr:
             return None
 
@@ -716,16 +775,7 @@ class EDSReconstructor:
 
     def _create_tcpip_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [TCP/IP Interface Class] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT revision, object_name, object_class_code, interface_config,
-                   host_name, ttl_value, mcast_config, select_acd, encap_timeout,
-                   max_inst, num_static_instances, max_dynamic_instances
-            FROM eds_tcpip_interface
-            WHERE file_id = ?
-        """, (eds_file_id,))
-
-        tcpip = cursor.fetchone()
+        tcpip = self._chunk.first('tcpip', eds_file_id)
         if not tcpip:
             return None
 
@@ -764,16 +814,7 @@ class EDSReconstructor:
     def _create_ethernet_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [Ethernet Link Class] section"""
         import json
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT revision, object_name, object_class_code, interface_speed,
-                   interface_flags, physical_address, interface_label, interface_labels,
-                   max_inst, num_static_instances, max_dynamic_instances
-            FROM eds_ethernet_link
-            WHERE file_id = ?
-        """, (eds_file_id,))
-
-        eth = cursor.fetchone()
+        eth = self._chunk.first('ethernet', eds_file_id)
         if not eth:
             return None
 
@@ -816,16 +857,7 @@ class EDSReconstructor:
 
     def _create_qos_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [QoS Class] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT revision, object_name, object_class_code, qos_tag_enable,
-                   dscp_urgent, dscp_scheduled, dscp_high, dscp_low, dscp_explicit,
-                   max_inst, num_static_instances, max_dynamic_instances
-            FROM eds_qos_config
-            WHERE file_id = ?
-        """, (eds_file_id,))
-
-        qos = cursor.fetchone()
+        qos = self._chunk.first('qos', eds_file_id)
         if not qos:
             return None
 
@@ -863,16 +895,7 @@ class EDSReconstructor:
 
     def _create_lldp_section(self, conn: sqlite3.Connection, eds_file_id: int) -> Optional[str]:
         """Create [LLDP Management Class] section"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT revision, object_name, object_class_code, msg_tx_interval,
-                   msg_tx_hold, chassis_id_subtype, chassis_id, port_id_subtype, port_id,
-                   max_inst, num_static_instances, max_dynamic_instances
-            FROM eds_lldp_management
-            WHERE file_id = ?
-        """, (eds_file_id,))
-
-        lldp = cursor.fetchone()
+        lldp = self._chunk.first('lldp', eds_file_id)
         if not lldp:
             return None
 
@@ -908,34 +931,23 @@ class EDSReconstructor:
 
         return "\n".join(lines)
 
-    def _extract_section_from_original(self, conn: sqlite3.Connection, eds_file_id: int, section_name: str) -> Optional[str]:
+    def _extract_section_from_original(self, original: Optional[Tuple[str, EDSSectionIndex]],
+                                       section_name: str) -> Optional[str]:
         """
         Extract a section verbatim from the original EDS file.
 
         This is a temporary workaround for sections that haven't been parsed/stored yet.
-        """
-        import re
-
-        # Get original EDS content
-        cursor = conn.cursor()
-        cursor.execute("SELECT eds_content FROM eds_files WHERE id = ?", (eds_file_id,))
-        row = cursor.fetchone()
+        Uses the section index tokenized at import instead of re-scanning the file.
 
-        if not row or not row['eds_content']:
+        Args:
+            original: (original content, section index) or None if no original is stored
+            section_name: Section name without brackets
+        """
+        if not original:
             return None
 
-        original_content = row['eds_content']
-
-        # Extract the section using regex
-        pattern = rf'\[{re.escape(section_name)}\](.*?)(?=\n\[|\Z)'
-        match = re.search(pattern, original_content, re.DOTALL)
-
-        if match:
-            # Return the full section including header, stripping trailing whitespace
-            section_content = match.group(0).rstrip()
-            return section_content
-
-        return None
+        original_content, section_index = original
+        return section_index.raw_section(original_content, section_name)
 
 
 def reconstruct_eds_file(eds_file_id: int, db_path: str = "greenstack.db") -> str:
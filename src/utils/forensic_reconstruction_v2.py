@@ -8,12 +8,262 @@ This version is aligned with the actual GreenStack database schema.
 import logging
 import re
 import sqlite3
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from xml.etree import ElementTree as ET
-from xml.dom import minidom
+
+from .chunk_rows import ChildQuery, ChunkRows
+from .text_table import TextTable, get_device_text_table, get_device_text_tables
+from .xml_serializer import XmlFormat, serialize_xml
 
 logger = logging.getLogger(__name__)
 
+# Parent scopes of the child queries below
+_PROCESS_DATA = "SELECT id FROM process_data WHERE device_id IN ({ids})"
+_PARAMETERS = "SELECT id FROM parameters WHERE device_id IN ({ids})"
+_DATATYPES = "SELECT id FROM custom_datatypes WHERE device_id IN ({ids})"
+_STD_VARIABLE_REFS = "SELECT id FROM std_variable_refs WHERE device_id IN ({ids})"
+_OVERLAYS = "SELECT id FROM direct_parameter_overlays WHERE device_id IN ({ids})"
+_MENUS = "SELECT id FROM ui_menus WHERE device_id IN ({ids})"
+
+# Every table the reconstructor reads, for a chunk of devices
+IODD_QUERIES: Dict[str, ChildQuery] = {
+    'device': ChildQuery('id', "SELECT * FROM devices WHERE id IN ({ids})"),
+    'iodd_file': ChildQuery('device_id', """
+        SELECT device_id, schema_version, profile_identification, profile_revision, profile_name,
+               stamp_crc, checker_name, checker_version
+        FROM iodd_files WHERE device_id IN ({ids}) ORDER BY id
+    """),
+    'build_format': ChildQuery('device_id', """
+        SELECT device_id, indent_char, indent_size, xml_declaration, newline_style,
+               has_trailing_newline, attribute_quoting
+        FROM iodd_build_format WHERE device_id IN ({ids}) ORDER BY id
+    """, optional=True),
+    'document_info': ChildQuery('device_id', "SELECT * FROM document_info WHERE device_id IN ({ids}) ORDER BY id"),
+    # PQA Fix #40: Added ProductName/ProductText fields
+    # PQA Fix #58: Added hardware_revision, firmware_revision
+    'device_variant': ChildQuery('device_id', """
+        SELECT device_id, product_id, device_symbol, device_icon, name, description,
+               name_text_id, description_text_id,
+               product_name_text_id, product_text_text_id,
+               has_name, has_description, has_product_name, has_product_text,
+               hardware_revision, firmware_revision
+        FROM device_variants WHERE device_id IN ({ids}) ORDER BY id
+    """),
+    'features': ChildQuery('device_id', "SELECT * FROM device_features WHERE device_id IN ({ids}) ORDER BY id"),
+    # Order by original XML order (min id per wrapper), then direction (input before output)
+    # PQA Fix #34b: Use MIN(id) per wrapper_id to preserve original document order
+    'process_data': ChildQuery('device_id', """
+        SELECT pd.*, w.min_id FROM process_data pd
+        JOIN (
+            SELECT device_id, COALESCE(wrapper_id, pd_id) as wid, MIN(id) as min_id
+            FROM process_data WHERE device_id IN ({ids})
+            GROUP BY device_id, COALESCE(wrapper_id, pd_id)
+        ) w ON pd.device_id = w.device_id AND COALESCE(pd.wrapper_id, pd.pd_id) = w.wid
+        WHERE pd.device_id IN ({ids})
+        ORDER BY w.min_id,
+                 CASE pd.direction WHEN 'input' THEN 0 ELSE 1 END,
+                 pd.id
+    """),
+    'process_data_device': ChildQuery('id', "SELECT id, device_id FROM process_data WHERE device_id IN ({ids})"),
+    'process_data_conditions': ChildQuery('process_data_id', f"""
+        SELECT process_data_id, condition_variable_id, condition_value, condition_subindex
+        FROM process_data_conditions
+        WHERE process_data_id IN ({_PROCESS_DATA}) ORDER BY id
+    """),
+    'process_data_ui_info': ChildQuery('process_data_id', f"""
+        SELECT * FROM process_data_ui_info WHERE process_data_id IN ({_PROCESS_DATA}) ORDER BY id
+    """),
+    'process_data_single_values': ChildQuery('process_data_id', f"""
+        SELECT process_data_id, value, name, name_text_id, xsi_type
+        FROM process_data_single_values
+        WHERE process_data_id IN ({_PROCESS_DATA}) ORDER BY id
+    """),
+    'process_data_record_items': ChildQuery('process_data_id', f"""
+        SELECT * FROM process_data_record_items
+        WHERE process_data_id IN ({_PROCESS_DATA}) ORDER BY subindex, id
+    """),
+    # PQA Fix #61: Include xsi_type in query
+    'process_data_record_item_single_values': ChildQuery('record_item_id', f"""
+        SELECT record_item_id, value, name, name_text_id, xsi_type
+        FROM process_data_single_values
+        WHERE record_item_id IN (
+            SELECT id FROM process_data_record_items WHERE process_data_id IN ({_PROCESS_DATA})
+        ) ORDER BY id
+    """),
+    # PQA Fix #42: Order by pd_ref_order to preserve original ProcessDataRef order
+    # PQA Fix #41: Order by xml_order within each ProcessDataRef to preserve original element order
+    # Fallback: direction-based order for legacy data without pd_ref_order
+    'process_data_ref_info': ChildQuery('device_id', """
+        SELECT pdui.*, pd.pd_id, pd.direction, pd.device_id
+        FROM process_data_ui_info pdui
+        JOIN process_data pd ON pdui.process_data_id = pd.id
+        WHERE pd.device_id IN ({ids})
+        ORDER BY COALESCE(pdui.pd_ref_order, CASE pd.direction WHEN 'output' THEN 0 ELSE 1 END),
+                 pd.pd_id,
+                 COALESCE(pdui.xml_order, pdui.subindex),
+                 pdui.id
+    """),
+    'parameters': ChildQuery('device_id', """
+        SELECT * FROM parameters WHERE device_id IN ({ids})
+        ORDER BY COALESCE(xml_order, param_index), id
+    """),
+    'parameter_record_items': ChildQuery('parameter_id', f"""
+        SELECT * FROM parameter_record_items
+        WHERE parameter_id IN ({_PARAMETERS}) ORDER BY order_index, id
+    """),
+    # PQA Fix #61: Include xsi_type in query
+    'record_item_single_values': ChildQuery('record_item_id', f"""
+        SELECT record_item_id, value, name, name_text_id, order_index, xsi_type
+        FROM record_item_single_values
+        WHERE record_item_id IN (
+            SELECT id FROM parameter_record_items WHERE parameter_id IN ({_PARAMETERS})
+        ) ORDER BY order_index, id
+    """),
+    'parameter_single_values': ChildQuery('parameter_id', f"""
+        SELECT * FROM parameter_single_values
+        WHERE parameter_id IN ({_PARAMETERS}) ORDER BY order_index, id
+    """),
+    'variable_record_item_info': ChildQuery('parameter_id', f"""
+        SELECT * FROM variable_record_item_info
+        WHERE parameter_id IN ({_PARAMETERS}) ORDER BY order_index, id
+    """),
+    'custom_datatypes': ChildQuery('device_id', "SELECT * FROM custom_datatypes WHERE device_id IN ({ids}) ORDER BY id"),
+    'custom_datatype_device': ChildQuery('id', "SELECT id, device_id FROM custom_datatypes WHERE device_id IN ({ids})"),
+    # PQA Fix #38: Order by xml_order to preserve original IODD order
+    # Fallback to numeric/alphabetic sort for legacy data without xml_order
+    'custom_datatype_single_values': ChildQuery('datatype_id', f"""
+        SELECT * FROM custom_datatype_single_values
+        WHERE datatype_id IN ({_DATATYPES})
+        ORDER BY COALESCE(xml_order, 999999),
+            CASE
+                WHEN value GLOB '[0-9]*' AND value NOT GLOB '*[^0-9]*'
+                THEN CAST(value AS INTEGER)
+                ELSE 999999
+            END, value, id
+    """),
+    'custom_datatype_record_items': ChildQuery('datatype_id', f"""
+        SELECT * FROM custom_datatype_record_items
+        WHERE datatype_id IN ({_DATATYPES}) ORDER BY subindex, id
+    """),
+    # PQA Fix #74: Order by xml_order to preserve original IODD order
+    'custom_datatype_record_item_single_values': ChildQuery('record_item_id', f"""
+        SELECT record_item_id, value, name, name_text_id, xsi_type
+        FROM custom_datatype_record_item_single_values
+        WHERE record_item_id IN (
+            SELECT id FROM custom_datatype_record_items WHERE datatype_id IN ({_DATATYPES})
+        ) ORDER BY COALESCE(xml_order, id), id
+    """),
+    'std_variable_refs': ChildQuery('device_id', """
+        SELECT device_id, id, variable_id, default_value, fixed_length_restriction,
+               excluded_from_data_storage, order_index
+        FROM std_variable_refs WHERE device_id IN ({ids}) ORDER BY order_index, id
+    """),
+    'std_variable_ref_single_values': ChildQuery('std_variable_ref_id', f"""
+        SELECT std_variable_ref_id, value, name_text_id, is_std_ref, order_index
+        FROM std_variable_ref_single_values
+        WHERE std_variable_ref_id IN ({_STD_VARIABLE_REFS}) ORDER BY order_index, id
+    """),
+    'std_variable_ref_value_ranges': ChildQuery('std_variable_ref_id', f"""
+        SELECT std_variable_ref_id, lower_value, upper_value, is_std_ref, order_index
+        FROM std_variable_ref_value_ranges
+        WHERE std_variable_ref_id IN ({_STD_VARIABLE_REFS}) ORDER BY order_index, id
+    """),
+    'std_record_item_refs': ChildQuery('std_variable_ref_id', f"""
+        SELECT std_variable_ref_id, id, subindex, default_value, order_index
+        FROM std_record_item_refs
+        WHERE std_variable_ref_id IN ({_STD_VARIABLE_REFS}) ORDER BY order_index, id
+    """),
+    'std_record_item_ref_single_values': ChildQuery('std_record_item_ref_id', f"""
+        SELECT std_record_item_ref_id, value, name_text_id, is_std_ref, order_index
+        FROM std_record_item_ref_single_values
+        WHERE std_record_item_ref_id IN (
+            SELECT id FROM std_record_item_refs WHERE std_variable_ref_id IN ({_STD_VARIABLE_REFS})
+        ) ORDER BY order_index, id
+    """),
+    'direct_parameter_overlays': ChildQuery('device_id', """
+        SELECT * FROM direct_parameter_overlays WHERE device_id IN ({ids}) ORDER BY xml_order, id
+    """),
+    'direct_parameter_overlay_record_items': ChildQuery('overlay_id', f"""
+        SELECT * FROM direct_parameter_overlay_record_items
+        WHERE overlay_id IN ({_OVERLAYS}) ORDER BY order_index, id
+    """),
+    'direct_parameter_overlay_record_item_single_values': ChildQuery('record_item_id', f"""
+        SELECT * FROM direct_parameter_overlay_record_item_single_values
+        WHERE record_item_id IN (
+            SELECT id FROM direct_parameter_overlay_record_items WHERE overlay_id IN ({_OVERLAYS})
+        ) ORDER BY order_index, id
+    """),
+    'direct_parameter_overlay_record_item_info': ChildQuery('overlay_id', f"""
+        SELECT * FROM direct_parameter_overlay_record_item_info
+        WHERE overlay_id IN ({_OVERLAYS}) ORDER BY order_index, id
+    """),
+    'error_types': ChildQuery('device_id', """
+        SELECT device_id, code, additional_code, has_code_attr, xml_order,
+               is_custom, name_text_id, description_text_id
+        FROM error_types WHERE device_id IN ({ids})
+        ORDER BY COALESCE(xml_order, additional_code), id
+    """),
+    # Order by order_index (if available) or id to preserve original XML order
+    # PQA Fix #46: Include mode column
+    'events': ChildQuery('device_id', """
+        SELECT device_id, code, name, description, event_type,
+               name_text_id, description_text_id, order_index, mode
+        FROM events WHERE device_id IN ({ids})
+        ORDER BY COALESCE(order_index, id), id
+    """),
+    'ui_menus': ChildQuery('device_id', "SELECT * FROM ui_menus WHERE device_id IN ({ids}) ORDER BY id"),
+    'ui_menu_items': ChildQuery('menu_id', f"""
+        SELECT * FROM ui_menu_items WHERE menu_id IN ({_MENUS}) ORDER BY item_order, id
+    """),
+    'ui_menu_buttons': ChildQuery('menu_item_id', f"""
+        SELECT * FROM ui_menu_buttons
+        WHERE menu_item_id IN (SELECT id FROM ui_menu_items WHERE menu_id IN ({_MENUS}))
+        ORDER BY id
+    """),
+    # PQA Fix #27: include has_xsi_type
+    'ui_menu_roles': ChildQuery('device_id', """
+        SELECT device_id, role_type, menu_type, menu_id, has_xsi_type
+        FROM ui_menu_roles WHERE device_id IN ({ids}) ORDER BY id
+    """),
+    'communication_profile': ChildQuery('device_id', "SELECT * FROM communication_profile WHERE device_id IN ({ids}) ORDER BY id"),
+    'wire_configurations': ChildQuery('device_id', """
+        SELECT * FROM wire_configurations WHERE device_id IN ({ids}) ORDER BY wire_number, id
+    """),
+    'device_test_config': ChildQuery('device_id', """
+        SELECT * FROM device_test_config WHERE device_id IN ({ids}) ORDER BY config_type, id
+    """),
+    'device_test_event_triggers': ChildQuery('test_config_id', """
+        SELECT * FROM device_test_event_triggers
+        WHERE test_config_id IN (SELECT id FROM device_test_config WHERE device_id IN ({ids}))
+        ORDER BY id
+    """),
+}
+
+
+class IODDChunk(ChunkRows):
+    """
+    Rows and text tables of a chunk of devices
+
+    Args:
+        conn: Connection to load with (Row factory)
+        device_ids: Devices of the chunk
+        db_path: Database the devices live in (for text table version stamps)
+    """
+
+    def __init__(self, conn: sqlite3.Connection, device_ids: Sequence[int], db_path: str):
+        super().__init__(conn, device_ids, IODD_QUERIES)
+        self.db_path = db_path
+        self._text_tables: Optional[Dict[int, TextTable]] = None
+
+    def text_table(self, device_id: int) -> TextTable:
+        """Texts of a device; the chunk's tables are loaded together on first use"""
+        if self._text_tables is None:
+            self._text_tables = get_device_text_tables(self.db_path, self.ids, self.conn)
+        texts = self._text_tables.get(device_id)
+        if texts is None:
+            texts = get_device_text_table(self.db_path, device_id, self.conn)
+        return texts
+
 
 class IODDReconstructor:
     """
@@ -72,6 +322,8 @@ class IODDReconstructor:
 
     def __init__(self, db_path: str = "greenstack.db"):
         self.db_path = db_path
+        # Rows of the chunk the current device belongs to
+        self._chunk: Optional[IODDChunk] = None
         # Default namespace registration (will be updated per-device)
         ET.register_namespace('xsi', 'http://www.w3.org/2001/XMLSchema-instance')
         # Default to 1.1 - this will be updated dynamically per device
@@ -94,9 +346,7 @@ class IODDReconstructor:
         Returns:
             Schema version string (e.g., '1.1', '1.0.1', '1.0')
         """
-        cursor = conn.cursor()
-        cursor.execute("SELECT schema_version FROM iodd_files WHERE device_id = ?", (device_id,))
-        row = cursor.fetchone()
+        row = self._chunk.first('iodd_file', device_id)
         if row and row['schema_version']:
             return row['schema_version']
         return self.DEFAULT_SCHEMA_VERSION
@@ -146,60 +396,97 @@ class IODDReconstructor:
         """
         conn = self.get_connection()
         try:
-            # Verify device exists
-            device = self._get_device(conn, device_id)
-            if not device:
-                raise ValueError(f"Device {device_id} not found")
-
-            # Build XML tree
-            root = self._create_root_element(conn, device_id, device)
-
-            # Add DocumentInfo (Phase 3 Task 9a)
-            document_info = self._create_document_info(conn, device_id)
-            if document_info is not None:
-                root.append(document_info)
-
-            # Add ProfileHeader
-            profile_header = self._create_profile_header(conn, device_id)
-            if profile_header is not None:
-                root.append(profile_header)
-
-            # Add ProfileBody
-            profile_body = self._create_profile_body(conn, device_id, device)
-            if profile_body is not None:
-                root.append(profile_body)
+            return self.reconstruct_with_connection(conn, device_id)
+        finally:
+            conn.close()
 
-            # Add CommNetworkProfile (direct child of IODevice, not ProfileBody)
-            comm_network_profile = self._create_comm_network_profile(conn, device_id)
-            if comm_network_profile is not None:
-                root.append(comm_network_profile)
+    def load_chunk(self, conn: sqlite3.Connection, device_ids: Sequence[int]) -> IODDChunk:
+        """Rows of a chunk of devices, for reconstruct_with_connection"""
+        return IODDChunk(conn, device_ids, self.db_path)
 
-            # Add Stamp (direct child of IODevice, contains CRC and Checker info)
-            stamp = self._create_stamp(conn, device_id)
-            if stamp is not None:
-                root.append(stamp)
+    def reconstruct_with_connection(self, conn: sqlite3.Connection, device_id: int,
+                                    chunk: Optional[IODDChunk] = None) -> str:
+        """
+        Reconstruct IODD XML using an existing connection
 
-            # Add ExternalTextCollection
-            text_collection = self._create_text_collection(conn, device_id)
-            if text_collection is not None:
-                root.append(text_collection)
+        Used by batch reconstruction to share one connection and one set of
+        child table reads across a chunk of devices.
 
-            # Pretty print
-            return self._prettify_xml(root)
+        Args:
+            conn: Database connection with Row factory
+            device_id: ID of device to reconstruct
+            chunk: Rows of the chunk containing the device (default: a chunk
+                of just this device)
 
+        Returns:
+            Reconstructed IODD XML as string
+        """
+        self._chunk = chunk if chunk is not None else self.load_chunk(conn, [device_id])
+        try:
+            # Verify device exists
+            device = self._get_device(conn, device_id)
+            if not device:
+                raise ValueError(f"Device {device_id} not found")
+            return self._reconstruct_device(conn, device_id, device)
         finally:
-            conn.close()
+            self._chunk = None
+
+    def _reconstruct_device(self, conn: sqlite3.Connection, device_id: int,
+                            device: sqlite3.Row) -> str:
+        """Build and serialize the XML tree of an existing device"""
+        # Build XML tree
+        root = self._create_root_element(conn, device_id, device)
+
+        # Add DocumentInfo (Phase 3 Task 9a)
+        document_info = self._create_document_info(conn, device_id)
+        if document_info is not None:
+            root.append(document_info)
+
+        # Add ProfileHeader
+        profile_header = self._create_profile_header(conn, device_id)
+        if profile_header is not None:
+            root.append(profile_header)
+
+        # Add ProfileBody
+        profile_body = self._create_profile_body(conn, device_id, device)
+        if profile_body is not None:
+            root.append(profile_body)
+
+        # Add CommNetworkProfile (direct child of IODevice, not ProfileBody)
+        comm_network_profile = self._create_comm_network_profile(conn, device_id)
+        if comm_network_profile is not None:
+            root.append(comm_network_profile)
+
+        # Add Stamp (direct child of IODevice, contains CRC and Checker info)
+        stamp = self._create_stamp(conn, device_id)
+        if stamp is not None:
+            root.append(stamp)
+
+        # Add ExternalTextCollection
+        text_collection = self._create_text_collection(conn, device_id)
+        if text_collection is not None:
+            root.append(text_collection)
+
+        # Pretty print using the original file's layout when known
+        return self._prettify_xml(root, self._get_build_format(conn, device_id))
 
     def _get_device(self, conn: sqlite3.Connection, device_id: int) -> Optional[sqlite3.Row]:
         """Get device record"""
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM devices WHERE id = ?", (device_id,))
-        return cursor.fetchone()
+        return self._chunk.first('device', device_id)
+
+    def _text_table(self, conn: sqlite3.Connection, device_id: int) -> TextTable:
+        """Texts of a device (loaded once for the whole chunk)"""
+        return self._chunk.text_table(device_id)
+
+    def _datatype_text_table(self, conn: sqlite3.Connection, datatype_id: int) -> TextTable:
+        """Texts of the device a custom datatype belongs to"""
+        row = self._chunk.first('custom_datatype_device', datatype_id)
+        return self._text_table(conn, row['device_id']) if row else TextTable()
 
     def _lookup_textid(self, conn: sqlite3.Connection, device_id: int,
                        text_value: str, fallback_patterns: list) -> str:
         """
-        Look up the original textId from iodd_text table by text value.
+        Look up the original textId in the device's text table by text value.
         Falls back to trying common prefix patterns if exact match not found.
 
         Args:
@@ -211,28 +498,18 @@ class IODDReconstructor:
         Returns:
             The original textId or a generated fallback
         """
-        cursor = conn.cursor()
+        texts = self._text_table(conn, device_id)
 
         # First try exact match on text_value
-        cursor.execute("""
-            SELECT text_id FROM iodd_text
-            WHERE device_id = ? AND text_value = ?
-            LIMIT 1
-        """, (device_id, text_value))
-        row = cursor.fetchone()
-        if row:
-            return row['text_id']
+        text_id = texts.find_text_id(text_value)
+        if text_id:
+            return text_id
 
         # Try each fallback pattern
         for pattern in fallback_patterns:
-            cursor.execute("""
-                SELECT text_id FROM iodd_text
-                WHERE device_id = ? AND text_id LIKE ?
-                LIMIT 1
-            """, (device_id, pattern + '%'))
-            row = cursor.fetchone()
-            if row:
-                return row['text_id']
+            text_id = texts.first_text_id(pattern)
+            if text_id:
+                return text_id
 
         # Final fallback: generate using first pattern
         return fallback_patterns[0] if fallback_patterns else 'TN_Unknown'
@@ -264,9 +541,7 @@ class IODDReconstructor:
 
     def _create_document_info(self, conn: sqlite3.Connection, device_id: int) -> Optional[ET.Element]:
         """Create DocumentInfo element (Phase 3 Task 9a)"""
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM document_info WHERE device_id = ?", (device_id,))
-        doc_info_row = cursor.fetchone()
+        doc_info_row = self._chunk.first('document_info', device_id)
 
         if not doc_info_row:
             return None
@@ -291,11 +566,7 @@ class IODDReconstructor:
         header = ET.Element('ProfileHeader')
 
         # Query stored ProfileHeader values from iodd_files
-        cursor = conn.execute("""
-            SELECT profile_identification, profile_revision, profile_name
-            FROM iodd_files WHERE device_id = ?
-        """, (device_id,))
-        row = cursor.fetchone()
+        row = self._chunk.first('iodd_file', device_id)
 
         # Use stored values or fall back to defaults
         stored_identification = row['profile_identification'] if row and row['profile_identification'] else None
@@ -390,20 +661,7 @@ class IODDReconstructor:
         device_variant_coll = ET.SubElement(device_identity, 'DeviceVariantCollection')
 
         # Query variant data from database (including PQA textId fields)
-        # PQA Fix #40: Added ProductName/ProductText fields
-        # PQA Fix #58: Added hardware_revision, firmware_revision
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT product_id, device_symbol, device_icon, name, description,
-                   name_text_id, description_text_id,
-                   product_name_text_id, product_text_text_id,
-                   has_name, has_description, has_product_name, has_product_text,
-                   hardware_revision, firmware_revision
-            FROM device_variants
-            WHERE device_id = ?
-            LIMIT 1
-        """, (device_id,))
-        variant_row = cursor.fetchone()
+        variant_row = self._chunk.first('device_variant', device_id)
 
         device_variant = ET.SubElement(device_variant_coll, 'DeviceVariant')
 
@@ -531,9 +789,7 @@ class IODDReconstructor:
 
     def _create_features(self, conn: sqlite3.Connection, device_id: int) -> Optional[ET.Element]:
         """Create Features element"""
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM device_features WHERE device_id = ?", (device_id,))
-        features_row = cursor.fetchone()
+        features_row = self._chunk.first('features', device_id)
 
         if not features_row:
             return None
@@ -567,22 +823,8 @@ class IODDReconstructor:
         PQA Fix #34: Group ProcessDataIn and ProcessDataOut by wrapper_id so they
         appear as children of the same ProcessData element.
         """
-        cursor = conn.cursor()
-        # Order by original XML order (min id per wrapper), then direction (input before output)
-        # PQA Fix #34b: Use MIN(id) per wrapper_id to preserve original document order
-        cursor.execute("""
-            SELECT pd.*, w.min_id FROM process_data pd
-            JOIN (
-                SELECT COALESCE(wrapper_id, pd_id) as wid, MIN(id) as min_id
-                FROM process_data WHERE device_id = ?
-                GROUP BY COALESCE(wrapper_id, pd_id)
-            ) w ON COALESCE(pd.wrapper_id, pd.pd_id) = w.wid
-            WHERE pd.device_id = ?
-            ORDER BY w.min_id,
-                     CASE pd.direction WHEN 'input' THEN 0 ELSE 1 END,
-                     pd.id
-        """, (device_id, device_id))
-        process_data_rows = cursor.fetchall()
+        # Ordered by original XML order (min id per wrapper), then direction
+        process_data_rows = self._chunk.all('process_data', device_id)
 
         if not process_data_rows:
             return None
@@ -621,12 +863,7 @@ class IODDReconstructor:
                 wrapper_order.append(wrapper_id)
 
                 # Check for Condition element (only add once per wrapper)
-                cursor.execute("""
-                    SELECT condition_variable_id, condition_value, condition_subindex
-                    FROM process_data_conditions
-                    WHERE process_data_id = ?
-                """, (pd['id'],))
-                condition = cursor.fetchone()
+                condition = self._chunk.first('process_data_conditions', pd['id'])
                 if condition and condition['condition_variable_id']:
                     condition_elem = ET.SubElement(pd_elem, 'Condition')
                     condition_elem.set('variableId', condition['condition_variable_id'])
@@ -736,11 +973,7 @@ class IODDReconstructor:
     def _add_ui_info(self, conn: sqlite3.Connection, parent: ET.Element,
                     process_data_id: int) -> None:
         """Add UI rendering info to process data"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM process_data_ui_info WHERE process_data_id = ?
-        """, (process_data_id,))
-        ui_info = cursor.fetchone()
+        ui_info = self._chunk.first('process_data_ui_info', process_data_id)
 
         if not ui_info:
             return
@@ -765,14 +998,7 @@ class IODDReconstructor:
         
         For non-RecordT types (like BooleanT) that have SingleValue enumerations directly under Datatype.
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT value, name, name_text_id, xsi_type
-            FROM process_data_single_values
-            WHERE process_data_id = ?
-            ORDER BY id
-        """, (process_data_id,))
-        single_values = cursor.fetchall()
+        single_values = self._chunk.all('process_data_single_values', process_data_id)
         
         for sv in single_values:
             sv_elem = ET.SubElement(parent, 'SingleValue')
@@ -790,21 +1016,13 @@ class IODDReconstructor:
 
         Queries process_data_record_items table and creates RecordItem child elements.
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM process_data_record_items
-            WHERE process_data_id = ? ORDER BY subindex
-        """, (process_data_id,))
-        items = cursor.fetchall()
+        items = self._chunk.all('process_data_record_items', process_data_id)
 
         if not items:
             return
 
         # Get device_id for text lookups
-        cursor.execute("""
-            SELECT device_id FROM process_data WHERE id = ?
-        """, (process_data_id,))
-        device_row = cursor.fetchone()
+        device_row = self._chunk.first('process_data_device', process_data_id)
         device_id = device_row['device_id'] if device_row else None
 
         for item in items:
@@ -845,13 +1063,7 @@ class IODDReconstructor:
                         sdt_name_elem.set('textId', sdt_name_text_id)
 
                     # Add SingleValue elements for this SimpleDatatype (PQA reconstruction)
-                    # PQA Fix #61: Include xsi_type in query
-                    cursor.execute("""
-                        SELECT value, name, name_text_id, xsi_type
-                        FROM process_data_single_values
-                        WHERE record_item_id = ?
-                    """, (item['id'],))
-                    single_values = cursor.fetchall()
+                    single_values = self._chunk.all('process_data_record_item_single_values', item['id'])
                     for sv in single_values:
                         sv_elem = ET.SubElement(simple_dt, 'SingleValue')
                         # PQA Fix #61: Add xsi:type attribute if present
@@ -864,16 +1076,11 @@ class IODDReconstructor:
                             sv_name_elem = ET.SubElement(sv_elem, 'Name')
                             sv_name_elem.set('textId', sv_name_text_id)
                         elif sv['name'] and device_id:
-                            # Fallback: lookup text_id from iodd_text
-                            cursor.execute("""
-                                SELECT text_id FROM iodd_text
-                                WHERE device_id = ? AND text_value = ?
-                                LIMIT 1
-                            """, (device_id, sv['name']))
-                            tid_row = cursor.fetchone()
-                            if tid_row:
+                            # Fallback: lookup text_id from the device's texts
+                            sv_text_id = self._text_table(conn, device_id).find_text_id(sv['name'])
+                            if sv_text_id:
                                 sv_name_elem = ET.SubElement(sv_elem, 'Name')
-                                sv_name_elem.set('textId', tid_row['text_id'])
+                                sv_name_elem.set('textId', sv_text_id)
 
                     # Add ValueRange element if present (PQA reconstruction)
                     min_val = item['min_value'] if 'min_value' in item.keys() else None
@@ -903,16 +1110,11 @@ class IODDReconstructor:
                 name_elem = ET.SubElement(record_elem, 'Name')
                 name_elem.set('textId', name_text_id)
             elif item['name'] and device_id:
-                # Fallback: try reverse-lookup from iodd_text (less accurate)
+                # Fallback: try reverse-lookup from the device's texts (less accurate)
                 name_elem = ET.SubElement(record_elem, 'Name')
-                cursor.execute("""
-                    SELECT text_id FROM iodd_text
-                    WHERE device_id = ? AND text_value = ? AND language_code = 'en'
-                    LIMIT 1
-                """, (device_id, item['name']))
-                text_row = cursor.fetchone()
-                if text_row:
-                    name_elem.set('textId', text_row['text_id'])
+                text_id = self._text_table(conn, device_id).find_text_id(item['name'], 'en')
+                if text_id:
+                    name_elem.set('textId', text_id)
                 else:
                     # Last resort: generate text ID from name
                     clean_name = item['name'].replace(' ', '_').replace(',', '').replace('(', '').replace(')', '')
@@ -930,12 +1132,7 @@ class IODDReconstructor:
 
         Queries parameter_record_items table and creates RecordItem child elements.
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM parameter_record_items
-            WHERE parameter_id = ? ORDER BY order_index
-        """, (parameter_id,))
-        items = cursor.fetchall()
+        items = self._chunk.all('parameter_record_items', parameter_id)
 
         if not items:
             return
@@ -974,14 +1171,7 @@ class IODDReconstructor:
                     simple_dt.set('id', dt_id)
 
                 # Add SingleValue children for this RecordItem's SimpleDatatype
-                # PQA Fix #61: Include xsi_type in query
-                cursor.execute("""
-                    SELECT value, name, name_text_id, order_index, xsi_type
-                    FROM record_item_single_values
-                    WHERE record_item_id = ?
-                    ORDER BY order_index
-                """, (item['id'],))
-                ri_single_values = cursor.fetchall()
+                ri_single_values = self._chunk.all('record_item_single_values', item['id'])
 
                 for sv in ri_single_values:
                     sv_elem = ET.SubElement(simple_dt, 'SingleValue')
@@ -1019,15 +1209,10 @@ class IODDReconstructor:
                 if item['name_text_id']:
                     name_elem.set('textId', item['name_text_id'])
                 else:
-                    # Try to find text ID from iodd_text
-                    cursor.execute("""
-                        SELECT text_id FROM iodd_text
-                        WHERE device_id = ? AND text_value = ? AND language_code = 'en'
-                        LIMIT 1
-                    """, (device_id, item['name']))
-                    text_row = cursor.fetchone()
-                    if text_row:
-                        name_elem.set('textId', text_row['text_id'])
+                    # Try to find text ID from the device's texts
+                    text_id = self._text_table(conn, device_id).find_text_id(item['name'], 'en')
+                    if text_id:
+                        name_elem.set('textId', text_id)
                     else:
                         # Generate text ID from name
                         clean_name = item['name'].replace(' ', '_').replace(',', '').replace('(', '').replace(')', '')
@@ -1045,12 +1230,7 @@ class IODDReconstructor:
 
         Queries parameter_single_values table and creates SingleValue child elements.
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM parameter_single_values
-            WHERE parameter_id = ? ORDER BY order_index
-        """, (parameter_id,))
-        items = cursor.fetchall()
+        items = self._chunk.all('parameter_single_values', parameter_id)
 
         if not items:
             return
@@ -1074,12 +1254,7 @@ class IODDReconstructor:
 
         Queries variable_record_item_info table and creates RecordItemInfo child elements.
         """
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM variable_record_item_info
-            WHERE parameter_id = ? ORDER BY order_index
-        """, (parameter_id,))
-        items = cursor.fetchall()
+        items = self._chunk.all('variable_record_item_info', parameter_id)
 
         if not items:
             return
@@ -1101,11 +1276,7 @@ class IODDReconstructor:
     def _create_datatype_collection(self, conn: sqlite3.Connection,
                                    device_id: int) -> Optional[ET.Element]:
         """Create DatatypeCollection for custom datatypes"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM custom_datatypes WHERE device_id = ?
-        """, (device_id,))
-        datatypes = cursor.fetchall()
+        datatypes = self._chunk.all('custom_datatypes', device_id)
 
         if not datatypes:
             return None
@@ -1189,20 +1360,8 @@ class IODDReconstructor:
     def _add_single_values(self, conn: sqlite3.Connection, parent: ET.Element,
                           datatype_id: int) -> None:
         """Add SingleValue enumeration values (Phase 3 Task 10a - direct children, no wrapper)"""
-        cursor = conn.cursor()
-        # PQA Fix #38: Order by xml_order to preserve original IODD order
-        # Fallback to numeric/alphabetic sort for legacy data without xml_order
-        cursor.execute("""
-            SELECT * FROM custom_datatype_single_values
-            WHERE datatype_id = ?
-            ORDER BY COALESCE(xml_order, 999999),
-                CASE
-                    WHEN value GLOB '[0-9]*' AND value NOT GLOB '*[^0-9]*'
-                    THEN CAST(value AS INTEGER)
-                    ELSE 999999
-                END, value
-        """, (datatype_id,))
-        values = cursor.fetchall()
+        # PQA Fix #38: Ordered by xml_order to preserve original IODD order
+        values = self._chunk.all('custom_datatype_single_values', datatype_id)
 
         if not values:
             return
@@ -1225,17 +1384,10 @@ class IODDReconstructor:
                 if stored_text_id:
                     name.set('textId', stored_text_id)
                 else:
-                    # Fallback: try to find from iodd_text table
-                    cursor2 = conn.cursor()
-                    cursor2.execute("""
-                        SELECT text_id FROM iodd_text
-                        WHERE device_id = (SELECT device_id FROM custom_datatypes WHERE id = ?)
-                        AND text_value = ?
-                        LIMIT 1
-                    """, (datatype_id, val['name']))
-                    text_id_row = cursor2.fetchone()
-                    if text_id_row:
-                        name.set('textId', text_id_row['text_id'])
+                    # Fallback: try to find from the device's texts
+                    text_id = self._datatype_text_table(conn, datatype_id).find_text_id(val['name'])
+                    if text_id:
+                        name.set('textId', text_id)
                     else:
                         # Final fallback: generate a text ID from the name
                         name.set('textId', 'TN_SV_' + val['name'].replace(' ', '').replace('-', '_'))
@@ -1243,12 +1395,7 @@ class IODDReconstructor:
     def _add_record_items(self, conn: sqlite3.Connection, parent: ET.Element,
                          datatype_id: int) -> None:
         """Add RecordItem structure fields (Phase 3 Task 10a - direct children, no wrapper)"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM custom_datatype_record_items
-            WHERE datatype_id = ? ORDER BY subindex
-        """, (datatype_id,))
-        items = cursor.fetchall()
+        items = self._chunk.all('custom_datatype_record_items', datatype_id)
 
         if not items:
             return
@@ -1271,17 +1418,10 @@ class IODDReconstructor:
                 if stored_text_id:
                     name.set('textId', stored_text_id)
                 else:
-                    # Fallback: try to find from iodd_text table
-                    cursor2 = conn.cursor()
-                    cursor2.execute("""
-                        SELECT text_id FROM iodd_text
-                        WHERE device_id = (SELECT device_id FROM custom_datatypes WHERE id = ?)
-                        AND text_value = ?
-                        LIMIT 1
-                    """, (datatype_id, item['name']))
-                    text_id_row = cursor2.fetchone()
-                    if text_id_row:
-                        name.set('textId', text_id_row['text_id'])
+                    # Fallback: try to find from the device's texts
+                    text_id = self._datatype_text_table(conn, datatype_id).find_text_id(item['name'])
+                    if text_id:
+                        name.set('textId', text_id)
                     else:
                         # Final fallback: generate a text ID from the name
                         clean_name = item['name'].replace(' ', '').replace('-', '_')
@@ -1375,15 +1515,8 @@ class IODDReconstructor:
                                                        record_item_id: int,
                                                        parent: ET.Element) -> None:
         """PQA Fix #21: Add SingleValue elements to RecordItem/SimpleDatatype for custom datatypes"""
-        cursor = conn.cursor()
-        # PQA Fix #74: Order by xml_order to preserve original IODD order
-        cursor.execute("""
-            SELECT value, name, name_text_id, xsi_type
-            FROM custom_datatype_record_item_single_values
-            WHERE record_item_id = ?
-            ORDER BY COALESCE(xml_order, id)
-        """, (record_item_id,))
-        single_values = cursor.fetchall()
+        # PQA Fix #74: Ordered by xml_order to preserve original IODD order
+        single_values = self._chunk.all('custom_datatype_record_item_single_values', record_item_id)
 
         for sv in single_values:
             sv_elem = ET.SubElement(parent, 'SingleValue')
@@ -1399,11 +1532,7 @@ class IODDReconstructor:
     def _create_user_interface(self, conn: sqlite3.Connection,
                               device_id: int) -> Optional[ET.Element]:
         """Create UserInterface element with menus and role menu sets"""
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM ui_menus WHERE device_id = ?
-        """, (device_id,))
-        menus = cursor.fetchall()
+        menus = self._chunk.all('ui_menus', device_id)
 
         if not menus:
             return None
@@ -1425,23 +1554,13 @@ class IODDReconstructor:
                 name_elem.set('textId', name_text_id)
             elif menu['name']:
                 # Fallback: reverse lookup from name (may match wrong textId)
-                cursor.execute("""
-                    SELECT text_id FROM iodd_text
-                    WHERE device_id = ? AND text_value = ? AND language_code = 'en'
-                    LIMIT 1
-                """, (device_id, menu['name']))
-                name_text_id_row = cursor.fetchone()
-                if name_text_id_row:
+                name_text_id = self._text_table(conn, device_id).find_text_id(menu['name'], 'en')
+                if name_text_id:
                     name_elem = ET.SubElement(menu_elem, 'Name')
-                    name_elem.set('textId', name_text_id_row['text_id'])
+                    name_elem.set('textId', name_text_id)
 
             # Get menu items for this menu
-            cursor.execute("""
-                SELECT * FROM ui_menu_items
-                WHERE menu_id = ?
-                ORDER BY item_order
-            """, (menu['id'],))
-            menu_items = cursor.fetchall()
+            menu_items = self._chunk.all('ui_menu_items', menu['id'])
 
             for item in menu_items:
                 # VariableRef or RecordItemRef
@@ -1467,13 +1586,7 @@ class IODDReconstructor:
                         offset_str = item['offset_str'] if 'offset_str' in item.keys() and item['offset_str'] else None
                         var_ref.set('offset', offset_str if offset_str else self._format_number(item['offset']))
                     # Add Button children if any
-                    cursor2 = conn.cursor()
-                    cursor2.execute("""
-                        SELECT * FROM ui_menu_buttons
-                        WHERE menu_item_id = ?
-                        ORDER BY id
-                    """, (item['id'],))
-                    button_rows = cursor2.fetchall()
+                    button_rows = self._chunk.all('ui_menu_buttons', item['id'])
                     for btn in button_rows:
                         button_elem = ET.SubElement(var_ref, 'Button')
                         button_elem.set('buttonValue', str(btn['button_value']))
@@ -1508,13 +1621,7 @@ class IODDReconstructor:
                         offset_str = item['offset_str'] if 'offset_str' in item.keys() and item['offset_str'] else None
                         record_ref.set('offset', offset_str if offset_str else self._format_number(item['offset']))
                     # PQA Fix #129: Add Button children for RecordItemRef if any
-                    cursor2 = conn.cursor()
-                    cursor2.execute("""
-                        SELECT * FROM ui_menu_buttons
-                        WHERE menu_item_id = ?
-                        ORDER BY id
-                    """, (item['id'],))
-                    button_rows = cursor2.fetchall()
+                    button_rows = self._chunk.all('ui_menu_buttons', item['id'])
                     for btn in button_rows:
                         button_elem = ET.SubElement(record_ref, 'Button')
                         button_elem.set('buttonValue', str(btn['button_value']))
@@ -1544,14 +1651,11 @@ class IODDReconstructor:
                         if cond_subindex is not None:
                             condition_elem.set('subindex', str(cond_subindex))
 
-        # Role Menu Sets - get from ui_menu_roles table
-        cursor.execute("""
-            SELECT DISTINCT role_type FROM ui_menu_roles WHERE device_id = ?
-        """, (device_id,))
-        role_types = cursor.fetchall()
+        # Role Menu Sets - get from ui_menu_roles table, roles in order of first appearance
+        menu_roles = self._chunk.all('ui_menu_roles', device_id)
+        role_types = list(dict.fromkeys(row['role_type'] for row in menu_roles))
 
-        for role_type_row in role_types:
-            role_type = role_type_row['role_type']
+        for role_type in role_types:
 
             # Create role menu set element
             if role_type == 'observer':
@@ -1564,12 +1668,8 @@ class IODDReconstructor:
                 continue  # Unknown role type
 
             # Get menu types for this role (PQA Fix #27: include has_xsi_type)
-            cursor.execute("""
-                SELECT menu_type, menu_id, has_xsi_type FROM ui_menu_roles
-                WHERE device_id = ? AND role_type = ?
-                ORDER BY menu_type
-            """, (device_id, role_type))
-            role_menus = cursor.fetchall()
+            role_menus = sorted((row for row in menu_roles if row['role_type'] == role_type),
+                                key=lambda row: row['menu_type'])
 
             for role_menu in role_menus:
                 menu_type = role_menu['menu_type']
@@ -1596,19 +1696,7 @@ class IODDReconstructor:
                     menu_elem.set('menuId', menu_id)
 
         # PQA Fix #31: Add ProcessDataRefCollection if UI info exists
-        # PQA Fix #42: Order by pd_ref_order to preserve original ProcessDataRef order
-        # PQA Fix #41: Order by xml_order within each ProcessDataRef to preserve original element order
-        # Fallback: direction-based order for legacy data without pd_ref_order
-        cursor.execute("""
-            SELECT pdui.*, pd.pd_id, pd.direction
-            FROM process_data_ui_info pdui
-            JOIN process_data pd ON pdui.process_data_id = pd.id
-            WHERE pd.device_id = ?
-            ORDER BY COALESCE(pdui.pd_ref_order, CASE pd.direction WHEN 'output' THEN 0 ELSE 1 END),
-                     pd.pd_id,
-                     COALESCE(pdui.xml_order, pdui.subindex)
-        """, (device_id,))
-        ui_info_rows = cursor.fetchall()
+        ui_info_rows = self._chunk.all('process_data_ref_info', device_id)
 
         if ui_info_rows:
             pdrc = ET.SubElement(user_interface, 'ProcessDataRefCollection')
@@ -1644,11 +1732,8 @@ class IODDReconstructor:
     def _create_comm_network_profile(self, conn: sqlite3.Connection,
                                       device_id: int) -> Optional[ET.Element]:
         """Create CommNetworkProfile element with TransportLayers and Test sections"""
-        cursor = conn.cursor()
-
         # Get communication profile data
-        cursor.execute("SELECT * FROM communication_profile WHERE device_id = ?", (device_id,))
-        comm_profile = cursor.fetchone()
+        comm_profile = self._chunk.first('communication_profile', device_id)
 
         if not comm_profile:
             return None
@@ -1688,12 +1773,7 @@ class IODDReconstructor:
             physical_layer.set('mSequenceCapability', str(comm_profile['msequence_capability']))
 
         # Get wire configurations for Connection element
-        cursor.execute("""
-            SELECT * FROM wire_configurations
-            WHERE device_id = ?
-            ORDER BY wire_number
-        """, (device_id,))
-        wire_configs = cursor.fetchall()
+        wire_configs = self._chunk.all('wire_configurations', device_id)
 
         if wire_configs or comm_profile['connection_type']:
             connection = ET.SubElement(physical_layer, 'Connection')
@@ -1721,8 +1801,7 @@ class IODDReconstructor:
             product_ref_id = comm_profile['product_ref_id'] if 'product_ref_id' in comm_profile.keys() else None
             if product_ref_id is None:
                 # Fallback to device_variants
-                cursor.execute("SELECT product_id FROM device_variants WHERE device_id = ? LIMIT 1", (device_id,))
-                variant_row = cursor.fetchone()
+                variant_row = self._chunk.first('device_variant', device_id)
                 if variant_row:
                     product_ref_id = variant_row['product_id']
             if product_ref_id is not None:
@@ -1755,12 +1834,7 @@ class IODDReconstructor:
 
         # PQA Fix #84: Create Test section if it was present in original IODD
         has_test_element = comm_profile['has_test_element'] if 'has_test_element' in comm_profile.keys() else False
-        cursor.execute("""
-            SELECT * FROM device_test_config
-            WHERE device_id = ?
-            ORDER BY config_type
-        """, (device_id,))
-        test_configs = cursor.fetchall()
+        test_configs = self._chunk.all('device_test_config', device_id)
 
         if has_test_element:
             test_elem = ET.SubElement(comm_elem, 'Test')
@@ -1779,11 +1853,7 @@ class IODDReconstructor:
                     config_elem.set('testValue', config['test_value'])
 
                 # Get event triggers for this config (for Config7)
-                cursor.execute("""
-                    SELECT * FROM device_test_event_triggers
-                    WHERE test_config_id = ?
-                """, (config['id'],))
-                event_triggers = cursor.fetchall()
+                event_triggers = self._chunk.all('device_test_event_triggers', config['id'])
 
                 for trigger in event_triggers:
                     trigger_elem = ET.SubElement(config_elem, 'EventTrigger')
@@ -1795,14 +1865,8 @@ class IODDReconstructor:
     def _create_stamp(self, conn: sqlite3.Connection,
                       device_id: int) -> Optional[ET.Element]:
         """Create Stamp element with CRC and Checker info"""
-        cursor = conn.cursor()
-
         # Get stamp data from iodd_files table
-        cursor.execute("""
-            SELECT stamp_crc, checker_name, checker_version
-            FROM iodd_files WHERE device_id = ?
-        """, (device_id,))
-        row = cursor.fetchone()
+        row = self._chunk.first('iodd_file', device_id)
 
         if not row:
             return None
@@ -1839,21 +1903,13 @@ class IODDReconstructor:
         SingleValue elements, etc.) in a dedicated variables table with proper schema.
         Current parameters table only stores basic parameter info.
         """
-        cursor = conn.cursor()
-
         # Get device info for standard variable default values
-        cursor.execute("SELECT * FROM devices WHERE id = ?", (device_id,))
-        device = cursor.fetchone()
+        device = self._chunk.first('device', device_id)
 
         # Get variant info for ProductID
-        cursor.execute("SELECT product_id FROM device_variants WHERE device_id = ? LIMIT 1", (device_id,))
-        variant_row = cursor.fetchone()
+        variant_row = self._chunk.first('device_variant', device_id)
 
-        cursor.execute("""
-            SELECT * FROM parameters WHERE device_id = ?
-            ORDER BY COALESCE(xml_order, param_index)
-        """, (device_id,))
-        parameters = cursor.fetchall()
+        parameters = self._chunk.all('parameters', device_id)
 
         if not parameters and not device:
             return None
@@ -1861,13 +1917,7 @@ class IODDReconstructor:
         collection = ET.Element('VariableCollection')
 
         # Query stored StdVariableRef elements in original order
-        cursor.execute("""
-            SELECT id, variable_id, default_value, fixed_length_restriction, excluded_from_data_storage, order_index
-            FROM std_variable_refs
-            WHERE device_id = ?
-            ORDER BY order_index
-        """, (device_id,))
-        std_var_refs = cursor.fetchall()
+        std_var_refs = self._chunk.all('std_variable_refs', device_id)
 
         if std_var_refs:
             # Use stored StdVariableRef data for accurate reconstruction
@@ -1888,13 +1938,7 @@ class IODDReconstructor:
                     std_ref.set('fixedLengthRestriction', str(ref['fixed_length_restriction']))
 
                 # Add SingleValue and StdSingleValueRef children
-                cursor.execute("""
-                    SELECT value, name_text_id, is_std_ref, order_index
-                    FROM std_variable_ref_single_values
-                    WHERE std_variable_ref_id = ?
-                    ORDER BY order_index
-                """, (ref['id'],))
-                single_values = cursor.fetchall()
+                single_values = self._chunk.all('std_variable_ref_single_values', ref['id'])
 
                 for sv in single_values:
                     if sv['is_std_ref']:
@@ -1910,13 +1954,7 @@ class IODDReconstructor:
                             name_elem.set('textId', sv['name_text_id'])
 
                 # PQA Fix #5: Add StdValueRangeRef and ValueRange children
-                cursor.execute("""
-                    SELECT lower_value, upper_value, is_std_ref, order_index
-                    FROM std_variable_ref_value_ranges
-                    WHERE std_variable_ref_id = ?
-                    ORDER BY order_index
-                """, (ref['id'],))
-                value_ranges = cursor.fetchall()
+                value_ranges = self._chunk.all('std_variable_ref_value_ranges', ref['id'])
 
                 for vr in value_ranges:
                     if vr['is_std_ref']:
@@ -1931,14 +1969,7 @@ class IODDReconstructor:
                         vr_elem.set('upperValue', vr['upper_value'])
 
                 # Add StdRecordItemRef children
-                cursor2 = conn.cursor()
-                cursor2.execute("""
-                    SELECT id, subindex, default_value, order_index
-                    FROM std_record_item_refs
-                    WHERE std_variable_ref_id = ?
-                    ORDER BY order_index
-                """, (ref['id'],))
-                record_item_refs = cursor2.fetchall()
+                record_item_refs = self._chunk.all('std_record_item_refs', ref['id'])
 
                 for ri in record_item_refs:
                     ri_elem = ET.SubElement(std_ref, 'StdRecordItemRef')
@@ -1947,14 +1978,7 @@ class IODDReconstructor:
                         ri_elem.set('defaultValue', ri['default_value'])
                     
                     # PQA Fix #76: Add SingleValue/StdSingleValueRef children
-                    cursor3 = conn.cursor()
-                    cursor3.execute("""
-                        SELECT value, name_text_id, is_std_ref, order_index
-                        FROM std_record_item_ref_single_values
-                        WHERE std_record_item_ref_id = ?
-                        ORDER BY order_index
-                    """, (ri['id'],))
-                    ri_single_values = cursor3.fetchall()
+                    ri_single_values = self._chunk.all('std_record_item_ref_single_values', ri['id'])
                     
                     for ri_sv in ri_single_values:
                         if ri_sv['is_std_ref']:
@@ -2120,17 +2144,11 @@ class IODDReconstructor:
                 name_elem.set('textId', name_text_id)
             else:
                 # Fallback: look up or generate text ID
-                cursor2 = conn.cursor()
-                cursor2.execute("""
-                    SELECT text_id FROM iodd_text
-                    WHERE device_id = ? AND text_value = ? AND text_id LIKE 'TN_V_%'
-                    LIMIT 1
-                """, (device_id, param['name']))
-                name_text_row = cursor2.fetchone()
-
-                if name_text_row:
+                name_text_id = self._text_table(conn, device_id).find_text_id(param['name'], prefix='TN_V_')
+
+                if name_text_id:
                     name_elem = ET.SubElement(variable, 'Name')
-                    name_elem.set('textId', name_text_row['text_id'])
+                    name_elem.set('textId', name_text_id)
                 else:
                     name_elem = ET.SubElement(variable, 'Name')
                     name_elem.set('textId', f'TN_{var_id}')
@@ -2142,29 +2160,19 @@ class IODDReconstructor:
                 desc_elem.set('textId', description_text_id)
             elif param['description']:
                 # Fallback: look up text ID
-                cursor2 = conn.cursor()
-                cursor2.execute("""
-                    SELECT text_id FROM iodd_text
-                    WHERE device_id = ? AND text_value LIKE ? AND text_id LIKE 'TD_V_%'
-                    LIMIT 1
-                """, (device_id, f"%{param['description'][:50]}%"))
-                desc_text_row = cursor2.fetchone()
-
-                if desc_text_row:
+                desc_text_id = self._text_table(conn, device_id).find_text_id_containing(
+                    param['description'][:50], prefix='TD_V_')
+
+                if desc_text_id:
                     desc_elem = ET.SubElement(variable, 'Description')
-                    desc_elem.set('textId', desc_text_row['text_id'])
+                    desc_elem.set('textId', desc_text_id)
 
             # Add RecordItemInfo elements for RecordT types
             if param['data_type'] == 'RecordT':
                 self._add_variable_record_item_info(conn, param['id'], variable)
 
         # PQA Fix #131: Reconstruct DirectParameterOverlay elements
-        cursor.execute("""
-            SELECT * FROM direct_parameter_overlays
-            WHERE device_id = ?
-            ORDER BY xml_order
-        """, (device_id,))
-        overlays = cursor.fetchall()
+        overlays = self._chunk.all('direct_parameter_overlays', device_id)
 
         for overlay in overlays:
             overlay_elem = ET.SubElement(collection, 'DirectParameterOverlay')
@@ -2187,13 +2195,7 @@ class IODDReconstructor:
                     datatype_elem.set('bitLength', str(overlay['datatype_bit_length']))
 
                 # Add RecordItem children
-                cursor2 = conn.cursor()
-                cursor2.execute("""
-                    SELECT * FROM direct_parameter_overlay_record_items
-                    WHERE overlay_id = ?
-                    ORDER BY order_index
-                """, (overlay['id'],))
-                record_items = cursor2.fetchall()
+                record_items = self._chunk.all('direct_parameter_overlay_record_items', overlay['id'])
 
                 for ri in record_items:
                     ri_elem = ET.SubElement(datatype_elem, 'RecordItem')
@@ -2228,13 +2230,7 @@ class IODDReconstructor:
                                 vr_name.set('textId', ri['value_range_name_text_id'])
 
                         # Add SingleValue children
-                        cursor3 = conn.cursor()
-                        cursor3.execute("""
-                            SELECT * FROM direct_parameter_overlay_record_item_single_values
-                            WHERE record_item_id = ?
-                            ORDER BY order_index
-                        """, (ri['id'],))
-                        single_values = cursor3.fetchall()
+                        single_values = self._chunk.all('direct_parameter_overlay_record_item_single_values', ri['id'])
 
                         for sv in single_values:
                             sv_elem = ET.SubElement(simple_dt, 'SingleValue')
@@ -2258,13 +2254,7 @@ class IODDReconstructor:
                         ri_desc.set('textId', ri['description_text_id'])
 
             # Add RecordItemInfo children
-            cursor2 = conn.cursor()
-            cursor2.execute("""
-                SELECT * FROM direct_parameter_overlay_record_item_info
-                WHERE overlay_id = ?
-                ORDER BY order_index
-            """, (overlay['id'],))
-            record_item_info = cursor2.fetchall()
+            record_item_info = self._chunk.all('direct_parameter_overlay_record_item_info', overlay['id'])
 
             for rii in record_item_info:
                 rii_elem = ET.SubElement(overlay_elem, 'RecordItemInfo')
@@ -2289,23 +2279,11 @@ class IODDReconstructor:
         - ErrorType: Custom errors with Name/Description children
         - StdErrorTypeRef: Standard IO-Link error references with only attributes
         """
-        cursor = conn.cursor()
-
         # PQA Fix #56: Check if original IODD had ErrorTypeCollection (even if empty)
-        cursor.execute("""
-            SELECT has_error_type_collection FROM devices WHERE id = ?
-        """, (device_id,))
-        device_row = cursor.fetchone()
+        device_row = self._chunk.first('device', device_id)
         has_collection = device_row['has_error_type_collection'] if device_row and 'has_error_type_collection' in device_row.keys() else False
 
-        cursor.execute("""
-            SELECT code, additional_code, has_code_attr, xml_order,
-                   is_custom, name_text_id, description_text_id
-            FROM error_types
-            WHERE device_id = ?
-            ORDER BY COALESCE(xml_order, additional_code)
-        """, (device_id,))
-        error_types = cursor.fetchall()
+        error_types = self._chunk.all('error_types', device_id)
 
         if not error_types:
             # PQA Fix #56: Output empty ErrorTypeCollection if original had one
@@ -2355,25 +2333,11 @@ class IODDReconstructor:
         Preserves original order using order_index column (or id as fallback).
         Uses stored textIds directly instead of reverse-lookup for accuracy.
         """
-        cursor = conn.cursor()
-        # Order by order_index (if available) or id to preserve original XML order
-        # PQA Fix #46: Include mode column
-        cursor.execute("""
-            SELECT code, name, description, event_type,
-                   name_text_id, description_text_id, order_index, mode
-            FROM events
-            WHERE device_id = ?
-            ORDER BY COALESCE(order_index, id)
-        """, (device_id,))
-        events = cursor.fetchall()
+        # Ordered by order_index (if available) or id to preserve original XML order
+        events = self._chunk.all('events', device_id)
 
         # PQA Fix: Check if original had EventCollection element (even if empty)
-        cursor.execute("""
-            SELECT has_event_collection
-            FROM devices
-            WHERE id = ?
-        """, (device_id,))
-        device_row = cursor.fetchone()
+        device_row = self._chunk.first('device', device_id)
         has_event_collection = device_row['has_event_collection'] if device_row else False
 
         if not events:
@@ -2430,15 +2394,9 @@ class IODDReconstructor:
         - PrimaryLanguage (usually English) - only ONE
         - Language (secondary languages) - zero or more
         """
-        cursor = conn.cursor()
-        # Get languages ordered by language_order (PQA: preserve original Language element order)
-        cursor.execute("""
-            SELECT DISTINCT language_code, MIN(language_order) as lang_order
-            FROM iodd_text WHERE device_id = ?
-            GROUP BY language_code
-            ORDER BY lang_order, language_code
-        """, (device_id,))
-        languages = [row['language_code'] for row in cursor.fetchall()]
+        texts = self._text_table(conn, device_id)
+        # Languages ordered by language_order (PQA: preserve original Language element order)
+        languages = texts.languages
 
         if not languages:
             return None
@@ -2446,70 +2404,39 @@ class IODDReconstructor:
         collection = ET.Element('ExternalTextCollection')
 
         # Determine primary language: the one with language_order=0, or 'en', or first
-        cursor.execute("""
-            SELECT DISTINCT language_code FROM iodd_text
-            WHERE device_id = ? AND language_order = 0
-        """, (device_id,))
-        primary_row = cursor.fetchone()
-        if primary_row:
-            primary_lang_code = primary_row['language_code']
-        elif 'en' in languages:
-            primary_lang_code = 'en'
-        else:
-            primary_lang_code = languages[0]
-
-        # Create PrimaryLanguage element
-        primary_elem = ET.SubElement(collection, 'PrimaryLanguage')
-        primary_elem.set('{http://www.w3.org/XML/1998/namespace}lang', primary_lang_code)
-
-        # Get all texts for primary language
-        # PQA Fix #66: Include is_text_redefine column
-        cursor.execute("""
-            SELECT text_id, text_value, is_text_redefine FROM iodd_text
-            WHERE device_id = ? AND language_code = ?
-            ORDER BY xml_order, id
-        """, (device_id, primary_lang_code))
-        texts = cursor.fetchall()
-
-        for text in texts:
-            # PQA Fix #66: Output TextRedefine instead of Text if appropriate
-            is_redefine = text['is_text_redefine'] if 'is_text_redefine' in text.keys() and text['is_text_redefine'] else False
-            elem_name = 'TextRedefine' if is_redefine else 'Text'
-            text_elem = ET.SubElement(primary_elem, elem_name)
-            text_elem.set('id', text['text_id'])
-            text_elem.set('value', text['text_value'] or '')
-
-        # Create Language elements for secondary languages
-        for lang_code in languages:
-            if lang_code == primary_lang_code:
-                continue  # Skip primary language
-
-            lang_elem = ET.SubElement(collection, 'Language')
-            lang_elem.set('{http://www.w3.org/XML/1998/namespace}lang', lang_code)
+        primary_lang_code = texts.primary_language
 
-            # PQA Fix #66: Include is_text_redefine column
-            cursor.execute("""
-                SELECT text_id, text_value, is_text_redefine FROM iodd_text
-                WHERE device_id = ? AND language_code = ?
-                ORDER BY xml_order, id
-            """, (device_id, lang_code))
-            texts = cursor.fetchall()
+        # Create PrimaryLanguage element, then Language elements for secondary languages
+        for lang_code in [primary_lang_code] + [lang for lang in languages if lang != primary_lang_code]:
+            lang_elem = ET.SubElement(collection, 'PrimaryLanguage' if lang_code == primary_lang_code else 'Language')
+            lang_elem.set('{http://www.w3.org/XML/1998/namespace}lang', lang_code)
 
-            for text in texts:
+            for text_id, text_value, is_redefine in texts.entries(lang_code):
                 # PQA Fix #66: Output TextRedefine instead of Text if appropriate
-                is_redefine = text['is_text_redefine'] if 'is_text_redefine' in text.keys() and text['is_text_redefine'] else False
                 elem_name = 'TextRedefine' if is_redefine else 'Text'
                 text_elem = ET.SubElement(lang_elem, elem_name)
-                text_elem.set('id', text['text_id'])
-                text_elem.set('value', text['text_value'] or '')
+                text_elem.set('id', text_id)
+                text_elem.set('value', text_value or '')
 
         return collection
 
-    def _prettify_xml(self, elem: ET.Element) -> str:
-        """Convert XML element to pretty-printed string"""
-        rough_string = ET.tostring(elem, encoding='unicode')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent="  ")
+    def _get_build_format(self, conn: sqlite3.Connection, device_id: int) -> Optional[Dict]:
+        """Get stored formatting metadata (indent, newlines, quoting) for a device"""
+        # Older databases without the build format table have no rows
+        row = self._chunk.first('build_format', device_id)
+        if not row:
+            return None
+        build_format = dict(row)
+        del build_format['device_id']
+        return build_format
+
+    def _prettify_xml(self, elem: ET.Element, build_format: Optional[Dict] = None) -> str:
+        """Convert XML element to pretty-printed string
+
+        Serializes straight from the element tree; without stored build format
+        metadata the output matches the previous minidom toprettyxml() layout.
+        """
+        return serialize_xml(elem, XmlFormat.from_build_format(build_format))
 
 
 def reconstruct_iodd_xml(device_id: int, db_path: str = "greenstack.db") -> str:
@@ -0,0 +1,516 @@
+"""
+Materialized PQA Dashboard Aggregates
+
+The /api/pqa/dashboard endpoints read pre-aggregated rows instead of scanning
+pqa_quality_metrics and pqa_diff_details on every page load. Each aggregate
+row is stored once per scope: 'ALL' plus one scope per file type ('IODD',
+'EDS'), so filtered and unfiltered views are both single indexed reads.
+
+Tables:
+- pqa_dashboard_totals: counts, score buckets and phase sums per scope
+- pqa_dashboard_devices: analyses and diffs per device (drives the distinct
+  device counts in pqa_dashboard_totals)
+- pqa_dashboard_diff_counts: diffs per (diff_type, severity)
+- pqa_dashboard_daily: per-day score statistics for trends
+- pqa_dashboard_xpath_patterns: most common diff locations
+
+Additive values are maintained with deltas computed from the rows being
+written or removed. Per-day and per-pattern rows (MIN/MAX and example values)
+are recomputed for the affected keys only. ``rebuild_dashboard_aggregates``
+recomputes everything from the base tables and
+``check_dashboard_aggregates`` reports any drift between the two.
+"""
+
+import logging
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = 'ALL'
+
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_IN_PARAMETERS = 500
+
+# Devices listed per XPath pattern
+MAX_PATTERN_DEVICES = 10
+
+PHASES = range(1, 6)
+
+# (column, aggregate over pqa_quality_metrics) - all additive across rows
+_METRIC_AGGREGATES = (
+    ('total_analyses', 'COUNT(*)'),
+    ('passed_analyses', 'SUM(passed_threshold = 1)'),
+    ('critical_failures', 'SUM(critical_data_loss = 1)'),
+    ('score_sum', 'TOTAL(overall_score)'),
+    ('bucket_perfect', 'SUM(overall_score = 100.0)'),
+    ('bucket_near_perfect', 'SUM(overall_score >= 99.900 AND overall_score < 100.0)'),
+    ('bucket_excellent', 'SUM(overall_score >= 99.500 AND overall_score < 99.900)'),
+    ('bucket_good', 'SUM(overall_score >= 99.000 AND overall_score < 99.500)'),
+    ('bucket_acceptable', 'SUM(overall_score >= 95.000 AND overall_score < 99.000)'),
+    ('bucket_below_threshold', 'SUM(overall_score < 95.000)'),
+    *((f'phase{n}_sum', f'TOTAL(phase{n}_score)') for n in PHASES),
+    *((f'phase{n}_count', f'COUNT(phase{n}_score)') for n in PHASES),
+    *((f'phase{n}_perfect', f'SUM(phase{n}_score = 100.0)') for n in PHASES),
+)
+_METRIC_COLUMNS = tuple(column for column, _ in _METRIC_AGGREGATES)
+_METRIC_SELECT = ', '.join(f'COALESCE({expr}, 0)' for _, expr in _METRIC_AGGREGATES)
+
+TOTAL_COLUMNS = _METRIC_COLUMNS + ('diff_total', 'devices_analyzed', 'diff_devices')
+_DIFF_TOTAL = TOTAL_COLUMNS.index('diff_total')
+_DEVICES_ANALYZED = TOTAL_COLUMNS.index('devices_analyzed')
+_DIFF_DEVICES = TOTAL_COLUMNS.index('diff_devices')
+
+# table -> (key columns, value columns)
+TABLES = {
+    'pqa_dashboard_totals': (('scope',), TOTAL_COLUMNS),
+    'pqa_dashboard_devices': (('scope', 'device_id'), ('analysis_count', 'diff_count')),
+    'pqa_dashboard_diff_counts': (('scope', 'diff_type', 'severity'), ('diff_count',)),
+    'pqa_dashboard_daily': (('scope', 'day'), ('analysis_count', 'score_sum', 'min_score', 'max_score')),
+    'pqa_dashboard_xpath_patterns': (
+        ('scope', 'xpath', 'diff_type', 'severity'),
+        ('occurrences', 'device_ids', 'example_expected', 'example_actual', 'description'),
+    ),
+}
+
+Rows = Dict[tuple, tuple]
+
+
+def _scopes(file_type: Optional[str]) -> Tuple[str, ...]:
+    """Scopes a row with the given file type contributes to"""
+    return (SCOPE_ALL, file_type) if file_type else (SCOPE_ALL,)
+
+
+def _chunks(ids: Sequence[int], size: int = MAX_IN_PARAMETERS) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield list(ids[start:start + size])
+
+
+def _in_clause(column: str, ids: Sequence[int]) -> str:
+    return f"{column} IN ({','.join('?' * len(ids))})"
+
+
+def _zero_totals() -> List[float]:
+    return [0] * len(TOTAL_COLUMNS)
+
+
+# ============================================================================
+# Aggregation queries (shared by incremental updates, rebuild and checks)
+# ============================================================================
+
+def _metric_totals(cursor: sqlite3.Cursor, where: str = "1 = 1",
+                   params: Sequence = ()) -> Dict[str, List[float]]:
+    """Additive totals per scope over the selected pqa_quality_metrics rows"""
+    totals: Dict[str, List[float]] = defaultdict(_zero_totals)
+    cursor.execute(f"""
+        SELECT file_type, {_METRIC_SELECT}
+        FROM pqa_quality_metrics
+        WHERE {where}
+        GROUP BY file_type
+    """, list(params))
+    for row in cursor.fetchall():
+        for scope in _scopes(row[0]):
+            values = totals[scope]
+            for i, value in enumerate(row[1:]):
+                values[i] += value
+    return totals
+
+
+def _diff_counts(cursor: sqlite3.Cursor, where: str = "1 = 1", params: Sequence = ()) -> Rows:
+    """Diff counts per (scope, diff_type, severity) over the selected diff rows"""
+    counts: Dict[tuple, int] = defaultdict(int)
+    cursor.execute(f"""
+        SELECT pqm.file_type, pdd.diff_type, pdd.severity, COUNT(*)
+        FROM pqa_diff_details pdd
+        JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
+        WHERE {where}
+        GROUP BY pqm.file_type, pdd.diff_type, pdd.severity
+    """, list(params))
+    for file_type, diff_type, severity, count in cursor.fetchall():
+        for scope in _scopes(file_type):
+            counts[(scope, diff_type, severity)] += count
+    return {key: (count,) for key, count in counts.items()}
+
+
+def _device_counts(cursor: sqlite3.Cursor, metric_where: str = "1 = 1", diff_where: str = "1 = 1",
+                   params: Sequence = (), include_metrics: bool = True) -> Rows:
+    """(analysis_count, diff_count) per (scope, device_id)"""
+    counts: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+    if include_metrics:
+        cursor.execute(f"""
+            SELECT file_type, device_id, COUNT(*)
+            FROM pqa_quality_metrics
+            WHERE {metric_where}
+            GROUP BY file_type, device_id
+        """, list(params))
+        for file_type, device_id, count in cursor.fetchall():
+            for scope in _scopes(file_type):
+                counts[(scope, device_id)][0] += count
+    cursor.execute(f"""
+        SELECT pqm.file_type, pqm.device_id, COUNT(*)
+        FROM pqa_diff_details pdd
+        JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
+        WHERE {diff_where}
+        GROUP BY pqm.file_type, pqm.device_id
+    """, list(params))
+    for file_type, device_id, count in cursor.fetchall():
+        for scope in _scopes(file_type):
+            counts[(scope, device_id)][1] += count
+    return {key: tuple(values) for key, values in counts.items()}
+
+
+def _daily_rows(cursor: sqlite3.Cursor, scope: str, day: Optional[str] = None) -> Rows:
+    """Per-day score statistics for one scope (optionally a single day)"""
+    filters, params = [], []
+    if scope != SCOPE_ALL:
+        filters.append("file_type = ?")
+        params.append(scope)
+    if day is not None:
+        # Range on the raw timestamp so the analysis_timestamp index is used
+        filters.append("analysis_timestamp >= ? AND analysis_timestamp < ?")
+        params += [day, (date.fromisoformat(day) + timedelta(days=1)).isoformat()]
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+    cursor.execute(f"""
+        SELECT DATE(analysis_timestamp) AS day, COUNT(*), TOTAL(overall_score),
+               MIN(overall_score), MAX(overall_score)
+        FROM pqa_quality_metrics
+        {where}
+        GROUP BY DATE(analysis_timestamp)
+    """, params)
+    return {(scope, row[0]): tuple(row[1:]) for row in cursor.fetchall() if row[0] is not None}
+
+
+def _pattern_rows(cursor: sqlite3.Cursor, scope: str, key: Optional[Tuple[str, str, str]] = None) -> Rows:
+    """XPath pattern statistics for one scope (optionally a single pattern)"""
+    filters, params = [], []
+    if scope != SCOPE_ALL:
+        filters.append("pqm.file_type = ?")
+        params.append(scope)
+    if key is not None:
+        filters.append("pdd.xpath = ? AND pdd.diff_type = ? AND pdd.severity = ?")
+        params += list(key)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+    cursor.execute(f"""
+        SELECT pdd.xpath, pdd.diff_type, pdd.severity, COUNT(*),
+               GROUP_CONCAT(DISTINCT pqm.device_id),
+               MIN(pdd.expected_value), MIN(pdd.actual_value), MIN(pdd.description)
+        FROM pqa_diff_details pdd
+        JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
+        {where}
+        GROUP BY pdd.xpath, pdd.diff_type, pdd.severity
+    """, params)
+
+    rows = {}
+    for xpath, diff_type, severity, count, device_ids, expected, actual, description in cursor.fetchall():
+        devices = sorted(int(device_id) for device_id in str(device_ids or '').split(',') if device_id)
+        rows[(scope, xpath, diff_type, severity)] = (
+            count,
+            ','.join(str(device_id) for device_id in devices[:MAX_PATTERN_DEVICES]),
+            expected,
+            actual,
+            description,
+        )
+    return rows
+
+
+def _file_types(cursor: sqlite3.Cursor) -> List[str]:
+    cursor.execute("SELECT DISTINCT file_type FROM pqa_quality_metrics WHERE file_type IS NOT NULL")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _expected_aggregates(cursor: sqlite3.Cursor) -> Dict[str, Rows]:
+    """Compute every aggregate table from the base tables"""
+    totals = _metric_totals(cursor)
+    totals.setdefault(SCOPE_ALL, _zero_totals())
+    devices = _device_counts(cursor)
+    diff_counts = _diff_counts(cursor)
+
+    for (scope, _), (analysis_count, diff_count) in devices.items():
+        totals[scope][_DEVICES_ANALYZED] += analysis_count > 0
+        totals[scope][_DIFF_DEVICES] += diff_count > 0
+    for (scope, _, _), (count,) in diff_counts.items():
+        totals[scope][_DIFF_TOTAL] += count
+
+    daily: Rows = {}
+    patterns: Rows = {}
+    for scope in (SCOPE_ALL, *_file_types(cursor)):
+        daily.update(_daily_rows(cursor, scope))
+        patterns.update(_pattern_rows(cursor, scope))
+
+    return {
+        'pqa_dashboard_totals': {(scope,): tuple(values) for scope, values in totals.items()},
+        'pqa_dashboard_devices': devices,
+        'pqa_dashboard_diff_counts': diff_counts,
+        'pqa_dashboard_daily': daily,
+        'pqa_dashboard_xpath_patterns': patterns,
+    }
+
+
+# ============================================================================
+# Storage helpers
+# ============================================================================
+
+def _read_rows(cursor: sqlite3.Cursor, table: str) -> Rows:
+    key_columns, value_columns = TABLES[table]
+    cursor.execute(f"SELECT {', '.join(key_columns + value_columns)} FROM {table}")
+    split = len(key_columns)
+    return {tuple(row[:split]): tuple(row[split:]) for row in cursor.fetchall()}
+
+
+def _write_rows(cursor: sqlite3.Cursor, table: str, rows: Rows) -> None:
+    if not rows:
+        return
+    key_columns, value_columns = TABLES[table]
+    columns = key_columns + value_columns
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [key + values for key, values in rows.items()]
+    )
+
+
+def _delete_row(cursor: sqlite3.Cursor, table: str, key: tuple) -> None:
+    key_columns, _ = TABLES[table]
+    cursor.execute(f"DELETE FROM {table} WHERE {' AND '.join(f'{c} = ?' for c in key_columns)}", key)
+
+
+def _add_counts(cursor: sqlite3.Cursor, table: str, deltas: Rows, sign: int) -> Dict[tuple, Tuple[tuple, tuple]]:
+    """Add signed deltas to additive rows; returns key -> (old values, new values)"""
+    key_columns, value_columns = TABLES[table]
+    where = ' AND '.join(f'{c} = ?' for c in key_columns)
+    changes = {}
+    for key, delta in deltas.items():
+        cursor.execute(f"SELECT {', '.join(value_columns)} FROM {table} WHERE {where}", key)
+        row = cursor.fetchone()
+        old = tuple(row) if row else (0,) * len(value_columns)
+        new = tuple(o + sign * d for o, d in zip(old, delta))
+        if any(new):
+            _write_rows(cursor, table, {key: new})
+        elif row:
+            _delete_row(cursor, table, key)
+        changes[key] = (old, new)
+    return changes
+
+
+def _is_built(cursor: sqlite3.Cursor) -> bool:
+    """Aggregates exist once a rebuild has written the 'ALL' totals row"""
+    try:
+        cursor.execute("SELECT 1 FROM pqa_dashboard_totals WHERE scope = ?", (SCOPE_ALL,))
+    except sqlite3.OperationalError:
+        # Database predates the dashboard tables
+        return False
+    return cursor.fetchone() is not None
+
+
+# ============================================================================
+# Incremental maintenance
+# ============================================================================
+
+class _PendingChange:
+    """Deltas and affected keys for a set of analyses"""
+
+    def __init__(self, cursor: sqlite3.Cursor, metric_ids: Sequence[int], include_metrics: bool):
+        self.totals: Dict[str, List[float]] = defaultdict(_zero_totals)
+        self.devices: Rows = {}
+        self.diff_counts: Rows = {}
+        self.days: Set[tuple] = set()
+        self.patterns: Set[tuple] = set()
+
+        for chunk in _chunks(list(metric_ids)):
+            params = chunk
+            metric_where = _in_clause('id', chunk)
+            diff_where = _in_clause('pdd.metric_id', chunk)
+
+            if include_metrics:
+                for scope, values in _metric_totals(cursor, metric_where, params).items():
+                    self.totals[scope] = [a + b for a, b in zip(self.totals[scope], values)]
+                cursor.execute(f"""
+                    SELECT DISTINCT file_type, DATE(analysis_timestamp)
+                    FROM pqa_quality_metrics WHERE {metric_where}
+                """, params)
+                for file_type, day in cursor.fetchall():
+                    if day is not None:
+                        self.days.update((scope, day) for scope in _scopes(file_type))
+
+            for key, values in _device_counts(cursor, metric_where, diff_where, params,
+                                              include_metrics).items():
+                previous = self.devices.get(key, (0, 0))
+                self.devices[key] = tuple(a + b for a, b in zip(previous, values))
+            for key, (count,) in _diff_counts(cursor, diff_where, params).items():
+                self.diff_counts[key] = (self.diff_counts.get(key, (0,))[0] + count,)
+                self.totals[key[0]][_DIFF_TOTAL] += count
+
+            cursor.execute(f"""
+                SELECT DISTINCT pqm.file_type, pdd.xpath, pdd.diff_type, pdd.severity
+                FROM pqa_diff_details pdd
+                JOIN pqa_quality_metrics pqm ON pdd.metric_id = pqm.id
+                WHERE {diff_where}
+            """, params)
+            for file_type, xpath, diff_type, severity in cursor.fetchall():
+                self.patterns.update((scope, xpath, diff_type, severity) for scope in _scopes(file_type))
+
+    def apply(self, cursor: sqlite3.Cursor, sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) the additive deltas"""
+        totals = {scope: [sign * value for value in values] for scope, values in self.totals.items()}
+        device_changes = _add_counts(cursor, 'pqa_dashboard_devices', self.devices, sign)
+        for (scope, _), (old, new) in device_changes.items():
+            # Distinct device counts change only when a device gains its first
+            # or loses its last analysis/diff
+            values = totals.setdefault(scope, _zero_totals())
+            values[_DEVICES_ANALYZED] += (new[0] > 0) - (old[0] > 0)
+            values[_DIFF_DEVICES] += (new[1] > 0) - (old[1] > 0)
+
+        _add_counts(cursor, 'pqa_dashboard_diff_counts', self.diff_counts, sign)
+
+        _, value_columns = TABLES['pqa_dashboard_totals']
+        for scope, values in totals.items():
+            cursor.execute(f"""
+                INSERT INTO pqa_dashboard_totals (scope, {', '.join(value_columns)})
+                VALUES (?, {', '.join('?' * len(value_columns))})
+                ON CONFLICT(scope) DO UPDATE SET
+                {', '.join(f'{c} = {c} + excluded.{c}' for c in value_columns)}
+            """, [scope] + values)
+        # A file type scope with no analyses left has nothing to report
+        cursor.execute("""
+            DELETE FROM pqa_dashboard_totals WHERE scope != ? AND total_analyses <= 0
+        """, (SCOPE_ALL,))
+
+    def refresh(self, cursor: sqlite3.Cursor) -> None:
+        """Recompute per-day and per-pattern rows for the affected keys"""
+        for scope, day in self.days:
+            rows = _daily_rows(cursor, scope, day)
+            if rows:
+                _write_rows(cursor, 'pqa_dashboard_daily', rows)
+            else:
+                _delete_row(cursor, 'pqa_dashboard_daily', (scope, day))
+        for scope, *key in self.patterns:
+            rows = _pattern_rows(cursor, scope, tuple(key))
+            if rows:
+                _write_rows(cursor, 'pqa_dashboard_xpath_patterns', rows)
+            else:
+                _delete_row(cursor, 'pqa_dashboard_xpath_patterns', (scope, *key))
+
+
+def record_analysis(cursor: sqlite3.Cursor, metric_id: int) -> None:
+    """
+    Add a newly saved analysis (metrics row and diff details) to the aggregates
+
+    Args:
+        cursor: Database cursor inside the transaction that saved the analysis
+        metric_id: ID of the pqa_quality_metrics row
+    """
+    if not _is_built(cursor):
+        return
+    change = _PendingChange(cursor, [metric_id], include_metrics=True)
+    change.apply(cursor, 1)
+    change.refresh(cursor)
+
+
+@contextmanager
+def removing_analyses(cursor: sqlite3.Cursor, metric_ids: Sequence[int],
+                      diffs_only: bool = False) -> Iterator[None]:
+    """
+    Keep the aggregates in step with analyses deleted inside the block
+
+    Args:
+        cursor: Database cursor used for the deletes
+        metric_ids: Analyses whose rows are deleted in the block
+        diffs_only: Only the diff details of the analyses are deleted
+    """
+    if not metric_ids or not _is_built(cursor):
+        yield
+        return
+    change = _PendingChange(cursor, metric_ids, include_metrics=not diffs_only)
+    change.apply(cursor, -1)
+    yield
+    change.refresh(cursor)
+
+
+# ============================================================================
+# Rebuild and consistency checks
+# ============================================================================
+
+def rebuild_dashboard_aggregates(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Recompute every dashboard aggregate from the base PQA tables
+
+    Args:
+        conn: Database connection (committed on success)
+
+    Returns:
+        Row count per aggregate table
+    """
+    cursor = conn.cursor()
+    expected = _expected_aggregates(cursor)
+    for table, rows in expected.items():
+        cursor.execute(f"DELETE FROM {table}")
+        _write_rows(cursor, table, rows)
+    conn.commit()
+
+    counts = {table: len(rows) for table, rows in expected.items()}
+    logger.info(f"Rebuilt PQA dashboard aggregates: {counts}")
+    return counts
+
+
+def ensure_dashboard_aggregates(conn: sqlite3.Connection) -> None:
+    """Build the aggregates on first use (e.g. right after the migration)"""
+    if not _is_built(conn.cursor()):
+        rebuild_dashboard_aggregates(conn)
+
+
+def _values_match(stored: tuple, expected: tuple) -> bool:
+    for a, b in zip(stored, expected):
+        if isinstance(a, float) or isinstance(b, float):
+            if a is None or b is None or abs(a - b) > 1e-6 * max(1.0, abs(a), abs(b)):
+                return False
+        elif a != b:
+            return False
+    return len(stored) == len(expected)
+
+
+def check_dashboard_aggregates(conn: sqlite3.Connection) -> List[str]:
+    """
+    Compare stored aggregates against values recomputed from the base tables
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Human readable description of every mismatch (empty if consistent)
+    """
+    cursor = conn.cursor()
+    problems = []
+    for table, expected_rows in _expected_aggregates(cursor).items():
+        stored_rows = _read_rows(cursor, table)
+        for key in sorted(expected_rows.keys() | stored_rows.keys(), key=repr):
+            stored = stored_rows.get(key)
+            expected = expected_rows.get(key)
+            if stored is None:
+                problems.append(f"{table} {key}: missing (expected {expected})")
+            elif expected is None:
+                problems.append(f"{table} {key}: unexpected row {stored}")
+            elif not _values_match(stored, expected):
+                problems.append(f"{table} {key}: stored {stored}, expected {expected}")
+    return problems
+
+
+def load_totals(conn: sqlite3.Connection, scope: str = SCOPE_ALL) -> Dict[str, float]:
+    """
+    Read the totals row for a scope, building the aggregates if needed
+
+    Args:
+        conn: Database connection
+        scope: 'ALL', 'IODD' or 'EDS'
+
+    Returns:
+        Dict of TOTAL_COLUMNS values (zeros for an empty scope)
+    """
+    ensure_dashboard_aggregates(conn)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(TOTAL_COLUMNS)} FROM pqa_dashboard_totals WHERE scope = ?", (scope,))
+    row = cursor.fetchone()
+    return dict(zip(TOTAL_COLUMNS, row if row else _zero_totals()))
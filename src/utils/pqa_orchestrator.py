@@ -8,7 +8,7 @@ Orchestrates: Archive → Reconstruct → Analyze → Score → Save → Report
 import logging
 import hashlib
 import sqlite3
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 from enum import Enum
 
@@ -18,13 +18,23 @@ from src import __version__
 # Import reconstruction engines
 from .forensic_reconstruction_v2 import IODDReconstructor
 from .eds_reconstruction import EDSReconstructor
+from .batch_reconstruction import BatchReconstructor
 
 # Import diff analyzers
 from .pqa_diff_analyzer import DiffAnalyzer, QualityMetrics, DiffItem
 from .eds_diff_analyzer import EDSDiffAnalyzer, EDSQualityMetrics, EDSDiffItem
 
+from src.parsers.eds_section_index import EDSSectionIndex, load_section_index
+
+from .cache_warmer import invalidate_device_view
+from .pqa_dashboard import record_analysis
+from .pqa_retention import RetentionPolicy, apply_retention
+
 logger = logging.getLogger(__name__)
 
+# Diff details stored per analysis
+MAX_STORED_DIFFS = 100
+
 
 class FileType(Enum):
     """Supported file types"""
@@ -48,8 +58,10 @@ class UnifiedPQAOrchestrator:
     and appropriate reconstruction/analysis workflows.
     """
 
-    def __init__(self, db_path: str = "greenstack.db"):
+    def __init__(self, db_path: str = "greenstack.db",
+                 retention_policy: Optional[RetentionPolicy] = None):
         self.db_path = db_path
+        self.retention_policy = retention_policy or RetentionPolicy.from_config()
 
         # Initialize engines
         self.iodd_reconstructor = IODDReconstructor(db_path)
@@ -58,7 +70,8 @@ class UnifiedPQAOrchestrator:
         self.eds_analyzer = EDSDiffAnalyzer(db_path)
 
     def run_full_analysis(self, file_id: int, file_type: FileType,
-                         original_content: str) -> Tuple[Union[QualityMetrics, EDSQualityMetrics],
+                         original_content: str,
+                         reconstructed_content: Optional[str] = None) -> Tuple[Union[QualityMetrics, EDSQualityMetrics],
                                                          Union[List[DiffItem], List[EDSDiffItem]]]:
         """
         Run complete PQA analysis workflow
@@ -68,22 +81,21 @@ class UnifiedPQAOrchestrator:
         2. Reconstruct file from database
         3. Perform diff analysis
         4. Calculate quality metrics
-        5. Save results to database
+        5. Save results to database and apply the retention policy
         6. Generate ticket if needed
 
         Args:
             file_id: IODD device_id or EDS file_id
             file_type: FileType.IODD or FileType.EDS
             original_content: Original file content
+            reconstructed_content: Already reconstructed content (e.g. from
+                BatchReconstructor); reconstructed from the database if omitted
 
         Returns:
             Tuple of (QualityMetrics, DiffItems)
         """
         logger.info(f"Starting PQA analysis for {file_type.value} file {file_id}")
 
-        # Delete any existing analysis for this device (we only keep the latest)
-        self._delete_existing_analysis(file_id)
-
         try:
             # Step 1: Archive original file
             archive_id = self._archive_original_file(
@@ -94,19 +106,22 @@ class UnifiedPQAOrchestrator:
             logger.info(f"Archived original file with ID {archive_id}")
 
             # Step 2: Reconstruct from database
-            reconstructed_content = self._reconstruct_file(file_id, file_type)
+            if reconstructed_content is None:
+                reconstructed_content = self._reconstruct_file(file_id, file_type)
             logger.info(f"Reconstructed {file_type.value} file ({len(reconstructed_content)} chars)")
 
             # Step 3: Perform diff analysis
             metrics, diff_items = self._analyze_diff(
                 original_content,
                 reconstructed_content,
-                file_type
+                file_type,
+                file_id
             )
             logger.info(f"Analysis complete: Overall score = {metrics.overall_score:.1f}%")
 
-            # Step 4: Save metrics to database
-            metric_id = self._save_quality_metrics(
+            # Step 4: Save metrics and diffs, trimming older history in the same transaction.
+            # The active threshold is read there too and shared with the ticket decision.
+            metric_id, threshold = self._save_quality_metrics(
                 file_id,
                 archive_id,
                 metrics,
@@ -122,7 +137,7 @@ class UnifiedPQAOrchestrator:
             logger.info(f"Checking if ticket should be generated for {file_type.value} {file_id}")
             logger.info(f"Metrics: score={metrics.overall_score:.2f}%, critical_loss={metrics.critical_data_loss}")
 
-            should_generate = self._should_generate_ticket(metrics)
+            should_generate = self._should_generate_ticket(metrics, threshold)
             logger.info(f"_should_generate_ticket returned: {should_generate}")
 
             if should_generate:
@@ -137,15 +152,6 @@ class UnifiedPQAOrchestrator:
                     )
                     if ticket_id:
                         logger.info(f"[OK] Successfully generated ticket ID {ticket_id}")
-                        # Verify ticket was actually created
-                        verify_conn = sqlite3.connect(self.db_path)
-                        verify_cursor = verify_conn.cursor()
-                        verify_cursor.execute("SELECT id FROM tickets WHERE id = ?", (ticket_id,))
-                        if verify_cursor.fetchone():
-                            logger.info(f"[OK] Verified ticket {ticket_id} exists in database")
-                        else:
-                            logger.error(f"[FAIL] CRITICAL: Ticket {ticket_id} was not found in database after creation!")
-                        verify_conn.close()
                     else:
                         logger.error(f"[FAIL] _generate_quality_ticket returned None instead of ticket_id")
                 except Exception as ticket_err:
@@ -161,40 +167,88 @@ class UnifiedPQAOrchestrator:
             logger.error(f"PQA analysis failed for {file_type.value} {file_id}: {e}")
             raise
 
-    def _delete_existing_analysis(self, file_id: int) -> None:
-        """Delete any existing PQA analysis for this device (we only keep the latest)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        try:
-            # Delete diff details first (foreign key constraint)
-            cursor.execute("""
-                DELETE FROM pqa_diff_details
-                WHERE metric_id IN (SELECT id FROM pqa_quality_metrics WHERE device_id = ?)
-            """, (file_id,))
+    def run_batch_analysis(self, file_type: FileType, file_ids: Iterable[int],
+                           workers: int = 1) -> Dict[str, int]:
+        """
+        Run the full analysis for many files of one type
 
-            # Delete quality metrics
-            cursor.execute("DELETE FROM pqa_quality_metrics WHERE device_id = ?", (file_id,))
+        Files are reconstructed by BatchReconstructor, which reads the child
+        tables once per chunk of files instead of once per file; each original
+        is loaded as its reconstruction arrives, so only one is held at a time.
 
-            # Delete file archives
-            cursor.execute("DELETE FROM pqa_file_archive WHERE device_id = ?", (file_id,))
+        Args:
+            file_type: FileType.IODD or FileType.EDS
+            file_ids: Device IDs or EDS file IDs, analyzed in this order
+            workers: Reconstruction worker processes
 
-            conn.commit()
-            logger.debug(f"Deleted existing PQA data for device {file_id}")
+        Returns:
+            Number of files 'analyzed' and 'failed'
+        """
+        batch = BatchReconstructor(self.db_path, workers=workers)
+        if file_type == FileType.IODD:
+            results = batch.reconstruct_iodd_batch(file_ids)
+        else:
+            results = batch.reconstruct_eds_batch(file_ids)
 
+        counts = {'analyzed': 0, 'failed': 0}
+        for result in results:
+            try:
+                if not result.ok:
+                    raise ValueError(result.error)
+                original = self._load_original_content(result.file_id, file_type)
+                if original is None:
+                    raise ValueError("original content not found")
+                self.run_full_analysis(result.file_id, file_type, original, result.content)
+                counts['analyzed'] += 1
+            except Exception as e:
+                logger.error(f"PQA analysis failed for {file_type.value} {result.file_id}: {e}", exc_info=True)
+                counts['failed'] += 1
+        return counts
+
+    def _load_original_content(self, file_id: int, file_type: FileType) -> Optional[str]:
+        """Original IODD XML (from iodd_assets) or EDS content of a file"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if file_type == FileType.IODD:
+                row = conn.execute("""
+                    SELECT file_content FROM iodd_assets
+                    WHERE device_id = ? AND file_type = 'xml'
+                    LIMIT 1
+                """, (file_id,)).fetchone()
+            else:
+                row = conn.execute("SELECT eds_content FROM eds_files WHERE id = ?", (file_id,)).fetchone()
         finally:
             conn.close()
 
+        if not row or not row[0]:
+            return None
+        content = row[0]
+        return content.decode('utf-8') if isinstance(content, bytes) else content
+
     def _archive_original_file(self, file_id: int, file_type: FileType,
                                content: str) -> int:
-        """Archive original file in pqa_file_archive table"""
+        """Archive original file in pqa_file_archive table
+
+        Re-analyses of an unchanged file reuse the latest archive row instead
+        of storing another copy of the content.
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             # Calculate file hash
-            file_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-            file_size = len(content.encode('utf-8'))
+            content_bytes = content.encode('utf-8')
+            file_hash = hashlib.sha256(content_bytes).hexdigest()
+            file_size = len(content_bytes)
+
+            cursor.execute("""
+                SELECT id FROM pqa_file_archive
+                WHERE device_id = ? AND file_type = ? AND file_hash = ?
+                ORDER BY id DESC LIMIT 1
+            """, (file_id, file_type.value, file_hash))
+            existing = cursor.fetchone()
+            if existing:
+                return existing[0]
 
             # Get filename from source table
             if file_type == FileType.IODD:
@@ -216,7 +270,7 @@ class UnifiedPQAOrchestrator:
                 file_type.value,
                 filename,
                 file_hash,
-                content.encode('utf-8'),
+                content_bytes,
                 file_size,
                 __version__
             ))
@@ -236,34 +290,47 @@ class UnifiedPQAOrchestrator:
             return self.eds_reconstructor.reconstruct_eds(file_id)
 
     def _analyze_diff(self, original: str, reconstructed: str,
-                     file_type: FileType) -> Tuple[Union[QualityMetrics, EDSQualityMetrics],
+                     file_type: FileType, file_id: Optional[int] = None) -> Tuple[Union[QualityMetrics, EDSQualityMetrics],
                                                    Union[List[DiffItem], List[EDSDiffItem]]]:
         """Perform diff analysis using appropriate analyzer"""
         if file_type == FileType.IODD:
             return self.iodd_analyzer.analyze(original, reconstructed)
         else:  # EDS
-            return self.eds_analyzer.analyze(original, reconstructed)
+            return self.eds_analyzer.analyze(original, reconstructed,
+                                             self._load_eds_section_index(file_id, original))
+
+    def _load_eds_section_index(self, eds_file_id: Optional[int],
+                                original: str) -> Optional[EDSSectionIndex]:
+        """Reuse the section index stored at import when its content hash matches the original"""
+        if eds_file_id is None:
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return load_section_index(conn, eds_file_id, original)
+        finally:
+            conn.close()
 
     def _save_quality_metrics(self, file_id: int, archive_id: int,
                              metrics: Union[QualityMetrics, EDSQualityMetrics],
                              diff_items: Union[List[DiffItem], List[EDSDiffItem]],
-                             file_type: FileType) -> int:
-        """Save quality metrics to database"""
+                             file_type: FileType) -> Tuple[int, Optional[sqlite3.Row]]:
+        """Save quality metrics and diff details, then apply the retention policy
+
+        Everything is written in one transaction so readers never see an
+        analysis without its diffs or a history longer than the policy allows.
+
+        Returns:
+            Tuple of (metric ID, active threshold used for the pass check)
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
         try:
             # Check thresholds
-            cursor.execute("""
-                SELECT min_overall_score, max_data_loss_percentage
-                FROM pqa_thresholds WHERE active = 1 LIMIT 1
-            """)
-            threshold_row = cursor.fetchone()
-
-            if threshold_row:
-                min_score, max_loss = threshold_row
-                passed = (metrics.overall_score >= min_score and
-                         metrics.data_loss_percentage <= max_loss)
+            threshold = self._get_active_threshold(conn)
+            if threshold:
+                passed = (metrics.overall_score >= threshold['min_overall_score'] and
+                         metrics.data_loss_percentage <= threshold['max_data_loss_percentage'])
             else:
                 passed = False
 
@@ -320,17 +387,14 @@ class UnifiedPQAOrchestrator:
 
             metric_id = cursor.lastrowid
 
-            # Save diff details
-            for diff in diff_items[:100]:  # Limit to first 100 diffs
-                # Determine phase based on location/xpath
-                phase = self._determine_phase(diff, file_type)
-
-                cursor.execute("""
-                    INSERT INTO pqa_diff_details (
-                        metric_id, diff_type, severity, xpath,
-                        expected_value, actual_value, description, phase
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+            # Save diff details (phase determined from location/xpath)
+            cursor.executemany("""
+                INSERT INTO pqa_diff_details (
+                    metric_id, diff_type, severity, xpath,
+                    expected_value, actual_value, description, phase
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
                     metric_id,
                     diff.diff_type.value,
                     diff.severity.value,
@@ -338,11 +402,20 @@ class UnifiedPQAOrchestrator:
                     diff.expected_value,
                     diff.actual_value,
                     diff.description,
-                    phase
-                ))
+                    self._determine_phase(diff, file_type)
+                )
+                for diff in diff_items[:MAX_STORED_DIFFS]
+            ])
+
+            record_analysis(cursor, metric_id)
+            retention = apply_retention(cursor, file_id, file_type.value, self.retention_policy)
+            if retention['deleted_analyses'] or retention['compacted_diffs']:
+                logger.debug(f"PQA retention for {file_type.value} {file_id}: {retention}")
 
             conn.commit()
-            return metric_id
+            if file_type == FileType.IODD:
+                invalidate_device_view("pqa-metrics", file_id)
+            return metric_id, threshold
 
         finally:
             conn.close()
@@ -377,32 +450,27 @@ class UnifiedPQAOrchestrator:
 
         return None
 
-    def _should_generate_ticket(self, metrics: Union[QualityMetrics, EDSQualityMetrics]) -> bool:
-        """Check if ticket generation is needed"""
-        # Get threshold configuration
-        conn = sqlite3.connect(self.db_path)
+    def _get_active_threshold(self, conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+        """Load the active threshold configuration on the caller's connection"""
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute("""
+            SELECT min_overall_score, max_data_loss_percentage, auto_ticket_on_fail, active
+            FROM pqa_thresholds WHERE active = 1 LIMIT 1
+        """)
+        return cursor.fetchone()
+
+    def _should_generate_ticket(self, metrics: Union[QualityMetrics, EDSQualityMetrics],
+                                threshold: Optional[sqlite3.Row]) -> bool:
+        """Check if ticket generation is needed"""
+        if not threshold:
+            return False
 
-        try:
-            cursor.execute("""
-                SELECT min_overall_score, auto_ticket_on_fail, active
-                FROM pqa_thresholds WHERE active = 1 LIMIT 1
-            """)
-            row = cursor.fetchone()
-
-            if not row:
-                return False
-
-            min_score, auto_ticket, active = row
-
-            if not auto_ticket or not active:
-                return False
-
-            # Generate ticket if score below threshold or critical data loss
-            return (metrics.overall_score < min_score or metrics.critical_data_loss)
+        if not threshold['auto_ticket_on_fail'] or not threshold['active']:
+            return False
 
-        finally:
-            conn.close()
+        # Generate ticket if score below threshold or critical data loss
+        return (metrics.overall_score < threshold['min_overall_score'] or metrics.critical_data_loss)
 
     def _generate_quality_ticket(self, file_id: int, metric_id: int,
                                 metrics: Union[QualityMetrics, EDSQualityMetrics],
@@ -587,7 +655,7 @@ def analyze_iodd_quality(device_id: int, original_xml: str,
         original_xml: Original XML content
         db_path: Database path
 
-    Note: Any existing analysis for this device is automatically replaced.
+    Note: Older analyses for this device are trimmed by the retention policy.
     """
     orchestrator = UnifiedPQAOrchestrator(db_path)
     return orchestrator.run_full_analysis(device_id, FileType.IODD, original_xml)
@@ -602,7 +670,7 @@ def analyze_eds_quality(eds_file_id: int, original_eds: str,
         original_eds: Original EDS content
         db_path: Database path
 
-    Note: Any existing analysis for this device is automatically replaced.
+    Note: Older analyses for this file are trimmed by the retention policy.
     """
     orchestrator = UnifiedPQAOrchestrator(db_path)
     return orchestrator.run_full_analysis(eds_file_id, FileType.EDS, original_eds)
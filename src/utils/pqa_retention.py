@@ -0,0 +1,204 @@
+"""
+PQA Retention and Compaction
+
+Keeps the PQA history tables bounded:
+- Only the newest N analyses per file (device_id + file_type) are kept
+- Analyses beyond the newest M keep their metrics row, but their diff details
+  are compacted into per (diff_type, severity, phase) counts in
+  ``pqa_diff_summary``
+- Archived originals no longer referenced by any analysis are removed
+
+Retention for a single file runs inside the orchestrator's save transaction;
+``compact_pqa_tables`` sweeps the whole database and is run periodically by
+the PQA scheduler.
+"""
+
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from src import config
+
+from .pqa_dashboard import removing_analyses
+
+logger = logging.getLogger(__name__)
+
+# Stay well below SQLite's default limit on host parameters per statement
+MAX_IN_PARAMETERS = 500
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How much PQA history to keep per file"""
+    keep_analyses: int = 5
+    keep_diff_details: int = 1
+
+    def __post_init__(self):
+        if self.keep_analyses < 1:
+            raise ValueError("keep_analyses must be at least 1")
+        if not 0 <= self.keep_diff_details <= self.keep_analyses:
+            raise ValueError("keep_diff_details must be between 0 and keep_analyses")
+
+    @classmethod
+    def from_config(cls) -> 'RetentionPolicy':
+        """Policy from PQA_RETAIN_ANALYSES / PQA_RETAIN_DIFF_DETAILS settings"""
+        keep_analyses = max(config.PQA_RETAIN_ANALYSES, 1)
+        return cls(
+            keep_analyses=keep_analyses,
+            keep_diff_details=min(max(config.PQA_RETAIN_DIFF_DETAILS, 0), keep_analyses),
+        )
+
+
+def _chunks(ids: Sequence[int], size: int = MAX_IN_PARAMETERS) -> Iterator[List[int]]:
+    for start in range(0, len(ids), size):
+        yield list(ids[start:start + size])
+
+
+def _placeholders(count: int) -> str:
+    return ','.join('?' * count)
+
+
+def _compact_diffs(cursor: sqlite3.Cursor, metric_ids: Sequence[int]) -> int:
+    """Fold diff details of the given analyses into pqa_diff_summary counts"""
+    compacted = 0
+    for chunk in _chunks(metric_ids):
+        marks = _placeholders(len(chunk))
+        cursor.execute(f"""
+            INSERT INTO pqa_diff_summary (metric_id, diff_type, severity, phase, diff_count)
+            SELECT metric_id, diff_type, severity, phase, COUNT(*)
+            FROM pqa_diff_details
+            WHERE metric_id IN ({marks})
+            GROUP BY metric_id, diff_type, severity, phase
+        """, chunk)
+        with removing_analyses(cursor, chunk, diffs_only=True):
+            cursor.execute(f"DELETE FROM pqa_diff_details WHERE metric_id IN ({marks})", chunk)
+            compacted += cursor.rowcount
+    return compacted
+
+
+def _delete_analyses(cursor: sqlite3.Cursor, metric_ids: Sequence[int]) -> int:
+    """Delete analyses along with their diff details and summaries"""
+    deleted = 0
+    for chunk in _chunks(metric_ids):
+        marks = _placeholders(len(chunk))
+        with removing_analyses(cursor, chunk):
+            cursor.execute(f"DELETE FROM pqa_diff_details WHERE metric_id IN ({marks})", chunk)
+            cursor.execute(f"DELETE FROM pqa_diff_summary WHERE metric_id IN ({marks})", chunk)
+            cursor.execute(f"UPDATE pqa_analysis_queue SET metric_id = NULL WHERE metric_id IN ({marks})", chunk)
+            cursor.execute(f"DELETE FROM pqa_quality_metrics WHERE id IN ({marks})", chunk)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def _delete_orphan_archives(cursor: sqlite3.Cursor, device_id: Optional[int] = None,
+                            file_type: Optional[str] = None) -> int:
+    """Delete archived originals that no analysis or queued job references"""
+    scope = ""
+    params: List = []
+    if device_id is not None:
+        scope = "AND a.device_id = ? AND a.file_type = ?"
+        params = [device_id, file_type]
+    cursor.execute(f"""
+        DELETE FROM pqa_file_archive
+        WHERE id IN (
+            SELECT a.id FROM pqa_file_archive a
+            WHERE NOT EXISTS (SELECT 1 FROM pqa_quality_metrics m WHERE m.archive_id = a.id)
+              AND NOT EXISTS (SELECT 1 FROM pqa_analysis_queue q WHERE q.archive_id = a.id)
+              {scope}
+        )
+    """, params)
+    return cursor.rowcount
+
+
+def apply_retention(cursor: sqlite3.Cursor, device_id: int, file_type: str,
+                    policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+    """
+    Apply the retention policy to one file's analysis history
+
+    Args:
+        cursor: Database cursor (caller commits)
+        device_id: IODD device_id or EDS file_id
+        file_type: 'IODD' or 'EDS'
+        policy: Retention policy (defaults to configured policy)
+
+    Returns:
+        Dict with counts of deleted analyses, compacted diff rows and deleted archives
+    """
+    policy = policy or RetentionPolicy.from_config()
+
+    cursor.execute("""
+        SELECT m.id, EXISTS (SELECT 1 FROM pqa_diff_details d WHERE d.metric_id = m.id)
+        FROM pqa_quality_metrics m
+        WHERE m.device_id = ? AND m.file_type = ?
+        ORDER BY m.analysis_timestamp DESC, m.id DESC
+    """, (device_id, file_type))
+    rows = cursor.fetchall()
+    to_compact = [metric_id for metric_id, has_details in rows[policy.keep_diff_details:policy.keep_analyses]
+                  if has_details]
+    to_delete = [metric_id for metric_id, _ in rows[policy.keep_analyses:]]
+
+    stats = {
+        'deleted_analyses': _delete_analyses(cursor, to_delete),
+        'compacted_diffs': _compact_diffs(cursor, to_compact),
+    }
+    stats['deleted_archives'] = _delete_orphan_archives(cursor, device_id, file_type)
+    return stats
+
+
+def compact_pqa_tables(db_path: str = "greenstack.db",
+                       policy: Optional[RetentionPolicy] = None) -> Dict[str, int]:
+    """
+    Apply the retention policy to every file's analysis history
+
+    Work is committed in chunks so the sweep never holds the write lock for
+    long while uploads or analyses are running.
+
+    Args:
+        db_path: Path to database file
+        policy: Retention policy (defaults to configured policy)
+
+    Returns:
+        Dict with counts of deleted analyses, compacted diff rows and deleted archives
+    """
+    policy = policy or RetentionPolicy.from_config()
+    stats = {'deleted_analyses': 0, 'compacted_diffs': 0, 'deleted_archives': 0}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, rn, has_details FROM (
+                SELECT m.id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY m.device_id, m.file_type
+                           ORDER BY m.analysis_timestamp DESC, m.id DESC
+                       ) AS rn,
+                       EXISTS (SELECT 1 FROM pqa_diff_details d WHERE d.metric_id = m.id) AS has_details
+                FROM pqa_quality_metrics m
+            )
+            WHERE rn > ?
+        """, (policy.keep_diff_details,))
+        rows = cursor.fetchall()
+
+        to_delete = [metric_id for metric_id, rn, _ in rows if rn > policy.keep_analyses]
+        to_compact = [metric_id for metric_id, rn, has_details in rows
+                      if rn <= policy.keep_analyses and has_details]
+
+        for chunk in _chunks(to_delete):
+            stats['deleted_analyses'] += _delete_analyses(cursor, chunk)
+            conn.commit()
+        for chunk in _chunks(to_compact):
+            stats['compacted_diffs'] += _compact_diffs(cursor, chunk)
+            conn.commit()
+
+        stats['deleted_archives'] = _delete_orphan_archives(cursor)
+        conn.commit()
+    finally:
+        conn.close()
+
+    if any(stats.values()):
+        logger.info(f"PQA compaction: {stats['deleted_analyses']} analyses removed, "
+                    f"{stats['compacted_diffs']} diff rows compacted, "
+                    f"{stats['deleted_archives']} archives removed")
+    return stats
@@ -5,6 +5,7 @@ Handles automated PQA analysis scheduling:
 - Run on server startup for unanalyzed devices
 - Daily scheduled runs
 - Re-analysis of failed/old analyses
+- Periodic compaction of PQA history (see pqa_retention)
 """
 
 import logging
@@ -14,7 +15,10 @@ import time
 from datetime import datetime, timedelta
 from typing import Optional
 
+from src import config
+
 from .pqa_orchestrator import UnifiedPQAOrchestrator, FileType
+from .pqa_retention import compact_pqa_tables
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +39,7 @@ class PQAScheduler:
         self.orchestrator = UnifiedPQAOrchestrator(db_path)
         self._stop_flag = threading.Event()
         self._scheduler_thread: Optional[threading.Thread] = None
+        self._compaction_thread: Optional[threading.Thread] = None
         self._startup_complete = False
 
     def start(self):
@@ -53,6 +58,10 @@ class PQAScheduler:
         self._scheduler_thread = threading.Thread(target=self._daily_scheduler_loop, daemon=True)
         self._scheduler_thread.start()
 
+        # Start PQA history compaction thread
+        self._compaction_thread = threading.Thread(target=self._compaction_loop, daemon=True)
+        self._compaction_thread.start()
+
         logger.info("PQA scheduler started successfully")
 
     def stop(self):
@@ -61,6 +70,8 @@ class PQAScheduler:
         self._stop_flag.set()
         if self._scheduler_thread:
             self._scheduler_thread.join(timeout=5)
+        if self._compaction_thread:
+            self._compaction_thread.join(timeout=5)
         logger.info("PQA scheduler stopped")
 
     def _run_startup_analysis(self):
@@ -190,6 +201,19 @@ class PQAScheduler:
                 logger.error(f"Daily scheduler error: {e}", exc_info=True)
                 self._stop_flag.wait(timeout=3600)  # Wait an hour before retrying
 
+    def _compaction_loop(self):
+        """Background thread that keeps PQA history within the retention policy"""
+        interval = max(config.PQA_COMPACTION_INTERVAL, 60)
+        logger.info(f"PQA compaction thread started (interval: {interval}s)")
+
+        while not self._stop_flag.is_set():
+            try:
+                compact_pqa_tables(self.db_path, self.orchestrator.retention_policy)
+            except Exception as e:
+                logger.error(f"PQA compaction error: {e}", exc_info=True)
+
+            self._stop_flag.wait(timeout=interval)
+
     def _get_next_daily_run_time(self) -> datetime:
         """Calculate next daily run time (2 AM tomorrow)"""
         now = datetime.now()
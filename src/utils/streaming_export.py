@@ -0,0 +1,150 @@
+"""
+Streaming Exports
+
+Generators that turn query results into JSON or CSV text piece by piece, so
+an export never holds more than one fetch batch of rows in memory:
+- ``iter_rows`` reads a query with ``fetchmany`` instead of ``fetchall``
+- ``iter_json`` encodes a document whose arrays (``JSONArray``) and
+  objects (``JSONObject``) may be generators; the text is the same as
+  ``json.dumps(document, indent=2)``
+- ``iter_csv`` writes CSV rows in small batches
+- ``gzip_chunks`` compresses any of these on the fly
+
+The generators are meant for ``StreamingResponse``. Starlette iterates
+plain generators in its thread pool, so connections used inside them are
+opened with ``check_same_thread=False`` (``open_export_connection``).
+"""
+
+import csv
+import io
+import json
+import sqlite3
+import zlib
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from src import config
+
+INDENT = '  '
+
+
+class JSONArray:
+    """A JSON array whose items are produced lazily"""
+    __slots__ = ('items',)
+
+    def __init__(self, items: Iterable[Any]):
+        self.items = items
+
+
+class JSONObject:
+    """A JSON object whose (key, value) pairs are produced lazily"""
+    __slots__ = ('pairs',)
+
+    def __init__(self, pairs: Iterable[Tuple[str, Any]]):
+        self.pairs = pairs
+
+
+def attachment_header(filename: str) -> str:
+    """Content-Disposition value for a download, RFC 5987 encoded if filename is not ASCII"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def open_export_connection(db_path: str) -> sqlite3.Connection:
+    """Connection for use inside a streamed response body (rows as sqlite3.Row)"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def iter_rows(conn: sqlite3.Connection, query: str, params: Sequence = (),
+              batch_size: Optional[int] = None) -> Iterator[sqlite3.Row]:
+    """
+    Rows of a query, fetched batch_size at a time
+
+    Each call uses its own cursor, so row iterators can be nested.
+
+    Args:
+        conn: Database connection
+        query: SQL query
+        params: Query parameters
+        batch_size: Rows per fetch (default EXPORT_FETCH_SIZE)
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        batch_size = batch_size or config.EXPORT_FETCH_SIZE
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def _encode(value: Any, level: int) -> Iterator[str]:
+    """JSON text of value at nesting level, matching json.dumps(indent=2)"""
+    if isinstance(value, JSONArray):
+        opened = False
+        for item in value.items:
+            yield ('[\n' if not opened else ',\n') + INDENT * (level + 1)
+            opened = True
+            yield from _encode(item, level + 1)
+        yield '\n' + INDENT * level + ']' if opened else '[]'
+    elif isinstance(value, JSONObject):
+        opened = False
+        for key, item in value.pairs:
+            yield ('{\n' if not opened else ',\n') + INDENT * (level + 1) + json.dumps(key) + ': '
+            opened = True
+            yield from _encode(item, level + 1)
+        yield '\n' + INDENT * level + '}' if opened else '{}'
+    else:
+        text = json.dumps(value, indent=len(INDENT))
+        yield text.replace('\n', '\n' + INDENT * level) if level else text
+
+
+def iter_json(document: Any, batch_bytes: int = 64 * 1024) -> Iterator[str]:
+    """
+    JSON text of a document that may contain JSONArray/JSONObject generators
+
+    Small pieces are joined into chunks of roughly batch_bytes.
+    """
+    pending, size = [], 0
+    for piece in _encode(document, 0):
+        pending.append(piece)
+        size += len(piece)
+        if size >= batch_bytes:
+            yield ''.join(pending)
+            pending, size = [], 0
+    if pending:
+        yield ''.join(pending)
+
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence], batch_rows: int = 500) -> Iterator[str]:
+    """CSV text of header and rows, batch_rows rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % batch_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[Any], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of str/bytes chunks on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,147 @@
+"""
+Streaming ZIP Writer
+
+Builds ZIP archives as a stream of byte chunks, so an export can start
+downloading before the last member has been read and never holds more than
+one chunk of a member in memory.
+
+``zipfile.ZipFile`` already knows how to write to a non-seekable stream: it
+sets the data-descriptor flag on each local header and appends sizes and
+CRCs after the compressed data instead of seeking back. ``iter_zip`` hands it
+a write-only sink and yields whatever has been written after every chunk.
+
+Members are described by ``ZipEntry`` objects whose ``chunks`` are read
+lazily, e.g. from a file on disk (``ZipEntry.from_file``) or an SQLite BLOB
+(``ZipEntry.from_blob``).
+"""
+
+import os
+import sqlite3
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from src import config
+
+
+class _Sink:
+    """Write-only file object collecting what ZipFile writes until drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@dataclass
+class ZipEntry:
+    """
+    One archive member
+
+    Attributes:
+        name: Path inside the archive
+        chunks: Member content, read lazily while the archive is streamed
+        size: Uncompressed size if known; only used to switch to ZIP64 for
+            members over 2 GiB
+        date_time: Modification time (defaults to now)
+    """
+    name: str
+    chunks: Iterable[bytes]
+    size: Optional[int] = None
+    date_time: Optional[Tuple[int, int, int, int, int, int]] = None
+
+    @classmethod
+    def from_bytes(cls, name: str, data: Union[bytes, str]) -> 'ZipEntry':
+        """Member with in-memory content (str is UTF-8 encoded)"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return cls(name, (data,), len(data))
+
+    @classmethod
+    def from_file(cls, name: str, path: Union[str, os.PathLike], chunk_size: Optional[int] = None) -> 'ZipEntry':
+        """Member read from a file on disk, keeping its modification time"""
+        stat = os.stat(path)
+        date_time = time.localtime(stat.st_mtime)[:6]
+        if date_time[0] < 1980:
+            date_time = (1980, 1, 1, 0, 0, 0)
+        return cls(name, iter_file(path, chunk_size), stat.st_size, date_time)
+
+    @classmethod
+    def from_blob(cls, conn: sqlite3.Connection, table: str, column: str, rowid: int,
+                  name: str, size: Optional[int] = None, chunk_size: Optional[int] = None) -> 'ZipEntry':
+        """Member read from the BLOB (or TEXT) value stored at table.column for rowid"""
+        return cls(name, iter_blob(conn, table, column, rowid, chunk_size), size)
+
+
+def iter_file(path: Union[str, os.PathLike], chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Contents of a file, chunk_size bytes at a time (default EXPORT_CHUNK_BYTES)"""
+    chunk_size = chunk_size or config.EXPORT_CHUNK_BYTES
+    with open(path, 'rb') as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_blob(conn: sqlite3.Connection, table: str, column: str, rowid: int,
+              chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    A stored BLOB/TEXT value, chunk_size bytes at a time
+
+    Uses incremental BLOB I/O where sqlite3 supports it (Python 3.11+) and
+    falls back to reading the whole value otherwise.
+    """
+    chunk_size = chunk_size or config.EXPORT_CHUNK_BYTES
+    if hasattr(conn, 'blobopen'):
+        with conn.blobopen(table, column, rowid, readonly=True) as blob:
+            while True:
+                chunk = blob.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+    else:
+        row = conn.execute(f"SELECT {column} FROM {table} WHERE rowid = ?", (rowid,)).fetchone()
+        if row and row[0] is not None:
+            yield row[0].encode('utf-8') if isinstance(row[0], str) else bytes(row[0])
+
+
+def iter_zip(entries: Iterable[ZipEntry], compression: int = zipfile.ZIP_DEFLATED) -> Iterator[bytes]:
+    """
+    ZIP archive of entries as a stream of byte chunks
+
+    Each member's local header and compressed data are yielded as its chunks
+    are read; the central directory follows the last member.
+
+    Args:
+        entries: Archive members (may be a generator)
+        compression: zipfile compression method
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, entry.date_time or time.localtime()[:6])
+            info.compress_type = compression
+            info.external_attr = 0o600 << 16
+            info.file_size = entry.size or 0
+            with archive.open(info, 'w') as member:
+                for chunk in entry.chunks:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
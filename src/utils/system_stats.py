@@ -0,0 +1,383 @@
+"""
+System Statistics Refresher
+
+The admin console's database health check (integrity check, foreign key
+check, index review, row count per table) and its activity snapshot (recent
+imports, EDS diagnostics, storage sizes) take seconds on a large database.
+``StatsRefresher`` computes them in a background thread every
+STATS_HEALTH_INTERVAL seconds and keeps the last result, which the endpoints
+return as is. Every STATS_RECONCILE_INTERVAL seconds it also recounts the
+tables behind the row counters (see ``table_counters``).
+
+Without a running refresher (or with STATS_HEALTH_INTERVAL=0), the reports
+are computed on each call.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src import config
+from src.utils.table_counters import read_row_counts, reconcile_row_counts
+
+logger = logging.getLogger(__name__)
+
+# Indexes the health check recommends, by table
+EXPECTED_INDEXES = {
+    "eds_files": ["vendor_name", "product_code"],
+    "devices": ["vendor_id"],
+    "iodd_files": ["device_id"],
+    "parameters": ["device_id"],
+    "tickets": ["status", "priority", "created_at"]
+}
+
+
+# ============================================================================
+# Reports
+# ============================================================================
+
+def build_database_health(db_path: str) -> Dict[str, Any]:
+    """Database health check with actionable diagnostics"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    issues = []
+    recommendations = []
+
+    # 1. Integrity check
+    cursor.execute("PRAGMA integrity_check")
+    integrity = cursor.fetchone()[0]
+
+    if integrity != "ok":
+        issues.append({
+            "type": "corruption",
+            "severity": "critical",
+            "title": "Database Corruption Detected",
+            "description": f"Integrity check failed: {integrity}",
+            "action": "backup",
+            "action_label": "Create Backup Now"
+        })
+        recommendations.append("Immediately create a backup before attempting any repairs")
+
+    # 2. Foreign key violations
+    cursor.execute("PRAGMA foreign_key_check")
+    fk_violations = cursor.fetchall()
+
+    if len(fk_violations) > 0:
+        # Group violations by table to provide specific details
+        violations_by_table = {}
+        for violation in fk_violations[:10]:  # Limit to first 10 for display
+            violations_by_table.setdefault(violation[0], []).append(violation[1])
+
+        violation_details = [f"{table} ({len(rowids)} records)" for table, rowids in violations_by_table.items()]
+
+        issues.append({
+            "type": "foreign_keys",
+            "severity": "high",
+            "title": f"{len(fk_violations)} Foreign Key Violations Detected",
+            "description": f"Orphaned records in: {', '.join(violation_details)}. These records reference parent data that no longer exists. Click 'Clean Orphaned Records' to remove them safely.",
+            "action": "clean_fk",
+            "action_label": "Clean Orphaned Records"
+        })
+        recommendations.append("Foreign key violations indicate data inconsistency. Use the 'Clean Orphaned Records' button to safely remove orphaned data.")
+
+    # 3. Check for database bloat
+    cursor.execute("PRAGMA page_count")
+    page_count = cursor.fetchone()[0]
+    cursor.execute("PRAGMA freelist_count")
+    freelist_count = cursor.fetchone()[0]
+
+    if freelist_count > 0:
+        bloat_pct = (freelist_count / page_count * 100) if page_count > 0 else 0
+        if bloat_pct > 10:
+            issues.append({
+                "type": "bloat",
+                "severity": "medium",
+                "title": f"Database Bloat Detected ({bloat_pct:.1f}%)",
+                "description": f"{freelist_count} unused pages wasting space",
+                "action": "vacuum",
+                "action_label": "Optimize Database (VACUUM)"
+            })
+            recommendations.append(f"Run VACUUM to reclaim ~{bloat_pct:.1f}% of database space")
+
+    # 4. Check for missing recommended indexes
+    cursor.execute("""
+        SELECT tbl_name, name
+        FROM sqlite_master
+        WHERE type='index' AND name NOT LIKE 'sqlite_%'
+    """)
+    existing_indexes = {}
+    for tbl, idx in cursor.fetchall():
+        existing_indexes.setdefault(tbl, []).append(idx)
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    table_names = [row[0] for row in cursor.fetchall()]
+
+    missing_indexes = []
+    for table, columns in EXPECTED_INDEXES.items():
+        if table in table_names:
+            for col in columns:
+                # Simple check - in production you'd verify actual index coverage
+                if not any(col in idx.lower() for idx in existing_indexes.get(table, [])):
+                    missing_indexes.append(f"{table}.{col}")
+
+    if missing_indexes:
+        issues.append({
+            "type": "performance",
+            "severity": "low",
+            "title": f"{len(missing_indexes)} Recommended Indexes Missing",
+            "description": f"Adding indexes could improve query performance: {', '.join(missing_indexes[:3])}",
+            "action": "info",
+            "action_label": "View Documentation"
+        })
+
+    # 5. Check for orphaned IODD assets
+    orphaned_assets = 0
+    if "iodd_assets" in table_names and "devices" in table_names:
+        cursor.execute("""
+            SELECT COUNT(*)
+            FROM iodd_assets
+            WHERE device_id NOT IN (SELECT id FROM devices)
+        """)
+        orphaned_assets = cursor.fetchone()[0]
+
+    if orphaned_assets > 0:
+        issues.append({
+            "type": "orphaned_data",
+            "severity": "medium",
+            "title": f"{orphaned_assets} Orphaned IODD Assets",
+            "description": "Asset files exist but their parent IODD files have been deleted",
+            "action": "vacuum",
+            "action_label": "Clean Up Orphaned Data"
+        })
+
+    # Table sizes (counted tables are read from their row counter)
+    cursor.execute("SELECT tbl_name, COUNT(*) FROM sqlite_master WHERE type='index' GROUP BY tbl_name")
+    index_counts = dict(cursor.fetchall())
+    row_counts = read_row_counts(cursor, table_names)
+    tables = [
+        {
+            "name": table_name,
+            "row_count": row_counts[table_name],
+            "index_count": index_counts.get(table_name, 0),
+        }
+        for table_name in table_names
+    ]
+
+    conn.close()
+
+    # Determine overall health status
+    severities = {issue["severity"] for issue in issues}
+    health_status = "healthy"
+    if "critical" in severities:
+        health_status = "critical"
+    elif "high" in severities:
+        health_status = "warning"
+    elif issues:
+        health_status = "needs_attention"
+
+    return {
+        "integrity": integrity,
+        "healthy": len(issues) == 0,
+        "health_status": health_status,
+        "foreign_key_violations": len(fk_violations),
+        "index_count": sum(len(indexes) for indexes in existing_indexes.values()),
+        "issues": issues,
+        "recommendations": recommendations,
+        "tables": tables,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _directory_usage(path: Path) -> Tuple[int, int]:
+    """(file count, total bytes) below path"""
+    count = size = 0
+    if path.exists():
+        for root, dirs, files in os.walk(path):
+            count += len(files)
+            for file in files:
+                size += os.path.getsize(os.path.join(root, file))
+    return count, size
+
+
+def build_activity_snapshot(db_path: str) -> Dict[str, Any]:
+    """Recent activity, EDS diagnostics and storage sizes for the admin overview"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+    table_names = {row[0] for row in cursor.fetchall()}
+
+    def count_recent(table: str, column: str) -> int:
+        """Rows added in the last 7 days, 0 for tables not created yet"""
+        if table not in table_names:
+            return 0
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} >= datetime('now', '-7 days')")
+        return cursor.fetchone()[0]
+
+    # Recent activity (last 7 days)
+    recent_iodd_imports = count_recent("devices", "import_date")
+    recent_eds_imports = count_recent("eds_files", "import_date")
+    recent_tickets = count_recent("tickets", "created_at")
+
+    # EDS diagnostics summary
+    eds_diag = (None, None)
+    if "eds_files" in table_names:
+        cursor.execute("""
+            SELECT
+                SUM(diagnostic_error_count + diagnostic_fatal_count) as total_issues,
+                SUM(CASE WHEN has_parsing_issues = 1 THEN 1 ELSE 0 END) as files_with_issues
+            FROM eds_files
+        """)
+        eds_diag = cursor.fetchone()
+
+    conn.close()
+
+    db_file_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
+    attachment_count, attachments_size = _directory_usage(Path("ticket_attachments"))
+
+    return {
+        "recent_activity": {
+            "iodd_imports": recent_iodd_imports,
+            "eds_imports": recent_eds_imports,
+            "new_tickets": recent_tickets
+        },
+        "diagnostics": {
+            "total_issues": eds_diag[0] or 0,
+            "files_with_issues": eds_diag[1] or 0
+        },
+        "storage": {
+            "database_size_bytes": db_file_size,
+            "database_size_mb": round(db_file_size / (1024 * 1024), 2),
+            "attachments_size_bytes": attachments_size,
+            "attachments_size_mb": round(attachments_size / (1024 * 1024), 2),
+            "attachment_count": attachment_count,
+            "total_size_mb": round((db_file_size + attachments_size) / (1024 * 1024), 2)
+        },
+        "table_count": len(table_names),
+    }
+
+
+REPORTS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "database_health": build_database_health,
+    "activity": build_activity_snapshot,
+}
+
+
+# ============================================================================
+# Background refresh
+# ============================================================================
+
+class StatsRefresher:
+    """Recomputes the reports and reconciles the row counters periodically"""
+
+    def __init__(self, db_path: str, interval: Optional[int] = None, reconcile_interval: Optional[int] = None):
+        self.db_path = db_path
+        self.interval = config.STATS_HEALTH_INTERVAL if interval is None else interval
+        self.reconcile_interval = config.STATS_RECONCILE_INTERVAL if reconcile_interval is None else reconcile_interval
+        self.last_reconcile: Optional[float] = None
+        self._results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._stop_flag = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the refresh thread (no-op when the interval is 0)"""
+        if self.interval <= 0:
+            logger.info("Background statistics refresh is disabled")
+            return
+        self._thread = threading.Thread(target=self._loop, name="stats-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Statistics refresh thread started (interval: {self.interval}s)")
+
+    def stop(self):
+        """Stop the refresh thread"""
+        self._stop_flag.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def refresh(self, name: str) -> Dict[str, Any]:
+        """Compute one report and keep it"""
+        started = time.perf_counter()
+        result = REPORTS[name](self.db_path)
+        with self._lock:
+            self._results[name] = (time.time(), result)
+        logger.debug(f"Refreshed {name} in {time.perf_counter() - started:.2f}s")
+        return result
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """Last computed report, computed now if there is none yet"""
+        with self._lock:
+            entry = self._results.get(name)
+        if entry is None or self.interval <= 0:
+            return self.refresh(name)
+        return entry[1]
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the report was computed"""
+        with self._lock:
+            entry = self._results.get(name)
+        return time.time() - entry[0] if entry else None
+
+    def discard(self, name: str):
+        """Drop a report that no longer reflects the database (recomputed on the next get)"""
+        with self._lock:
+            self._results.pop(name, None)
+
+    def run_once(self):
+        """Refresh every report, and reconcile the row counters when due"""
+        for name in REPORTS:
+            self.refresh(name)
+        if self.reconcile_interval > 0 and (
+                self.last_reconcile is None or time.time() - self.last_reconcile >= self.reconcile_interval):
+            reconcile_row_counts(self.db_path)
+            self.last_reconcile = time.time()
+
+    def _loop(self):
+        # First pass right away so the endpoints have a result to serve
+        while not self._stop_flag.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Statistics refresh error: {e}", exc_info=True)
+            self._stop_flag.wait(timeout=self.interval)
+
+
+_refresher: Optional[StatsRefresher] = None
+
+
+def init_stats_refresher(db_path: str) -> StatsRefresher:
+    """Initialize the global statistics refresher"""
+    global _refresher
+
+    if _refresher is None:
+        _refresher = StatsRefresher(db_path)
+        _refresher.start()
+
+    return _refresher
+
+
+def shutdown_stats_refresher():
+    """Shutdown the global statistics refresher"""
+    global _refresher
+
+    if _refresher:
+        _refresher.stop()
+        _refresher = None
+
+
+def get_report(name: str, db_path: str) -> Dict[str, Any]:
+    """Report from the running refresher, or computed now for another database"""
+    if _refresher is not None and _refresher.db_path == db_path:
+        return _refresher.get(name)
+    return REPORTS[name](db_path)
+
+
+def discard_report(name: str):
+    if _refresher:
+        _refresher.discard(name)
@@ -0,0 +1,134 @@
+"""
+Table Row Counters
+
+Dashboards show row counts of tables with hundreds of thousands of rows
+(parameters, iodd_text, eds_parameters). ``table_row_counts`` holds one row
+per counted table, kept current by AFTER INSERT / AFTER DELETE triggers, so
+reading every count is a single small query.
+
+Triggers fire for every write path (savers, cascade deletes, admin resets)
+without those paths knowing about the counters. ``reconcile_row_counts``
+recounts the tables, corrects any drift (e.g. a database restored from a
+backup taken before the triggers existed) and installs triggers on counted
+tables created after the counters were installed.
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+COUNTED_TABLES = (
+    'devices', 'parameters', 'iodd_text', 'iodd_assets', 'generated_adapters',
+    'eds_files', 'eds_parameters', 'eds_packages', 'tickets',
+)
+
+
+def _existing_tables(cursor: sqlite3.Cursor) -> set:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def install_row_counters(cursor: sqlite3.Cursor, tables: Iterable[str] = COUNTED_TABLES) -> int:
+    """
+    Create the counters table and triggers for the existing counted tables
+
+    Tables that get their triggers now are counted in the same transaction.
+    Returns the number of tables newly set up; the caller commits.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_row_counts (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+            reconciled_at REAL
+        )
+    """)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_count_insert'")
+    installed = {row[0] for row in cursor.fetchall()}
+    existing = _existing_tables(cursor)
+
+    added = 0
+    for table in tables:
+        if table not in existing or f"trg_{table}_count_insert" in installed:
+            continue
+        for event, delta in (('INSERT', '+ 1'), ('DELETE', '- 1')):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_row_counts SET row_count = row_count {delta} WHERE table_name = '{table}';
+                END
+            """)
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO table_row_counts (table_name, row_count, reconciled_at)
+            SELECT ?, COUNT(*), ? FROM {table}
+        """, (table, time.time()))
+        added += 1
+    return added
+
+
+def read_row_counts(cursor: sqlite3.Cursor, tables: Iterable[str] = COUNTED_TABLES) -> Dict[str, int]:
+    """
+    Row count per table from the counters
+
+    Tables without a counter are counted directly, missing tables count 0.
+    """
+    tables = list(tables)
+    try:
+        cursor.execute("SELECT table_name, row_count FROM table_row_counts")
+        counts = dict(cursor.fetchall())
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+        counts = {}
+
+    missing = [table for table in tables if table not in counts]
+    if missing:
+        existing = _existing_tables(cursor)
+        for table in missing:
+            if table in existing:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cursor.fetchone()[0]
+            else:
+                counts[table] = 0
+    return {table: counts[table] for table in tables}
+
+
+def reconcile_row_counts(db_path: str, tables: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Recount the counted tables and correct the counters
+
+    Returns {table: {"stored": ..., "actual": ...}} for counters that had drifted.
+    """
+    tables = list(tables or COUNTED_TABLES)
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        install_row_counters(cursor, tables)
+        conn.commit()
+        existing = _existing_tables(cursor)
+        drift = {}
+        for table in tables:
+            if table not in existing:
+                continue
+            # Count and correct under the write lock so no insert or delete slips in between
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT row_count FROM table_row_counts WHERE table_name = ?", (table,))
+            row = cursor.fetchone()
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            actual = cursor.fetchone()[0]
+            stored = row[0] if row else None
+            cursor.execute(
+                "UPDATE table_row_counts SET row_count = ?, reconciled_at = ? WHERE table_name = ?",
+                (actual, time.time(), table)
+            )
+            conn.commit()
+            if stored != actual:
+                drift[table] = {"stored": stored, "actual": actual}
+        if drift:
+            logger.warning(f"Corrected drifted row counters: {drift}")
+        return drift
+    finally:
+        conn.close()
@@ -0,0 +1,360 @@
+"""
+Device Text Tables
+
+An IODD's ExternalTextCollection maps text ids to one value per language.
+``TextTable`` holds that mapping for one device: every text id is interned
+and numbered once, and each language keeps an id -> value map plus the
+reverse value -> id map, so lookups in both directions are dict hits.
+
+One table serves every consumer of a device's texts:
+- ``IODDParser`` builds it from the XML (``TextTable.from_xml``) and
+  resolves textId references through it
+- ``TextSaver`` writes its rows to iodd_text (``TextTable.rows``)
+- the reconstructor and the menu and language endpoints load it from
+  iodd_text (``get_device_text_table``, or ``get_device_text_tables`` for a
+  batch of devices) instead of searching iodd_text by value for every element
+
+Loaded tables are kept in an in-process LRU keyed by device id and version
+stamp (src/utils/device_versions.py). A re-import gives the device a new
+stamp, so entries need no invalidation. Cached tables are shared and must be
+treated as read-only.
+"""
+
+import logging
+import sqlite3
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from src import config
+from src.cache_manager import _MISSING, LocalCache
+from src.utils.device_versions import get_device_version
+
+logger = logging.getLogger(__name__)
+
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+# Rough per-entry overhead (dict slots, int objects) for the LRU byte budget
+ENTRY_OVERHEAD = 120
+
+_tables = LocalCache(
+    config.TEXT_TABLE_CACHE_MAX_ENTRIES, config.TEXT_TABLE_CACHE_MAX_BYTES, config.TEXT_TABLE_CACHE_TTL
+)
+
+
+class TextTable:
+    """
+    Texts of one device, by language
+
+    Text ids are numbered in the order they are first added, which is also
+    the order of their iodd_text rows. Reverse lookups that match several
+    ids return the first one, like the ``LIMIT 1`` queries they replace.
+    """
+
+    __slots__ = ('_ids', '_text_ids', '_values', '_reverse', '_xml_order', '_redefines', 'language_order')
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._text_ids: List[str] = []
+        self._values: Dict[str, Dict[int, Optional[str]]] = {}
+        self._reverse: Dict[str, Dict[str, Union[int, Tuple[int, ...]]]] = {}
+        self._xml_order: Dict[str, Dict[int, int]] = {}
+        self._redefines: Set[int] = set()
+        self.language_order: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._text_ids)
+
+    def __contains__(self, text_id: str) -> bool:
+        return text_id in self._ids
+
+    @classmethod
+    def from_xml(cls, root, namespaces: Dict[str, str]) -> 'TextTable':
+        """
+        Build from an IODD's ExternalTextCollection
+
+        PrimaryLanguage gets language order 0, the Language elements 1, 2, ...
+        Text and TextRedefine elements keep their position within their
+        language as xml order.
+        """
+        table = cls()
+        collection = './/iodd:ExternalTextCollection/'
+        languages = [(root.find(collection + 'iodd:PrimaryLanguage', namespaces), 'en')]
+        languages += [(elem, 'unknown') for elem in root.findall(collection + 'iodd:Language', namespaces)]
+
+        for lang_idx, (language_elem, default_code) in enumerate(languages):
+            if language_elem is None:
+                continue
+            language = sys.intern(language_elem.get(XML_LANG, default_code))
+            table.language_order[language] = lang_idx
+            order_idx = 0
+            for child in language_elem:
+                local_name = child.tag.split('}')[-1] if '}' in child.tag else child.tag
+                if local_name not in ('Text', 'TextRedefine'):
+                    continue
+                text_id = child.get('id')
+                if text_id:
+                    table.add(text_id, language, child.get('value', ''), order_idx, local_name == 'TextRedefine')
+                    order_idx += 1
+        return table
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, device_id: int) -> 'TextTable':
+        """Load a device's texts from iodd_text (one query, any row factory)"""
+        return cls.load_many(conn, [device_id])[device_id]
+
+    @classmethod
+    def load_many(cls, conn: sqlite3.Connection, device_ids: List[int]) -> Dict[int, 'TextTable']:
+        """Load the texts of several devices from iodd_text with one ``IN (...)`` query"""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT device_id, text_id, language_code, text_value, xml_order, language_order, is_text_redefine
+            FROM iodd_text WHERE device_id IN ({','.join('?' * len(device_ids))})
+            ORDER BY id
+        """, list(device_ids))
+        tables = {device_id: cls() for device_id in device_ids}
+        for device_id, text_id, language, value, xml_order, language_order, is_redefine in cursor:
+            table = tables[device_id]
+            table.add(text_id, language, value, xml_order, bool(is_redefine))
+            if language_order is not None and language_order < table.language_order.get(language, language_order + 1):
+                table.language_order[language] = language_order
+        return tables
+
+    def add(self, text_id: str, language: str, value: Optional[str],
+            xml_order: Optional[int] = None, redefine: bool = False) -> int:
+        """Add or replace the value of a text id in one language; returns the integer id"""
+        index = self._ids.get(text_id)
+        if index is None:
+            index = len(self._text_ids)
+            text_id = sys.intern(text_id)
+            self._ids[text_id] = index
+            self._text_ids.append(text_id)
+        language = sys.intern(language)
+
+        values = self._values.setdefault(language, {})
+        reverse = self._reverse.setdefault(language, {})
+        if index in values:
+            self._unlink(reverse, values[index], index)
+        values[index] = value
+        if value is not None:
+            ids = reverse.get(value)
+            if ids is None:
+                reverse[value] = index
+            else:
+                reverse[value] = tuple(sorted({index, *(ids if isinstance(ids, tuple) else (ids,))}))
+
+        if xml_order is not None:
+            self._xml_order.setdefault(language, {})[index] = xml_order
+        if redefine:
+            self._redefines.add(index)
+        return index
+
+    @staticmethod
+    def _unlink(reverse: Dict[str, Union[int, Tuple[int, ...]]], value: Optional[str], index: int):
+        ids = reverse.get(value)
+        if ids is None:
+            return
+        if not isinstance(ids, tuple):
+            del reverse[value]
+            return
+        remaining = tuple(i for i in ids if i != index)
+        reverse[value] = remaining[0] if len(remaining) == 1 else remaining
+
+    @property
+    def languages(self) -> List[str]:
+        """Languages in Language element order (languages without an order first, like SQL NULLs)"""
+        return sorted(self._values, key=lambda lang: (self.language_order.get(lang, -1), lang))
+
+    @property
+    def primary_language(self) -> Optional[str]:
+        """The language with order 0, else English, else the first language"""
+        for language, order in self.language_order.items():
+            if order == 0 and language in self._values:
+                return language
+        if 'en' in self._values:
+            return 'en'
+        languages = self.languages
+        return languages[0] if languages else None
+
+    def resolve(self, text_id: Optional[str], language: Optional[str] = None) -> Optional[str]:
+        """Value of a text id in a language (default: the primary language), or None"""
+        index = self._ids.get(text_id) if text_id else None
+        if index is None:
+            return None
+        return self._values.get(language or self.primary_language, {}).get(index)
+
+    @property
+    def text_ids(self) -> List[str]:
+        """Text ids in the order they were added"""
+        return list(self._text_ids)
+
+    def values(self, text_id: str) -> Dict[str, Optional[str]]:
+        """All values of a text id, by language code"""
+        index = self._ids.get(text_id)
+        if index is None:
+            return {}
+        return {lang: self._values[lang][index] for lang in sorted(self._values) if index in self._values[lang]}
+
+    def find_text_id(self, value: Optional[str], language: Optional[str] = None,
+                     prefix: Optional[str] = None) -> Optional[str]:
+        """
+        First text id with this exact value
+
+        Args:
+            value: Text value to look up
+            language: Only match this language (default: any language)
+            prefix: Only match text ids starting with this prefix
+        """
+        if value is None:
+            return None
+        best = None
+        for lang in ((language,) if language else self._reverse):
+            ids = self._reverse.get(lang, {}).get(value)
+            if ids is None:
+                continue
+            for index in (ids if isinstance(ids, tuple) else (ids,)):
+                if prefix and not self._text_ids[index].startswith(prefix):
+                    continue
+                if best is None or index < best:
+                    best = index
+                break
+        return None if best is None else self._text_ids[best]
+
+    def find_text_id_containing(self, fragment: str, prefix: Optional[str] = None) -> Optional[str]:
+        """First text id whose value contains the fragment (case-insensitive), in any language"""
+        fragment = fragment.casefold()
+        for index, text_id in enumerate(self._text_ids):
+            if prefix and not text_id.startswith(prefix):
+                continue
+            for values in self._values.values():
+                value = values.get(index)
+                if value and fragment in value.casefold():
+                    return text_id
+        return None
+
+    def first_text_id(self, prefix: str) -> Optional[str]:
+        """First text id starting with the prefix"""
+        for text_id in self._text_ids:
+            if text_id.startswith(prefix):
+                return text_id
+        return None
+
+    def is_redefine(self, text_id: str) -> bool:
+        return self._ids.get(text_id) in self._redefines
+
+    def entries(self, language: str) -> Iterator[Tuple[str, Optional[str], bool]]:
+        """(text_id, value, is_text_redefine) of one language in XML order"""
+        values = self._values.get(language, {})
+        orders = self._xml_order.get(language, {})
+        for index in sorted(values, key=lambda i: (orders.get(i, -1), i)):
+            yield self._text_ids[index], values[index], index in self._redefines
+
+    def rows(self) -> Iterator[Tuple[str, str, Optional[str], Optional[int], Optional[int], int]]:
+        """
+        iodd_text rows: (text_id, language_code, text_value, xml_order,
+        language_order, is_text_redefine), grouped by text id
+        """
+        languages = self.languages
+        for index, text_id in enumerate(self._text_ids):
+            is_redefine = 1 if index in self._redefines else 0
+            for language in languages:
+                values = self._values[language]
+                if index in values:
+                    yield (text_id, language, values[index], self._xml_order.get(language, {}).get(index),
+                           self.language_order.get(language), is_redefine)
+
+    def to_dicts(self) -> Tuple[Dict[str, Dict[str, Optional[str]]], Dict[str, Dict[str, int]], Dict[str, int], Set[str]]:
+        """
+        The nested-dict form: ({text_id: {language: value}},
+        {text_id: {language: xml_order}}, {language: language_order},
+        text ids of TextRedefine elements)
+        """
+        all_text: Dict[str, Dict[str, Optional[str]]] = {}
+        xml_order: Dict[str, Dict[str, int]] = {}
+        for text_id, language, value, order, _, _ in self.rows():
+            all_text.setdefault(text_id, {})[language] = value
+            if order is not None:
+                xml_order.setdefault(text_id, {})[language] = order
+        redefine_ids = {self._text_ids[index] for index in self._redefines}
+        return all_text, xml_order, dict(self.language_order), redefine_ids
+
+    @property
+    def size_estimate(self) -> int:
+        """Approximate memory in bytes, for the LRU byte budget"""
+        size = sum(len(text_id) for text_id in self._text_ids) + ENTRY_OVERHEAD * len(self._text_ids)
+        for values in self._values.values():
+            size += sum(len(value) for value in values.values() if value) + 2 * ENTRY_OVERHEAD * len(values)
+        return size
+
+
+def _cache_key(db_path: str, device_id: int) -> Optional[str]:
+    # Devices without a stamp (no device_versions table) are not cached
+    version = get_device_version(db_path, device_id)
+    return f"{device_id}:{version.version:x}" if version else None
+
+
+def get_device_text_table(db_path: str, device_id: int,
+                          conn: Optional[sqlite3.Connection] = None) -> TextTable:
+    """
+    Text table of a device, from the in-process LRU or loaded from iodd_text
+
+    Args:
+        db_path: Database the device lives in (for its version stamp)
+        device_id: Device ID
+        conn: Connection to load with (default: a new one to db_path)
+    """
+    key = _cache_key(db_path, device_id)
+    if key is not None:
+        table = _tables.get(key)
+        if table is not _MISSING:
+            return table
+
+    if conn is None:
+        own = sqlite3.connect(db_path)
+        try:
+            table = TextTable.load(own, device_id)
+        finally:
+            own.close()
+    else:
+        table = TextTable.load(conn, device_id)
+
+    if key is not None:
+        _tables.set(key, table, table.size_estimate, config.TEXT_TABLE_CACHE_TTL)
+    return table
+
+
+def get_device_text_tables(db_path: str, device_ids: List[int],
+                           conn: sqlite3.Connection) -> Dict[int, TextTable]:
+    """
+    Text tables of several devices; LRU misses are loaded with one query
+
+    Args:
+        db_path: Database the devices live in (for their version stamps)
+        device_ids: Device IDs (at most a few hundred per call)
+        conn: Connection to load with
+    """
+    tables: Dict[int, TextTable] = {}
+    missing: Dict[int, Optional[str]] = {}
+    for device_id in device_ids:
+        key = _cache_key(db_path, device_id)
+        table = _tables.get(key) if key is not None else _MISSING
+        if table is _MISSING:
+            missing[device_id] = key
+        else:
+            tables[device_id] = table
+
+    if missing:
+        for device_id, table in TextTable.load_many(conn, list(missing)).items():
+            key = missing[device_id]
+            if key is not None:
+                _tables.set(key, table, table.size_estimate, config.TEXT_TABLE_CACHE_TTL)
+            tables[device_id] = table
+    return tables
+
+
+def text_table_cache_stats() -> Dict[str, Any]:
+    return _tables.stats()
+
+
+def clear_text_tables() -> int:
+    return _tables.clear()
@@ -0,0 +1,205 @@
+"""
+Streaming XML Serializer
+
+Writes an ElementTree directly to a text sink with indentation, avoiding the
+``ET.tostring`` -> ``minidom.parseString`` -> ``toprettyxml`` round trip that
+the reconstruction engine previously used for pretty printing.
+
+Formatting follows the ``iodd_build_format`` metadata captured at import time
+(indent character and size, newline style, attribute quoting, XML declaration)
+so reconstructed files resemble the original layout.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from xml.etree import ElementTree as ET
+
+XSI_NAMESPACE = 'http://www.w3.org/2001/XMLSchema-instance'
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+# Prefixes used for Clark-notation names ("{uri}local"); unknown URIs get ns0, ns1, ...
+_KNOWN_PREFIXES = {
+    XSI_NAMESPACE: 'xsi',
+    XML_NAMESPACE: 'xml',
+}
+
+_NEWLINES = {
+    'lf': '\n',
+    'crlf': '\r\n',
+    'cr': '\r',
+}
+
+# Matches the declaration minidom's toprettyxml() emits
+DEFAULT_XML_DECLARATION = '<?xml version="1.0" ?>'
+
+
+@dataclass(frozen=True)
+class XmlFormat:
+    """Output formatting options for the serializer"""
+    indent: str = '  '
+    newline: str = '\n'
+    quote: str = '"'
+    xml_declaration: Optional[str] = DEFAULT_XML_DECLARATION
+    trailing_newline: bool = True
+
+    @classmethod
+    def from_build_format(cls, build_format: Optional[Dict]) -> 'XmlFormat':
+        """Create a format from an ``iodd_build_format`` row (see BuildFormatSaver.get_format)
+
+        Args:
+            build_format: Dict with indent_char, indent_size, newline_style,
+                attribute_quoting, xml_declaration and has_trailing_newline keys,
+                or None to use the default (minidom-compatible) layout
+
+        Returns:
+            XmlFormat instance
+        """
+        if not build_format:
+            return cls()
+
+        indent_unit = '\t' if build_format.get('indent_char') == 'tab' else ' '
+        indent_size = build_format.get('indent_size')
+        if indent_size is None or indent_size < 0:
+            indent_size = 1 if indent_unit == '\t' else 2
+
+        return cls(
+            indent=indent_unit * indent_size,
+            newline=_NEWLINES.get(build_format.get('newline_style') or 'lf', '\n'),
+            quote="'" if build_format.get('attribute_quoting') == 'single' else '"',
+            xml_declaration=build_format.get('xml_declaration'),
+            trailing_newline=bool(build_format.get('has_trailing_newline', True)),
+        )
+
+
+def _escape_text(text: str) -> str:
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
+
+
+def _escape_attrib(value: str, quote: str) -> str:
+    value = _escape_text(value)
+    if quote in value:
+        value = value.replace(quote, '&quot;' if quote == '"' else '&apos;')
+    if '\n' in value or '\r' in value or '\t' in value:
+        value = value.replace('\r', '&#13;').replace('\n', '&#10;').replace('\t', '&#9;')
+    return value
+
+
+def _collect_namespaces(root: ET.Element) -> Dict[str, str]:
+    """Map every namespace URI used in Clark notation to a prefix"""
+    namespaces: Dict[str, str] = {}
+
+    def add(name):
+        if isinstance(name, str) and name[:1] == '{':
+            uri = name[1:name.index('}')]
+            if uri not in namespaces:
+                namespaces[uri] = _KNOWN_PREFIXES.get(uri, f'ns{len(namespaces)}')
+
+    for elem in root.iter():
+        add(elem.tag)
+        for key in elem.keys():
+            add(key)
+    return namespaces
+
+
+def write_xml(root: ET.Element, write: Callable[[str], object],
+              xml_format: Optional[XmlFormat] = None) -> None:
+    """Serialize an element tree to a write callable, indenting as it goes
+
+    Args:
+        root: Root element to serialize
+        write: Callable accepting string chunks (e.g. ``file.write`` or ``list.append``)
+        xml_format: Formatting options (defaults to minidom-compatible output)
+    """
+    fmt = xml_format or XmlFormat()
+    newline = fmt.newline
+    quote = fmt.quote
+    namespaces = _collect_namespaces(root)
+    qnames: Dict[str, str] = {}
+
+    def qualify(name: str) -> str:
+        qname = qnames.get(name)
+        if qname is None:
+            if name[:1] == '{':
+                uri, local = name[1:].split('}', 1)
+                qname = f'{namespaces[uri]}:{local}'
+            else:
+                qname = name
+            qnames[name] = qname
+        return qname
+
+    def serialize(elem: ET.Element, indent: str, ns_decls: Optional[Dict[str, str]]) -> None:
+        tag = elem.tag
+        if tag is ET.Comment:
+            emit(f'{indent}<!--{elem.text or ""}-->{newline}')
+            return
+        if tag is ET.ProcessingInstruction:
+            emit(f'{indent}<?{elem.text or ""}?>{newline}')
+            return
+
+        name = qualify(tag)
+        emit(f'{indent}<{name}')
+        if ns_decls:
+            for uri, prefix in sorted(ns_decls.items(), key=lambda item: item[1]):
+                if uri != XML_NAMESPACE:
+                    emit(f' xmlns:{prefix}={quote}{_escape_attrib(uri, quote)}{quote}')
+        for key, value in elem.items():
+            emit(f' {qualify(key)}={quote}{_escape_attrib(str(value), quote)}{quote}')
+
+        text = elem.text
+        if len(elem):
+            emit('>')
+            if text:
+                emit(_escape_text(text))
+            emit(newline)
+            child_indent = indent + fmt.indent
+            for child in elem:
+                serialize(child, child_indent, None)
+                if child.tail and child.tail.strip():
+                    emit(f'{child_indent}{_escape_text(child.tail.strip())}{newline}')
+            emit(f'{indent}</{name}>{newline}')
+        elif text:
+            emit(f'>{_escape_text(text)}</{name}>{newline}')
+        else:
+            emit(f'/>{newline}')
+
+    if fmt.xml_declaration:
+        write(fmt.xml_declaration + newline)
+
+    if fmt.trailing_newline:
+        emit = write
+        serialize(root, '', namespaces)
+        return
+
+    # Hold back one chunk so the final newline can be dropped without a second pass
+    pending = []
+
+    def emit(chunk: str) -> None:
+        if pending:
+            write(pending.pop())
+        pending.append(chunk)
+
+    serialize(root, '', namespaces)
+    if pending:
+        chunk = pending.pop()
+        write(chunk[:-len(newline)] if chunk.endswith(newline) else chunk)
+
+
+def serialize_xml(root: ET.Element, xml_format: Optional[XmlFormat] = None) -> str:
+    """Serialize an element tree to an indented string
+
+    Args:
+        root: Root element to serialize
+        xml_format: Formatting options (defaults to minidom-compatible output)
+
+    Returns:
+        Serialized XML document
+    """
+    parts = []
+    write_xml(root, parts.append, xml_format)
+    return ''.join(parts)
@@ -0,0 +1,112 @@
+"""
+Unit Tests for the Batch Export Engine (src/utils/batch_export)
+================================================================
+
+Tests the set-based export loader, archive assembly with throughput
+metrics, and the in-process path of the batch export task.
+"""
+
+import json
+import sqlite3
+import zipfile
+
+import pytest
+
+from src.utils import batch_export
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "export.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY, product_name TEXT, manufacturer TEXT,
+                              vendor_id INTEGER, device_id INTEGER);
+        CREATE TABLE device_variants (id INTEGER PRIMARY KEY, device_id INTEGER,
+                                      hardware_revision TEXT, firmware_revision TEXT);
+        CREATE TABLE parameters (id INTEGER PRIMARY KEY, device_id INTEGER, param_index INTEGER, name TEXT,
+                                 data_type TEXT, access_rights TEXT, default_value TEXT, unit TEXT);
+        CREATE TABLE process_data (id INTEGER PRIMARY KEY, device_id INTEGER, pd_id TEXT, name TEXT,
+                                   data_type TEXT, bit_length INTEGER, direction TEXT);
+    """)
+    for device_id in range(1, 6):
+        conn.execute("INSERT INTO devices VALUES (?, ?, 'Acme', 26, ?)", (device_id, f"Sensor {device_id}", device_id))
+        conn.execute("INSERT INTO device_variants (device_id, hardware_revision, firmware_revision)"
+                     " VALUES (?, 'HW1', 'FW1'), (?, 'HW2', 'FW2')", (device_id, device_id))
+        conn.executemany(
+            "INSERT INTO parameters (device_id, param_index, name, data_type, access_rights, default_value, unit)"
+            " VALUES (?, ?, ?, 'UIntegerT', 'rw', '0', 'mm')",
+            [(device_id, index, f"Param {index}") for index in range(3)]
+        )
+        conn.execute("INSERT INTO process_data (device_id, pd_id, name, data_type, bit_length, direction)"
+                     " VALUES (?, 'PDIn', 'In', 'RecordT', 16, 'input'), (?, 'PDOut', 'Out', 'UIntegerT', 8, 'output')",
+                     (device_id, device_id))
+    conn.commit()
+    conn.close()
+    return path
+
+
+class TestLoader:
+    """Set-based export records"""
+
+    def test_records_for_chunk(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        records = batch_export.load_export_data(conn, [2, 99])
+        conn.close()
+
+        assert records[99] is None
+        record = records[2]
+        assert record["device_info"] == {
+            "product_name": "Sensor 2", "vendor": "Acme", "vendor_id": 26, "device_id": 2,
+            "hardware_revision": "HW1", "firmware_revision": "FW1",
+        }
+        assert [p["index"] for p in record["parameters"]] == [0, 1, 2]
+        assert record["process_data"] == {
+            "inputs": [{"id": "PDIn", "name": "In", "data_type": "RecordT", "bit_length": 16}],
+            "outputs": [{"id": "PDOut", "name": "Out", "data_type": "UIntegerT", "bit_length": 8}],
+        }
+
+    def test_chunking_deduplicates(self):
+        assert batch_export.chunk_ids([3, 1, 3, 2, 1], chunk_size=2) == [[3, 1], [2]]
+
+
+class TestBatchArchive:
+    """Archive assembly"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_zip_archive(self, db_path, tmp_path, workers):
+        output = str(tmp_path / "out" / "batch.zip")
+        result = batch_export.run_batch_export([1, 2, 3, 42, 4, 5], "csv", db_path=db_path, output_path=output,
+                                               workers=workers, chunk_size=2)
+
+        archive = zipfile.ZipFile(output)
+        names = archive.namelist()
+        assert names[:5] == [f"device_{i}_sensor_{i}.csv" for i in (1, 2, 3, 4, 5)]
+        assert archive.read(names[0]).decode().splitlines()[1] == "0,Param 0,UIntegerT,rw,0,mm"
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["failed"] == [{"device_id": 42, "error": "Device 42 not found"}]
+
+        metrics = result["metrics"]
+        assert (result["total"], len(result["successful"]), len(result["failed"])) == (6, 5, 1)
+        assert metrics["chunks"] == 3 and metrics["workers"] == workers
+        assert metrics["bytes_written"] == len(open(output, "rb").read()) and metrics["devices_per_s"] > 0
+
+    def test_combined_json(self, db_path, tmp_path):
+        output = str(tmp_path / "combined.json")
+        batch_export.run_batch_export([3, 1], "json", db_path=db_path, output_path=output, combine=True, workers=1)
+
+        combined = json.load(open(output))
+        assert [record["device_id"] for record in combined] == [3, 1]
+        assert combined[0]["device_info"]["product_name"] == "Sensor 3"
+
+    def test_task_runs_in_process_without_broker(self, db_path, tmp_path, monkeypatch):
+        from src.tasks import export_tasks
+
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(export_tasks, "get_db_path", lambda: db_path)
+        result = export_tasks.batch_export_devices.apply(args=([1, 2], "xml")).get()
+
+        archive = zipfile.ZipFile(tmp_path / result["archive"])
+        assert b"<product_name>Sensor 2</product_name>" in archive.read("device_2_sensor_2.xml")
+        assert result["metrics"]["successful"] == 2
@@ -0,0 +1,203 @@
+"""
+Unit Tests for Batch Reconstruction (src/utils/batch_reconstruction)
+====================================================================
+
+Tests that reconstructing IODD devices and EDS files in chunks, in-process or
+over a (spawned) worker pool, gives exactly the per-file reconstruction, that
+a chunk reads each child table once however many files it holds, and that the
+IODD batch export carries the same XML.
+"""
+
+import os
+import sqlite3
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from alembic import command
+from alembic.config import Config
+
+from src import cache_manager
+from src.cache_manager import LocalCache
+from src.greenstack import IODDManager
+from src.parsers.eds_parser import parse_eds_file
+from src.parsers.eds_section_index import save_section_index
+from src.storage.eds import save_eds_details
+from src.utils import text_table
+from src.utils.batch_export import run_batch_export
+from src.utils.batch_reconstruction import BatchReconstructor
+from src.utils.eds_reconstruction import EDSReconstructor
+from src.utils.forensic_reconstruction_v2 import IODDReconstructor
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURE = ROOT / "tests" / "fixtures" / "reconstruction_device.xml"
+
+EDS_TEMPLATE = """[File]
+        DescText = "Batch test {code}";
+        CreateDate = 01-15-2024;
+        FileRevision = 1.{code};
+[Device]
+        VendCode = 42;
+        VendName = "ACME";
+        ProdType = 12;
+        ProdTypeStr = "Communication Adapter";
+        ProdCode = {code};
+        MajRev = 1;
+        MinRev = {code};
+        ProdName = "Widget {code}";
+[Device Classification]
+        Class1 = EtherNetIP;
+[ParamClass]
+        MaxInst = 3;
+[Params]
+        Param1 = 0,,,0x0000,0xC7,2,"Speed","rpm","",0,1500,{code};
+        Param2 = 0,,,0x0000,0xC6,1,"Mode","","",0,2,0;
+        Enum2 = 0,"Off", 1,"On", 2,"Auto";
+        Param3 = 0,,,0x0000,0xC6,1,"Level","","",0,1,0;
+        Enum3 = 1,"High", 0,"Low";
+[Groups]
+        Group1 = "Main", 2, 1,2;
+[Assembly]
+        Assem100 = "Input", 0x64, , 0x0020, , "20 04 24 64 30 03";
+[Connection Manager]
+        Connection1 = 0x04010002, 0x44640405, 2, 0, , , , , , , , "Exclusive Owner", "", "20 04 24 01 2C 96 2C 64";
+[Port]
+        Port1 = TCP, "EtherNet/IP", "20 F5 24 01", 1;
+[Capacity]
+        MaxIOConnections = 4;
+        TSpec1 = TxRx, 32, 100;
+[Safety Supervisor Class]
+        Revision = {code};
+"""
+
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    """Migrated database with three devices and three EDS files"""
+    tmp = tmp_path_factory.mktemp("batch")
+    path = str(tmp / "greenstack.db")
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    with mock.patch.dict(os.environ, {"IODD_DATABASE_URL": f"sqlite:///{path}"}):
+        command.upgrade(config, "head")
+
+    manager = IODDManager(str(tmp / "storage"), path)
+    source = FIXTURE.read_text()
+    for index in range(3):
+        device_file = tmp / f"device_{index}.xml"
+        device_file.write_text(source.replace('deviceId="4711"', f'deviceId="{4711 + index}"'))
+        manager.import_iodd(str(device_file))
+
+    conn = sqlite3.connect(path)
+    for code in (1, 2, 3):
+        content = EDS_TEMPLATE.format(code=code)
+        parsed, diagnostics = parse_eds_file(content)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO eds_files (vendor_code, vendor_name, product_code, product_name,
+                                   description, major_revision, minor_revision, eds_content)
+            VALUES (42, 'ACME', ?, ?, ?, 1, ?, ?)
+        """, (code, f"Widget {code}", f"Batch test {code}", code, content))
+        save_eds_details(cursor, cursor.lastrowid, parsed, diagnostics)
+        save_section_index(cursor, cursor.lastrowid, content)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def text_tables(monkeypatch):
+    # Version stamps are read from the database, not a cache manager
+    monkeypatch.setattr(cache_manager, "_cache_manager", None)
+    monkeypatch.setattr(text_table, "_tables", LocalCache(10, 10 ** 6, 300))
+
+
+def per_file(db_path, file_type, ids):
+    if file_type == "IODD":
+        reconstructor = IODDReconstructor(db_path)
+        return {file_id: reconstructor.reconstruct_iodd(file_id) for file_id in ids}
+    reconstructor = EDSReconstructor(db_path)
+    return {file_id: reconstructor.reconstruct_eds(file_id) for file_id in ids}
+
+
+def batch(db_path, file_type, ids, **kwargs):
+    reconstructor = BatchReconstructor(db_path, **kwargs)
+    run = reconstructor.reconstruct_iodd_batch if file_type == "IODD" else reconstructor.reconstruct_eds_batch
+    return list(run(ids))
+
+
+class TestBatchMatchesPerFile:
+    """Batch output equals per-file reconstruction"""
+
+    @pytest.mark.parametrize("file_type", ["IODD", "EDS"])
+    @pytest.mark.parametrize("chunk_size", [1, 2, 200])
+    def test_in_process(self, db_path, file_type, chunk_size):
+        expected = per_file(db_path, file_type, [1, 2, 3])
+        results = batch(db_path, file_type, [3, 1, 2, 1], chunk_size=chunk_size)
+
+        assert [result.file_id for result in results] == [3, 1, 2]
+        assert all(result.ok and result.file_type == file_type for result in results)
+        assert {result.file_id: result.content for result in results} == expected
+
+    @pytest.mark.parametrize("file_type", ["IODD", "EDS"])
+    def test_worker_pool(self, db_path, file_type):
+        expected = per_file(db_path, file_type, [1, 2, 3])
+        results = batch(db_path, file_type, [1, 2, 3], workers=2, chunk_size=2)
+
+        assert [result.file_id for result in results] == [1, 2, 3]
+        assert {result.file_id: result.content for result in results} == expected
+
+    def test_fixture_is_fully_reconstructed(self, db_path):
+        xml = per_file(db_path, "IODD", [2])[2]
+        for element in ('deviceId="4712"', "<StdRecordItemRef", "<DirectParameterOverlay",
+                        "<RecordItemInfo", "<Button", "<EventTrigger", "<TextRedefine"):
+            assert element in xml
+        eds = per_file(db_path, "EDS", [3])[3]
+        assert 'Enum3 =' in eds and "[Safety Supervisor Class]" in eds
+
+    @pytest.mark.parametrize("file_type", ["IODD", "EDS"])
+    def test_missing_file_is_reported(self, db_path, file_type):
+        results = batch(db_path, file_type, [1, 999])
+
+        assert results[0].ok
+        assert not results[1].ok and results[1].content is None
+        assert "999 not found" in results[1].error
+
+
+class TestChunkReads:
+    """A chunk reads each child table once"""
+
+    @pytest.mark.parametrize("reconstructor_class", [IODDReconstructor, EDSReconstructor])
+    def test_statements_do_not_grow_with_chunk_size(self, db_path, reconstructor_class):
+        def statements(ids):
+            reconstructor = reconstructor_class(db_path)
+            conn = reconstructor.get_connection()
+            executed = []
+            conn.set_trace_callback(executed.append)
+            chunk = reconstructor.load_chunk(conn, ids)
+            for file_id in ids:
+                reconstructor.reconstruct_with_connection(conn, file_id, chunk)
+            conn.close()
+            return [sql for sql in executed if sql.lstrip().upper().startswith("SELECT")]
+
+        single = statements([1])
+        assert len(statements([1, 2, 3])) == len(single)
+        assert len(single) == len(set(single))
+
+
+class TestIODDExport:
+    """Batch export of reconstructed IODD XML"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_archive_holds_per_file_reconstruction(self, db_path, tmp_path, workers):
+        expected = per_file(db_path, "IODD", [1, 2, 3])
+        output = str(tmp_path / f"iodd_{workers}.zip")
+        result = run_batch_export([2, 999, 1, 3], "iodd", db_path=db_path, output_path=output,
+                                  workers=workers, chunk_size=2)
+
+        archive = zipfile.ZipFile(output)
+        files = {entry["device_id"]: entry["file_name"] for entry in result["successful"]}
+        assert list(files) == [2, 1, 3] and all(name.endswith("_iodd.xml") for name in files.values())
+        assert {device_id: archive.read(name).decode() for device_id, name in files.items()} == expected
+        assert result["failed"] == [{"device_id": 999, "error": "Device 999 not found"}]
@@ -0,0 +1,73 @@
+"""
+Unit Tests for the Cache Value Codec (src/cache_codec)
+=======================================================
+
+Tests envelope round trips for every installed serializer/compressor pair,
+the compression threshold, and decoding of legacy JSON text and entries this
+process cannot read.
+"""
+
+import json
+
+import pytest
+
+from src.cache_codec import COMPRESSORS, ENVELOPE_VERSION, SERIALIZERS, CacheCodec, CacheCodecError
+
+DEVICE = {
+    "id": 7,
+    "product_name": "Sensor",
+    "parameters": [
+        {"param_index": index, "name": f"Parameter {index}", "default_value": None,
+         "enumeration_values": json.dumps({str(value): f"Option {value}" for value in range(8)})}
+        for index in range(200)
+    ],
+}
+
+
+class TestCacheCodec:
+    """Enveloped encoding"""
+
+    @pytest.mark.parametrize("serializer", sorted(SERIALIZERS))
+    @pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+    def test_round_trip(self, serializer, compression):
+        codec = CacheCodec(serializer, compression, compress_min_bytes=1024)
+        data = codec.encode(DEVICE)
+
+        assert data[0] == ENVELOPE_VERSION and data[1] == SERIALIZERS[serializer].id
+        assert data[2] == COMPRESSORS[compression].id
+        assert codec.decode(data) == DEVICE
+        # Any codec can read what another one wrote
+        assert CacheCodec("json", "none").decode(data) == DEVICE
+
+    def test_compression_threshold_and_ratio(self):
+        codec = CacheCodec("json", "zlib", compress_min_bytes=1024)
+
+        small = codec.encode({"id": 1})
+        assert small[2] == COMPRESSORS["none"].id
+        assert len(codec.encode(DEVICE)) * 4 < len(json.dumps(DEVICE))
+
+    def test_legacy_and_unreadable_values(self):
+        codec = CacheCodec()
+        assert codec.decode(json.dumps(DEVICE).encode()) == DEVICE
+        assert codec.decode(b'"text"') == "text"
+
+        # Version 1 envelopes carry no tags
+        assert codec.unwrap_tagged(bytes((1, 1, 0)) + b"[1]") == (b"[1]", SERIALIZERS["json"], [])
+
+        with pytest.raises(CacheCodecError):
+            codec.decode(bytes((ENVELOPE_VERSION + 1, 1, 0)) + b"{}")
+        with pytest.raises(CacheCodecError):
+            codec.decode(bytes((ENVELOPE_VERSION, 99, 0)) + b"{}")
+
+    def test_tags_travel_with_the_value(self):
+        codec = CacheCodec("json", "zlib", compress_min_bytes=1024)
+        data = codec.wrap(codec.serializer.dumps(DEVICE), ["all_devices", "device:7"])
+
+        payload, serializer, tags = codec.unwrap_tagged(data)
+        assert serializer.loads(payload) == DEVICE and tags == ["all_devices", "device:7"]
+        assert codec.decode(data) == DEVICE
+
+    def test_unknown_codec_falls_back(self):
+        codec = CacheCodec("no-such-serializer", "no-such-compressor")
+        assert codec.serializer.name in SERIALIZERS and codec.compressor.name in COMPRESSORS
+        assert codec.decode(codec.encode([1, 2])) == [1, 2]
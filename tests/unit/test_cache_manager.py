@@ -0,0 +1,316 @@
+"""
+Unit Tests for the Two-Tier Cache (src/cache_manager, src/cached_storage)
+==========================================================================
+
+Tests the bounded in-process LRU tier, cross-process invalidation messages,
+cached device lookups when Redis is not reachable, coalesced computation
+with stale-while-revalidate, and the Redis tier's scripted tag writes,
+enveloped values, compute locks and prefix-scoped deletes against fakeredis.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src import cache_manager, config
+from src.cache_codec import ENVELOPE_VERSION
+from src.cache_manager import CacheManager, LocalCache
+from src.cached_storage import CachedStorageManager
+
+UNREACHABLE_REDIS = "redis://127.0.0.1:1/0"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_manager.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestLocalCache:
+    """In-process LRU tier"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalCache(max_entries=2, max_bytes=1000, max_ttl=60)
+        cache.set("a", 1, 10, 60)
+        cache.set("b", 2, 10, 60)
+        assert cache.get("a") == 1
+        cache.set("c", 3, 10, 60)
+
+        assert cache.get("b") is cache_manager._MISSING
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        cache = LocalCache(max_entries=100, max_bytes=100, max_ttl=60)
+        cache.set("a", "x", 60, 60)
+        cache.set("b", "y", 60, 60)
+        cache.set("huge", "z", 500, 60)
+
+        assert cache.get("a") is cache_manager._MISSING
+        assert cache.get("huge") is cache_manager._MISSING
+        assert cache.stats()["bytes"] == 60
+
+    def test_ttl_is_capped(self, clock):
+        cache = LocalCache(max_entries=10, max_bytes=1000, max_ttl=30)
+        cache.set("a", 1, 10, ttl=600)
+        clock[0] += 29
+        assert cache.get("a") == 1
+        clock[0] += 2
+        assert cache.get("a") is cache_manager._MISSING
+        assert cache.stats()["expirations"] == 1
+
+    def test_tag_and_prefix_invalidation(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000, max_ttl=60)
+        cache.set("cache:devices:device:1", 1, 10, 60, tags=["all_devices", "device:1"])
+        cache.set("cache:devices:device:2", 2, 10, 60, tags=["all_devices", "device:2"])
+        cache.set("cache:eds:eds:1", 3, 10, 60, tags=["all_eds"])
+
+        assert cache.invalidate_tag("device:1") == 1
+        assert cache.invalidate_tag("all_devices") == 1
+        assert cache.invalidate_prefix("cache:eds:") == 1
+        assert cache.stats()["entries"] == 0 and cache.bytes == 0
+
+    def test_pattern_invalidation(self):
+        cache = LocalCache(max_entries=10, max_bytes=1000, max_ttl=60)
+        for key in ("cache:fn:device:1", "cache:fn:device:2", "cache:fn:search:1"):
+            cache.set(key, 1, 10, 60)
+
+        assert cache.invalidate_matching("cache:fn:device:*") == 2
+        assert cache.get("cache:fn:search:1") == 1
+
+
+class TestCacheManager:
+    """Tiered lookups without Redis"""
+
+    def test_local_tier_without_redis(self):
+        manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 10_000, 60))
+        assert not manager.redis_available() and manager.is_available()
+
+        assert manager.get("devices", "device:1") is None
+        manager.set("devices", "device:1", {"id": 1}, tags=["device:1"])
+        assert manager.get("devices", "device:1") == {"id": 1}
+
+        stats = manager.get_stats()
+        assert stats["tiers"]["local"]["hits"] == 1 and stats["tiers"]["local"]["misses"] == 1
+        assert stats["hit_rate"] == 0.5 and not stats["tiers"]["redis"]["connected"]
+
+        manager.invalidate_by_tag("device:1")
+        assert manager.get("devices", "device:1") is None
+
+    def test_applies_invalidations_from_other_workers(self):
+        manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 10_000, 60))
+        manager.set("devices", "all_devices", [1], tags=["all_devices"])
+        manager.set("devices", "device:1", {"id": 1}, tags=["device:1"])
+
+        # Own messages are ignored, other origins are applied
+        manager._on_invalidation({"data": json.dumps({"origin": manager.instance_id, "op": "tags",
+                                                      "value": ["all_devices"]})})
+        assert manager.get("devices", "all_devices") == [1]
+        manager._on_invalidation({"data": json.dumps({"origin": "other", "op": "tags", "value": ["all_devices"]})})
+        assert manager.get("devices", "all_devices") is None
+        manager._on_invalidation({"data": json.dumps({"origin": "other", "op": "clear", "value": None})})
+        assert manager.get("devices", "device:1") is None
+
+
+class TestCoalescing:
+    """get_or_set single-flight and stale-while-revalidate"""
+
+    def test_concurrent_misses_compute_once(self):
+        manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 10_000, 60))
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return [1, 2]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            manager.get_or_set("devices", "all_devices", compute, tags=["all_devices"]))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while manager._flight.shared < 7:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == [[1, 2]] * 8 and len(calls) == 1
+        assert manager.get_stats()["coalescing"]["shared_computations"] == 7
+
+    def test_stale_entry_is_served_while_refreshed(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(cache_manager.time, "time", lambda: now[0])
+        manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 10_000, 600))
+        versions = iter(["v1", "v2"])
+
+        assert manager.get_or_set("stats", "totals", lambda: next(versions), ttl=10, stale_ttl=60) == "v1"
+        now[0] += 11
+        assert manager.get_or_set("stats", "totals", lambda: next(versions), ttl=10, stale_ttl=60) == "v1"
+        manager._refresher.shutdown(wait=True)
+        manager._refresher = None
+
+        assert manager.get_or_set("stats", "totals", lambda: "v3", ttl=10) == "v2"
+        assert manager.stale_served == 1
+
+    def test_invalidation_during_computation_is_not_overwritten(self):
+        manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 10_000, 60))
+
+        def compute():
+            manager.invalidate_by_tag("all_devices")
+            return ["before import"]
+
+        assert manager.get_or_set("devices", "all_devices", compute, tags=["all_devices"]) == ["before import"]
+        assert manager.get_or_set("devices", "all_devices", lambda: ["after import"]) == ["after import"]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(cache_manager.redis, "from_url",
+                        lambda url, **kwargs: fakeredis.FakeRedis(server=server))
+    managers = []
+
+    def connect(local=None):
+        managers.append(CacheManager("redis://fake/0", local=local or LocalCache(0, 0, 0)))
+        return managers[-1]
+
+    yield connect
+    for manager in managers:
+        manager.close()
+
+
+@pytest.fixture
+def redis_manager(fake_redis):
+    return fake_redis()
+
+
+class TestRedisTier:
+    """Scripted writes and scoped deletes on the Redis tier"""
+
+    def test_set_with_tags_and_invalidate(self, redis_manager):
+        client = redis_manager.client
+        redis_manager.set("devices", "device:1", {"id": 1}, ttl=100, tags=["all_devices", "device:1"])
+        redis_manager.set("devices", "device:2", {"id": 2}, ttl=10, tags=["all_devices", "device:2"])
+
+        assert client.smembers("cache:tag:all_devices") == {b"cache:devices:device:1", b"cache:devices:device:2"}
+        # Tag sets outlive every member and are never shortened
+        assert client.ttl("cache:tag:all_devices") > 100 and client.ttl("cache:tag:device:2") <= 70
+        assert redis_manager.get("devices", "device:1") == {"id": 1}
+
+        assert redis_manager.invalidate_by_tags(["device:1", "device:2"]) == 2
+        assert redis_manager.get("devices", "device:1") is None
+        assert not client.exists("cache:tag:device:1", "cache:devices:device:2")
+
+    def test_values_are_enveloped(self, redis_manager):
+        client = redis_manager.client
+        redis_manager.set("devices", "device:1", {"id": 1, "parameters": ["x" * 40] * 100})
+        assert client.get("cache:devices:device:1")[0] == ENVELOPE_VERSION
+        assert redis_manager.get("devices", "device:1")["parameters"][0] == "x" * 40
+
+        # Entries written before the envelope, and ones this process cannot read
+        client.set("cache:devices:legacy", json.dumps({"id": 2}))
+        client.set("cache:devices:newer", bytes((ENVELOPE_VERSION + 1, 1, 0)) + b"{}")
+        assert redis_manager.get("devices", "legacy") == {"id": 2}
+        assert redis_manager.get("devices", "newer") is None
+
+    def test_redis_hits_keep_tags_in_process(self, fake_redis):
+        worker_a, worker_b = (fake_redis(LocalCache(10, 10_000, 300)) for _ in range(2))
+        versions = iter(["v1", "v2", "v3"])
+
+        def load():
+            return worker_b.get_or_set("devices", "all_devices", lambda: next(versions), ttl=60,
+                                       tags=["all_devices"])
+
+        assert worker_a.get_or_set("devices", "all_devices", lambda: next(versions), ttl=60,
+                                   tags=["all_devices"]) == "v1"
+        assert load() == "v1"
+        assert worker_b.local._tags == {"all_devices": {"cache:devices:all_devices"}}
+        # The copy expires with the Redis entry (ttl + stale window), not after max_ttl
+        expires_in = worker_b.local._entries["cache:devices:all_devices"].expires_at - time.monotonic()
+        assert 55 < expires_in <= 60 + config.CACHE_STALE_TTL
+
+        # Invalidated in the worker that copied the Redis hit
+        worker_b.invalidate_by_tags(["all_devices"])
+        assert load() == "v2"
+
+        # Invalidated by another worker, via pub/sub
+        worker_a.invalidate_by_tags(["all_devices"])
+        deadline = time.monotonic() + 5
+        while worker_b.local._tags and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert load() == "v3"
+
+    def test_waits_for_computation_in_other_process(self, fake_redis, monkeypatch):
+        monkeypatch.setattr(config, "CACHE_LOCK_WAIT", 5)
+        worker_a, worker_b = fake_redis(), fake_redis()
+        lock_key = worker_a._make_lock_key("cache:devices:all_devices")
+        worker_a.client.set(lock_key, "worker-a")
+
+        def finish():
+            time.sleep(0.1)
+            worker_a.set("devices", "all_devices", {"fresh_until": time.time() + 60, "value": [1]})
+            worker_a.client.delete(lock_key)
+
+        threading.Thread(target=finish).start()
+        assert worker_b.get_or_set("devices", "all_devices", lambda: pytest.fail("computed twice")) == [1]
+        assert worker_b.lock_waits == 1
+
+        # The lock is released only by its holder
+        assert worker_b.get_or_set("devices", "device:1", lambda: {"id": 1}) == {"id": 1}
+        assert not worker_b.client.exists(worker_b._make_lock_key("cache:devices:device:1"))
+
+    def test_pattern_deletes_stay_in_prefix(self, redis_manager):
+        client = redis_manager.client
+        client.set("session:1", "keep")
+        for index in range(1200):
+            redis_manager.set("fn", f"device:{index}", index)
+        redis_manager.set("fn", "search:x", 1)
+        redis_manager.set("devices", "device:1", 1)
+
+        assert redis_manager.delete_pattern("fn", "device:*") == 1200
+        assert redis_manager.get("fn", "search:x") == 1
+        redis_manager.invalidate_namespace("fn")
+        assert redis_manager.get("fn", "search:x") is None and redis_manager.get("devices", "device:1") == 1
+
+        redis_manager.clear_all()
+        assert client.keys("*") == [b"session:1"]
+        with pytest.raises(ValueError):
+            redis_manager._unlink_matching("*")
+
+
+class FakeStorage:
+    def __init__(self):
+        self.calls = 0
+
+    def get_device(self, device_id):
+        self.calls += 1
+        return {"id": device_id, "parameters": [{"name": "p"}]}
+
+    def list_devices(self):
+        self.calls += 1
+        return [{"id": 1}]
+
+
+class TestCachedStorage:
+    """Device lookups through CachedStorageManager"""
+
+    def test_device_lookups_are_cached_and_invalidated(self, monkeypatch):
+        monkeypatch.setattr(cache_manager, "_cache_manager",
+                            CacheManager(UNREACHABLE_REDIS, local=LocalCache(10, 100_000, 60)))
+        storage = FakeStorage()
+        cached = CachedStorageManager(storage, redis_url=UNREACHABLE_REDIS)
+
+        assert cached.get_device(7) == cached.get_device(7)
+        assert cached.list_devices() == cached.list_devices()
+        assert storage.calls == 2
+
+        cached.invalidate_devices([7])
+        cached.get_device(7)
+        cached.list_devices()
+        assert storage.calls == 4
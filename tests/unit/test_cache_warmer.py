@@ -0,0 +1,134 @@
+"""
+Unit Tests for the Device View Cache and Warmer (src/utils/cache_warmer)
+========================================================================
+
+Tests cached route handlers (default variant only, errors not cached),
+request counting per device, and warming the registered views.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+from src import cache_manager
+from src.cache_manager import CacheManager, LocalCache
+from src.utils import cache_warmer
+from src.utils.cache_warmer import CacheWarmer, DeviceAccessStats, device_view, invalidate_device_view
+
+UNREACHABLE_REDIS = "redis://127.0.0.1:1/0"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "devices.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY AUTOINCREMENT);
+        CREATE TABLE device_access_stats (
+            device_id INTEGER PRIMARY KEY,
+            request_count INTEGER NOT NULL DEFAULT 0,
+            last_accessed REAL,
+            FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+        );
+        INSERT INTO devices DEFAULT VALUES;
+        INSERT INTO devices DEFAULT VALUES;
+        INSERT INTO devices DEFAULT VALUES;
+    """)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def views(monkeypatch):
+    manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(100, 10 ** 6, 300))
+    monkeypatch.setattr(cache_manager, "_cache_manager", manager)
+    monkeypatch.setattr(cache_warmer, "_views", {})
+    calls = []
+
+    @device_view("summary", role=None)
+    async def summary(device_id: int, role=None):
+        calls.append((device_id, role))
+        if device_id == 404:
+            raise HTTPException(status_code=404, detail="Device not found")
+        return {"id": device_id, "role": role}
+
+    yield summary, calls
+    manager.close()
+
+
+class TestDeviceView:
+    """Cached route handlers"""
+
+    def test_default_variant_is_cached(self, views):
+        summary, calls = views
+        assert asyncio.run(summary(device_id=1, role=None)) == {"id": 1, "role": None}
+        assert asyncio.run(summary(device_id=1, role=None)) == {"id": 1, "role": None}
+        assert asyncio.run(summary(device_id=1, role="observer")) == {"id": 1, "role": "observer"}
+        assert calls == [(1, None), (1, "observer")]
+
+        invalidate_device_view("summary", 1)
+        asyncio.run(summary(device_id=1, role=None))
+        cache_manager._cache_manager.invalidate_by_tag("device:1")
+        asyncio.run(summary(device_id=1, role=None))
+        assert len(calls) == 4
+
+    def test_errors_are_not_cached(self, views):
+        summary, calls = views
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                asyncio.run(summary(device_id=404, role=None))
+        assert len(calls) == 2
+
+
+class TestDeviceAccessStats:
+    """Request counts"""
+
+    def test_flush_and_top_devices(self, db_path):
+        stats = DeviceAccessStats(db_path, flush_interval=3600)
+        for device_id in (2, 2, 3, 2, 3, 1, 99):
+            assert stats.record(device_id) is False
+        assert stats.flush() == 4
+        stats.record(1)
+        stats.flush()
+
+        # Ties go to the most recently requested device
+        assert stats.top_devices(2) == [2, 1]
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT device_id, request_count FROM device_access_stats ORDER BY device_id").fetchall() \
+            == [(1, 2), (2, 3), (3, 2)]
+        conn.close()
+
+    def test_flush_is_due_after_interval(self, db_path):
+        stats = DeviceAccessStats(db_path, flush_interval=0)
+        assert stats.record(1) is True
+
+
+class TestCacheWarmer:
+    """Background warming"""
+
+    def test_warm_devices(self, views, db_path):
+        summary, calls = views
+        warmer = CacheWarmer(db_path, workers=1)
+        run = warmer.warm_devices([1, 404], "test")
+        assert (run.devices, run.views, run.failures) == (2, 1, 1)
+
+        asyncio.run(summary(device_id=1, role=None))
+        assert calls == [(1, None), (404, None)]
+        assert warmer.stats()["views"]["summary"]["computations"] == 1
+
+        future = warmer.submit([2, 2], "import")
+        assert future.result().devices == 1
+        warmer.close()
+
+    def test_startup_warms_most_requested(self, views, db_path):
+        summary, calls = views
+        warmer = CacheWarmer(db_path, workers=1)
+        warmer.access.record(3)
+        warmer.access.flush()
+
+        assert warmer.submit_top_devices(limit=5).result().reason == "startup"
+        assert calls == [(3, None)]
+        assert warmer.submit_top_devices(limit=0) is None
+        warmer.close()
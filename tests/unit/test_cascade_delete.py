@@ -0,0 +1,155 @@
+"""
+Unit Tests for Set-Based Cascade Deletes (src/utils/cascade_delete)
+====================================================================
+
+Tests that a CascadePlan follows foreign keys and extra links in parent-first
+order, deletes in chunks without touching unrelated rows, honours ON DELETE
+SET NULL, reports the rows removed per table and leaves the connection's
+foreign key setting as it found it.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from src.utils.cascade_delete import CascadeLink, CascadePlan
+
+SCHEMA = """
+CREATE TABLE devices (id INTEGER PRIMARY KEY, name TEXT);
+CREATE TABLE parameters (id INTEGER PRIMARY KEY, device_id INTEGER REFERENCES devices(id));
+CREATE TABLE parameter_values (id INTEGER PRIMARY KEY, parameter_id INTEGER REFERENCES parameters(id));
+CREATE TABLE archive (id INTEGER PRIMARY KEY, device_id INTEGER, file_type TEXT);
+CREATE TABLE queue (
+    id INTEGER PRIMARY KEY,
+    archive_id INTEGER REFERENCES archive(id),
+    value_id INTEGER REFERENCES parameter_values(id) ON DELETE SET NULL
+);
+CREATE TABLE notes (id INTEGER PRIMARY KEY, device_name TEXT REFERENCES devices(name));
+"""
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+
+def make_plan(conn):
+    return CascadePlan.from_schema(conn.cursor(), 'devices', extra_links=[
+        CascadeLink('devices', 'archive', 'device_id', condition="file_type = 'IODD'"),
+    ])
+
+
+def populate(conn, devices=6, parameters=3):
+    cursor = conn.cursor()
+    for device_id in range(1, devices + 1):
+        cursor.execute("INSERT INTO devices VALUES (?, ?)", (device_id, f"dev{device_id}"))
+        cursor.execute("INSERT INTO notes (device_name) VALUES (?)", (f"dev{device_id}",))
+        for file_type in ('IODD', 'EDS'):
+            cursor.execute("INSERT INTO archive (device_id, file_type) VALUES (?, ?)", (device_id, file_type))
+            cursor.execute("INSERT INTO queue (archive_id) VALUES (?)", (cursor.lastrowid,))
+        for _ in range(parameters):
+            cursor.execute("INSERT INTO parameters (device_id) VALUES (?)", (device_id,))
+            cursor.execute("INSERT INTO parameter_values (parameter_id) VALUES (?)", (cursor.lastrowid,))
+    conn.commit()
+
+
+def count(conn, sql):
+    return conn.execute(sql).fetchone()[0]
+
+
+class TestCascadePlan:
+    """Plan construction from the schema"""
+
+    def test_order_puts_parents_first(self, conn):
+        plan = make_plan(conn)
+        order = plan.order
+        assert order[0] == 'devices'
+        assert set(order) == {'devices', 'parameters', 'parameter_values', 'archive', 'queue', 'notes'}
+        assert order.index('parameters') < order.index('parameter_values')
+        assert order.index('archive') < order.index('queue')
+        assert [link.child for link in plan.links if link.set_null] == ['queue']
+
+    def test_cycle_raises(self, conn):
+        conn.executescript("""
+            CREATE TABLE a (id INTEGER PRIMARY KEY, b_id INTEGER REFERENCES b(id));
+            CREATE TABLE b (id INTEGER PRIMARY KEY, a_id INTEGER REFERENCES a(id));
+        """)
+        with pytest.raises(ValueError):
+            CascadePlan.from_schema(conn.cursor(), 'a')
+
+
+class TestCascadeDelete:
+    """Chunked deletes"""
+
+    def test_deletes_dependents_only(self, conn):
+        populate(conn)
+        # A queue row of a kept device points at a value that is deleted
+        kept_value = conn.execute("SELECT id FROM parameter_values WHERE parameter_id = 1").fetchone()[0]
+        conn.execute("UPDATE queue SET value_id = ? WHERE id = (SELECT MAX(id) FROM queue)", (kept_value,))
+        conn.commit()
+
+        counts = make_plan(conn).delete(conn, [1, 2, 3, 99], chunk_size=2)
+
+        assert counts == {
+            'devices': 3, 'notes': 3, 'parameters': 9, 'parameter_values': 9,
+            'archive': 3, 'queue': 3, 'queue.value_id (set NULL)': 1,
+        }
+        assert count(conn, "SELECT COUNT(*) FROM devices") == 3
+        assert count(conn, "SELECT COUNT(*) FROM parameters WHERE device_id <= 3") == 0
+        assert count(conn, "SELECT COUNT(*) FROM parameter_values") == 9
+        # EDS archive rows of deleted devices are outside the IODD link
+        assert count(conn, "SELECT COUNT(*) FROM archive WHERE device_id <= 3") == 3
+        assert count(conn, "SELECT COUNT(*) FROM archive WHERE device_id <= 3 AND file_type = 'IODD'") == 0
+        assert count(conn, "SELECT COUNT(*) FROM queue WHERE value_id IS NOT NULL") == 0
+        assert count(conn, "SELECT COUNT(*) FROM sqlite_temp_master") == 0
+
+    def test_hooks_wrap_every_chunk(self, conn):
+        populate(conn)
+        seen = []
+
+        @contextmanager
+        def hook(cursor, ids):
+            before = count(conn, "SELECT COUNT(*) FROM devices")
+            yield
+            seen.append((ids, before, count(conn, "SELECT COUNT(*) FROM devices")))
+
+        make_plan(conn).delete(conn, range(1, 6), chunk_size=2, hooks=[hook])
+
+        assert seen == [([1, 2], 6, 4), ([3, 4], 4, 2), ([5], 2, 1)]
+
+    def test_failed_chunk_rolls_back(self, conn):
+        populate(conn)
+
+        @contextmanager
+        def failing(cursor, ids):
+            yield
+            if 3 in ids:
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            make_plan(conn).delete(conn, [1, 2, 3, 4], chunk_size=2, hooks=[failing])
+
+        # The first chunk is committed, the failing one is not
+        assert [row[0] for row in conn.execute("SELECT id FROM devices")] == [3, 4, 5, 6]
+        assert count(conn, "SELECT COUNT(*) FROM parameters WHERE device_id = 3") == 3
+
+    @pytest.mark.parametrize("enabled", [0, 1])
+    def test_restores_foreign_keys_setting(self, conn, enabled):
+        populate(conn)
+        conn.execute(f"PRAGMA foreign_keys = {enabled}")
+
+        make_plan(conn).delete(conn, [1])
+        assert count(conn, "PRAGMA foreign_keys") == enabled
+
+        @contextmanager
+        def failing(cursor, ids):
+            raise RuntimeError("boom")
+            yield
+
+        with pytest.raises(RuntimeError):
+            make_plan(conn).delete(conn, [2], hooks=[failing])
+        assert count(conn, "PRAGMA foreign_keys") == enabled
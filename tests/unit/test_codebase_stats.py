@@ -0,0 +1,79 @@
+"""
+Unit Tests for Codebase Statistics (src/utils/codebase_stats)
+=============================================================
+
+Tests the single tree walk, per-file line count reuse across runs, and the
+background refresh.
+"""
+
+import json
+import os
+
+import pytest
+
+from src.utils import codebase_stats
+from src.utils.codebase_stats import FILE_CACHE_FILE, STATS_FILE, CodebaseStats, FileLineCache, generate_stats
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("# app\n\nprint('hi')\n")
+    (tmp_path / "README.md").write_text("# Title\ntext\n")
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text("x\n" * 100)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(codebase_stats, "_latest", None)
+    monkeypatch.setattr(codebase_stats, "_refresh", None)
+
+
+class TestLineCounts:
+    """Counting and reuse"""
+
+    def test_excluded_directories_are_skipped(self, project):
+        generator = CodebaseStats(str(project))
+        languages = generator.count_lines_by_extension()
+        assert languages["Python"] == {"files": 1, "lines": 3, "blank": 1, "comments": 1, "is_doc": False}
+        assert "JavaScript" not in languages
+        assert generator.count_files_and_dirs() == {"total_files": 2, "total_directories": 1}
+
+    def test_only_changed_files_are_read(self, project):
+        generate_stats(str(project))
+        cache = FileLineCache.load(project / FILE_CACHE_FILE)
+        assert set(cache.entries) == {"src/app.py", "README.md"}
+
+        app = project / "src" / "app.py"
+        app.write_text("print('hi')\nprint('again')\n\n\n")
+        os.utime(app, ns=(1, 1))
+        (project / "README.md").unlink()
+
+        generator = CodebaseStats(str(project), file_cache=cache)
+        languages = generator.count_lines_by_extension()
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert languages["Python"]["lines"] == 4
+        assert set(cache.entries) == {"src/app.py"}
+
+        CodebaseStats(str(project), file_cache=cache).count_lines_by_extension()
+        assert cache.hits == 1
+
+    def test_cache_of_other_version_is_ignored(self, project):
+        (project / FILE_CACHE_FILE).write_text(json.dumps({"version": 0, "files": {"src/app.py": [0, 0, 9, 9, 9]}}))
+        assert FileLineCache.load(project / FILE_CACHE_FILE).entries == {}
+
+
+class TestBackgroundRefresh:
+    """start_refresh"""
+
+    def test_refresh_saves_stats(self, project):
+        refresh = codebase_stats.start_refresh(str(project))
+        assert codebase_stats.wait_for_refresh(30)
+        assert refresh.to_dict()["status"] == "completed"
+        assert refresh.to_dict()["percent"] == 100.0
+
+        saved = json.loads((project / STATS_FILE).read_text())
+        assert saved["totals"]["total_files_counted"] == 2
+        assert codebase_stats.load_saved_stats(str(project))["generated_at"] == saved["generated_at"]
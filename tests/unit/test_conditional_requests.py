@@ -0,0 +1,168 @@
+"""
+Unit Tests for Device Version Stamps and Conditional Requests
+=============================================================
+
+Tests stamp bumps and lazy creation (src/utils/device_versions), and the
+middleware in src/utils/conditional_requests: validators on device-scoped
+responses, 304s answered without running the route or reading the database,
+and gzip bodies served from the encoded-response cache.
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src import cache_manager
+from src.cache_manager import CacheManager, LocalCache
+from src.utils import conditional_requests, device_versions
+from src.utils.conditional_requests import choose_encoding, conditional_device_response, etag_matches
+from src.utils.device_versions import bump_device_versions, load_device_version
+
+UNREACHABLE_REDIS = "redis://127.0.0.1:1/0"
+
+PARAMETERS = [{"index": index, "name": f"Parameter {index}"} for index in range(200)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "devices.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY AUTOINCREMENT, product_name TEXT);
+        CREATE TABLE device_versions (
+            device_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+        );
+        INSERT INTO devices (product_name) VALUES ('Sensor'), ('Valve');
+    """)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    manager = CacheManager(UNREACHABLE_REDIS, local=LocalCache(100, 10 ** 6, 300))
+    monkeypatch.setattr(cache_manager, "_cache_manager", manager)
+    monkeypatch.setattr(conditional_requests, "_encoded_bodies", LocalCache(100, 10 ** 6, 300))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def app(db_path, cache):
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.middleware("http")
+    async def conditional(request: Request, call_next):
+        return await conditional_device_response(request, call_next, db_path)
+
+    @app.get("/api/iodd/{device_id}/parameters")
+    async def parameters(device_id: int):
+        app.state.calls += 1
+        return PARAMETERS
+
+    @app.get("/api/iodd/{device_id}/name")
+    async def name(device_id: int):
+        app.state.calls += 1
+        return {"id": device_id}
+
+    @app.get("/api/iodd")
+    async def devices():
+        return []
+
+    return app
+
+
+def bump(db_path, device_id):
+    conn = sqlite3.connect(db_path)
+    bump_device_versions(conn.cursor(), [device_id])
+    conn.commit()
+    conn.close()
+
+
+class TestDeviceVersions:
+    """Version stamps"""
+
+    def test_bump_is_monotonic_and_skips_unknown_devices(self, db_path):
+        bump(db_path, 1)
+        first = load_device_version(db_path, 1)
+        bump(db_path, 1)
+        bump(db_path, 99)
+
+        assert load_device_version(db_path, 1).version > first.version
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT device_id FROM device_versions").fetchall() == [(1,)]
+        conn.close()
+
+    def test_lazy_stamp_and_missing_device(self, db_path):
+        assert load_device_version(db_path, 2) is not None
+        assert load_device_version(db_path, 2) == load_device_version(db_path, 2)
+        assert load_device_version(db_path, 3) is None
+
+    def test_missing_table_disables_stamps(self, tmp_path):
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE devices (id INTEGER PRIMARY KEY)")
+        bump_device_versions(conn.cursor(), [1])
+        conn.close()
+        assert load_device_version(path, 1) is None
+
+
+class TestConditionalRequests:
+    """Validators, 304s and encoded bodies"""
+
+    def test_revalidation_skips_route_and_database(self, app, monkeypatch):
+        client = TestClient(app)
+        response = client.get("/api/iodd/1/name")
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"1-') and "last-modified" in response.headers
+
+        monkeypatch.setattr(device_versions, "load_device_version", pytest.fail)
+        revalidated = client.get("/api/iodd/1/name", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304 and revalidated.headers["etag"] == etag
+        assert app.state.calls == 1
+
+        by_date = client.get("/api/iodd/1/name", headers={"If-Modified-Since": response.headers["last-modified"]})
+        assert by_date.status_code == 304
+
+    def test_save_changes_etag(self, app, db_path, cache):
+        client = TestClient(app)
+        etag = client.get("/api/iodd/1/name").headers["etag"]
+
+        bump(db_path, 1)
+        cache.invalidate_by_tag("device:1")
+        response = client.get("/api/iodd/1/name", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.headers["etag"] != etag
+
+    def test_encoded_body_cache(self, app):
+        client = TestClient(app)
+        headers = {"Accept-Encoding": "gzip"}
+        first = client.get("/api/iodd/1/parameters", headers=headers)
+        second = client.get("/api/iodd/1/parameters", headers=headers)
+
+        assert first.headers["content-encoding"] == "gzip" and first.json() == PARAMETERS
+        assert second.content == first.content and second.headers["etag"] == first.headers["etag"]
+        assert app.state.calls == 1
+        assert conditional_requests.encoded_cache_stats()["hits"] == 1
+
+        identity = client.get("/api/iodd/1/parameters", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers and app.state.calls == 2
+
+    def test_other_paths_pass_through(self, app):
+        client = TestClient(app)
+        assert "etag" not in client.get("/api/iodd").headers
+        unknown = client.get("/api/iodd/3/name")
+        assert unknown.status_code == 200 and "etag" not in unknown.headers
+
+    def test_header_parsing(self):
+        assert etag_matches('"a", W/"1-2-x"', 'W/"1-2-x"')
+        assert etag_matches('*', 'W/"1-2-x"')
+        assert not etag_matches('W/"1-3-x"', 'W/"1-2-x"')
+        assert choose_encoding("gzip;q=0.5, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("") is None
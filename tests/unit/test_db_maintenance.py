@@ -0,0 +1,140 @@
+"""
+Unit Tests for Database Maintenance (src/utils/db_maintenance)
+===============================================================
+
+Tests the stepped online backup, incremental vacuum, resumable table
+analysis, streamed snapshots and the background job registry.
+"""
+
+import gzip
+import sqlite3
+import time
+
+import pytest
+
+from src.utils import db_maintenance
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    for name in ("alpha", "beta", "gamma"):
+        conn.execute(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY, value TEXT)")
+        conn.execute(f"CREATE INDEX idx_{name} ON {name} (value)")
+        conn.executemany(f"INSERT INTO {name} (value) VALUES (?)", [(f"{name}-{i}" * 20,) for i in range(500)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def rows(path, table="alpha"):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+class TestOperations:
+    """Backup, vacuum and analyze"""
+
+    def test_online_backup_reports_progress(self, db_path, tmp_path):
+        steps = []
+        dest = str(tmp_path / "backup.db")
+
+        size = db_maintenance.online_backup(db_path, dest, pages_per_step=5, pause=0,
+                                            progress=lambda done, total: steps.append((done, total)))
+
+        assert rows(dest) == rows(db_path)
+        assert size > 0 and len(steps) > 1
+        assert steps[-1][0] == steps[-1][1]
+
+    def test_incremental_vacuum_converts_then_steps(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM beta")
+        conn.commit()
+        conn.close()
+
+        skipped = db_maintenance.incremental_vacuum(db_path, pause=0)
+        assert skipped["pages_freed"] == 0 and not skipped["converted"]
+
+        converted = db_maintenance.incremental_vacuum(db_path, pause=0, convert=True)
+        assert converted["converted"] and converted["size_after"] < converted["size_before"]
+
+        kept = rows(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM gamma")
+        conn.commit()
+        conn.close()
+        result = db_maintenance.incremental_vacuum(db_path, pages_per_step=2, pause=0)
+        assert result["pages_freed"] > 0 and result["pages_remaining"] == 0
+        assert rows(db_path) == kept
+
+    def test_analyze_resumes_after_budget(self, db_path):
+        db_maintenance._analyze_resume.clear()
+        first = db_maintenance.analyze_tables(db_path, budget=1e-9, pause=0)
+        assert first == {"tables_analyzed": [], "complete": False}
+
+        second = db_maintenance.analyze_tables(db_path, pause=0)
+        assert second == {"tables_analyzed": ["alpha", "beta", "gamma"], "complete": True}
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(DISTINCT tbl) FROM sqlite_stat1").fetchone()[0] == 3
+        conn.close()
+
+
+class TestSnapshot:
+    """Streaming snapshots"""
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_snapshot_ignores_later_writes(self, db_path, tmp_path, compress):
+        writer = sqlite3.connect(db_path)
+        writer.execute("INSERT INTO alpha (value) VALUES ('uncheckpointed')")
+        writer.commit()
+        expected = rows(db_path)
+
+        snapshot = db_maintenance.DatabaseSnapshot(db_path)
+        chunks = snapshot.iter_bytes(chunk_size=4096, compress=compress)
+        first = next(chunks)
+        # Commits (and checkpoints) after the snapshot do not reach the streamed file
+        writer.execute("DELETE FROM alpha")
+        writer.commit()
+        writer.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        data = first + b"".join(chunks)
+        writer.close()
+
+        out = tmp_path / "snapshot.db"
+        out.write_bytes(gzip.decompress(data) if compress else data)
+        assert rows(str(out)) == expected
+        assert len(rows(db_path)) == 0
+
+
+class TestJobs:
+    """Background job registry"""
+
+    def test_one_job_at_a_time(self):
+        job = db_maintenance.submit_job("test", lambda progress: time.sleep(0.2) or {"ok": True})
+        with pytest.raises(db_maintenance.MaintenanceBusyError):
+            db_maintenance.submit_job("test", lambda progress: {})
+
+        deadline = time.monotonic() + 5
+        while job.status in ("pending", "running") and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert db_maintenance.get_job(job.id).to_dict()["result"] == {"ok": True}
+        assert job.status == "completed" and job.finished_at
+        assert db_maintenance.list_jobs()[0] is job
+
+    def test_failed_job_records_error(self):
+        def fail(progress):
+            progress(1, 4)
+            raise RuntimeError("disk full")
+
+        job = db_maintenance.submit_job("test", fail)
+        deadline = time.monotonic() + 5
+        while job.status in ("pending", "running") and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert job.to_dict()["status"] == "failed"
+        assert job.error == "disk full" and job.to_dict()["percent"] == 25.0
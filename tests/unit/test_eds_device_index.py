@@ -0,0 +1,102 @@
+"""
+Unit Tests for EDS Device Index (src/utils/eds_device_index)
+=============================================================
+
+Tests that per-device refreshes of eds_device_index match a full rebuild and
+pick the right latest revision, variant representatives and feature flags.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils.eds_device_index import (
+    INDEX_COLUMNS, device_keys, ensure_device_index, rebuild_device_index, refresh_device_index, variant_info
+)
+
+SCHEMA = f"""
+CREATE TABLE eds_files (
+    id INTEGER PRIMARY KEY, vendor_code INTEGER, product_code INTEGER,
+    major_revision INTEGER, minor_revision INTEGER, import_date TEXT,
+    vendor_name TEXT, product_type INTEGER, product_type_str TEXT, product_name TEXT,
+    catalog_number TEXT, description TEXT, home_url TEXT,
+    diagnostic_info_count INTEGER, diagnostic_warn_count INTEGER, diagnostic_error_count INTEGER,
+    diagnostic_fatal_count INTEGER, has_parsing_issues BOOLEAN
+);
+CREATE TABLE eds_assemblies (id INTEGER PRIMARY KEY, eds_file_id INTEGER, assembly_number INTEGER);
+CREATE TABLE eds_device_index (id INTEGER PRIMARY KEY, {', '.join(INDEX_COLUMNS)});
+"""
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+
+def add_file(conn, vendor, product, major, minor, day, assemblies=(100, 101)):
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO eds_files (vendor_code, product_code, major_revision, minor_revision, import_date,
+                               vendor_name, product_name)
+        VALUES (?, ?, ?, ?, ?, 'ACME', ?)
+    """, (vendor, product, major, minor, f"2026-01-{day:02d}", f"Product {product}"))
+    eds_id = cursor.lastrowid
+    cursor.executemany("INSERT INTO eds_assemblies (eds_file_id, assembly_number) VALUES (?, ?)",
+                       [(eds_id, number) for number in assemblies])
+    refresh_device_index(cursor, [(vendor, product)])
+    conn.commit()
+    return eds_id
+
+
+def index_rows(conn):
+    columns = ', '.join(INDEX_COLUMNS)
+    return sorted(conn.execute(f"SELECT {columns} FROM eds_device_index").fetchall(), key=repr)
+
+
+class TestDeviceIndex:
+    """Test incremental refresh against a full rebuild."""
+
+    def test_latest_revision_and_variants(self, conn):
+        add_file(conn, 1, 10, 1, 0, 1)
+        newest_import = add_file(conn, 1, 10, 1, 0, 3)
+        extended = add_file(conn, 1, 10, 1, 0, 2, assemblies=(100, 101, 210))
+        latest = add_file(conn, 1, 10, 2, 0, 1)
+        add_file(conn, 1, 11, 1, 0, 1)
+
+        rows = {row[5]: dict(zip(INDEX_COLUMNS, row)) for row in index_rows(conn)}
+        assert set(rows) == {newest_import, extended, latest, 5}
+        assert rows[newest_import]['file_count'] == 2
+        assert rows[extended]['has_opcua'] == 1 and rows[extended]['assembly_count'] == 3
+        assert [eds_id for eds_id, row in rows.items() if row['is_latest_revision']] == [latest, 5]
+        assert rows[latest]['revision_count'] == 4
+
+        stored = index_rows(conn)
+        rebuild_device_index(conn)
+        assert index_rows(conn) == stored
+
+    def test_delete_and_null_codes(self, conn):
+        first = add_file(conn, None, None, 1, 0, 1)
+        add_file(conn, None, None, 1, 1, 2)
+        devices = device_keys(conn.cursor(), [first])
+        assert devices == [(None, None)]
+
+        conn.execute("DELETE FROM eds_files WHERE product_code IS NULL AND minor_revision = 1")
+        refresh_device_index(conn.cursor(), devices)
+        rows = index_rows(conn)
+        assert len(rows) == 1 and rows[0][5] == first and rows[0][INDEX_COLUMNS.index('is_latest_revision')] == 1
+
+    def test_ensure_builds_missing_index(self, conn):
+        add_file(conn, 1, 10, 1, 0, 1)
+        conn.execute("DELETE FROM eds_device_index")
+        ensure_device_index(conn)
+        assert len(index_rows(conn)) == 1
+
+    def test_variant_info(self):
+        assert variant_info(3, 1, 0, 1) == {
+            "variant_label": "Extended", "assembly_count": 3, "features": ["OPC-UA", "JSON"],
+            "feature_set": "OPC-UA, JSON",
+        }
+        assert variant_info(0)["feature_set"] == "Basic"
@@ -0,0 +1,171 @@
+"""
+Unit Tests for EDS Lexer (src/parsers/eds_lexer)
+=================================================
+
+Tests single-pass tokenization of EDS entries and the EDSParser getters that
+read from the token stream.
+"""
+
+import hashlib
+import pickle
+
+import pytest
+
+from src.parsers.eds_advanced_sections import EDSAdvancedSectionsParser
+from src.parsers.eds_lexer import EDSTokenStream, split_fields
+from src.parsers.eds_parser import EDSParser, parse_eds_file
+
+SAMPLE_EDS = """$ EDS file for test device
+
+[Device]
+        VendCode = 42;
+        VendName = "ACME $ Co";     $ dollar inside quotes is text
+        ProdName = "Widget 100"
+        Catalog = "W-100";
+        IconContents =
+                "AAAB"
+                "CCDD"
+                ;
+
+[Params]
+        Param1 =
+                0,                      $ reserved
+                6,"20 01 24 01 30 03",  $ path
+                0x0000,                 $ descriptor
+                0xC7,                   $ data type
+                2,                      $ data size
+                "Speed; max",           $ name
+                "rpm",                  $ units
+                "Motor speed, in rpm",  $ help; not a terminator
+                0,1500,750;             $ min, max, default
+        Enum1 =
+                0, "Off (default)",
+                1, "On";
+        Param2 = 0,,,0x0000,0xC6,1,"Mode","","",0,3,1;  Param3 = 0;
+
+[Connection Manager]
+        Connection1 =
+                0x04010002,             $ trigger & transport
+                0x44640405,             $ connection parameters
+                ,,,                     $ O->T
+                ,,,                     $ T->O
+                ,,
+                ,,
+                "Exclusive Owner";
+
+[DLR Class]
+        Revision = 3;
+        Object_Name = "Device Level Ring Object";
+        Object_Class_Code = 0x47;
+"""
+
+
+@pytest.fixture
+def tokens():
+    return EDSTokenStream.tokenize(SAMPLE_EDS)
+
+
+class TestTokenize:
+    """Test entry boundaries, quoting and comments."""
+
+    def test_sections_match_raw_text(self, tokens):
+        assert list(tokens.sections) == ['Device', 'Params', 'Connection Manager', 'DLR Class']
+        assert tokens.sections['DLR Class'].splitlines()[0].strip() == 'Revision = 3;'
+
+    def test_quoted_terminators_and_comments_are_text(self, tokens):
+        param = dict(tokens.numbered('Params', 'Param'))[1]
+        assert param.fields[6] == '"Speed; max"'
+        assert param.values[8] == 'Motor speed, in rpm'
+        assert param.values[-3:] == ['0', '1500', '750']
+        assert tokens.key_values('Device')['VendName'] == '"ACME $ Co"'
+
+    def test_line_numbers_and_entries_on_one_line(self, tokens):
+        params = [(number, entry.line) for number, entry in tokens.numbered('Params', 'Param')]
+        assert params == [(1, 14), (2, 27), (3, 27)]
+
+    def test_missing_terminator_ends_at_next_key(self, tokens):
+        device = {entry.key: entry for entry in tokens.section_entries('Device')}
+        assert device['ProdName'].terminated is False
+        assert device['ProdName'].value == '"Widget 100"'
+        assert device['Catalog'].value == '"W-100"'
+
+    def test_multiline_value_keeps_lines(self, tokens):
+        assert tokens.key_values('Device')['IconContents'] == '"AAAB"\n"CCDD"'
+
+    def test_sections_tokenized_on_first_read(self, tokens):
+        # Reading a later section first still gives file line numbers
+        assert [(entry.key, entry.line) for entry in tokens.section_entries('DLR Class')] == [
+            ('Revision', 40), ('Object_Name', 41), ('Object_Class_Code', 42),
+        ]
+        assert tokens.section_entries('Missing') == []
+        assert tokens.entries['DLR Class'] == tokens.section_entries('DLR Class')
+
+    def test_split_fields(self):
+        assert split_fields('1, "a, b" ,,"c"') == ['1', '"a, b"', '', '"c"']
+        assert split_fields('1, 2') == ['1', '2']
+
+
+class TestParserGetters:
+    """Test EDSParser getters reading from the token stream."""
+
+    def test_parameters_and_enums(self):
+        parser = EDSParser(SAMPLE_EDS)
+        params = parser.get_parameters()
+        assert [p['param_number'] for p in params] == [1, 2, 3]
+        assert params[0]['param_name'] == 'Speed; max'
+        assert params[0]['help_string_1'] == 'Motor speed, in rpm'
+        assert params[0]['data_type'] == 0xC7
+        # Missing trailing fields fall back to the defaults
+        assert params[2]['param_name'] == 'Param3'
+        assert (params[2]['units'], params[2]['min_value'], params[2]['decimal_places']) == ('', None, None)
+        assert parser.get_enums() == {1: [
+            {'value': 0, 'label': 'Off', 'is_default': True},
+            {'value': 1, 'label': 'On', 'is_default': False},
+        ]}
+
+    def test_connection_line_comments(self):
+        connection = EDSParser(SAMPLE_EDS).get_connections()[0]
+        assert connection['trigger_transport'] == '0x04010002'
+        assert connection['trigger_transport_comment'] == 'trigger & transport'
+        assert connection['connection_name'] == 'Exclusive Owner'
+
+    def test_device_icon(self):
+        device = EDSParser(SAMPLE_EDS).get_device_info()
+        assert device['vendor_code'] == 42
+        assert device['icon_data'] is not None
+
+    def test_advanced_sections_share_tokens(self):
+        parser = EDSParser(SAMPLE_EDS)
+        shared = EDSAdvancedSectionsParser(parser.sections, parser.tokens).parse_dlr_class()
+        standalone = EDSAdvancedSectionsParser(parser.sections).parse_dlr_class()
+        assert shared == standalone
+        assert shared['object_class_code'] == 0x47
+
+
+class TestParseResult:
+    """Test the lazily derived parse_eds_file result."""
+
+    def test_derived_keys(self):
+        content = SAMPLE_EDS.replace('"rpm"', '"°C"')
+        parsed, _ = parse_eds_file(content, 'sample.eds')
+
+        assert parsed.source == content.encode()
+        assert parsed['eds_content'] == content
+        assert parsed['all_sections'] == EDSParser(content).get_all_sections()
+        assert parsed['checksum'] == parsed['source']['checksum_md5'] == hashlib.md5(content.encode()).hexdigest()
+        assert parsed['source']['file_hash'] == hashlib.sha256(content.encode()).hexdigest()
+        assert {'eds_content', 'all_sections', 'parameters'} <= set(parsed)
+        assert len(parsed) == len(dict(parsed))
+
+    def test_pickles_without_derived_values(self):
+        parsed, _ = parse_eds_file(SAMPLE_EDS)
+        restored = pickle.loads(pickle.dumps(parsed))
+        assert dict(restored) == dict(parsed)
+        assert 'eds_content' not in restored._data
+
+    def test_advanced_sections_from_same_parse(self):
+        parsed, _ = parse_eds_file(SAMPLE_EDS, advanced_sections=True)
+        parser = EDSParser(SAMPLE_EDS)
+        assert parsed['advanced_sections'] == EDSAdvancedSectionsParser(parser.sections).parse_all_advanced_sections()
+        assert parsed['advanced_sections']['dlr_config']['object_class_code'] == 0x47
+        assert 'advanced_sections' not in parse_eds_file(SAMPLE_EDS)[0]
@@ -0,0 +1,86 @@
+"""
+Unit Tests for EDS Package Parsing (src/parsers/eds_package_parser)
+====================================================================
+
+Tests that package parsing gives the same, deterministically ordered result
+whether EDS files are parsed in-process or over a (spawned) worker pool.
+"""
+
+import zipfile
+
+import pytest
+
+from src.parsers import eds_package_parser
+from src.parsers.eds_package_parser import EDSPackageParser
+
+EDS_TEMPLATE = """[File]
+        DescText = "Package test";
+[Device]
+        VendCode = 42;
+        VendName = "ACME";
+        ProdCode = {code};
+        ProdName = "Widget {code}";
+[Params]
+        Param1 = 0,,,0x0000,0xC7,2,"Speed","rpm","",0,1500,750;
+"""
+
+
+@pytest.fixture
+def package_zip(tmp_path):
+    path = tmp_path / "ACME_Widget.zip"
+    with zipfile.ZipFile(path, 'w') as zf:
+        for index, folder in enumerate(['EDS/01_ODVA_Certified/V1.0', 'EDS/01_ODVA_Certified/V1.2',
+                                        'EDS/02_Manufacturer_1/V2.0']):
+            for code in (1, 2):
+                zf.writestr(f'{folder}/widget_{code}.eds', EDS_TEMPLATE.format(code=100 * index + code))
+            zf.writestr(f'{folder}/widget.ico', f'icon {index}'.encode())
+        zf.writestr('EDS/Readme.txt', 'Package readme')
+        zf.writestr('EDS/logo.png', b'PNG')
+    return str(path)
+
+
+def summary(result):
+    return [
+        (info['file_path'], info['variant_type'], info['version_folder'], info['icon_data'],
+         info['parsed_data']['device']['product_code'])
+        for info in result['eds_files']
+    ]
+
+
+class TestParsePackage:
+    """Test serial and pooled package parsing."""
+
+    def test_pool_matches_serial(self, package_zip):
+        serial = EDSPackageParser(package_zip, workers=1).parse_package()
+        pooled = EDSPackageParser(package_zip, workers=2).parse_package()
+
+        assert serial['parse_timings']['workers'] == 1
+        assert pooled['parse_timings']['workers'] == 2
+        assert summary(pooled) == summary(serial)
+        assert [info['file_path'] for info in serial['eds_files']] == sorted(
+            info['file_path'] for info in serial['eds_files'])
+
+    def test_icons_metadata_and_timings(self, package_zip):
+        result = EDSPackageParser(package_zip, workers=1).parse_package()
+
+        assert result['total_eds_files'] == 6
+        assert result['versions'] == ['V1.0', 'V1.2', 'V2.0']
+        assert summary(result)[0][3] == b'icon 0'
+        assert summary(result)[-1][3] == b'icon 2'
+        assert result['readme_content'] == 'Package readme'
+        assert sorted(m['file_type'] for m in result['metadata_files']) == ['image', 'readme']
+        assert [t['file_path'] for t in result['parse_timings']['files']] == [
+            info['file_path'] for info in result['eds_files']]
+        assert all(t['parse_ms'] >= 0 and t['error'] is None for t in result['parse_timings']['files'])
+
+    def test_pool_spawns_workers(self, package_zip, monkeypatch):
+        contexts = []
+        real_executor = eds_package_parser.ProcessPoolExecutor
+
+        def executor(**kwargs):
+            contexts.append(kwargs['mp_context'].get_start_method())
+            return real_executor(**kwargs)
+
+        monkeypatch.setattr(eds_package_parser, "ProcessPoolExecutor", executor)
+        EDSPackageParser(package_zip, workers=2).parse_package()
+        assert contexts == ['spawn']
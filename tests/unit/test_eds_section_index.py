@@ -0,0 +1,173 @@
+"""
+Unit Tests for EDS Section Index (src/parsers/eds_section_index)
+=================================================================
+
+Tests that the tokenized index matches configparser and the raw section
+extraction previously done with regex rescans, and the stored index being
+reused only while its content hash matches.
+"""
+
+import configparser
+import re
+import sqlite3
+
+import pytest
+
+from src.parsers.eds_section_index import EDSSectionIndex, load_section_index, save_section_index
+
+SAMPLE_EDS = """$ EDS file for test device
+$ generated
+
+[File]
+        DescText = "Test Device EDS";
+        CreateDate = 01-15-2024;
+        CreateTime = 10:30:00;
+        Revision = 1.2;
+        HomeURL = "http://example.com/eds";
+
+[Device]
+        VendCode = 42;
+        VendName = "ACME";
+        ProdType = 12;
+        ProdTypeStr = "Communications Adapter";
+        ProdCode = 100;
+        MajRev = 1;
+        MinRev = 2;
+        ProdName = "Widget 100";
+        Catalog = "W-100";
+        Icon = "w100.ico";
+
+[Device Classification]
+        Class1 = EtherNetIP;
+
+[Params]
+        Num_Params = 2;
+        Param1 =
+                0,                      $ reserved
+                6,"20 01 24 01 30 03",  $ path
+                0x0000,                 $ descriptor
+                0xC7,                   $ data type
+                2,                      $ data size
+                "Speed",                $ name
+                "rpm",                  $ units
+                "Motor speed",          $ help
+
+                0,1500,750;             $ min, max, default
+        Enum1 =
+                0, "Off",
+                1, "On";
+        Param2 = 0,,,0x0000,0xC6,1,"Mode","","",0,3,1;
+
+[Assembly]
+        Assem100 = "Input", "20 04 24 64 30 03", 32,,,
+                Param1;
+        Assem150 = "Output",,4,0x0000,,;
+
+[Connection Manager]
+        Connection1 =
+                0x04010002,0x44640405,,,,,,,"Exclusive Owner";
+  [Port]
+        Port1 = TCP, "EtherNet/IP", "20 F5 24 01", 1;
+[Capacity]
+        MaxIOConnections = 4;
+        TSpec1 = TxRx, 32, 100;
+[Params]
+        Param3 = 1,2,3;
+        Param1 = overridden;
+"""
+
+
+def configparser_view(content):
+    """Key/value view produced by the previous configparser-based diff path."""
+    config = configparser.ConfigParser(
+        allow_no_value=True,
+        strict=False,
+        comment_prefixes=('$',),
+        interpolation=None
+    )
+    config.optionxform = str
+    try:
+        config.read_string(content)
+    except configparser.Error:
+        return {}
+    return {section: dict(config[section]) for section in config.sections()}
+
+
+def regex_section(content, name):
+    """Raw section extraction previously done by EDSReconstructor."""
+    match = re.search(rf'\[{re.escape(name)}\](.*?)(?=\n\[|\Z)', content, re.DOTALL)
+    return match.group(0).rstrip() if match else None
+
+
+class TestTokenize:
+    """Test tokenization against configparser."""
+
+    @pytest.mark.parametrize("content", [
+        SAMPLE_EDS,
+        SAMPLE_EDS.replace('\n', '\r\n'),
+        "junk before header\n" + SAMPLE_EDS,
+        SAMPLE_EDS.replace('Num_Params', '= Num_Params'),
+    ])
+    def test_matches_configparser(self, content):
+        assert EDSSectionIndex.tokenize(content).as_dict() == configparser_view(content)
+
+    def test_duplicate_sections_merge(self):
+        params = EDSSectionIndex.tokenize(SAMPLE_EDS).as_dict()['Params']
+        assert list(params)[:3] == ['Num_Params', 'Param1', 'Enum1']
+        assert params['Param1'] == 'overridden;'
+        assert params['Param3'] == '1,2,3;'
+
+    def test_entries_keep_source_offsets(self):
+        index = EDSSectionIndex.tokenize(SAMPLE_EDS)
+        for key, _, offset in index.iter_entries('Device'):
+            assert SAMPLE_EDS[offset:].lstrip().startswith(key)
+
+
+class TestRawSection:
+    """Test verbatim section extraction."""
+
+    @pytest.mark.parametrize("name", ['File', 'Params', 'Assembly', 'Port', 'Capacity', 'Missing'])
+    def test_matches_regex_extraction(self, name):
+        index = EDSSectionIndex.tokenize(SAMPLE_EDS)
+        assert index.raw_section(SAMPLE_EDS, name) == regex_section(SAMPLE_EDS, name)
+
+
+class TestSerialization:
+    """Test compact storage round trip."""
+
+    def test_round_trip(self):
+        index = EDSSectionIndex.tokenize(SAMPLE_EDS)
+        restored = EDSSectionIndex.from_bytes(index.to_bytes())
+        assert restored.as_dict() == index.as_dict()
+        assert restored.raw_section(SAMPLE_EDS, 'Assembly') == index.raw_section(SAMPLE_EDS, 'Assembly')
+        assert len(index.to_bytes()) < len(SAMPLE_EDS)
+
+
+class TestStoredIndex:
+    """Test loading the index stored at upload."""
+
+    @pytest.fixture
+    def conn(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("""
+            CREATE TABLE eds_section_index (
+                eds_file_id INTEGER PRIMARY KEY, format_version INTEGER NOT NULL,
+                content_hash VARCHAR(64), index_data BLOB NOT NULL
+            )
+        """)
+        yield conn
+        conn.close()
+
+    def test_reused_while_content_hash_matches(self, conn):
+        save_section_index(conn.cursor(), 1, SAMPLE_EDS)
+        stored = load_section_index(conn, 1, SAMPLE_EDS)
+        assert stored.as_dict() == EDSSectionIndex.tokenize(SAMPLE_EDS).as_dict()
+
+        changed = SAMPLE_EDS.replace('Widget 100', 'Widget 200')
+        assert load_section_index(conn, 1, changed).as_dict()['Device']['ProdName'] == '"Widget 200";'
+
+    def test_load_never_writes(self, conn):
+        assert load_section_index(conn, 1) is None
+        assert load_section_index(conn, 1, SAMPLE_EDS).section_names()[0] == 'File'
+        assert conn.execute("SELECT COUNT(*) FROM eds_section_index").fetchone()[0] == 0
+        assert not conn.in_transaction
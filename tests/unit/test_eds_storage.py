@@ -0,0 +1,135 @@
+"""
+Unit Tests for EDS Storage (src/storage/eds)
+=============================================
+
+Tests that bulk EDS savers store every child row of a parsed EDS file and
+link enum values to the right parameters.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.parsers.eds_parser import parse_eds_file
+from src.storage.eds import save_eds_details
+
+SCHEMA = """
+CREATE TABLE eds_files (
+    id INTEGER PRIMARY KEY, diagnostic_info_count INTEGER, diagnostic_warn_count INTEGER,
+    diagnostic_error_count INTEGER, diagnostic_fatal_count INTEGER, has_parsing_issues BOOLEAN
+);
+CREATE TABLE eds_parameters (
+    id INTEGER PRIMARY KEY, eds_file_id, param_number, param_name, data_type, data_size,
+    default_value, min_value, max_value, description, link_path_size, link_path, descriptor,
+    help_string_1, help_string_2, help_string_3, enum_values, units, scaling_multiplier,
+    scaling_divisor, scaling_base, scaling_offset, link_scaling_multiplier, link_scaling_divisor,
+    link_scaling_base, link_scaling_offset, decimal_places
+);
+CREATE TABLE eds_enum_values (
+    id INTEGER PRIMARY KEY, parameter_id, enum_name, enum_value, enum_display, is_default
+);
+CREATE TABLE eds_connections (
+    id INTEGER PRIMARY KEY, eds_file_id, connection_number, connection_name, trigger_transport,
+    connection_params, output_assembly, input_assembly, help_string, o_to_t_params, t_to_o_params,
+    config_part1, config_part2, path, trigger_transport_comment, connection_params_comment
+);
+CREATE TABLE eds_assemblies (
+    id INTEGER PRIMARY KEY, eds_file_id, assembly_number, assembly_name, assembly_type,
+    unknown_field1, size, unknown_field2, path, help_string, is_variable
+);
+CREATE TABLE eds_variable_assemblies (
+    id INTEGER PRIMARY KEY, eds_file_id, assembly_name, assembly_number, unknown_value1, max_size, description
+);
+CREATE TABLE eds_ports (
+    id INTEGER PRIMARY KEY, eds_file_id, port_number, port_type, port_name, port_path, link_number
+);
+CREATE TABLE eds_modules (
+    id INTEGER PRIMARY KEY, eds_file_id, module_number, module_name, device_type, catalog_number,
+    major_revision, minor_revision, config_size, config_data, input_size, output_size,
+    module_description, slot_number, module_class, vendor_code, product_code, raw_definition
+);
+CREATE TABLE eds_groups (
+    id INTEGER PRIMARY KEY, eds_file_id, group_number, group_name, parameter_count, parameter_list
+);
+CREATE TABLE eds_capacity (
+    id INTEGER PRIMARY KEY, eds_file_id, max_msg_connections, max_io_producers, max_io_consumers,
+    max_cx_per_config_tool
+);
+CREATE TABLE eds_tspecs (
+    id INTEGER PRIMARY KEY, eds_file_id, tspec_name, direction, data_size, rate
+);
+CREATE TABLE eds_diagnostics (
+    id INTEGER PRIMARY KEY, eds_file_id, severity, code, message, section, line, column, context, created_at
+);
+"""
+
+EDS = """[File]
+        DescText = "Storage test";
+[Device]
+        VendCode = 42;
+        VendName = "ACME";
+        ProdCode = 7;
+        ProdName = "Widget";
+[Params]
+        Param1 = 0,,,0x0000,0xC7,2,"Speed","rpm","",0,1500,750;
+        Param2 = 0,,,0x0000,0xC6,1,"Mode","","",0,2,0;
+        Enum2 = 0,"Off (default)", 1,"On", 2,"Auto";
+        Param3 = 0,,,0x0000,0xC6,1,"Level","","",0,1,0;
+        Enum3 = 0,"Low", 1,"High";
+[Assembly]
+        Assem100 = "Input", 0x64, , 0x0020, , "20 04 24 64 30 03";
+        AssemExa134 = 34, 32, "IO-Link Process Data";
+[Port]
+        Port1 = TCP, "EtherNet/IP", "20 F5 24 01", 1;
+[Groups]
+        Group1 = "Main", 2, 1,2;
+[Capacity]
+        MaxIOConnections = 4;
+        TSpec1 = TxRx, 32, 100;
+"""
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SCHEMA)
+    yield conn.cursor()
+    conn.close()
+
+
+def count(cursor, table):
+    return cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestSaveEDSDetails:
+    """Test bulk storage of a parsed EDS file."""
+
+    def test_rows_per_table(self, cursor):
+        parsed, diagnostics = parse_eds_file(EDS)
+        cursor.execute("INSERT INTO eds_files (id) VALUES (1)")
+
+        rows = save_eds_details(cursor, 1, parsed, diagnostics)
+
+        assert rows['parameters'] == count(cursor, 'eds_parameters') + count(cursor, 'eds_enum_values') == 3 + 5
+        assert count(cursor, 'eds_assemblies') == count(cursor, 'eds_variable_assemblies') == 1
+        assert count(cursor, 'eds_ports') == count(cursor, 'eds_groups') == 1
+        assert count(cursor, 'eds_capacity') == count(cursor, 'eds_tspecs') == 1
+        assert rows['diagnostics'] == count(cursor, 'eds_diagnostics')
+        assert cursor.execute("SELECT diagnostic_info_count FROM eds_files").fetchone()[0] is not None
+
+    def test_enum_values_link_to_their_parameter(self, cursor):
+        # Rows of an earlier file must not shift the parameter IDs of the next one
+        for eds_file_id in (1, 2):
+            parsed, _ = parse_eds_file(EDS)
+            cursor.execute("INSERT INTO eds_files (id) VALUES (?)", (eds_file_id,))
+            save_eds_details(cursor, eds_file_id, parsed)
+
+        linked = cursor.execute("""
+            SELECT p.eds_file_id, p.param_number, e.enum_name, e.enum_value, e.enum_display, e.is_default
+            FROM eds_enum_values e JOIN eds_parameters p ON p.id = e.parameter_id
+            WHERE p.eds_file_id = 2 ORDER BY e.id
+        """).fetchall()
+        assert linked == [
+            (2, 2, 'Enum2', 0, 'Off', 1), (2, 2, 'Enum2', 1, 'On', 0), (2, 2, 'Enum2', 2, 'Auto', 0),
+            (2, 3, 'Enum3', 0, 'Low', 0), (2, 3, 'Enum3', 1, 'High', 0),
+        ]
@@ -5,6 +5,9 @@ Unit Tests for Data Models (src/models)
 Tests all dataclass models and enums used throughout the application.
 """
 
+import dataclasses
+import sys
+
 import pytest
 from datetime import datetime
 
@@ -32,6 +35,8 @@ from src.models import (
     CustomDatatype,
     Constraint,
     DeviceVariant,  # Changed from ProductVariant
+    RecordItem,
+    SingleValue,
 )
 
 
@@ -480,3 +485,30 @@ class TestDeviceProfile:
         assert len(profile.events) == 1
         assert profile.device_features.block_parameter is True
         assert profile.communication_profile.profile_type == "IOLink"
+
+
+class TestSlottedModels:
+    """Test __slots__ and string interning of the models."""
+
+    def test_no_instance_dict(self):
+        """Models only accept their declared fields."""
+        value = SingleValue("1", "On")
+        assert not hasattr(value, "__dict__")
+        with pytest.raises(AttributeError):
+            value.undeclared = True
+
+    def test_repeated_strings_are_interned(self):
+        """Identifier-like fields share one string object."""
+        text_id = "".join(["TI_", "Item"])
+        item = RecordItem(1, "Item", 0, 8, "".join(["UInteger", "T"]), name_text_id=text_id)
+        assert item.data_type is sys.intern("UIntegerT")
+        assert item.name_text_id is sys.intern("TI_Item")
+        assert item.name == "Item"
+
+    def test_dataclass_helpers_still_work(self):
+        """asdict and replace keep working for savers and generators."""
+        param = Parameter("V_1", 64, None, "Level", IODDDataType.UNSIGNED_INTEGER, AccessRights.READ_WRITE,
+                          record_item_info=[{"subindex": 1}])
+        assert dataclasses.asdict(param)["record_item_info"] == [{"subindex": 1}]
+        assert dataclasses.replace(param, name="Limit").name == "Limit"
+        assert Parameter("V_2", 65, None, "Other", IODDDataType.BOOLEAN, AccessRights.READ_ONLY).record_item_info == []
@@ -0,0 +1,141 @@
+"""
+Unit Tests for PQA Dashboard Aggregates (src/utils/pqa_dashboard)
+==================================================================
+
+Tests that incrementally maintained aggregates match a full rebuild from the
+base PQA tables.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils.pqa_dashboard import (
+    TABLES, check_dashboard_aggregates, ensure_dashboard_aggregates, load_totals,
+    rebuild_dashboard_aggregates, record_analysis, removing_analyses
+)
+
+BASE_SCHEMA = """
+CREATE TABLE pqa_quality_metrics (
+    id INTEGER PRIMARY KEY, device_id INTEGER NOT NULL, file_type TEXT,
+    analysis_timestamp DATETIME, overall_score FLOAT NOT NULL,
+    passed_threshold BOOLEAN, critical_data_loss BOOLEAN,
+    phase1_score FLOAT, phase2_score FLOAT, phase3_score FLOAT, phase4_score FLOAT, phase5_score FLOAT
+);
+CREATE TABLE pqa_diff_details (
+    id INTEGER PRIMARY KEY, metric_id INTEGER NOT NULL, diff_type TEXT NOT NULL,
+    severity TEXT NOT NULL, xpath TEXT NOT NULL, expected_value TEXT, actual_value TEXT,
+    description TEXT, phase TEXT
+);
+"""
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(BASE_SCHEMA)
+    for table, (keys, values) in TABLES.items():
+        conn.execute(f"CREATE TABLE {table} ({', '.join(keys + values)}, PRIMARY KEY ({', '.join(keys)}))")
+    yield conn
+    conn.close()
+
+
+def save_analysis(conn, device_id, file_type, score, day, diffs=()):
+    """Insert an analysis like the orchestrator does and record it"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO pqa_quality_metrics (device_id, file_type, analysis_timestamp, overall_score,
+                                         passed_threshold, critical_data_loss, phase1_score, phase2_score)
+        VALUES (?, ?, ?, ?, ?, 0, ?, NULL)
+    """, (device_id, file_type, f"2026-03-{day:02d} 12:00:00", score, score >= 95, score))
+    metric_id = cursor.lastrowid
+    cursor.executemany("""
+        INSERT INTO pqa_diff_details (metric_id, diff_type, severity, xpath, expected_value, description)
+        VALUES (?, ?, ?, ?, ?, 'diff')
+    """, [(metric_id, diff_type, severity, xpath, f'{xpath}-{metric_id}') for diff_type, severity, xpath in diffs])
+    record_analysis(cursor, metric_id)
+    conn.commit()
+    return metric_id
+
+
+def delete_analyses(conn, metric_ids, diffs_only=False):
+    cursor = conn.cursor()
+    marks = ','.join('?' * len(metric_ids))
+    with removing_analyses(cursor, metric_ids, diffs_only=diffs_only):
+        cursor.execute(f"DELETE FROM pqa_diff_details WHERE metric_id IN ({marks})", metric_ids)
+        if not diffs_only:
+            cursor.execute(f"DELETE FROM pqa_quality_metrics WHERE id IN ({marks})", metric_ids)
+    conn.commit()
+
+
+MISSING = ('missing_element', 'HIGH', '/IODevice/A')
+WRONG = ('incorrect_attribute', 'LOW', '/IODevice/B')
+
+
+class TestIncrementalMaintenance:
+    """Test that incremental updates match a full rebuild."""
+
+    def test_not_recorded_until_built(self, conn):
+        save_analysis(conn, 1, 'IODD', 90.0, 1, [MISSING])
+        assert conn.execute("SELECT COUNT(*) FROM pqa_dashboard_totals").fetchone()[0] == 0
+
+        ensure_dashboard_aggregates(conn)
+        assert load_totals(conn)['total_analyses'] == 1
+        assert check_dashboard_aggregates(conn) == []
+
+    def test_inserts_and_deletes_stay_consistent(self, conn):
+        ensure_dashboard_aggregates(conn)
+        first = save_analysis(conn, 1, 'IODD', 100.0, 1, [MISSING, WRONG])
+        second = save_analysis(conn, 1, 'IODD', 99.95, 2, [MISSING])
+        eds = save_analysis(conn, 1, 'EDS', 80.0, 2, [MISSING, MISSING])
+        save_analysis(conn, 2, None, 96.0, 3)
+        assert check_dashboard_aggregates(conn) == []
+
+        totals = load_totals(conn)
+        assert totals['total_analyses'] == 4
+        assert totals['devices_analyzed'] == 2  # device ids are shared across file types
+        assert totals['diff_total'] == 5
+        assert totals['bucket_perfect'] == 1 and totals['bucket_near_perfect'] == 1
+        assert load_totals(conn, 'EDS')['devices_analyzed'] == 1
+
+        delete_analyses(conn, [first], diffs_only=True)
+        assert check_dashboard_aggregates(conn) == []
+        delete_analyses(conn, [second, eds])
+        assert check_dashboard_aggregates(conn) == []
+
+        assert load_totals(conn, 'IODD')['diff_devices'] == 0
+        assert load_totals(conn, 'EDS')['total_analyses'] == 0
+        assert conn.execute("SELECT COUNT(*) FROM pqa_dashboard_xpath_patterns").fetchone()[0] == 0
+        assert conn.execute("SELECT day FROM pqa_dashboard_daily WHERE scope = 'ALL' ORDER BY day").fetchall() == [
+            ('2026-03-01',), ('2026-03-03',)
+        ]
+
+    def test_pattern_examples_follow_remaining_rows(self, conn):
+        ensure_dashboard_aggregates(conn)
+        first = save_analysis(conn, 1, 'IODD', 90.0, 1, [MISSING])
+        save_analysis(conn, 2, 'IODD', 90.0, 1, [MISSING])
+
+        delete_analyses(conn, [first])
+
+        row = conn.execute("""
+            SELECT occurrences, device_ids, example_expected FROM pqa_dashboard_xpath_patterns
+            WHERE scope = 'IODD'
+        """).fetchone()
+        assert row == (1, '2', '/IODevice/A-2')
+
+
+class TestRebuildAndCheck:
+    """Test rebuild and drift detection."""
+
+    def test_check_reports_drift_and_rebuild_fixes_it(self, conn):
+        ensure_dashboard_aggregates(conn)
+        save_analysis(conn, 1, 'IODD', 90.0, 1, [MISSING])
+        conn.execute("UPDATE pqa_dashboard_totals SET total_analyses = 7 WHERE scope = 'IODD'")
+        conn.execute("DELETE FROM pqa_dashboard_daily")
+
+        problems = check_dashboard_aggregates(conn)
+        assert any(p.startswith("pqa_dashboard_totals ('IODD',)") for p in problems)
+        assert any(p.startswith("pqa_dashboard_daily") and 'missing' in p for p in problems)
+
+        rebuild_dashboard_aggregates(conn)
+        assert check_dashboard_aggregates(conn) == []
@@ -0,0 +1,163 @@
+"""
+Unit Tests for PQA Retention (src/utils/pqa_retention)
+=======================================================
+
+Tests history trimming, diff compaction and archive cleanup for PQA tables.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils.pqa_retention import RetentionPolicy, apply_retention, compact_pqa_tables
+
+SCHEMA = """
+CREATE TABLE pqa_file_archive (
+    id INTEGER PRIMARY KEY, device_id INTEGER NOT NULL, file_type TEXT NOT NULL,
+    file_content BLOB
+);
+CREATE TABLE pqa_quality_metrics (
+    id INTEGER PRIMARY KEY, device_id INTEGER NOT NULL, archive_id INTEGER NOT NULL,
+    file_type TEXT, analysis_timestamp DATETIME, overall_score FLOAT
+);
+CREATE TABLE pqa_diff_details (
+    id INTEGER PRIMARY KEY, metric_id INTEGER NOT NULL, diff_type TEXT NOT NULL,
+    severity TEXT NOT NULL, xpath TEXT NOT NULL, phase TEXT
+);
+CREATE TABLE pqa_diff_summary (
+    id INTEGER PRIMARY KEY, metric_id INTEGER NOT NULL, diff_type TEXT NOT NULL,
+    severity TEXT NOT NULL, phase TEXT, diff_count INTEGER NOT NULL
+);
+CREATE TABLE pqa_analysis_queue (
+    id INTEGER PRIMARY KEY, device_id INTEGER NOT NULL, archive_id INTEGER NOT NULL,
+    status TEXT NOT NULL, metric_id INTEGER
+);
+"""
+
+
+def add_analysis(conn, device_id, file_type, day, diffs=(('missing_element', 'HIGH', 'Phase1_UI'),) * 2):
+    """Insert an analysis with its own archive and diff details; returns the metric id"""
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO pqa_file_archive (device_id, file_type) VALUES (?, ?)",
+                   (device_id, file_type))
+    archive_id = cursor.lastrowid
+    cursor.execute("""
+        INSERT INTO pqa_quality_metrics (device_id, archive_id, file_type, analysis_timestamp, overall_score)
+        VALUES (?, ?, ?, ?, 90.0)
+    """, (device_id, archive_id, file_type, f"2026-01-{day:02d} 00:00:00"))
+    metric_id = cursor.lastrowid
+    cursor.executemany("""
+        INSERT INTO pqa_diff_details (metric_id, diff_type, severity, xpath, phase)
+        VALUES (?, ?, ?, '/x', ?)
+    """, [(metric_id, diff_type, severity, phase) for diff_type, severity, phase in diffs])
+    conn.commit()
+    return metric_id
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pqa.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+def count(conn, sql, params=()):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+class TestRetentionPolicy:
+    """Test policy validation."""
+
+    def test_rejects_invalid_limits(self):
+        with pytest.raises(ValueError):
+            RetentionPolicy(keep_analyses=0)
+        with pytest.raises(ValueError):
+            RetentionPolicy(keep_analyses=2, keep_diff_details=3)
+
+
+class TestApplyRetention:
+    """Test retention for a single file."""
+
+    def test_trims_history_and_compacts_older_diffs(self, db_path):
+        conn = sqlite3.connect(db_path)
+        metric_ids = [add_analysis(conn, 7, 'IODD', day) for day in range(1, 6)]
+
+        stats = apply_retention(conn.cursor(), 7, 'IODD',
+                                RetentionPolicy(keep_analyses=3, keep_diff_details=1))
+        conn.commit()
+
+        newest, second, third = metric_ids[4], metric_ids[3], metric_ids[2]
+        remaining = [row[0] for row in conn.execute("SELECT id FROM pqa_quality_metrics ORDER BY id")]
+        assert remaining == [third, second, newest]
+        assert stats == {'deleted_analyses': 2, 'compacted_diffs': 4, 'deleted_archives': 2}
+
+        # Newest analysis keeps full diffs, older kept analyses only have counts
+        assert count(conn, "SELECT COUNT(*) FROM pqa_diff_details WHERE metric_id = ?", (newest,)) == 2
+        assert count(conn, "SELECT COUNT(*) FROM pqa_diff_details WHERE metric_id != ?", (newest,)) == 0
+        summary = conn.execute("""
+            SELECT metric_id, diff_type, severity, phase, diff_count FROM pqa_diff_summary ORDER BY metric_id
+        """).fetchall()
+        assert summary == [
+            (third, 'missing_element', 'HIGH', 'Phase1_UI', 2),
+            (second, 'missing_element', 'HIGH', 'Phase1_UI', 2),
+        ]
+        assert count(conn, "SELECT COUNT(*) FROM pqa_file_archive") == 3
+        conn.close()
+
+    def test_scoped_to_file_type(self, db_path):
+        conn = sqlite3.connect(db_path)
+        add_analysis(conn, 7, 'IODD', 1)
+        add_analysis(conn, 7, 'IODD', 2)
+        eds_metric = add_analysis(conn, 7, 'EDS', 1)
+
+        apply_retention(conn.cursor(), 7, 'IODD', RetentionPolicy(keep_analyses=1))
+        conn.commit()
+
+        assert count(conn, "SELECT COUNT(*) FROM pqa_quality_metrics WHERE file_type = 'IODD'") == 1
+        assert count(conn, "SELECT COUNT(*) FROM pqa_diff_details WHERE metric_id = ?", (eds_metric,)) == 2
+        assert count(conn, "SELECT COUNT(*) FROM pqa_file_archive WHERE file_type = 'EDS'") == 1
+        conn.close()
+
+    def test_keeps_archives_referenced_by_queue(self, db_path):
+        conn = sqlite3.connect(db_path)
+        add_analysis(conn, 7, 'IODD', 1)
+        add_analysis(conn, 7, 'IODD', 2)
+        oldest_archive = count(conn, "SELECT MIN(id) FROM pqa_file_archive")
+        conn.execute("INSERT INTO pqa_analysis_queue (device_id, archive_id, status) VALUES (7, ?, 'pending')",
+                     (oldest_archive,))
+
+        stats = apply_retention(conn.cursor(), 7, 'IODD', RetentionPolicy(keep_analyses=1))
+
+        assert stats['deleted_analyses'] == 1
+        assert stats['deleted_archives'] == 0
+        conn.close()
+
+
+class TestCompactPqaTables:
+    """Test the database-wide compaction sweep."""
+
+    def test_matches_per_file_retention(self, db_path):
+        conn = sqlite3.connect(db_path)
+        for device_id in (1, 2):
+            for day in range(1, 5):
+                add_analysis(conn, device_id, 'EDS', day)
+        add_analysis(conn, 3, 'EDS', 1)
+        conn.close()
+
+        stats = compact_pqa_tables(db_path, RetentionPolicy(keep_analyses=2, keep_diff_details=1))
+
+        conn = sqlite3.connect(db_path)
+        assert stats == {'deleted_analyses': 4, 'compacted_diffs': 4, 'deleted_archives': 4}
+        assert conn.execute("""
+            SELECT device_id, COUNT(*) FROM pqa_quality_metrics GROUP BY device_id ORDER BY device_id
+        """).fetchall() == [(1, 2), (2, 2), (3, 1)]
+        assert count(conn, "SELECT COUNT(*) FROM pqa_diff_summary") == 2
+        assert count(conn, "SELECT COUNT(DISTINCT metric_id) FROM pqa_diff_details") == 3
+
+        # A second sweep has nothing left to do
+        assert compact_pqa_tables(db_path, RetentionPolicy(keep_analyses=2, keep_diff_details=1)) == {
+            'deleted_analyses': 0, 'compacted_diffs': 0, 'deleted_archives': 0,
+        }
+        conn.close()
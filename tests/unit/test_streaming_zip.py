@@ -0,0 +1,91 @@
+"""
+Unit Tests for the Streaming ZIP Writer (src/utils/streaming_zip)
+==================================================================
+
+Tests that streamed archives round-trip through zipfile, that members are
+read lazily while the archive is produced, and that BLOBs and files are read
+in chunks.
+"""
+
+import io
+import os
+import sqlite3
+import struct
+import zipfile
+
+import pytest
+
+from src.utils.streaming_zip import ZipEntry, iter_blob, iter_zip
+
+
+def unzip(chunks):
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    return {name: archive.read(name) for name in archive.namelist()}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE assets (id INTEGER PRIMARY KEY, content BLOB, text_content TEXT)")
+    yield conn
+    conn.close()
+
+
+class TestIterZip:
+    """Archive layout and laziness"""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "attachment.bin"
+        data = os.urandom(100_000)
+        path.write_bytes(data)
+
+        files = unzip(iter_zip([
+            ZipEntry.from_bytes("readme.txt", "Grüße"),
+            ZipEntry.from_file("T-1/attachment.bin", path, chunk_size=4096),
+            ZipEntry("empty.txt", iter(())),
+        ]))
+
+        assert files == {"readme.txt": "Grüße".encode(), "T-1/attachment.bin": data, "empty.txt": b""}
+
+    def test_members_are_read_lazily(self):
+        reads = []
+
+        def chunks():
+            for index in range(3):
+                reads.append(index)
+                yield os.urandom(50_000)
+
+        stream = iter_zip([ZipEntry("data.bin", chunks())], compression=zipfile.ZIP_STORED)
+        first = next(stream)
+
+        assert first.startswith(b"PK\x03\x04") and reads == [0]
+        rest = list(stream)
+        assert reads == [0, 1, 2]
+        assert len(unzip([first] + rest)["data.bin"]) == 150_000
+
+    def test_large_members_use_zip64(self):
+        entry = ZipEntry("huge.bin", iter([b"x"]), size=5 * 2 ** 30)
+        data = b"".join(iter_zip([entry]))
+        # The local header carries a ZIP64 extra field (header id 0x0001) after the name
+        name_length, extra_length = struct.unpack("<HH", data[26:30])
+        assert extra_length and data[30 + name_length:32 + name_length] == b"\x01\x00"
+        assert unzip([data]) == {"huge.bin": b"x"}
+
+
+class TestBlobs:
+    """Chunked BLOB reads"""
+
+    def test_blob_and_text_chunks(self, conn):
+        data = os.urandom(10_000)
+        conn.execute("INSERT INTO assets (id, content, text_content) VALUES (1, ?, 'Grüße')", (data,))
+
+        chunks = list(iter_blob(conn, "assets", "content", 1, chunk_size=4096))
+        assert b"".join(chunks) == data
+        assert len(chunks) == (3 if hasattr(conn, "blobopen") else 1)
+        assert b"".join(iter_blob(conn, "assets", "text_content", 1)) == "Grüße".encode()
+
+    def test_blob_entry(self, conn):
+        conn.execute("INSERT INTO assets (id, content) VALUES (7, ?)", (b"<xml/>",))
+        files = unzip(iter_zip([ZipEntry.from_blob(conn, "assets", "content", 7, "device.xml", 6)]))
+        assert files == {"device.xml": b"<xml/>"}
@@ -0,0 +1,128 @@
+"""
+Unit Tests for Row Counters and the Statistics Refresher
+========================================================
+
+Tests trigger-maintained row counts (src/utils/table_counters), their
+reconciliation, and the cached reports of src/utils/system_stats.
+"""
+
+import sqlite3
+
+import pytest
+
+from src.utils import system_stats
+from src.utils.system_stats import StatsRefresher
+from src.utils.table_counters import install_row_counters, read_row_counts, reconcile_row_counts
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "counters.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY AUTOINCREMENT, import_date TIMESTAMP);
+        CREATE TABLE parameters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            device_id INTEGER,
+            FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE
+        );
+        INSERT INTO devices DEFAULT VALUES;
+        INSERT INTO parameters (device_id) VALUES (1), (1);
+    """)
+    install_row_counters(conn.cursor())
+    conn.commit()
+    conn.close()
+    return path
+
+
+def counts(db_path, *tables):
+    conn = sqlite3.connect(db_path)
+    try:
+        return read_row_counts(conn.cursor(), tables)
+    finally:
+        conn.close()
+
+
+class TestRowCounters:
+    """Trigger-maintained counts"""
+
+    def test_install_seeds_existing_rows(self, db_path):
+        assert counts(db_path, "devices", "parameters") == {"devices": 1, "parameters": 2}
+
+    def test_inserts_and_cascade_deletes_are_counted(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("INSERT INTO devices DEFAULT VALUES")
+        conn.executemany("INSERT INTO parameters (device_id) VALUES (?)", [(2,)] * 3)
+        conn.commit()
+        assert counts(db_path, "devices", "parameters") == {"devices": 2, "parameters": 5}
+
+        conn.execute("DELETE FROM devices WHERE id = 1")
+        conn.commit()
+        conn.close()
+        assert counts(db_path, "devices", "parameters") == {"devices": 1, "parameters": 3}
+
+    def test_uncounted_and_missing_tables(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE tickets (id INTEGER PRIMARY KEY)")
+        conn.execute("INSERT INTO tickets DEFAULT VALUES")
+        conn.commit()
+        conn.close()
+        assert counts(db_path, "tickets", "eds_files") == {"tickets": 1, "eds_files": 0}
+
+    def test_reconcile_corrects_drift_and_installs_new_tables(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE table_row_counts SET row_count = 40 WHERE table_name = 'parameters'")
+        conn.execute("CREATE TABLE tickets (id INTEGER PRIMARY KEY)")
+        conn.commit()
+
+        assert reconcile_row_counts(db_path) == {"parameters": {"stored": 40, "actual": 2}}
+        conn.execute("INSERT INTO tickets DEFAULT VALUES")
+        conn.commit()
+        conn.close()
+        assert counts(db_path, "parameters", "tickets") == {"parameters": 2, "tickets": 1}
+        assert reconcile_row_counts(db_path) == {}
+
+
+class TestStatsRefresher:
+    """Cached reports"""
+
+    @pytest.fixture
+    def reports(self, monkeypatch):
+        calls = []
+
+        def report(db_path):
+            calls.append(db_path)
+            return {"run": len(calls)}
+
+        monkeypatch.setattr(system_stats, "REPORTS", {"health": report})
+        return calls
+
+    def test_last_result_is_served(self, db_path, reports):
+        refresher = StatsRefresher(db_path, interval=300, reconcile_interval=3600)
+        assert refresher.get("health") == {"run": 1}
+        assert refresher.get("health") == {"run": 1}
+
+        refresher.run_once()
+        assert refresher.get("health") == {"run": 2}
+        assert refresher.last_reconcile is not None
+
+        refresher.discard("health")
+        assert refresher.get("health") == {"run": 3}
+
+    def test_on_demand_without_interval(self, db_path, reports):
+        refresher = StatsRefresher(db_path, interval=0)
+        refresher.start()
+        refresher.get("health")
+        refresher.get("health")
+        assert len(reports) == 2
+
+    def test_reports_on_partially_migrated_database(self, db_path):
+        health = system_stats.build_database_health(db_path)
+        assert health["integrity"] == "ok"
+        assert {"name": "devices", "row_count": 1, "index_count": 0} in health["tables"]
+
+        activity = system_stats.build_activity_snapshot(db_path)
+        assert activity["recent_activity"] == {"iodd_imports": 0, "eds_imports": 0, "new_tickets": 0}
+        assert activity["table_count"] == 3
@@ -0,0 +1,130 @@
+"""
+Unit Tests for Device Text Tables (src/utils/text_table)
+========================================================
+
+Tests building the table from an ExternalTextCollection, lookups in both
+directions, the iodd_text round trip through TextSaver, and the in-process
+LRU keyed by device version.
+"""
+
+import sqlite3
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src import cache_manager
+from src.cache_manager import LocalCache
+from src.storage.text import TextSaver
+from src.utils import text_table
+from src.utils.device_versions import bump_device_versions
+from src.utils.text_table import TextTable, get_device_text_table
+
+NAMESPACES = {'iodd': 'http://www.io-link.com/IODD/2010/10'}
+
+IODD = """<IODevice xmlns="http://www.io-link.com/IODD/2010/10">
+  <ExternalTextCollection>
+    <PrimaryLanguage xml:lang="en">
+      <Text id="TN_V_Mode" value="Mode"/>
+      <Text id="TD_V_Mode" value="Operating mode of the sensor"/>
+      <TextRedefine id="STD_TN_Name" value="Sensor"/>
+      <Text id="TN_V_Other" value="Mode"/>
+    </PrimaryLanguage>
+    <Language xml:lang="de">
+      <Text id="TN_V_Other" value="Modus"/>
+      <Text id="TN_V_Mode" value="Betriebsart"/>
+    </Language>
+  </ExternalTextCollection>
+</IODevice>"""
+
+
+@pytest.fixture
+def table():
+    return TextTable.from_xml(ET.fromstring(IODD), NAMESPACES)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "texts.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE devices (id INTEGER PRIMARY KEY AUTOINCREMENT);
+        CREATE TABLE device_versions (device_id INTEGER PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL NOT NULL);
+        CREATE TABLE iodd_text (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, device_id INTEGER, text_id TEXT, language_code TEXT,
+            text_value TEXT, xml_order INTEGER, language_order INTEGER, is_text_redefine INTEGER DEFAULT 0
+        );
+        INSERT INTO devices DEFAULT VALUES;
+    """)
+    conn.close()
+    return path
+
+
+def save(db_path, device_id, table):
+    conn = sqlite3.connect(db_path)
+    TextSaver(conn.cursor()).save(device_id, {}, text_table=table)
+    bump_device_versions(conn.cursor(), [device_id])
+    conn.commit()
+    conn.close()
+
+
+class TestTextTable:
+    """Building and lookups"""
+
+    def test_from_xml(self, table):
+        assert len(table) == 4
+        assert table.languages == ['en', 'de']
+        assert table.primary_language == 'en'
+        assert table.resolve('TN_V_Mode') == 'Mode'
+        assert table.resolve('TN_V_Mode', 'de') == 'Betriebsart'
+        assert table.resolve('STD_TN_Name') == 'Sensor'
+        assert table.resolve('TN_Missing') is None
+        assert table.is_redefine('STD_TN_Name')
+        assert [entry[0] for entry in table.entries('de')] == ['TN_V_Other', 'TN_V_Mode']
+
+    def test_reverse_lookups_return_first_match(self, table):
+        assert table.find_text_id('Mode') == 'TN_V_Mode'
+        assert table.find_text_id('Mode', prefix='TN_V_O') == 'TN_V_Other'
+        assert table.find_text_id('Modus', 'en') is None
+        assert table.find_text_id('Modus') == 'TN_V_Other'
+        assert table.find_text_id_containing('operating MODE', prefix='TD_V_') == 'TD_V_Mode'
+        assert table.first_text_id('STD_') == 'STD_TN_Name'
+
+    def test_replaced_value_leaves_reverse_map(self, table):
+        table.add('TN_V_Mode', 'en', 'Level')
+        assert table.find_text_id('Mode') == 'TN_V_Other'
+        assert table.find_text_id('Level') == 'TN_V_Mode'
+
+    def test_nested_dicts(self, table):
+        all_text, xml_order, language_order, redefine_ids = table.to_dicts()
+        assert all_text['TN_V_Other'] == {'en': 'Mode', 'de': 'Modus'}
+        assert xml_order['TN_V_Other'] == {'en': 3, 'de': 0}
+        assert language_order == {'en': 0, 'de': 1}
+        assert redefine_ids == {'STD_TN_Name'}
+
+
+class TestDeviceTextTables:
+    """iodd_text round trip and the LRU"""
+
+    @pytest.fixture(autouse=True)
+    def lru(self, monkeypatch):
+        # Version stamps are read from the database, not a cache manager
+        monkeypatch.setattr(cache_manager, "_cache_manager", None)
+        monkeypatch.setattr(text_table, "_tables", LocalCache(10, 10 ** 6, 300))
+
+    def test_saved_rows_load_back(self, db_path, table):
+        save(db_path, 1, table)
+        loaded = get_device_text_table(db_path, 1)
+        assert list(loaded.rows()) == list(table.rows())
+        assert loaded.is_redefine('STD_TN_Name')
+        assert loaded.languages == ['en', 'de']
+
+    def test_cached_until_device_version_changes(self, db_path, table):
+        save(db_path, 1, table)
+        first = get_device_text_table(db_path, 1)
+        assert get_device_text_table(db_path, 1) is first
+
+        table.add('TN_V_New', 'en', 'New')
+        save(db_path, 1, table)
+        reloaded = get_device_text_table(db_path, 1)
+        assert reloaded is not first
+        assert reloaded.resolve('TN_V_New') == 'New'
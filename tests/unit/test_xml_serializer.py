@@ -0,0 +1,85 @@
+"""
+Unit Tests for Streaming XML Serializer (src/utils/xml_serializer)
+===================================================================
+
+Tests indentation, escaping and build-format handling of the serializer used
+by the IODD reconstruction engine.
+"""
+
+import pytest
+from xml.dom import minidom
+from xml.etree import ElementTree as ET
+
+from src.utils.xml_serializer import XSI_NAMESPACE, XmlFormat, serialize_xml
+
+
+@pytest.fixture
+def iodd_tree():
+    """Small IODD-shaped element tree."""
+    root = ET.Element('IODevice')
+    root.set('xmlns', 'http://www.io-link.com/IODD/2010/10')
+    root.set(f'{{{XSI_NAMESPACE}}}schemaLocation', 'http://www.io-link.com/IODD/2010/10 IODD1.1.xsd')
+    variable = ET.SubElement(root, 'Variable', id='V_Test', defaultValue='a<b & "c"')
+    datatype = ET.SubElement(variable, 'Datatype')
+    datatype.set(f'{{{XSI_NAMESPACE}}}type', 'UIntegerT')
+    name = ET.SubElement(variable, 'Name')
+    name.text = 'Temp & Pressure'
+    ET.SubElement(variable, 'Description').text = ''
+    return root
+
+
+class TestSerializeXml:
+    """Test default serialization."""
+
+    def test_matches_minidom_output(self, iodd_tree):
+        expected = minidom.parseString(ET.tostring(iodd_tree, encoding='unicode')).toprettyxml(indent="  ")
+        assert serialize_xml(iodd_tree) == expected
+
+    def test_output_round_trips(self, iodd_tree):
+        reparsed = ET.fromstring(serialize_xml(iodd_tree))
+        variable = reparsed.find('{http://www.io-link.com/IODD/2010/10}Variable')
+        assert variable.get('defaultValue') == 'a<b & "c"'
+        assert variable.find('{http://www.io-link.com/IODD/2010/10}Name').text == 'Temp & Pressure'
+        datatype = variable.find('{http://www.io-link.com/IODD/2010/10}Datatype')
+        assert datatype.get(f'{{{XSI_NAMESPACE}}}type') == 'UIntegerT'
+
+
+class TestBuildFormat:
+    """Test formatting from stored iodd_build_format metadata."""
+
+    def test_no_build_format_uses_default(self):
+        assert XmlFormat.from_build_format(None) == XmlFormat()
+
+    def test_tab_indent_crlf_single_quotes(self, iodd_tree):
+        fmt = XmlFormat.from_build_format({
+            'indent_char': 'tab',
+            'indent_size': 1,
+            'newline_style': 'crlf',
+            'attribute_quoting': 'single',
+            'xml_declaration': '<?xml version="1.0" encoding="utf-8"?>',
+            'has_trailing_newline': True,
+        })
+        output = serialize_xml(iodd_tree, fmt)
+
+        assert output.startswith('<?xml version="1.0" encoding="utf-8"?>\r\n<IODevice ')
+        assert "\r\n\t<Variable id='V_Test'" in output
+        assert "\r\n\t\t<Name>Temp &amp; Pressure</Name>\r\n" in output
+        assert 'defaultValue=\'a&lt;b &amp; "c"\'' in output
+        assert output.endswith('</IODevice>\r\n')
+        assert '\n' not in output.replace('\r\n', '')
+
+    def test_space_indent_without_declaration_or_trailing_newline(self, iodd_tree):
+        fmt = XmlFormat.from_build_format({
+            'indent_char': 'space',
+            'indent_size': 4,
+            'newline_style': 'lf',
+            'attribute_quoting': 'double',
+            'xml_declaration': None,
+            'has_trailing_newline': False,
+        })
+        output = serialize_xml(iodd_tree, fmt)
+
+        assert output.startswith('<IODevice ')
+        assert '\n    <Variable ' in output
+        assert '\n        <Datatype xsi:type="UIntegerT"/>' in output
+        assert output.endswith('</IODevice>')